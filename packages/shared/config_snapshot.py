@@ -0,0 +1,210 @@
+"""
+Versioned, in-memory configuration snapshots.
+
+    store = ConfigSnapshotStore("discovery", load=_load_config, fetch_marker=_config_updated_at, refresh_sec=60)
+    store.start()                      # background refresh (FastAPI lifespan)
+    cfg = await store.get()            # ConfigSnapshot; no I/O once loaded
+    ranking = cfg.get("ranking")
+
+load() and fetch_marker() are synchronous (sync Supabase client) and run in a worker thread. Every
+check_sec the store compares fetch_marker() (e.g. the tables' updated_at) with the loaded snapshot and
+reloads when it moved; every refresh_sec it reloads regardless, for writers that do not bump updated_at.
+A snapshot's version only increases when the loaded values actually change. If a reload fails the
+previous snapshot stays in place.
+
+Snapshot values are frozen: FrozenDict / FrozenList subclass dict / list (so isinstance checks in
+callers keep working) but raise TypeError on mutation. Use thaw() for a mutable deep copy.
+"""
+
+import asyncio
+import json
+import logging
+import time
+from dataclasses import dataclass, field
+from typing import Any, Callable, Dict, Optional
+
+logger = logging.getLogger(__name__)
+
+
+def _readonly(*_args: Any, **_kwargs: Any) -> None:
+    raise TypeError("config snapshot values are read-only; use thaw() for a mutable copy")
+
+
+class FrozenDict(dict):
+    """Read-only dict (still an instance of dict)."""
+
+    __setitem__ = __delitem__ = _readonly  # type: ignore[assignment]
+    clear = pop = popitem = setdefault = update = _readonly  # type: ignore[assignment]
+    __ior__ = _readonly  # type: ignore[assignment]
+
+    def __copy__(self) -> Dict[str, Any]:
+        return dict(self)
+
+    def __deepcopy__(self, memo: Dict[int, Any]) -> Any:
+        return thaw(self)
+
+    def __reduce__(self) -> Any:
+        return (FrozenDict, (dict(self),))
+
+
+class FrozenList(list):
+    """Read-only list (still an instance of list)."""
+
+    __setitem__ = __delitem__ = _readonly  # type: ignore[assignment]
+    append = clear = extend = insert = pop = remove = reverse = sort = _readonly  # type: ignore[assignment]
+    __iadd__ = __imul__ = _readonly  # type: ignore[assignment]
+
+    def __copy__(self) -> list:
+        return list(self)
+
+    def __deepcopy__(self, memo: Dict[int, Any]) -> Any:
+        return thaw(self)
+
+    def __reduce__(self) -> Any:
+        return (FrozenList, (list(self),))
+
+
+def freeze(value: Any) -> Any:
+    """Recursively convert dicts / lists into FrozenDict / FrozenList."""
+    if isinstance(value, dict):
+        return FrozenDict((k, freeze(v)) for k, v in value.items())
+    if isinstance(value, (list, tuple)):
+        return FrozenList(freeze(v) for v in value)
+    return value
+
+
+def thaw(value: Any) -> Any:
+    """Mutable deep copy of a frozen value."""
+    if isinstance(value, dict):
+        return {k: thaw(v) for k, v in value.items()}
+    if isinstance(value, list):
+        return [thaw(v) for v in value]
+    return value
+
+
+@dataclass(frozen=True)
+class ConfigSnapshot:
+    """One immutable view of the configuration. version increases whenever values change."""
+
+    version: int
+    values: FrozenDict
+    marker: Optional[str] = None  # fetch_marker() value the snapshot was loaded at
+    loaded_at: float = field(default_factory=time.time)
+
+    def get(self, key: str, default: Any = None) -> Any:
+        return self.values.get(key, default)
+
+
+class ConfigSnapshotStore:
+    """Holds the current ConfigSnapshot and refreshes it in the background."""
+
+    def __init__(
+        self,
+        name: str,
+        load: Callable[[], Dict[str, Any]],
+        fetch_marker: Optional[Callable[[], Optional[str]]] = None,
+        refresh_sec: float = 60.0,
+        check_sec: float = 5.0,
+        defaults: Optional[Dict[str, Any]] = None,
+        on_change: Optional[Callable[[ConfigSnapshot], None]] = None,
+    ):
+        self.name = name
+        self._load = load
+        self._fetch_marker = fetch_marker
+        self._refresh_sec = max(1.0, float(refresh_sec))
+        self._check_sec = max(0.5, float(check_sec))
+        self._defaults = dict(defaults or {})
+        self._on_change = on_change
+        self._snapshot: Optional[ConfigSnapshot] = None
+        self._checked_at = 0.0
+        self._lock = asyncio.Lock()
+        self._task: Optional[asyncio.Task] = None
+        self._stats = {"loads": 0, "load_errors": 0, "marker_checks": 0, "changes": 0}
+        self._last_error: Optional[str] = None
+
+    @property
+    def current(self) -> Optional[ConfigSnapshot]:
+        return self._snapshot
+
+    async def get(self) -> ConfigSnapshot:
+        """Current snapshot. Loads on first use; when no background task runs, refreshes inline once due."""
+        snap = self._snapshot
+        if snap is None or (self._task is None and time.monotonic() - self._checked_at >= self._check_sec):
+            await self.refresh()
+            snap = self._snapshot
+        if snap is None:  # first load failed: serve defaults until the next attempt succeeds
+            return ConfigSnapshot(version=0, values=freeze(self._defaults))
+        return snap
+
+    async def refresh(self, force: bool = False) -> bool:
+        """Check the marker and reload when it moved, refresh_sec elapsed or force. Returns True when values changed."""
+        async with self._lock:
+            now = time.monotonic()
+            snap = self._snapshot
+            marker: Optional[str] = None
+            try:
+                if self._fetch_marker is not None:
+                    self._stats["marker_checks"] += 1
+                    marker = await asyncio.to_thread(self._fetch_marker)
+                due = snap is None or force or time.time() - snap.loaded_at >= self._refresh_sec
+                if not due and (self._fetch_marker is None or marker == snap.marker):
+                    self._checked_at = now
+                    return False
+                self._stats["loads"] += 1
+                values = freeze(await asyncio.to_thread(self._load))
+            except Exception as e:
+                self._stats["load_errors"] += 1
+                self._last_error = str(e)
+                self._checked_at = now
+                logger.warning("Config snapshot %s refresh failed; keeping version %s: %s", self.name, snap.version if snap else None, e)
+                return False
+            self._checked_at = now
+            self._last_error = None
+            if snap is not None and _fingerprint(values) == _fingerprint(snap.values):
+                self._snapshot = ConfigSnapshot(version=snap.version, values=snap.values, marker=marker)
+                return False
+            self._snapshot = ConfigSnapshot(version=(snap.version + 1) if snap else 1, values=values, marker=marker)
+            self._stats["changes"] += 1
+        if snap is not None:
+            logger.info("Config snapshot %s changed: version %s -> %s", self.name, snap.version, self._snapshot.version)
+        if self._on_change is not None:
+            try:
+                self._on_change(self._snapshot)
+            except Exception as e:
+                logger.warning("Config snapshot %s on_change failed: %s", self.name, e)
+        return True
+
+    async def _run(self) -> None:
+        while True:
+            await asyncio.sleep(self._check_sec)
+            await self.refresh()
+
+    def start(self) -> None:
+        """Start the background refresh loop (idempotent)."""
+        if self._task is None:
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    def stats(self) -> Dict[str, Any]:
+        snap = self._snapshot
+        return {
+            **self._stats,
+            "name": self.name,
+            "version": snap.version if snap else None,
+            "marker": snap.marker if snap else None,
+            "loaded_at": snap.loaded_at if snap else None,
+            "background": self._task is not None,
+            "last_error": self._last_error,
+        }
+
+
+def _fingerprint(values: Any) -> str:
+    return json.dumps(values, sort_keys=True, default=str)
@@ -1,20 +1,27 @@
 """
 Protocol-Aware Discovery Aggregator.
 
-Fans out to LocalDB, UCP Manifest, and MCP drivers with strict timeout handling.
+Fans out to LocalDB, UCP Manifest, and MCP drivers with strict timeout handling; results are
+collected per driver as they arrive, so a slow partner never discards fast local results.
 Normalizes all responses into UCPProduct schema (capabilities, features) to prevent LLM hallucination.
 """
 
 import asyncio
 import logging
 from dataclasses import dataclass, field
-from typing import Any, Awaitable, Callable, Dict, List, Optional, Union, Union
+from typing import Any, AsyncIterator, Awaitable, Callable, Dict, List, Optional, Tuple, Union
 from urllib.parse import urlparse
 
 from .discovery import is_browse_query
+from .ucp_manifest_cache import UCPManifestCache, get_manifest_cache
+from .http_clients import get_http_client
 
 logger = logging.getLogger(__name__)
 
+# UCP partner fan-out defaults: partners queried concurrently, each with its own deadline
+UCP_DEFAULT_MAX_CONCURRENCY = 10
+UCP_DEFAULT_PARTNER_TIMEOUT = 4.0
+
 
 @dataclass
 class UCPProduct:
@@ -178,14 +185,31 @@ class UCPManifestDriver:
     Otherwise we try REST (GET /items, /search, etc.).
     Uses the origin (scheme + host) of base_url for manifest and relative endpoints so stored paths
     like https://kyliecosmetics.com/.well-known/ucp still resolve to https://kyliecosmetics.com/.well-known/ucp.
+    Manifests (and the parsed transport) come from the process-wide UCPManifestCache, so a warm search
+    only makes catalog calls.
     """
 
-    def __init__(self, get_partner_manifest_urls: Optional[Callable[[], Awaitable[List[Union[str, Dict[str, Any]]]]]] = None):
+    def __init__(
+        self,
+        get_partner_manifest_urls: Optional[Callable[[], Awaitable[List[Union[str, Dict[str, Any]]]]]] = None,
+        max_concurrency: int = UCP_DEFAULT_MAX_CONCURRENCY,
+        partner_timeout: float = UCP_DEFAULT_PARTNER_TIMEOUT,
+        max_partners: Optional[int] = None,
+        manifest_cache: Optional[UCPManifestCache] = None,
+    ):
         """
         get_partner_manifest_urls: async callable returning list of base URLs (str) or
         list of dicts with "base_url" and optional "access_token" for MCP Bearer auth.
+        max_concurrency: partners queried at once (fan-out width).
+        partner_timeout: per-partner deadline in seconds (manifest + catalog calls).
+        max_partners: optional cap on partners queried per search (None = all registered partners).
+        manifest_cache: manifest cache (defaults to the process-wide cache from get_manifest_cache()).
         """
         self._get_urls = get_partner_manifest_urls
+        self._max_concurrency = max(1, min(50, int(max_concurrency)))
+        self._partner_timeout = max(0.5, min(30.0, float(partner_timeout)))
+        self._max_partners = max(1, int(max_partners)) if max_partners else None
+        self._manifest_cache = manifest_cache or get_manifest_cache()
 
     @staticmethod
     def _origin(base_url: str) -> str:
@@ -246,7 +270,6 @@ class UCPManifestDriver:
         except ImportError:
             logger.debug("shopify_mcp_driver not available for UCP MCP transport")
             return []
-        import httpx
         payload = {
             "jsonrpc": "2.0",
             "id": 1,
@@ -264,8 +287,7 @@ class UCPManifestDriver:
             headers["Authorization"] = f"Bearer {access_token.strip()}"
         logger.info("UCP MCP request: POST url=%s query=%s", mcp_endpoint, (query or "products")[:50])
         try:
-            async with httpx.AsyncClient(timeout=5.0) as client:
-                r = await client.post(mcp_endpoint, json=payload, headers=headers)
+            r = await get_http_client(mcp_endpoint).post(mcp_endpoint, json=payload, headers=headers, timeout=5.0)
         except Exception as e:
             logger.info("UCP MCP request failed: url=%s error=%s", mcp_endpoint, e)
             return []
@@ -290,152 +312,219 @@ class UCPManifestDriver:
             logger.info("UCP MCP response summary: url=%s products_extracted=%s", mcp_endpoint, len(out))
         return out
 
+    @staticmethod
+    def _normalize_partners(urls: List[Union[str, Dict[str, Any]]]) -> List[Tuple[str, Optional[str]]]:
+        """Normalize: list of str -> (base_url, None); list of dict -> (base_url, access_token). Dedupes by base_url."""
+        partners: List[Tuple[str, Optional[str]]] = []
+        seen: set = set()
+        for item in urls:
+            if isinstance(item, dict):
+                bu = (item.get("base_url") or "").strip()
+                token = item.get("access_token")
+                token = str(token).strip() if token and str(token).strip() else None
+            else:
+                bu = str(item).strip()
+                token = None
+            if bu and bu not in seen:
+                seen.add(bu)
+                partners.append((bu, token))
+        return partners
+
+    def _parse_manifest(self, data: Dict[str, Any], origin: str) -> Dict[str, Any]:
+        """Resolve the shopping transport once per manifest fetch: MCP endpoint and REST catalog base (or None)."""
+        ucp = data.get("ucp", data)
+        mcp_endpoint, rest_endpoint = self._parse_shopping_transport(ucp, origin) if isinstance(ucp, dict) else (None, None)
+        if not mcp_endpoint and not rest_endpoint and isinstance(ucp, dict):
+            logger.debug("UCP driver: no dev.ucp.shopping transport for %s (manifest may use different structure)", origin)
+        catalog_url = None
+        if isinstance(ucp, dict):
+            services = ucp.get("services", {})
+            if isinstance(services, dict):
+                dev = services.get("dev.ucp.shopping", services)
+                if isinstance(dev, dict):
+                    rest = dev.get("rest", dev)
+                    if isinstance(rest, dict):
+                        catalog_url = rest.get("endpoint", rest.get("catalog"))
+        # Only try REST catalog when manifest explicitly advertises a REST endpoint (avoids 404 on /api/v1/ucp/* for MCP-only partners)
+        catalog_base = None
+        if not catalog_url and rest_endpoint:
+            catalog_base = rest_endpoint
+        elif catalog_url:
+            cu = str(catalog_url or rest_endpoint or "").rstrip("/")
+            for suffix in ("/items", "/search", "/item", "/products"):
+                if cu.endswith(suffix):
+                    catalog_base = cu[: -len(suffix)]
+                    break
+            else:
+                catalog_base = cu or f"{origin}/api/v1/ucp"
+        return {"mcp_endpoint": mcp_endpoint, "catalog_base": catalog_base}
+
+    async def _search_partner(
+        self,
+        base_url: str,
+        access_token: Optional[str],
+        query: str,
+        limit: int,
+        headers: Dict[str, str],
+    ) -> List[UCPProduct]:
+        """MCP/REST catalog lookup for one partner using its cached manifest. Returns that partner's products (up to limit)."""
+        origin = self._origin(base_url)
+        if not origin:
+            return []
+        entry = await self._manifest_cache.get(origin, base_url, headers, self._parse_manifest)
+        if entry is None:
+            return []
+        items_out: List[UCPProduct] = []
+        mcp_endpoint = entry.transport.get("mcp_endpoint")
+        catalog_base = entry.transport.get("catalog_base")
+        slug = origin.replace("https://", "").replace("http://", "").split("/")[0].replace(".", "_")[:64]
+
+        if mcp_endpoint:
+            host = origin.replace("http://", "").replace("https://", "").split("/")[0]
+            fallback_mcp = f"https://{host}/api/mcp" if "/api/ucp/mcp" in (mcp_endpoint or "") else None
+            if not access_token and fallback_mcp:
+                products_raw = await self._search_via_mcp(fallback_mcp, query, limit, slug, access_token=None)
+            else:
+                products_raw = await self._search_via_mcp(mcp_endpoint, query, limit, slug, access_token=access_token)
+                if not products_raw and fallback_mcp:
+                    products_raw = await self._search_via_mcp(fallback_mcp, query, limit, slug, access_token=None)
+            if products_raw:
+                for raw in products_raw[:limit]:
+                    p = _normalize_to_ucp_product(raw, "UCP")
+                    if p.id:
+                        items_out.append(p)
+                logger.info("UCP driver: %s returned %s products for query=%s", origin, len(products_raw), query[:50] if query else "")
+                return items_out
+            if query and query.strip():
+                logger.info("UCP driver: MCP returned 0 products for %s query=%s", origin, query[:50])
+        if not catalog_base:
+            return []
+        # Try primary path /items, then fallbacks: /search, /item, /products; stop at the first 404 (remembered in the
+        # manifest cache so MCP-only partners don't pay a 404 round trip on every search)
+        catalog_paths = ["/items", "/search", "/item", "/products"]
+        cat = None
+        for path in catalog_paths:
+            if path in entry.rest_404_paths:
+                break
+            url = f"{catalog_base.rstrip('/')}{path}"
+            r = await get_http_client(url).get(url, params={"q": query, "limit": limit}, headers=headers, timeout=3.0)
+            logger.info("UCP REST catalog request: GET url=%s params=q=%s,limit=%s status=%s", url, (query or "")[:30], limit, r.status_code)
+            if r.status_code == 404:
+                self._manifest_cache.mark_rest_404(origin, path)
+                break
+            if r.status_code == 200:
+                try:
+                    cat = r.json()
+                    item_count = len(cat.get("items", cat.get("products", [])) if isinstance(cat, dict) else [])
+                    logger.info("UCP REST catalog response: url=%s status=200 items_count=%s", url, item_count)
+                    break
+                except Exception:
+                    pass
+        if not cat or not isinstance(cat, dict):
+            return []
+        items = cat.get("items", cat.get("products", []))
+        if not items and isinstance(cat.get("item"), dict):
+            items = [cat["item"]]
+        for it in (items or [])[:limit]:
+            raw = it if isinstance(it, dict) else {}
+            pid = raw.get("id", raw.get("item", {}).get("id", ""))
+            if isinstance(pid, dict):
+                pid = pid.get("id", "")
+            p = _normalize_to_ucp_product(
+                {
+                    "id": pid,
+                    "name": raw.get("title", raw.get("name", "")),
+                    "description": raw.get("description", ""),
+                    "price": raw.get("price", 0) / 100.0 if isinstance(raw.get("price"), (int, float)) else 0,
+                    "currency": raw.get("currency", "USD"),
+                    "image_url": raw.get("image_url"),
+                    "capabilities": raw.get("capabilities", []),
+                    "features": raw.get("features", []),
+                },
+                "UCP",
+            )
+            items_out.append(p)
+        return items_out
+
+    async def _search_partner_bounded(
+        self,
+        sem: asyncio.Semaphore,
+        base_url: str,
+        access_token: Optional[str],
+        query: str,
+        limit: int,
+        headers: Dict[str, str],
+    ) -> List[UCPProduct]:
+        """Run _search_partner under the fan-out semaphore with its own deadline (starts when the slot is acquired)."""
+        async with sem:
+            try:
+                return await asyncio.wait_for(
+                    self._search_partner(base_url, access_token, query, limit, headers),
+                    timeout=self._partner_timeout,
+                )
+            except asyncio.TimeoutError:
+                logger.info("UCP driver: partner %s timed out after %.1fs", base_url, self._partner_timeout)
+            except Exception as e:
+                logger.debug("UCP manifest %s failed: %s", base_url, e)
+            return []
+
+    @staticmethod
+    def _merge_partner_results(per_partner: List[List[UCPProduct]], limit: int) -> List[UCPProduct]:
+        """Round-robin merge in partner order so every answering partner is represented; dedupe by id."""
+        out: List[UCPProduct] = []
+        seen: set = set()
+        depth = max((len(r) for r in per_partner), default=0)
+        for i in range(depth):
+            for results in per_partner:
+                if len(out) >= limit:
+                    return out
+                if i < len(results):
+                    p = results[i]
+                    key = p.id or f"{p.source}:{p.name}"
+                    if key in seen:
+                        continue
+                    seen.add(key)
+                    out.append(p)
+        return out
+
     async def search(
         self,
         query: str,
         limit: int = 20,
         partner_id: Optional[str] = None,
         exclude_partner_id: Optional[str] = None,
+        timeout: Optional[float] = None,
     ) -> List[UCPProduct]:
+        """
+        Query all partners concurrently (up to max_concurrency in flight, each bounded by partner_timeout).
+        timeout: overall deadline in seconds; partners still running at the deadline are cancelled and
+        whatever already answered is returned.
+        """
         if not self._get_urls:
             return []
         try:
-            import httpx
             urls = await self._get_urls()
             if not urls:
                 return []
-            # Normalize: list of str -> (base_url, None); list of dict -> (base_url, access_token)
-            partners: List[tuple] = []
-            for item in urls[:5]:
-                if isinstance(item, dict):
-                    bu = (item.get("base_url") or "").strip()
-                    token = item.get("access_token")
-                    if bu:
-                        partners.append((bu, token if token and str(token).strip() else None))
-                else:
-                    bu = str(item).strip()
-                    if bu:
-                        partners.append((bu, None))
+            partners = self._normalize_partners(urls)
+            if self._max_partners is not None:
+                partners = partners[: self._max_partners]
             if not partners:
                 return []
             logger.info("UCP partner base URLs: %s", [p[0] for p in partners])
-            all_items: List[UCPProduct] = []
             headers = {"Accept": "application/json", "User-Agent": "USO-Orchestrator/1.0 (UCP Discovery)"}
-            for base_url, access_token in partners:
-                try:
-                    origin = self._origin(base_url)
-                    if not origin:
-                        continue
-                    # Try manifest: prefer /.well-known/ucp (no extension) first to avoid 404 where servers only serve that path
-                    manifest_url = f"{origin}/.well-known/ucp"
-                    async with httpx.AsyncClient(timeout=3.0) as client:
-                        r = await client.get(manifest_url, headers=headers)
-                        logger.info("UCP manifest request: GET url=%s status=%s", manifest_url, r.status_code)
-                        if r.status_code != 200:
-                            manifest_url = f"{origin}/.well-known/ucp.json"
-                            r = await client.get(manifest_url, headers=headers)
-                            logger.info("UCP manifest request: GET url=%s status=%s", manifest_url, r.status_code)
-                        if r.status_code != 200 and base_url != origin and base_url.startswith(origin):
-                            manifest_url = base_url.rstrip("/")
-                            r = await client.get(manifest_url, headers=headers)
-                            logger.info("UCP manifest request: GET url=%s status=%s", manifest_url, r.status_code)
-                        if r.status_code != 200:
-                            logger.info("UCP driver: manifest failed for %s (status=%s)", origin, r.status_code)
-                            continue
-                        data = r.json()
-                    logger.info("UCP manifest response: url=%s status=200 keys=%s", manifest_url, list(data.keys())[:15] if isinstance(data, dict) else "n/a")
-                    catalog_url = None
-                    ucp = data.get("ucp", data)
-                    mcp_endpoint, rest_endpoint = self._parse_shopping_transport(ucp, origin) if isinstance(ucp, dict) else (None, None)
-                    if not mcp_endpoint and not rest_endpoint and isinstance(ucp, dict):
-                        logger.debug("UCP driver: no dev.ucp.shopping transport for %s (manifest may use different structure)", origin)
-                    slug = origin.replace("https://", "").replace("http://", "").split("/")[0].replace(".", "_")[:64]
-
-                    if mcp_endpoint:
-                        host = origin.replace("http://", "").replace("https://", "").split("/")[0]
-                        fallback_mcp = f"https://{host}/api/mcp" if "/api/ucp/mcp" in (mcp_endpoint or "") else None
-                        has_token = access_token and str(access_token).strip()
-                        if not has_token and fallback_mcp:
-                            products_raw = await self._search_via_mcp(fallback_mcp, query, limit, slug, access_token=None)
-                        else:
-                            products_raw = await self._search_via_mcp(mcp_endpoint, query, limit, slug, access_token=access_token)
-                            if not products_raw and fallback_mcp:
-                                products_raw = await self._search_via_mcp(fallback_mcp, query, limit, slug, access_token=None)
-                        if products_raw:
-                            for raw in products_raw[:limit]:
-                                p = _normalize_to_ucp_product(raw, "UCP")
-                                if p.id:
-                                    all_items.append(p)
-                            logger.info("UCP driver: %s returned %s products for query=%s", origin, len(products_raw), query[:50] if query else "")
-                            continue
-                        if not products_raw and query and query.strip():
-                            logger.info("UCP driver: MCP returned 0 products for %s query=%s", origin, query[:50])
-                    if isinstance(ucp, dict):
-                        services = ucp.get("services", {})
-                        if isinstance(services, dict):
-                            dev = services.get("dev.ucp.shopping", services)
-                            if isinstance(dev, dict):
-                                rest = dev.get("rest", dev)
-                                if isinstance(rest, dict):
-                                    catalog_url = rest.get("endpoint", rest.get("catalog"))
-                    # Only try REST catalog when manifest explicitly advertises a REST endpoint (avoids 404 on /api/v1/ucp/* for MCP-only partners)
-                    if not catalog_url and not rest_endpoint:
-                        continue
-                    if not catalog_url:
-                        catalog_base = rest_endpoint or f"{origin}/api/v1/ucp"
-                    else:
-                        cu = (catalog_url or rest_endpoint or "").rstrip("/")
-                        for suffix in ("/items", "/search", "/item", "/products"):
-                            if cu.endswith(suffix):
-                                catalog_base = cu[: -len(suffix)]
-                                break
-                        else:
-                            catalog_base = cu or f"{origin}/api/v1/ucp"
-                    # Try primary path /items, then fallbacks: /search, /item, /products; stop after first 404 to avoid 4x 404 for MCP-only partners
-                    catalog_paths = ["/items", "/search", "/item", "/products"]
-                    cat = None
-                    async with httpx.AsyncClient(timeout=3.0) as client:
-                        for path in catalog_paths:
-                            url = f"{catalog_base.rstrip('/')}{path}"
-                            r = await client.get(url, params={"q": query, "limit": limit}, headers=headers)
-                            logger.info("UCP REST catalog request: GET url=%s params=q=%s,limit=%s status=%s", url, (query or "")[:30], limit, r.status_code)
-                            if r.status_code == 404:
-                                break
-                            if r.status_code == 200:
-                                try:
-                                    cat = r.json()
-                                    item_count = len(cat.get("items", cat.get("products", [])) if isinstance(cat, dict) else [])
-                                    logger.info("UCP REST catalog response: url=%s status=200 items_count=%s", url, item_count)
-                                    break
-                                except Exception:
-                                    pass
-                    if not cat:
-                        continue
-                    items = cat.get("items", cat.get("products", []))
-                    if not items and isinstance(cat.get("item"), dict):
-                        items = [cat["item"]]
-                    for it in (items or [])[:limit]:
-                        raw = it if isinstance(it, dict) else {}
-                        pid = raw.get("id", raw.get("item", {}).get("id", ""))
-                        if isinstance(pid, dict):
-                            pid = pid.get("id", "")
-                        p = _normalize_to_ucp_product(
-                            {
-                                "id": pid,
-                                "name": raw.get("title", raw.get("name", "")),
-                                "description": raw.get("description", ""),
-                                "price": raw.get("price", 0) / 100.0 if isinstance(raw.get("price"), (int, float)) else 0,
-                                "currency": raw.get("currency", "USD"),
-                                "image_url": raw.get("image_url"),
-                                "capabilities": raw.get("capabilities", []),
-                                "features": raw.get("features", []),
-                            },
-                            "UCP",
-                        )
-                        all_items.append(p)
-                except Exception as e:
-                    logger.debug("UCP manifest %s failed: %s", base_url, e)
-            return all_items[:limit]
+            sem = asyncio.Semaphore(self._max_concurrency)
+            tasks = [
+                asyncio.create_task(self._search_partner_bounded(sem, base_url, access_token, query, limit, headers))
+                for base_url, access_token in partners
+            ]
+            done, pending = await asyncio.wait(tasks, timeout=timeout)
+            for t in pending:
+                t.cancel()
+            if pending:
+                logger.info("UCP driver: %s of %s partners still pending at %.1fs deadline", len(pending), len(tasks), timeout or 0)
+            per_partner = [t.result() for t in tasks if t in done and not t.cancelled() and t.exception() is None]
+            return self._merge_partner_results(per_partner, limit)
         except Exception as e:
             logger.warning("UCPManifestDriver search failed: %s", e)
             return []
@@ -464,10 +553,42 @@ class MCPDriver:
             return []
 
 
+@dataclass
+class DriverBatch:
+    """Products from one driver, yielded by DiscoveryAggregator.stream as soon as that driver finishes."""
+
+    source: str  # local | ucp | mcp | shopify_mcp
+    products: List[UCPProduct]
+    elapsed_ms: int = 0
+    error: Optional[str] = None  # "timeout" when the driver missed the deadline, else the exception text
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Convert to dict for API/SSE payloads."""
+        return {
+            "source": self.source,
+            "products": [p.to_dict() for p in self.products],
+            "count": len(self.products),
+            "elapsed_ms": self.elapsed_ms,
+            "error": self.error,
+        }
+
+
+def _exclude_by_tags(products: List[UCPProduct], exclude_experience_tags: Optional[List[str]]) -> List[UCPProduct]:
+    """Drop products carrying any of exclude_experience_tags (case-insensitive)."""
+    if not exclude_experience_tags:
+        return products
+    exclude_set = {str(t).strip().lower() for t in exclude_experience_tags if t and str(t).strip()}
+    if not exclude_set:
+        return products
+    return [p for p in products if not any((tag or "").strip().lower() in exclude_set for tag in (p.experience_tags or []))]
+
+
 class DiscoveryAggregator:
     """
     Async aggregator that fans out to LocalDB, UCP, MCP with strict timeout.
     Merges and dedupes by product id; returns list of UCPProduct.
+    Drivers are collected as they finish: search() returns whatever arrived by the deadline,
+    stream() yields one DriverBatch per driver so callers can show local products before partners answer.
     """
 
     def __init__(
@@ -484,25 +605,24 @@ class DiscoveryAggregator:
         self._shopify_mcp = shopify_mcp_driver
         self._timeout_ms = max(500, min(60000, timeout_ms))
 
-    async def search(
+    def _driver_calls(
         self,
         query: str,
-        limit: int = 20,
-        partner_id: Optional[str] = None,
-        exclude_partner_id: Optional[str] = None,
-        experience_tag: Optional[str] = None,
-        experience_tags: Optional[List[str]] = None,
-        exclude_experience_tags: Optional[List[str]] = None,
-    ) -> List[UCPProduct]:
-        if is_browse_query(query):
-            query = ""
+        limit: int,
+        partner_id: Optional[str],
+        exclude_partner_id: Optional[str],
+        experience_tag: Optional[str],
+        experience_tags: Optional[List[str]],
+    ) -> List[Tuple[str, Awaitable[List[UCPProduct]]]]:
+        """(source, coroutine) per configured driver, in merge order (local first)."""
         timeout_sec = self._timeout_ms / 1000.0
         # Cap UCP per-driver timeout so one slow partner doesn't block the whole aggregator
         ucp_timeout_sec = min(timeout_sec, 5.0)
-        tasks: List[asyncio.Task] = []
+        calls: List[Tuple[str, Awaitable[List[UCPProduct]]]] = []
         if self._local:
-            tasks.append(
-                asyncio.create_task(
+            calls.append(
+                (
+                    "local",
                     self._local.search(
                         query=query,
                         limit=limit,
@@ -510,59 +630,131 @@ class DiscoveryAggregator:
                         exclude_partner_id=exclude_partner_id,
                         experience_tag=experience_tag,
                         experience_tags=experience_tags,
-                    )
+                    ),
                 )
             )
         if self._ucp:
             ucp_driver = self._ucp
             async def _ucp_with_timeout():
+                # Driver returns partial (per-partner) results at its own deadline; outer wait_for is a safety net.
                 try:
                     return await asyncio.wait_for(
-                        ucp_driver.search(query=query, limit=limit, partner_id=partner_id, exclude_partner_id=exclude_partner_id),
-                        timeout=ucp_timeout_sec,
+                        ucp_driver.search(
+                            query=query,
+                            limit=limit,
+                            partner_id=partner_id,
+                            exclude_partner_id=exclude_partner_id,
+                            timeout=ucp_timeout_sec,
+                        ),
+                        timeout=ucp_timeout_sec + 0.5,
                     )
                 except asyncio.TimeoutError:
                     logger.debug("UCP driver timed out after %.0fs", ucp_timeout_sec)
                     return []
 
-            tasks.append(asyncio.create_task(_ucp_with_timeout()))
+            calls.append(("ucp", _ucp_with_timeout()))
         if self._mcp:
-            tasks.append(
-                asyncio.create_task(
-                    self._mcp.search(query=query, limit=limit, partner_id=partner_id, exclude_partner_id=exclude_partner_id)
-                )
+            calls.append(
+                ("mcp", self._mcp.search(query=query, limit=limit, partner_id=partner_id, exclude_partner_id=exclude_partner_id))
             )
         if self._shopify_mcp:
-            tasks.append(
-                asyncio.create_task(
-                    self._shopify_mcp.search(query=query, limit=limit, partner_id=partner_id, exclude_partner_id=exclude_partner_id)
+            calls.append(
+                (
+                    "shopify_mcp",
+                    self._shopify_mcp.search(query=query, limit=limit, partner_id=partner_id, exclude_partner_id=exclude_partner_id),
                 )
             )
-        if not tasks:
-            return []
+        return calls
+
+    async def stream(
+        self,
+        query: str,
+        limit: int = 20,
+        partner_id: Optional[str] = None,
+        exclude_partner_id: Optional[str] = None,
+        experience_tag: Optional[str] = None,
+        experience_tags: Optional[List[str]] = None,
+        exclude_experience_tags: Optional[List[str]] = None,
+    ) -> AsyncIterator[DriverBatch]:
+        """
+        Yield one DriverBatch per driver as it completes (fastest first). Drivers still running at the
+        deadline are cancelled and reported as empty batches with error="timeout". Closing the iterator
+        early cancels the remaining drivers.
+        """
+        if is_browse_query(query):
+            query = ""
+        calls = self._driver_calls(query, limit, partner_id, exclude_partner_id, experience_tag, experience_tags)
+        if not calls:
+            return
+        loop = asyncio.get_running_loop()
+        started = loop.time()
+        deadline = started + self._timeout_ms / 1000.0
+        order: Dict[asyncio.Task, int] = {}
+        sources: Dict[asyncio.Task, str] = {}
+        for i, (source, coro) in enumerate(calls):
+            task = asyncio.create_task(coro)
+            order[task] = i
+            sources[task] = source
+        pending = set(order)
         try:
-            raw_results: List[Union[List[UCPProduct], BaseException]] = await asyncio.wait_for(
-                asyncio.gather(*tasks, return_exceptions=True),
-                timeout=timeout_sec,
-            )
-        except asyncio.TimeoutError:
-            logger.warning("DiscoveryAggregator timed out after %sms", self._timeout_ms)
-            return []
+            while pending:
+                remaining = deadline - loop.time()
+                if remaining <= 0:
+                    break
+                done, pending = await asyncio.wait(pending, timeout=remaining, return_when=asyncio.FIRST_COMPLETED)
+                for task in sorted(done, key=order.__getitem__):
+                    elapsed_ms = int((loop.time() - started) * 1000)
+                    source = sources[task]
+                    exc = task.exception()
+                    if exc is not None:
+                        logger.warning("Discovery driver %s failed: %s", source, exc)
+                        yield DriverBatch(source=source, products=[], elapsed_ms=elapsed_ms, error=str(exc) or type(exc).__name__)
+                        continue
+                    result = task.result()
+                    products = [p for p in (result if isinstance(result, list) else []) if isinstance(p, UCPProduct) and p.id]
+                    if products:
+                        logger.info("DiscoveryAggregator: %s returned %s products in %sms", source, len(products), elapsed_ms)
+                    yield DriverBatch(source=source, products=_exclude_by_tags(products, exclude_experience_tags), elapsed_ms=elapsed_ms)
+            if pending:
+                timed_out = sorted(pending, key=order.__getitem__)
+                logger.warning(
+                    "DiscoveryAggregator: %s missed the %sms deadline; returning partial results",
+                    ", ".join(sources[t] for t in timed_out),
+                    self._timeout_ms,
+                )
+                for task in timed_out:
+                    task.cancel()
+                elapsed_ms = int((loop.time() - started) * 1000)
+                for task in timed_out:
+                    yield DriverBatch(source=sources[task], products=[], elapsed_ms=elapsed_ms, error="timeout")
+        finally:
+            for task in pending:
+                task.cancel()
+
+    async def search(
+        self,
+        query: str,
+        limit: int = 20,
+        partner_id: Optional[str] = None,
+        exclude_partner_id: Optional[str] = None,
+        experience_tag: Optional[str] = None,
+        experience_tags: Optional[List[str]] = None,
+        exclude_experience_tags: Optional[List[str]] = None,
+    ) -> List[UCPProduct]:
+        """Collect every driver batch that arrives by the deadline; merge in driver order, dedupe by id."""
+        batches: Dict[str, List[UCPProduct]] = {}
+        async for batch in self.stream(
+            query=query,
+            limit=limit,
+            partner_id=partner_id,
+            exclude_partner_id=exclude_partner_id,
+            experience_tag=experience_tag,
+            experience_tags=experience_tags,
+            exclude_experience_tags=exclude_experience_tags,
+        ):
+            batches[batch.source] = batch.products
         merged: Dict[str, UCPProduct] = {}
-        for r in raw_results:
-            if isinstance(r, Exception):
-                logger.warning("Discovery driver failed: %s", r)
-                continue
-            n = len(r) if isinstance(r, list) else 0
-            if n > 0:
-                logger.info("DiscoveryAggregator: one driver returned %s products", n)
-            for p in r if isinstance(r, list) else []:
-                if isinstance(p, UCPProduct) and p.id:
-                    merged[p.id] = p
-        out = list(merged.values())[:limit]
-        # Config-driven exclusion: when caller passes exclude_experience_tags (from admin config), drop products that have any of those tags.
-        if exclude_experience_tags:
-            exclude_set = {str(t).strip().lower() for t in exclude_experience_tags if t and str(t).strip()}
-            if exclude_set:
-                out = [p for p in out if not any((tag or "").strip().lower() in exclude_set for tag in (p.experience_tags or []))]
-        return out
+        for source in ("local", "ucp", "mcp", "shopify_mcp"):
+            for p in batches.get(source, []):
+                merged[p.id] = p
+        return list(merged.values())[:limit]
@@ -0,0 +1,298 @@
+"""
+Pluggable text-embedding providers.
+
+    provider = create_embedding_provider("openai", "text-embedding-3-small", openai_api_key=...)
+    vectors = await provider.embed(["red roses", "date night"])  # one vector (or None) per input
+
+Providers:
+- openai / azure: remote embeddings API (multi-input batches; 429 / 5xx / network errors retried with
+  backoff, honouring Retry-After).
+- local: CPU sentence-embedding model via sentence-transformers when installed, else the hashing provider.
+- hash: deterministic hashing vectorizer (word, word-bigram and character-trigram features). No model, no
+  network, no dependencies; useful for air-gapped / test deployments and local benchmarks.
+
+Every vector is padded or truncated to `dimension` (pgvector column width) and tagged by provider.version
+(e.g. "openai:text-embedding-3-small", "hash:hashing-v1"). Store the version with the vectors: vectors from
+different versions are not comparable.
+"""
+
+import asyncio
+import hashlib
+import logging
+import math
+import random
+import re
+from abc import ABC, abstractmethod
+from collections import Counter
+from typing import Any, Dict, List, Optional
+
+import httpx
+
+from .http_clients import get_http_client
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_DIMENSION = 1536
+MAX_ATTEMPTS = 5
+MAX_BACKOFF_SEC = 30.0
+DEFAULT_LOCAL_MODEL = "sentence-transformers/all-MiniLM-L6-v2"
+
+
+def _fit(vec: List[float], dimension: int) -> List[float]:
+    """Zero-pad or truncate to dimension (zero padding keeps cosine similarity unchanged)."""
+    if len(vec) >= dimension:
+        return vec[:dimension]
+    return vec + [0.0] * (dimension - len(vec))
+
+
+class EmbeddingProvider(ABC):
+    """Abstract provider: embed(texts) returns one vector (or None on failure) per input, in order."""
+
+    name = "base"
+
+    def __init__(self, model: str, dimension: int = DEFAULT_DIMENSION):
+        self.model = model
+        self.dimension = int(dimension)
+
+    @property
+    def version(self) -> str:
+        """Model-version tag stored with vectors."""
+        return f"{self.name}:{self.model}"
+
+    @property
+    def remote(self) -> bool:
+        return False
+
+    @abstractmethod
+    async def embed(self, texts: List[str]) -> List[Optional[List[float]]]:
+        """One vector (or None) per input text."""
+        ...
+
+    async def embed_one(self, text: str) -> Optional[List[float]]:
+        return (await self.embed([text]))[0]
+
+
+class _RemoteEmbeddingProvider(EmbeddingProvider):
+    """Shared request/retry/parse logic for the OpenAI-compatible embeddings API."""
+
+    timeout = 60.0
+
+    @property
+    def remote(self) -> bool:
+        return True
+
+    @abstractmethod
+    def _request(self, inputs: List[str]) -> tuple:
+        """(url, headers, json payload) for one embeddings request."""
+        ...
+
+    async def embed(self, texts: List[str]) -> List[Optional[List[float]]]:
+        out: List[Optional[List[float]]] = [None] * len(texts)
+        if not texts:
+            return out
+        url, headers, payload = self._request([(t or "").strip()[:8192] or " " for t in texts])
+        data: Any = None
+        for attempt in range(MAX_ATTEMPTS):
+            try:
+                r = await get_http_client(url).post(url, headers=headers, json=payload, timeout=self.timeout)
+            except httpx.RequestError as e:
+                if attempt == MAX_ATTEMPTS - 1:
+                    logger.warning("Embedding API failed after %s attempts: %s", MAX_ATTEMPTS, e)
+                    return out
+                await asyncio.sleep(_backoff_delay(attempt))
+                continue
+            if r.status_code == 429 or r.status_code >= 500:
+                if attempt == MAX_ATTEMPTS - 1:
+                    logger.warning("Embedding API returned %s after %s attempts", r.status_code, MAX_ATTEMPTS)
+                    return out
+                delay = _backoff_delay(attempt, r.headers.get("Retry-After"))
+                logger.info("Embedding API %s, retry %s/%s in %.1fs", r.status_code, attempt + 1, MAX_ATTEMPTS, delay)
+                await asyncio.sleep(delay)
+                continue
+            if r.status_code >= 400:
+                logger.warning("Embedding API failed: %s %s", r.status_code, r.text[:200])
+                return out
+            try:
+                data = r.json()
+            except ValueError as e:
+                logger.warning("Embedding API returned invalid JSON: %s", e)
+                return out
+            break
+
+        items = data.get("data") if isinstance(data, dict) else None
+        if not items or not isinstance(items, list):
+            return out
+        for pos, item in enumerate(items):
+            if not isinstance(item, dict):
+                continue
+            idx = item.get("index", pos)
+            emb = item.get("embedding")
+            if not isinstance(idx, int) or not 0 <= idx < len(out) or not emb or not isinstance(emb, list):
+                continue
+            vec = [float(x) for x in emb]
+            if len(vec) < self.dimension:
+                logger.warning("Embedding dimension %s < %s; check model", len(vec), self.dimension)
+                continue
+            out[idx] = vec[: self.dimension]
+        return out
+
+
+class OpenAIEmbeddingProvider(_RemoteEmbeddingProvider):
+    name = "openai"
+
+    def __init__(self, api_key: str, model: str = "text-embedding-3-small", dimension: int = DEFAULT_DIMENSION):
+        super().__init__(model, dimension)
+        self._api_key = api_key
+
+    def _request(self, inputs: List[str]) -> tuple:
+        return (
+            "https://api.openai.com/v1/embeddings",
+            {"Authorization": f"Bearer {self._api_key}", "Content-Type": "application/json"},
+            {"model": self.model, "input": inputs},
+        )
+
+
+class AzureOpenAIEmbeddingProvider(_RemoteEmbeddingProvider):
+    name = "azure"
+
+    def __init__(
+        self,
+        endpoint: str,
+        api_key: str,
+        deployment: str = "text-embedding-3-small",
+        dimension: int = DEFAULT_DIMENSION,
+        api_version: str = "2024-02-15-preview",
+    ):
+        super().__init__(deployment, dimension)
+        self._endpoint = endpoint.rstrip("/")
+        self._api_key = api_key
+        self._api_version = api_version
+
+    def _request(self, inputs: List[str]) -> tuple:
+        return (
+            f"{self._endpoint}/openai/deployments/{self.model}/embeddings?api-version={self._api_version}",
+            {"api-key": self._api_key, "Content-Type": "application/json"},
+            {"input": inputs},
+        )
+
+
+class HashingEmbeddingProvider(EmbeddingProvider):
+    """
+    Deterministic hashing vectorizer: each word, word bigram and character trigram is hashed (blake2b, so
+    stable across processes) to a signed bucket; counts are sublinear (1 + log tf) and the vector is
+    L2-normalized. Lexical rather than semantic, but captures vocabulary overlap, with some typo tolerance from trigrams.
+    """
+
+    name = "hash"
+    _TOKEN = re.compile(r"[a-z0-9]+")
+    _WEIGHTS = {"w": 1.0, "b": 0.5, "c": 0.25}
+
+    def __init__(self, model: str = "hashing-v1", dimension: int = DEFAULT_DIMENSION):
+        super().__init__(model, dimension)
+
+    def _features(self, text: str) -> Counter:
+        words = self._TOKEN.findall((text or "").lower())
+        feats: Counter = Counter()
+        for w in words:
+            feats[f"w:{w}"] += 1
+            padded = f"#{w}#"
+            for i in range(len(padded) - 2):
+                feats[f"c:{padded[i:i + 3]}"] += 1
+        for a, b in zip(words, words[1:]):
+            feats[f"b:{a} {b}"] += 1
+        return feats
+
+    def encode(self, text: str) -> Optional[List[float]]:
+        feats = self._features(text)
+        if not feats:
+            return None
+        vec = [0.0] * self.dimension
+        for feat, tf in feats.items():
+            h = int.from_bytes(hashlib.blake2b(feat.encode("utf-8"), digest_size=8).digest(), "big")
+            sign = 1.0 if h & 1 else -1.0
+            vec[(h >> 1) % self.dimension] += sign * self._WEIGHTS[feat[0]] * (1.0 + math.log(tf))
+        norm = math.sqrt(sum(x * x for x in vec))
+        if norm == 0.0:
+            return None
+        return [x / norm for x in vec]
+
+    async def embed(self, texts: List[str]) -> List[Optional[List[float]]]:
+        return [self.encode(t) for t in texts]
+
+
+class SentenceTransformerEmbeddingProvider(EmbeddingProvider):
+    """CPU sentence-embedding model (sentence-transformers). Loaded on first use; encoding runs off the event loop."""
+
+    name = "local"
+
+    def __init__(self, model: str = DEFAULT_LOCAL_MODEL, dimension: int = DEFAULT_DIMENSION, batch_size: int = 64):
+        super().__init__(model, dimension)
+        self._batch_size = batch_size
+        self._model: Any = None
+
+    @staticmethod
+    def available() -> bool:
+        try:
+            import sentence_transformers  # noqa: F401
+        except ImportError:
+            return False
+        return True
+
+    def _encode(self, texts: List[str]) -> List[List[float]]:
+        if self._model is None:
+            from sentence_transformers import SentenceTransformer
+
+            self._model = SentenceTransformer(self.model, device="cpu")
+        vectors = self._model.encode(texts, batch_size=self._batch_size, normalize_embeddings=True)
+        return [_fit([float(x) for x in v], self.dimension) for v in vectors]
+
+    async def embed(self, texts: List[str]) -> List[Optional[List[float]]]:
+        if not texts:
+            return []
+        try:
+            return list(await asyncio.to_thread(self._encode, [(t or "").strip() or " " for t in texts]))
+        except Exception as e:
+            logger.warning("Local embedding model %s failed: %s", self.model, e)
+            return [None] * len(texts)
+
+
+def _backoff_delay(attempt: int, retry_after: Optional[str] = None) -> float:
+    """Seconds to wait before retry attempt+1: Retry-After when given, else exponential with jitter."""
+    if retry_after:
+        try:
+            return min(MAX_BACKOFF_SEC, max(0.0, float(retry_after)))
+        except ValueError:
+            pass
+    return min(MAX_BACKOFF_SEC, (2 ** attempt) * (1.0 + random.random() / 2))
+
+
+def create_embedding_provider(
+    provider: str,
+    model: str = "",
+    dimension: int = DEFAULT_DIMENSION,
+    openai_api_key: str = "",
+    azure_endpoint: str = "",
+    azure_api_key: str = "",
+    local_model: str = DEFAULT_LOCAL_MODEL,
+) -> Optional[EmbeddingProvider]:
+    """Provider for name ("openai" | "azure" | "local" | "hash"), or None when its credentials are missing."""
+    provider = (provider or "").strip().lower()
+    if provider == "openai":
+        return OpenAIEmbeddingProvider(openai_api_key, model or "text-embedding-3-small", dimension) if openai_api_key and model else None
+    if provider == "azure":
+        if not (azure_endpoint and azure_api_key and model):
+            return None
+        return AzureOpenAIEmbeddingProvider(azure_endpoint, azure_api_key, model, dimension)
+    if provider == "local":
+        if SentenceTransformerEmbeddingProvider.available():
+            return SentenceTransformerEmbeddingProvider(local_model or DEFAULT_LOCAL_MODEL, dimension)
+        logger.warning("EMBEDDING_PROVIDER=local but sentence-transformers is not installed; using hashing embeddings")
+        return HashingEmbeddingProvider(dimension=dimension)
+    if provider == "hash":
+        return HashingEmbeddingProvider(dimension=dimension)
+    return None
+
+
+def describe_providers() -> Dict[str, Any]:
+    """Which optional local backends are importable (admin diagnostics)."""
+    return {"sentence_transformers": SentenceTransformerEmbeddingProvider.available()}
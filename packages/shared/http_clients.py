@@ -0,0 +1,242 @@
+"""
+Shared pooled HTTP clients for outbound calls.
+
+One httpx.AsyncClient per host (scheme + netloc), reused across requests so calls keep TCP/TLS
+connections alive instead of paying setup on every request. Callers pass per-request timeouts:
+
+    client = get_http_client(url)
+    r = await client.post(url, json=payload, timeout=10.0)
+
+Never close the returned client; the registry owns it. Services close all pools on shutdown via
+http_client_lifespan (FastAPI lifespan=) or aclose_http_clients().
+
+Env config (all optional):
+- HTTP_POOL_MAX_CONNECTIONS: max connections per host (default 50)
+- HTTP_POOL_MAX_KEEPALIVE: idle keep-alive connections kept per host (default 20)
+- HTTP_POOL_KEEPALIVE_EXPIRY_SEC: idle connection lifetime (default 30)
+- HTTP_POOL_MAX_HOSTS: hosts with a live pool before the least recently used is retired (default 256). A retired
+  client is closed only once it has been out of the registry for the request timeout and has no busy
+  connection, so coroutines still holding it can finish their requests.
+- HTTP_CLIENT_TIMEOUT_SEC: default request timeout when the caller passes none (default 30)
+- HTTP_CLIENT_HTTP2: "true" to negotiate HTTP/2 (needs the h2 package; falls back to HTTP/1.1)
+"""
+
+import asyncio
+import logging
+import os
+import time
+from collections import OrderedDict
+from contextlib import asynccontextmanager
+from typing import Any, AsyncIterator, Dict, List, Optional, Set, Tuple
+from urllib.parse import urlparse
+
+import httpx
+
+logger = logging.getLogger(__name__)
+
+
+def _env_int(key: str, default: int) -> int:
+    try:
+        return int(os.getenv(key) or default)
+    except ValueError:
+        return default
+
+
+def _env_float(key: str, default: float) -> float:
+    try:
+        return float(os.getenv(key) or default)
+    except ValueError:
+        return default
+
+
+def _http2_available() -> bool:
+    try:
+        import h2  # noqa: F401
+    except ImportError:
+        return False
+    return True
+
+
+def host_key(url: str) -> str:
+    """Pool key for a URL: scheme://netloc (lower-cased). Empty or relative URLs share the 'default' pool."""
+    try:
+        parsed = urlparse(url or "")
+    except Exception:
+        return "default"
+    if not parsed.netloc:
+        return "default"
+    return f"{(parsed.scheme or 'https').lower()}://{parsed.netloc.lower()}"
+
+
+class HTTPClientRegistry:
+    """Per-host pooled AsyncClients with request/response counters. Clients are bound to the running event loop."""
+
+    def __init__(
+        self,
+        max_connections: Optional[int] = None,
+        max_keepalive: Optional[int] = None,
+        keepalive_expiry: Optional[float] = None,
+        max_hosts: Optional[int] = None,
+        timeout: Optional[float] = None,
+        http2: Optional[bool] = None,
+    ):
+        self.max_connections = max(1, max_connections or _env_int("HTTP_POOL_MAX_CONNECTIONS", 50))
+        self.max_keepalive = max(0, max_keepalive if max_keepalive is not None else _env_int("HTTP_POOL_MAX_KEEPALIVE", 20))
+        self.keepalive_expiry = max(1.0, keepalive_expiry or _env_float("HTTP_POOL_KEEPALIVE_EXPIRY_SEC", 30.0))
+        self.max_hosts = max(1, max_hosts or _env_int("HTTP_POOL_MAX_HOSTS", 256))
+        self.timeout = max(0.5, timeout or _env_float("HTTP_CLIENT_TIMEOUT_SEC", 30.0))
+        want_http2 = http2 if http2 is not None else (os.getenv("HTTP_CLIENT_HTTP2") or "").strip().lower() == "true"
+        self.http2 = bool(want_http2 and _http2_available())
+        if want_http2 and not self.http2:
+            logger.warning("HTTP_CLIENT_HTTP2=true but h2 is not installed; using HTTP/1.1 pools")
+        self._clients: "OrderedDict[str, Tuple[httpx.AsyncClient, asyncio.AbstractEventLoop]]" = OrderedDict()
+        self._retired: List[Tuple[httpx.AsyncClient, asyncio.AbstractEventLoop, float]] = []
+        self._closing: Set["asyncio.Task[None]"] = set()
+        self._stats: Dict[str, Dict[str, Any]] = {}
+
+    def get(self, url: str = "") -> httpx.AsyncClient:
+        """Return the pooled client for url's host, creating it on first use in this event loop."""
+        key = host_key(url)
+        loop = asyncio.get_running_loop()
+        self._close_idle_retired(loop)
+        existing = self._clients.get(key)
+        if existing is not None:
+            client, client_loop = existing
+            if client_loop is loop and not client.is_closed:
+                self._clients.move_to_end(key)
+                return client
+            self._clients.pop(key, None)
+        client = self._create(key)
+        self._clients[key] = (client, loop)
+        while len(self._clients) > self.max_hosts:
+            old_key, (old_client, old_loop) = self._clients.popitem(last=False)
+            if old_loop is loop and not old_client.is_closed:
+                self._retired.append((old_client, old_loop, time.monotonic()))
+            logger.debug("HTTP pool evicted for %s", old_key)
+        return client
+
+    @staticmethod
+    def _busy(client: httpx.AsyncClient) -> bool:
+        """True if any pooled connection is mid-request (or the pool cannot be inspected)."""
+        conns = getattr(getattr(getattr(client, "_transport", None), "_pool", None), "connections", None)
+        if conns is None:
+            return True
+        return any(not getattr(c, "is_idle", lambda: False)() for c in conns)
+
+    def _close_idle_retired(self, loop: asyncio.AbstractEventLoop) -> None:
+        """Close evicted clients of this loop that are past the grace period and have no busy connection."""
+        if not self._retired:
+            return
+        now = time.monotonic()
+        keep = []
+        for client, client_loop, retired_at in self._retired:
+            if client.is_closed:
+                continue
+            if client_loop is not loop or now - retired_at < self.timeout or self._busy(client):
+                keep.append((client, client_loop, retired_at))
+                continue
+            task = loop.create_task(client.aclose())
+            self._closing.add(task)
+            task.add_done_callback(self._closing.discard)
+        self._retired = keep
+
+    def _create(self, key: str) -> httpx.AsyncClient:
+        stats = self._stats.setdefault(key, {"clients_created": 0, "requests": 0, "responses": 0, "errors_5xx": 0, "last_used": None})
+        stats["clients_created"] += 1
+
+        async def _on_request(request: httpx.Request) -> None:
+            stats["requests"] += 1
+            stats["last_used"] = time.time()
+
+        async def _on_response(response: httpx.Response) -> None:
+            stats["responses"] += 1
+            if response.status_code >= 500:
+                stats["errors_5xx"] += 1
+
+        return httpx.AsyncClient(
+            timeout=self.timeout,
+            limits=httpx.Limits(
+                max_connections=self.max_connections,
+                max_keepalive_connections=self.max_keepalive,
+                keepalive_expiry=self.keepalive_expiry,
+            ),
+            http2=self.http2,
+            event_hooks={"request": [_on_request], "response": [_on_response]},
+        )
+
+    async def aclose(self) -> None:
+        """Close every pool owned by the current event loop (call on service shutdown)."""
+        loop = asyncio.get_running_loop()
+        clients = list(self._clients.items()) + [("retired", (c, cl)) for c, cl, _ in self._retired]
+        self._clients.clear()
+        self._retired = []
+        for key, (client, client_loop) in clients:
+            if client_loop is not loop or client.is_closed:
+                continue
+            try:
+                await client.aclose()
+            except Exception as e:
+                logger.debug("HTTP pool close failed for %s: %s", key, e)
+
+    def stats(self) -> Dict[str, Any]:
+        """Pool metrics per host: request/response counters and open/idle connections."""
+        hosts: Dict[str, Any] = {}
+        for key, stats in self._stats.items():
+            entry = dict(stats)
+            live = self._clients.get(key)
+            open_conns = idle_conns = None
+            if live is not None:
+                pool = getattr(getattr(live[0], "_transport", None), "_pool", None)
+                conns = getattr(pool, "connections", None)
+                if conns is not None:
+                    open_conns = len(conns)
+                    idle_conns = sum(1 for c in conns if getattr(c, "is_idle", lambda: False)())
+            entry["pooled"] = live is not None
+            entry["open_connections"] = open_conns
+            entry["idle_connections"] = idle_conns
+            hosts[key] = entry
+        return {
+            "http2": self.http2,
+            "max_connections_per_host": self.max_connections,
+            "max_keepalive_per_host": self.max_keepalive,
+            "keepalive_expiry_sec": self.keepalive_expiry,
+            "active_hosts": len(self._clients),
+            "retired_clients": len(self._retired),
+            "hosts": hosts,
+        }
+
+
+_registry: Optional[HTTPClientRegistry] = None
+
+
+def get_http_client_registry() -> HTTPClientRegistry:
+    """Process-wide registry (created on first use from env config)."""
+    global _registry
+    if _registry is None:
+        _registry = HTTPClientRegistry()
+    return _registry
+
+
+def get_http_client(url: str = "") -> httpx.AsyncClient:
+    """Shared pooled client for url's host. Do not close it; pass timeout= per request."""
+    return get_http_client_registry().get(url)
+
+
+async def aclose_http_clients() -> None:
+    """Close all pooled clients (service shutdown)."""
+    if _registry is not None:
+        await _registry.aclose()
+
+
+def http_client_stats() -> Dict[str, Any]:
+    """Pool metrics for health/admin endpoints."""
+    return get_http_client_registry().stats()
+
+
+@asynccontextmanager
+async def http_client_lifespan(app: Any) -> AsyncIterator[None]:
+    """FastAPI lifespan: pools are created lazily on first request and closed on shutdown."""
+    try:
+        yield
+    finally:
+        await aclose_http_clients()
@@ -0,0 +1,285 @@
+"""
+Process-wide cache of LLM SDK clients (OpenAI, Azure OpenAI, OpenAI-compatible endpoints, Gemini).
+
+    client = get_openai_client(api_key, base_url="https://openrouter.ai/api/v1")
+    client = get_openai_client(api_key, azure_endpoint=endpoint, api_version="2024-02-01")
+    genai = get_gemini_client(api_key)
+
+Clients are keyed by a hash of their provider config (kind, base URL / endpoint, API version, API key) and
+built once per config, so planner steps, engagement replies, enrichment batches, intent resolution and vision
+checks share one keep-alive connection pool per provider instead of opening a new one per call. A changed
+config (e.g. key rotated in Platform Config) simply hashes to a new entry. genai.configure is process-global
+and only re-run when the Gemini key changes.
+
+get_async_openai_twin(client) returns the AsyncOpenAI / AsyncAzureOpenAI client with the same config as a
+client from get_openai_client (used by packages.shared.llm_provider.gateway). Async clients are cached per
+event loop, since their connection pool cannot be shared across loops.
+
+Never close returned clients; the registry owns them. Env config (all optional):
+- LLM_POOL_MAX_CONNECTIONS: max connections per client (default 20)
+- LLM_POOL_MAX_KEEPALIVE: idle keep-alive connections kept per client (default 10)
+- LLM_POOL_KEEPALIVE_EXPIRY_SEC: idle connection lifetime (default 60)
+- LLM_CLIENT_CACHE_MAX: provider configs cached before the least recently used is dropped (default 16)
+"""
+
+import asyncio
+import hashlib
+import inspect
+import json
+import logging
+import os
+import threading
+import time
+import weakref
+from collections import OrderedDict
+from typing import Any, Dict, Optional
+
+logger = logging.getLogger(__name__)
+
+
+def _env_int(key: str, default: int) -> int:
+    try:
+        return int(os.getenv(key) or default)
+    except ValueError:
+        return default
+
+
+def _env_float(key: str, default: float) -> float:
+    try:
+        return float(os.getenv(key) or default)
+    except ValueError:
+        return default
+
+
+def config_key(**config: Any) -> str:
+    """Stable hash of a provider config (the API key is part of it but never stored or reported)."""
+    raw = json.dumps({k: v for k, v in config.items() if v is not None}, sort_keys=True, default=str)
+    return hashlib.sha256(raw.encode("utf-8")).hexdigest()[:24]
+
+
+class LLMClientRegistry:
+    """LRU cache of SDK clients per provider config, with use counters and connection-pool metrics."""
+
+    def __init__(
+        self,
+        max_connections: Optional[int] = None,
+        max_keepalive: Optional[int] = None,
+        keepalive_expiry: Optional[float] = None,
+        max_clients: Optional[int] = None,
+    ):
+        self.max_connections = max(1, max_connections or _env_int("LLM_POOL_MAX_CONNECTIONS", 20))
+        self.max_keepalive = max(0, max_keepalive if max_keepalive is not None else _env_int("LLM_POOL_MAX_KEEPALIVE", 10))
+        self.keepalive_expiry = max(1.0, keepalive_expiry or _env_float("LLM_POOL_KEEPALIVE_EXPIRY_SEC", 60.0))
+        self.max_clients = max(1, max_clients or _env_int("LLM_CLIENT_CACHE_MAX", 16))
+        self._lock = threading.Lock()
+        self._entries: "OrderedDict[str, Dict[str, Any]]" = OrderedDict()
+        self._gemini_key: Optional[str] = None
+        self._configs: "weakref.WeakKeyDictionary[Any, Dict[str, Any]]" = weakref.WeakKeyDictionary()
+        self._counters = {"hits": 0, "builds": 0, "evictions": 0, "gemini_configures": 0}
+
+    def _http_client(self, use_async: bool = False) -> Any:
+        """Pooled httpx client with the SDK's defaults (timeouts, redirects); None = SDK default pool."""
+        try:
+            import httpx
+            from openai import DefaultAsyncHttpxClient, DefaultHttpxClient
+        except ImportError:
+            return None
+        limits = httpx.Limits(
+            max_connections=self.max_connections,
+            max_keepalive_connections=self.max_keepalive,
+            keepalive_expiry=self.keepalive_expiry,
+        )
+        return DefaultAsyncHttpxClient(limits=limits) if use_async else DefaultHttpxClient(limits=limits)
+
+    def _cached(self, key: str, loop: Any = None) -> Optional[Any]:
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+        if loop is not None and entry.get("loop") is not None and entry["loop"]() is not loop:
+            # Same id() as a closed loop: the old async client's pool belongs to that loop.
+            del self._entries[key]
+            return None
+        self._entries.move_to_end(key)
+        entry["uses"] += 1
+        entry["last_used"] = time.time()
+        self._counters["hits"] += 1
+        return entry["client"]
+
+    def _store(self, key: str, kind: str, target: str, client: Any, http_client: Any = None, loop: Any = None) -> Any:
+        self._entries[key] = {
+            "client": client,
+            "http_client": http_client,
+            "kind": kind,
+            "target": target,
+            "loop": weakref.ref(loop) if loop is not None else None,
+            "created_at": time.time(),
+            "last_used": time.time(),
+            "uses": 1,
+        }
+        self._counters["builds"] += 1
+        while len(self._entries) > self.max_clients:
+            # Not closed: another thread may still be mid-request on it; its pool is released with the client.
+            old_key, old = self._entries.popitem(last=False)
+            self._counters["evictions"] += 1
+            logger.debug("LLM client evicted: %s %s (%s)", old["kind"], old["target"], old_key)
+        return client
+
+    def openai(
+        self,
+        api_key: str,
+        base_url: Optional[str] = None,
+        azure_endpoint: Optional[str] = None,
+        api_version: Optional[str] = None,
+    ) -> Any:
+        """Cached OpenAI client (AzureOpenAI when azure_endpoint is set)."""
+        kind = "azure" if azure_endpoint else "openai"
+        key = config_key(kind=kind, api_key=api_key, base_url=base_url, azure_endpoint=azure_endpoint, api_version=api_version)
+        with self._lock:
+            client = self._cached(key)
+            if client is not None:
+                return client
+            http_client = self._http_client()
+            extra: Dict[str, Any] = {"http_client": http_client} if http_client is not None else {}
+            if azure_endpoint:
+                from openai import AzureOpenAI
+
+                client = AzureOpenAI(api_key=api_key, api_version=api_version, azure_endpoint=azure_endpoint, **extra)
+            else:
+                from openai import OpenAI
+
+                client = OpenAI(api_key=api_key, base_url=base_url, **extra)
+            self._configs[client] = {
+                "api_key": api_key, "base_url": base_url, "azure_endpoint": azure_endpoint, "api_version": api_version,
+            }
+            return self._store(key, kind, azure_endpoint or base_url or "https://api.openai.com/v1", client, http_client)
+
+    def async_openai(
+        self,
+        api_key: str,
+        base_url: Optional[str] = None,
+        azure_endpoint: Optional[str] = None,
+        api_version: Optional[str] = None,
+    ) -> Any:
+        """Cached AsyncOpenAI client (AsyncAzureOpenAI when azure_endpoint is set) for the running event loop."""
+        loop = asyncio.get_running_loop()
+        kind = "async_azure" if azure_endpoint else "async_openai"
+        key = config_key(
+            kind=kind, api_key=api_key, base_url=base_url, azure_endpoint=azure_endpoint, api_version=api_version, loop=id(loop)
+        )
+        with self._lock:
+            client = self._cached(key, loop)
+            if client is not None:
+                return client
+            http_client = self._http_client(use_async=True)
+            extra: Dict[str, Any] = {"http_client": http_client} if http_client is not None else {}
+            if azure_endpoint:
+                from openai import AsyncAzureOpenAI
+
+                client = AsyncAzureOpenAI(api_key=api_key, api_version=api_version, azure_endpoint=azure_endpoint, **extra)
+            else:
+                from openai import AsyncOpenAI
+
+                client = AsyncOpenAI(api_key=api_key, base_url=base_url, **extra)
+            return self._store(key, kind, azure_endpoint or base_url or "https://api.openai.com/v1", client, http_client, loop)
+
+    def async_twin(self, client: Any) -> Optional[Any]:
+        """Async client with the same config as a client from openai(); None if client was not built here."""
+        try:
+            config = self._configs.get(client)
+        except TypeError:  # not weak-referenceable, so never stored
+            return None
+        return self.async_openai(**config) if config else None
+
+    def gemini(self, api_key: str) -> Any:
+        """google.generativeai configured with api_key (configure only re-run when the key changes)."""
+        import google.generativeai as genai
+
+        key = config_key(kind="gemini", api_key=api_key)
+        with self._lock:
+            if self._gemini_key != key:
+                genai.configure(api_key=api_key)
+                self._gemini_key = key
+                self._counters["gemini_configures"] += 1
+            if self._cached(key) is None:
+                self._store(key, "gemini", "generativelanguage.googleapis.com", genai)
+        return genai
+
+    def clear(self) -> None:
+        """Drop and close every cached client (service shutdown / tests)."""
+        with self._lock:
+            entries = list(self._entries.values())
+            self._entries.clear()
+            self._gemini_key = None
+        for entry in entries:
+            close = getattr(entry["client"], "close", None)
+            # Async clients close with their event loop (aclose cannot be awaited here).
+            if entry["kind"] != "gemini" and callable(close) and not inspect.iscoroutinefunction(close):
+                try:
+                    close()
+                except Exception as e:
+                    logger.debug("LLM client close failed: %s", e)
+
+    def stats(self) -> Dict[str, Any]:
+        """Counters plus per-client uses and open/idle pooled connections (API keys are never reported)."""
+        clients: Dict[str, Any] = {}
+        with self._lock:
+            for key, entry in self._entries.items():
+                pool = getattr(getattr(entry.get("http_client"), "_transport", None), "_pool", None)
+                conns = getattr(pool, "connections", None)
+                clients[key[:12]] = {
+                    "kind": entry["kind"],
+                    "target": entry["target"],
+                    "uses": entry["uses"],
+                    "created_at": entry["created_at"],
+                    "last_used": entry["last_used"],
+                    "open_connections": len(conns) if conns is not None else None,
+                    "idle_connections": sum(1 for c in conns if getattr(c, "is_idle", lambda: False)()) if conns is not None else None,
+                }
+            return {
+                **self._counters,
+                "cached_clients": len(self._entries),
+                "max_clients": self.max_clients,
+                "max_connections_per_client": self.max_connections,
+                "max_keepalive_per_client": self.max_keepalive,
+                "keepalive_expiry_sec": self.keepalive_expiry,
+                "clients": clients,
+            }
+
+
+_registry: Optional[LLMClientRegistry] = None
+_registry_lock = threading.Lock()
+
+
+def get_llm_client_registry() -> LLMClientRegistry:
+    """Process-wide registry (created on first use from env config)."""
+    global _registry
+    if _registry is None:
+        with _registry_lock:
+            if _registry is None:
+                _registry = LLMClientRegistry()
+    return _registry
+
+
+def get_openai_client(
+    api_key: str,
+    base_url: Optional[str] = None,
+    azure_endpoint: Optional[str] = None,
+    api_version: Optional[str] = None,
+) -> Any:
+    """Shared OpenAI / AzureOpenAI client for this config. Do not close it."""
+    return get_llm_client_registry().openai(api_key, base_url=base_url, azure_endpoint=azure_endpoint, api_version=api_version)
+
+
+def get_async_openai_twin(client: Any) -> Optional[Any]:
+    """Shared AsyncOpenAI / AsyncAzureOpenAI client matching a get_openai_client client, or None. Call inside a running loop."""
+    return get_llm_client_registry().async_twin(client)
+
+
+def get_gemini_client(api_key: str) -> Any:
+    """google.generativeai module configured for api_key."""
+    return get_llm_client_registry().gemini(api_key)
+
+
+def llm_client_stats() -> Dict[str, Any]:
+    """Cache and pool metrics for health/admin endpoints."""
+    return get_llm_client_registry().stats()
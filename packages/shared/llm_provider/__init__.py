@@ -1,13 +1,30 @@
 """
 LLM abstraction for the new platform: self-hosted OSS primary, OpenAI API fallback.
 Single provider interface for intent resolution, planning, and engagement response.
+Async call sites go through the gateway (async SDK clients, per-provider limits, timeouts).
 """
 
 from .config import get_llm_provider_config
 from .facade import get_llm_provider, LLMProviderFacade
+from .gateway import (
+    LLMGateway,
+    LLMTimeoutError,
+    chat_completion,
+    generate_content,
+    get_llm_gateway,
+    llm_gateway_stats,
+    stream_chat_completion,
+)
 
 __all__ = [
     "get_llm_provider_config",
     "get_llm_provider",
     "LLMProviderFacade",
+    "LLMGateway",
+    "LLMTimeoutError",
+    "chat_completion",
+    "generate_content",
+    "get_llm_gateway",
+    "llm_gateway_stats",
+    "stream_chat_completion",
 ]
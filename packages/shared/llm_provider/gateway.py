@@ -0,0 +1,276 @@
+"""
+Async LLM gateway: chat completions, streams and Gemini calls on async SDK clients, so an LLM call no longer
+holds a thread of the default executor (which also runs the blocking Supabase calls) while it waits.
+
+    response = await chat_completion(provider, client, model=model, messages=messages, max_tokens=300)
+    async for chunk in stream_chat_completion(provider, client, model=model, messages=messages):
+        ...
+    resp = await generate_content(genai, model, prompt, generation_config={"max_output_tokens": 300})
+
+provider / client are what get_llm_chat_client (or the planner's client helper) return. A sync OpenAI client
+from packages.shared.llm_clients is swapped for its async twin (same config, pooled per event loop); Gemini
+uses generate_content_async. A client with no async counterpart still runs in a worker thread, counted as a
+thread fallback in stats().
+
+Each provider has a concurrency limit: calls beyond it wait for a slot instead of piling onto the provider.
+The timeout covers the wait and the call (streams: the wait, then each chunk). Cancelling the caller cancels
+the HTTP request and frees the slot. Env config (all optional):
+- LLM_GATEWAY_MAX_CONCURRENCY: in-flight calls per provider (default 32)
+- LLM_GATEWAY_MAX_CONCURRENCY_<PROVIDER>: override for one provider, e.g. LLM_GATEWAY_MAX_CONCURRENCY_GEMINI=8
+- LLM_GATEWAY_TIMEOUT_SEC: per-call timeout in seconds (default 60)
+"""
+
+import asyncio
+import inspect
+import logging
+import os
+from typing import Any, AsyncIterator, Awaitable, Callable, Dict, Optional, TypeVar
+
+logger = logging.getLogger(__name__)
+
+T = TypeVar("T")
+
+_STREAM_END = object()
+
+
+def _env_int(key: str, default: int) -> int:
+    try:
+        return int(os.getenv(key) or default)
+    except ValueError:
+        return default
+
+
+def _env_float(key: str, default: float) -> float:
+    try:
+        return float(os.getenv(key) or default)
+    except ValueError:
+        return default
+
+
+class LLMTimeoutError(asyncio.TimeoutError):
+    """An LLM call (including its wait for a provider slot) took longer than the gateway timeout."""
+
+
+def _async_client(client: Any) -> Optional[Any]:
+    """client itself if it is already async, else its async twin from the shared registry (None if unknown)."""
+    create = getattr(getattr(getattr(client, "chat", None), "completions", None), "create", None)
+    if inspect.iscoroutinefunction(create):
+        return client
+    try:
+        from packages.shared.llm_clients import get_async_openai_twin
+
+        return get_async_openai_twin(client)
+    except ImportError:
+        return None
+
+
+class LLMGateway:
+    """Per-provider concurrency limits, timeouts and counters around async SDK calls."""
+
+    def __init__(
+        self,
+        max_concurrency: Optional[int] = None,
+        timeout: Optional[float] = None,
+        limits: Optional[Dict[str, int]] = None,
+    ):
+        self.max_concurrency = max(1, max_concurrency or _env_int("LLM_GATEWAY_MAX_CONCURRENCY", 32))
+        self.timeout = max(1.0, timeout or _env_float("LLM_GATEWAY_TIMEOUT_SEC", 60.0))
+        self._limits: Dict[str, int] = dict(limits or {})
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._semaphores: Dict[str, asyncio.Semaphore] = {}
+        self._counters: Dict[str, Dict[str, int]] = {}
+        self.thread_fallbacks = 0
+
+    def limit(self, provider: str) -> int:
+        if provider not in self._limits:
+            env_key = f"LLM_GATEWAY_MAX_CONCURRENCY_{provider.upper()}"
+            self._limits[provider] = max(1, _env_int(env_key, self.max_concurrency))
+        return self._limits[provider]
+
+    def _semaphore(self, provider: str) -> asyncio.Semaphore:
+        loop = asyncio.get_running_loop()
+        if self._loop is not loop:  # semaphores bind to the loop that first waits on them
+            self._loop, self._semaphores = loop, {}
+        sem = self._semaphores.get(provider)
+        if sem is None:
+            sem = self._semaphores[provider] = asyncio.Semaphore(self.limit(provider))
+        return sem
+
+    def _counter(self, provider: str) -> Dict[str, int]:
+        if provider not in self._counters:
+            self._counters[provider] = {
+                "calls": 0, "in_flight": 0, "waiting": 0, "timeouts": 0, "cancelled": 0, "errors": 0,
+            }
+        return self._counters[provider]
+
+    async def _acquire(self, provider: str) -> asyncio.Semaphore:
+        sem, counter = self._semaphore(provider), self._counter(provider)
+        counter["waiting"] += 1
+        try:
+            await sem.acquire()
+        finally:
+            counter["waiting"] -= 1
+        counter["in_flight"] += 1
+        return sem
+
+    def _release(self, provider: str, sem: asyncio.Semaphore) -> None:
+        self._counter(provider)["in_flight"] -= 1
+        sem.release()
+
+    async def _run(self, provider: Optional[str], call: Callable[[], Awaitable[T]], timeout: Optional[float]) -> T:
+        provider = provider or "default"
+        counter = self._counter(provider)
+        counter["calls"] += 1
+        seconds = self.timeout if timeout is None else timeout
+
+        async def _limited() -> T:
+            sem = await self._acquire(provider)
+            try:
+                return await call()
+            finally:
+                self._release(provider, sem)
+
+        try:
+            return await asyncio.wait_for(_limited(), seconds)
+        except asyncio.TimeoutError:
+            counter["timeouts"] += 1
+            raise LLMTimeoutError(f"{provider} LLM call timed out after {seconds:g}s") from None
+        except asyncio.CancelledError:
+            counter["cancelled"] += 1
+            raise
+        except Exception:
+            counter["errors"] += 1
+            raise
+
+    async def chat_completion(
+        self, provider: Optional[str], client: Any, *, timeout: Optional[float] = None, **kwargs: Any
+    ) -> Any:
+        """client.chat.completions.create(**kwargs) on the async client; returns the SDK response."""
+        aclient = _async_client(client)
+        if aclient is not None:
+            return await self._run(provider, lambda: aclient.chat.completions.create(**kwargs), timeout)
+        self.thread_fallbacks += 1
+        return await self._run(provider, lambda: asyncio.to_thread(client.chat.completions.create, **kwargs), timeout)
+
+    async def stream_chat_completion(
+        self, provider: Optional[str], client: Any, *, timeout: Optional[float] = None, **kwargs: Any
+    ) -> AsyncIterator[Any]:
+        """Yield chunks of a streamed chat completion. The provider slot is held until the stream ends or is closed."""
+        provider = provider or "default"
+        counter = self._counter(provider)
+        counter["calls"] += 1
+        seconds = self.timeout if timeout is None else timeout
+        aclient = _async_client(client)
+        if aclient is None:
+            self.thread_fallbacks += 1
+        stream: Any = None
+        try:
+            sem = await asyncio.wait_for(self._acquire(provider), seconds)
+        except asyncio.TimeoutError:
+            counter["timeouts"] += 1
+            raise LLMTimeoutError(f"{provider} LLM stream waited more than {seconds:g}s for a slot") from None
+        try:
+            if aclient is not None:
+                stream = await asyncio.wait_for(aclient.chat.completions.create(stream=True, **kwargs), seconds)
+                chunks = stream.__aiter__()
+                while True:
+                    try:
+                        chunk = await asyncio.wait_for(chunks.__anext__(), seconds)
+                    except StopAsyncIteration:
+                        break
+                    yield chunk
+            else:
+                stream = await asyncio.wait_for(
+                    asyncio.to_thread(lambda: client.chat.completions.create(stream=True, **kwargs)), seconds
+                )
+                chunks = iter(stream)
+                while True:
+                    chunk = await asyncio.wait_for(asyncio.to_thread(next, chunks, _STREAM_END), seconds)
+                    if chunk is _STREAM_END:
+                        break
+                    yield chunk
+        except asyncio.TimeoutError:
+            counter["timeouts"] += 1
+            raise LLMTimeoutError(f"{provider} LLM stream stalled for more than {seconds:g}s") from None
+        except asyncio.CancelledError:
+            counter["cancelled"] += 1
+            raise
+        except Exception:
+            counter["errors"] += 1
+            raise
+        finally:
+            self._release(provider, sem)
+            close = getattr(stream, "close", None)
+            if callable(close):
+                try:
+                    if inspect.iscoroutinefunction(close):
+                        await close()
+                    else:
+                        close()
+                except Exception as e:
+                    logger.debug("LLM stream close failed: %s", e)
+
+    async def generate_content(
+        self,
+        genai: Any,
+        model: str,
+        prompt: Any,
+        *,
+        generation_config: Optional[Dict[str, Any]] = None,
+        tools: Optional[Any] = None,
+        timeout: Optional[float] = None,
+        provider: str = "gemini",
+    ) -> Any:
+        """GenerativeModel(model, tools=tools).generate_content_async(prompt, ...) on the google.generativeai module."""
+        gen_model = genai.GenerativeModel(model, tools=tools) if tools else genai.GenerativeModel(model)
+        call_async = getattr(gen_model, "generate_content_async", None)
+        if call_async is not None:
+            return await self._run(provider, lambda: call_async(prompt, generation_config=generation_config), timeout)
+        self.thread_fallbacks += 1
+        return await self._run(
+            provider,
+            lambda: asyncio.to_thread(gen_model.generate_content, prompt, generation_config=generation_config),
+            timeout,
+        )
+
+    def stats(self) -> Dict[str, Any]:
+        """Limits plus per-provider calls, in-flight / waiting calls, timeouts, cancellations and errors."""
+        return {
+            "max_concurrency": self.max_concurrency,
+            "timeout_sec": self.timeout,
+            "thread_fallbacks": self.thread_fallbacks,
+            "providers": {p: {**c, "limit": self.limit(p)} for p, c in self._counters.items()},
+        }
+
+
+_gateway: Optional[LLMGateway] = None
+
+
+def get_llm_gateway() -> LLMGateway:
+    """Process-wide gateway (created on first use from env config)."""
+    global _gateway
+    if _gateway is None:
+        _gateway = LLMGateway()
+    return _gateway
+
+
+async def chat_completion(provider: Optional[str], client: Any, *, timeout: Optional[float] = None, **kwargs: Any) -> Any:
+    """Non-streaming chat completion through the shared gateway."""
+    return await get_llm_gateway().chat_completion(provider, client, timeout=timeout, **kwargs)
+
+
+def stream_chat_completion(
+    provider: Optional[str], client: Any, *, timeout: Optional[float] = None, **kwargs: Any
+) -> AsyncIterator[Any]:
+    """Streamed chat completion chunks through the shared gateway."""
+    return get_llm_gateway().stream_chat_completion(provider, client, timeout=timeout, **kwargs)
+
+
+async def generate_content(genai: Any, model: str, prompt: Any, **kwargs: Any) -> Any:
+    """Gemini generate_content through the shared gateway."""
+    return await get_llm_gateway().generate_content(genai, model, prompt, **kwargs)
+
+
+def llm_gateway_stats() -> Dict[str, Any]:
+    """Gateway limits and counters for health/admin endpoints."""
+    return get_llm_gateway().stats()
@@ -22,8 +22,8 @@ class OpenAIFallbackProvider:
 
     def _get_client(self):
         if self._client is None:
-            from openai import OpenAI
-            self._client = OpenAI(api_key=self.api_key)
+            from packages.shared.llm_clients import get_openai_client
+            self._client = get_openai_client(self.api_key)
         return self._client
 
     def chat_completion(
@@ -26,11 +26,8 @@ class OSSProvider:
 
     def _get_client(self):
         if self._client is None:
-            from openai import OpenAI
-            self._client = OpenAI(
-                base_url=self.endpoint,
-                api_key=self.api_key or "no-key",
-            )
+            from packages.shared.llm_clients import get_openai_client
+            self._client = get_openai_client(self.api_key or "no-key", base_url=self.endpoint)
         return self._client
 
     def chat_completion(
@@ -0,0 +1,151 @@
+"""
+Stateless masked product ids for Exclusive Gateway ID masking (ID_MASKING_MODE=token).
+
+    masked = encode_masked_id(secret, internal_id, partner_id, agent_slug="flowers_co", source="local", ttl_sec=86400)
+    # uso_flowers_co.<base64url(nonce | AES-256-GCM(payload) | tag)>
+    decode_masked_id([secret, previous_secret], masked)  # MaskedId(...) or None (tampered, foreign key, expired)
+
+The internal product id, partner id, source and expiry are encrypted and authenticated (AES-GCM; the agent
+slug, kept readable in the prefix, is authenticated as associated data), so masking and resolving need no
+id_masking_map row. Legacy ids (uso_{slug}_{short_id}, uso_{24hex}) contain no "." and still resolve
+through the table.
+
+Payload: version (1 byte) | expires_at (uint32 unix seconds, 0 = never) | internal id | partner id | source,
+where each field is a UUID in 16 bytes or length-prefixed UTF-8, so a 2-UUID id stays ~100 characters.
+"""
+
+import base64
+import hashlib
+import hmac
+import os
+import struct
+import time
+import uuid
+from dataclasses import dataclass
+from typing import Optional, Sequence, Tuple, Union
+
+MASK_PREFIX = "uso_"
+_SEP = "."
+_VERSION = 1
+_NONCE_LEN = 12
+_TAG_LEN = 16
+_NONE, _UUID, _TEXT = 0, 1, 2
+
+
+@dataclass(frozen=True)
+class MaskedId:
+    internal_product_id: str
+    partner_id: Optional[str]
+    agent_slug: str
+    source: Optional[str]
+    expires_at: Optional[int]  # unix seconds; None = no expiry
+
+
+def is_token_masked_id(masked_id: str) -> bool:
+    """True for stateless (encrypted) masked ids; legacy table-backed ids contain no '.'."""
+    return bool(masked_id) and str(masked_id).startswith(MASK_PREFIX) and _SEP in str(masked_id)
+
+
+def _key(secret: str) -> bytes:
+    return hmac.new(secret.encode("utf-8"), b"uso-masked-product-id", hashlib.sha256).digest()
+
+
+def _slug(agent_slug: Optional[str]) -> str:
+    return "".join(c for c in str(agent_slug or "") if c.isalnum() or c == "_")[:64] or "discovery"
+
+
+def _pack_field(value: Optional[str]) -> bytes:
+    if value is None or value == "":
+        return bytes([_NONE])
+    text = str(value)
+    try:
+        u = uuid.UUID(text)
+        if str(u) == text.lower():
+            return bytes([_UUID]) + u.bytes
+    except ValueError:
+        pass
+    raw = text.encode("utf-8")
+    if len(raw) > 255:
+        raise ValueError("masked id field too long")
+    return bytes([_TEXT, len(raw)]) + raw
+
+
+def _unpack_field(buf: bytes, pos: int) -> Tuple[Optional[str], int]:
+    kind = buf[pos]
+    if kind == _NONE:
+        return None, pos + 1
+    if kind == _UUID:
+        return str(uuid.UUID(bytes=bytes(buf[pos + 1 : pos + 17]))), pos + 17
+    if kind == _TEXT:
+        n = buf[pos + 1]
+        return bytes(buf[pos + 2 : pos + 2 + n]).decode("utf-8"), pos + 2 + n
+    raise ValueError("unknown field kind")
+
+
+def encode_masked_id(
+    secret: str,
+    internal_product_id: str,
+    partner_id: Optional[str] = None,
+    agent_slug: Optional[str] = None,
+    source: Optional[str] = None,
+    ttl_sec: Optional[float] = None,
+) -> str:
+    """Encrypted, self-contained masked id (uso_{agent_slug}.{token}). ttl_sec None / 0 = no expiry."""
+    from cryptography.hazmat.primitives.ciphers.aead import AESGCM
+
+    if not secret:
+        raise ValueError("ID masking secret is not configured")
+    slug = _slug(agent_slug)
+    expires_at = int(time.time() + ttl_sec) if ttl_sec else 0
+    payload = (
+        struct.pack(">BI", _VERSION, expires_at)
+        + _pack_field(str(internal_product_id))
+        + _pack_field(str(partner_id) if partner_id else None)
+        + _pack_field(source)
+    )
+    nonce = os.urandom(_NONCE_LEN)
+    sealed = AESGCM(_key(secret)).encrypt(nonce, payload, slug.encode("utf-8"))
+    token = base64.urlsafe_b64encode(nonce + sealed).rstrip(b"=").decode("ascii")
+    return f"{MASK_PREFIX}{slug}{_SEP}{token}"
+
+
+def decode_masked_id(secrets: Union[str, Sequence[str]], masked_id: str, now: Optional[float] = None) -> Optional[MaskedId]:
+    """
+    MaskedId for a token produced by encode_masked_id with any of secrets (current first, then previous
+    ones during rotation). None when malformed, not authentic or expired.
+    """
+    from cryptography.exceptions import InvalidTag
+    from cryptography.hazmat.primitives.ciphers.aead import AESGCM
+
+    if not is_token_masked_id(masked_id):
+        return None
+    slug, _, token = str(masked_id)[len(MASK_PREFIX) :].partition(_SEP)
+    try:
+        raw = base64.urlsafe_b64decode(token + "=" * (-len(token) % 4))
+    except (ValueError, TypeError):
+        return None
+    if len(raw) < _NONCE_LEN + _TAG_LEN + 5:
+        return None
+    nonce, sealed = raw[:_NONCE_LEN], raw[_NONCE_LEN:]
+    for secret in [secrets] if isinstance(secrets, str) else secrets:
+        if not secret:
+            continue
+        try:
+            payload = AESGCM(_key(secret)).decrypt(nonce, sealed, slug.encode("utf-8"))
+        except InvalidTag:
+            continue
+        try:
+            version, expires_at = struct.unpack(">BI", payload[:5])
+            if version != _VERSION:
+                return None
+            internal_id, pos = _unpack_field(payload, 5)
+            partner_id, pos = _unpack_field(payload, pos)
+            source, _ = _unpack_field(payload, pos)
+        except (IndexError, ValueError, struct.error):
+            return None
+        if not internal_id:
+            return None
+        if expires_at and expires_at < (time.time() if now is None else now):
+            return None
+        return MaskedId(internal_id, partner_id, slug, source, expires_at or None)
+    return None
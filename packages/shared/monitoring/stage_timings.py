@@ -0,0 +1,97 @@
+"""
+Per-request stage timings with process-wide aggregates.
+
+    with stage_timings() as t:                       # one request
+        a, b = await asyncio.gather(timed("aggregator", fetch()), timed("semantic", search()))
+        ranked = await timed("ranking", rank(a + b))
+    logger.info("stages %s", t.as_dict())            # {"aggregator": 812.4, "semantic": 95.1, "ranking": 3.2}
+
+timed() records into the request's StageTimings (found through a context variable, so nested helpers and
+gathered tasks need no extra argument) and into StageStats, which keeps count / total / max per stage for
+admin diagnostics. Outside a stage_timings() block only StageStats is updated.
+"""
+
+import contextvars
+import time
+from contextlib import contextmanager
+from typing import Any, Awaitable, Dict, Iterator, Optional, TypeVar
+
+T = TypeVar("T")
+
+
+class StageTimings:
+    """Elapsed milliseconds per stage for one request (repeated stages accumulate)."""
+
+    def __init__(self) -> None:
+        self._started = time.perf_counter()
+        self._stages: Dict[str, float] = {}
+
+    def record(self, stage: str, elapsed_ms: float) -> None:
+        self._stages[stage] = self._stages.get(stage, 0.0) + elapsed_ms
+
+    @property
+    def total_ms(self) -> float:
+        return (time.perf_counter() - self._started) * 1000
+
+    def as_dict(self) -> Dict[str, float]:
+        return {**{k: round(v, 1) for k, v in self._stages.items()}, "total": round(self.total_ms, 1)}
+
+
+class StageStats:
+    """Process-wide per-stage counters: count, total_ms, max_ms, last_ms."""
+
+    def __init__(self) -> None:
+        self._stages: Dict[str, Dict[str, float]] = {}
+
+    def observe(self, stage: str, elapsed_ms: float) -> None:
+        s = self._stages.setdefault(stage, {"count": 0, "total_ms": 0.0, "max_ms": 0.0, "last_ms": 0.0})
+        s["count"] += 1
+        s["total_ms"] += elapsed_ms
+        s["max_ms"] = max(s["max_ms"], elapsed_ms)
+        s["last_ms"] = elapsed_ms
+
+    def snapshot(self) -> Dict[str, Dict[str, Any]]:
+        return {
+            stage: {
+                "count": int(s["count"]),
+                "avg_ms": round(s["total_ms"] / s["count"], 1) if s["count"] else 0.0,
+                "max_ms": round(s["max_ms"], 1),
+                "last_ms": round(s["last_ms"], 1),
+            }
+            for stage, s in sorted(self._stages.items())
+        }
+
+    def reset(self) -> None:
+        self._stages.clear()
+
+
+stage_stats = StageStats()
+_current: contextvars.ContextVar[Optional[StageTimings]] = contextvars.ContextVar("stage_timings", default=None)
+
+
+@contextmanager
+def stage_timings() -> Iterator[StageTimings]:
+    """Collect timed() stages for the enclosed request."""
+    timings = StageTimings()
+    token = _current.set(timings)
+    try:
+        yield timings
+    finally:
+        _current.reset(token)
+
+
+def current_stage_timings() -> Optional[StageTimings]:
+    return _current.get()
+
+
+async def timed(stage: str, awaitable: Awaitable[T]) -> T:
+    """Await awaitable and record its wall time under stage (also when it raises)."""
+    started = time.perf_counter()
+    try:
+        return await awaitable
+    finally:
+        elapsed_ms = (time.perf_counter() - started) * 1000
+        stage_stats.observe(stage, elapsed_ms)
+        timings = _current.get()
+        if timings is not None:
+            timings.record(stage, elapsed_ms)
@@ -101,7 +101,8 @@ def get_platform_image_config(supabase_client) -> Optional[Dict[str, Any]]:
 
 def get_llm_chat_client(llm_config: Dict[str, Any]) -> Tuple[Optional[str], Any]:
     """
-    Create chat client from platform LLM config.
+    Chat client for platform LLM config, shared process-wide per provider config (packages.shared.llm_clients),
+    so repeated calls reuse one pooled client instead of building a new one each time.
     Returns (provider, client) where provider is 'azure'|'openrouter'|'custom'|'gemini', client is OpenAI or genai.
     Returns (None, None) when not configured.
     """
@@ -115,31 +116,28 @@ def get_llm_chat_client(llm_config: Dict[str, Any]) -> Tuple[Optional[str], Any]
     endpoint = cfg.get("endpoint")
 
     try:
+        from packages.shared.llm_clients import get_gemini_client, get_openai_client
+
         if preferred == "openrouter" and api_key:
-            from openai import OpenAI
-            return ("openrouter", OpenAI(base_url="https://openrouter.ai/api/v1", api_key=api_key))
+            return ("openrouter", get_openai_client(api_key, base_url="https://openrouter.ai/api/v1"))
 
         if preferred == "custom" and endpoint and api_key:
-            from openai import OpenAI
             base = endpoint.rstrip("/")
             if not base.endswith("/v1"):
                 base = f"{base}/v1"
-            return ("custom", OpenAI(base_url=base, api_key=api_key))
+            return ("custom", get_openai_client(api_key, base_url=base))
 
         if preferred == "gemini" and api_key:
-            import google.generativeai as genai
-            genai.configure(api_key=api_key)
-            return ("gemini", genai)
+            return ("gemini", get_gemini_client(api_key))
 
         if preferred in ("azure", "openai") and api_key:
-            from openai import OpenAI, AzureOpenAI
             if endpoint:
-                return ("azure", AzureOpenAI(
-                    api_key=api_key,
-                    api_version="2024-02-01",
+                return ("azure", get_openai_client(
+                    api_key,
                     azure_endpoint=endpoint.rstrip("/"),
+                    api_version="2024-02-01",
                 ))
-            return ("openai", OpenAI(api_key=api_key))
+            return ("openai", get_openai_client(api_key))
     except Exception:
         pass
     return (None, None)
@@ -1,6 +1,26 @@
-"""Partner ranking and sponsorship boost for product discovery."""
+"""
+Partner ranking and sponsorship boost for product discovery.
 
-from typing import Any, Dict, List, Optional, Set
+The ranking config (ranking_policy, ranking_edge_cases, sponsorship_pricing) is compiled once into a
+RankingPolicy; sort_products_by_rank then scores the whole candidate list in one pass over columnar
+price / rating / commission / trust / boost arrays (NumPy when installed and the list is large enough,
+else the per-product scorer, with identical scores). top_k returns only the best k products, selected
+with a partition instead of sorting everything.
+"""
+
+import heapq
+from dataclasses import dataclass
+from typing import Any, Dict, List, Optional, Sequence, Set, Tuple
+
+from packages.shared.config_snapshot import FrozenDict
+
+try:
+    import numpy as np
+except ImportError:  # pragma: no cover - optional dependency
+    np = None  # type: ignore[assignment]
+
+# Below this many products the per-product scorer is faster than building arrays
+BATCH_MIN = 64
 
 
 def _get_policy(config: Dict[str, Any]) -> Dict[str, Any]:
@@ -36,6 +56,101 @@ def _get_sponsorship(config: Dict[str, Any]) -> Dict[str, Any]:
     }
 
 
+@dataclass(frozen=True)
+class RankingPolicy:
+    """Parsed ranking config: weights, price direction, edge-case defaults, sponsorship settings."""
+
+    enabled: bool = True
+    w_price: float = 0.3
+    w_rating: float = 0.3
+    w_commission: float = 0.2
+    w_trust: float = 0.2
+    price_asc: bool = True
+    missing_rating: float = 0.5
+    missing_commission: float = 0.0
+    missing_trust: float = 0.5
+    max_sponsored: int = 3
+    sponsorship_boost: float = 0.5  # Add to score for sponsored products
+
+    def score(
+        self,
+        product: Dict[str, Any],
+        partner: Optional[Dict[str, Any]],
+        partner_rating: Optional[float],
+        commission_pct: Optional[float],
+    ) -> float:
+        """Weighted combination of price, rating, commission, trust. Higher = better."""
+        # Normalize components to 0-1 (higher = better for ranking)
+        price = product.get("price")
+        if price is not None:
+            try:
+                price_val = float(price)
+                # Inverse for asc (lower price = higher score)
+                if self.price_asc:
+                    price_score = 1.0 / (1.0 + price_val) if price_val >= 0 else 0.5
+                else:
+                    price_score = min(1.0, price_val / 100.0) if price_val >= 0 else 0.5
+            except (TypeError, ValueError):
+                price_score = 0.5
+        else:
+            price_score = 0.5
+
+        rating = partner_rating if partner_rating is not None else self.missing_rating
+        rating_score = min(1.0, max(0.0, float(rating) / 5.0))
+
+        commission = commission_pct if commission_pct is not None else self.missing_commission
+        commission_score = min(1.0, max(0.0, float(commission) / 20.0))
+
+        trust = 0.5
+        if partner:
+            ts = partner.get("trust_score")
+            if ts is not None:
+                try:
+                    trust = min(1.0, max(0.0, float(ts) / 100.0))
+                except (TypeError, ValueError):
+                    trust = self.missing_trust
+            else:
+                trust = self.missing_trust
+
+        return (
+            self.w_price * price_score
+            + self.w_rating * rating_score
+            + self.w_commission * commission_score
+            + self.w_trust * trust
+        )
+
+
+# Last compiled snapshot config: snapshot values (FrozenDict) cannot change, so identity is a safe cache key
+_compiled: Tuple[Optional[Dict[str, Any]], Optional[RankingPolicy]] = (None, None)
+
+
+def compile_ranking_policy(config: Optional[Dict[str, Any]]) -> RankingPolicy:
+    """RankingPolicy for a platform_config ranking dict (ranking_enabled, ranking_policy, ranking_edge_cases, ...)."""
+    global _compiled
+    config = config or {}
+    if isinstance(config, FrozenDict) and _compiled[0] is config and _compiled[1] is not None:
+        return _compiled[1]
+    policy = _get_policy(config)
+    edge = _get_edge_cases(config)
+    sp = _get_sponsorship(config)
+    weights = policy.get("weights") or {}
+    compiled = RankingPolicy(
+        enabled=bool(config.get("ranking_enabled", True)),
+        w_price=float(weights.get("price", 0.3)),
+        w_rating=float(weights.get("rating", 0.3)),
+        w_commission=float(weights.get("commission", 0.2)),
+        w_trust=float(weights.get("trust", 0.2)),
+        price_asc=str(policy.get("price_direction", "asc")).lower() == "asc",
+        missing_rating=edge["missing_rating"],
+        missing_commission=edge["missing_commission"],
+        missing_trust=edge["missing_trust"],
+        max_sponsored=sp.get("max_sponsored_per_query", 3) if sp.get("sponsorship_enabled", True) else 0,
+    )
+    if isinstance(config, FrozenDict):
+        _compiled = (config, compiled)
+    return compiled
+
+
 def compute_product_rank_score(
     product: Dict[str, Any],
     partner: Optional[Dict[str, Any]],
@@ -47,56 +162,114 @@ def compute_product_rank_score(
     Compute rank score for a product. Higher = better.
     Uses weighted combination of price, rating, commission, trust.
     """
-    policy = _get_policy(config)
-    edge = _get_edge_cases(config)
+    return compile_ranking_policy(config).score(product, partner, partner_rating, commission_pct)
 
-    weights = policy.get("weights") or {}
-    w_price = float(weights.get("price", 0.3))
-    w_rating = float(weights.get("rating", 0.3))
-    w_commission = float(weights.get("commission", 0.2))
-    w_trust = float(weights.get("trust", 0.2))
-
-    price_dir = str(policy.get("price_direction", "asc")).lower()
-
-    # Normalize components to 0-1 (higher = better for ranking)
-    price = product.get("price")
-    if price is not None:
-        try:
-            price_val = float(price)
-            # Inverse for asc (lower price = higher score)
-            if price_dir == "asc":
-                price_score = 1.0 / (1.0 + price_val) if price_val >= 0 else 0.5
-            else:
-                price_score = min(1.0, price_val / 100.0) if price_val >= 0 else 0.5
-        except (TypeError, ValueError):
-            price_score = 0.5
-    else:
-        price_score = 0.5
 
-    rating = partner_rating if partner_rating is not None else edge.get("missing_rating", 0.5)
-    rating_score = min(1.0, max(0.0, float(rating) / 5.0))
+def _has_tag(product: Dict[str, Any], tag: str) -> bool:
+    tags = product.get("experience_tags")
+    return isinstance(tags, list) and tag in {str(t).strip().lower() for t in tags if t}
+
+
+def _score_scalar(
+    products: Sequence[Dict[str, Any]],
+    policy: RankingPolicy,
+    partners_map: Dict[str, Dict[str, Any]],
+    partner_ratings_map: Dict[str, float],
+    commission_map: Dict[str, float],
+    active_sponsorships: Set[str],
+    boost_tag: Optional[str],
+    boost_amount: float,
+) -> List[float]:
+    scores: List[float] = []
+    for p in products:
+        partner_id = str(p.get("partner_id", "")) if p.get("partner_id") else ""
+        partner = partners_map.get(partner_id) if partner_id else None
+        score = policy.score(p, partner, partner_ratings_map.get(partner_id), commission_map.get(partner_id))
+        if policy.max_sponsored > 0 and str(p.get("id", "")) in active_sponsorships:
+            score += policy.sponsorship_boost
+        if boost_tag is not None and _has_tag(p, boost_tag):
+            score += boost_amount
+        scores.append(score)
+    return scores
 
-    commission = commission_pct if commission_pct is not None else edge.get("missing_commission", 0)
-    commission_score = min(1.0, max(0.0, float(commission) / 20.0))
 
-    trust = 0.5
-    if partner:
-        ts = partner.get("trust_score")
-        if ts is not None:
+def _score_batch(
+    products: Sequence[Dict[str, Any]],
+    policy: RankingPolicy,
+    partners_map: Dict[str, Dict[str, Any]],
+    partner_ratings_map: Dict[str, float],
+    commission_map: Dict[str, float],
+    active_sponsorships: Set[str],
+    boost_tag: Optional[str],
+    boost_amount: float,
+) -> Any:
+    """Same scores as _score_scalar (same float operations in the same order), computed over columns."""
+    n = len(products)
+    nan = float("nan")
+    price = [nan] * n  # NaN = missing / unparseable -> 0.5, like a negative price
+    rating = [policy.missing_rating] * n
+    commission = [policy.missing_commission] * n
+    trust = [nan] * n  # raw trust_score; NaN = use trust_default
+    trust_default = [0.5] * n
+    has_trust = [False] * n
+    sponsored = [False] * n
+    tagged = [False] * n
+    check_sponsored = policy.max_sponsored > 0 and bool(active_sponsorships)
+    for i, p in enumerate(products):
+        v = p.get("price")
+        if v is not None:
             try:
-                trust = min(1.0, max(0.0, float(ts) / 100.0))
+                price[i] = float(v)
             except (TypeError, ValueError):
-                trust = edge.get("missing_trust", 0.5)
-        else:
-            trust = edge.get("missing_trust", 0.5)
+                pass
+        partner_id = str(p.get("partner_id", "")) if p.get("partner_id") else ""
+        r = partner_ratings_map.get(partner_id)
+        if r is not None:
+            rating[i] = float(r)
+        c = commission_map.get(partner_id)
+        if c is not None:
+            commission[i] = float(c)
+        partner = partners_map.get(partner_id) if partner_id else None
+        if partner:
+            trust_default[i] = policy.missing_trust
+            ts = partner.get("trust_score")
+            if ts is not None:
+                try:
+                    trust[i] = float(ts)
+                    has_trust[i] = True
+                except (TypeError, ValueError):
+                    pass
+        if check_sponsored:
+            sponsored[i] = str(p.get("id", "")) in active_sponsorships
+        if boost_tag is not None:
+            tagged[i] = _has_tag(p, boost_tag)
 
-    score = (
-        w_price * price_score
-        + w_rating * rating_score
-        + w_commission * commission_score
-        + w_trust * trust
-    )
-    return score
+    with np.errstate(all="ignore"):
+        price_arr = np.asarray(price, dtype=np.float64)
+        valid = price_arr >= 0  # False for NaN
+        if policy.price_asc:
+            price_score = np.where(valid, 1.0 / (1.0 + price_arr), 0.5)
+        else:
+            price_score = np.where(valid, np.minimum(1.0, price_arr / 100.0), 0.5)
+        # fmax/fmin: NaN clamps to 0.0 like Python's min(1.0, max(0.0, nan))
+        rating_score = np.fmin(1.0, np.fmax(0.0, np.asarray(rating, dtype=np.float64) / 5.0))
+        commission_score = np.fmin(1.0, np.fmax(0.0, np.asarray(commission, dtype=np.float64) / 20.0))
+        trust_score = np.where(
+            np.asarray(has_trust),
+            np.fmin(1.0, np.fmax(0.0, np.asarray(trust, dtype=np.float64) / 100.0)),
+            np.asarray(trust_default, dtype=np.float64),
+        )
+        scores = (
+            policy.w_price * price_score
+            + policy.w_rating * rating_score
+            + policy.w_commission * commission_score
+            + policy.w_trust * trust_score
+        )
+    if check_sponsored:
+        scores = scores + np.where(np.asarray(sponsored), policy.sponsorship_boost, 0.0)
+    if boost_tag is not None:
+        scores = scores + np.where(np.asarray(tagged), boost_amount, 0.0)
+    return scores
 
 
 def sort_products_by_rank(
@@ -108,45 +281,50 @@ def sort_products_by_rank(
     config: Optional[Dict[str, Any]] = None,
     experience_tag_boost: Optional[str] = None,
     experience_tag_boost_amount: float = 0.2,
+    top_k: Optional[int] = None,
+    policy: Optional[RankingPolicy] = None,
 ) -> List[Dict[str, Any]]:
     """
     Sort products by rank score. Sponsored products get a boost (up to max_sponsored_per_query).
     When experience_tag_boost is set, products whose experience_tags contain that tag get an extra boost.
+    top_k: return only the k best (same order as the full sort). policy: precompiled config (overrides config).
     """
-    config = config or {}
-    if not config.get("ranking_enabled", True):
-        return products
-
-    sp = _get_sponsorship(config)
-    max_sponsored = sp.get("max_sponsored_per_query", 3) if sp.get("sponsorship_enabled", True) else 0
-    sponsorship_boost = 0.5  # Add to score for sponsored products
-
-    partner_ratings_map = partner_ratings_map or {}
-    commission_map = commission_map or {}
-    active_sponsorships = active_sponsorships or set()
-
-    scored: List[tuple] = []
-    for p in products:
-        pid = str(p.get("id", ""))
-        partner_id = str(p.get("partner_id", "")) if p.get("partner_id") else ""
-        partner = partners_map.get(partner_id) if partner_id else None
-        rating = partner_ratings_map.get(partner_id)
-        commission = commission_map.get(partner_id)
-        score = compute_product_rank_score(p, partner, rating, commission, config)
-
-        if pid in active_sponsorships and max_sponsored > 0:
-            score += sponsorship_boost
+    policy = policy or compile_ranking_policy(config)
+    if not policy.enabled:
+        return products[:top_k] if top_k is not None else products
+    n = len(products)
+    if n == 0:
+        return []
 
-        if experience_tag_boost and experience_tag_boost_amount:
-            tags = p.get("experience_tags")
-            if isinstance(tags, list):
-                tag_set = {str(t).strip().lower() for t in tags if t}
-                if experience_tag_boost.strip().lower() in tag_set:
-                    score += experience_tag_boost_amount
-
-        scored.append((score, p))
+    boost_tag = experience_tag_boost.strip().lower() if experience_tag_boost and experience_tag_boost_amount else None
+    args = (
+        products,
+        policy,
+        partners_map,
+        partner_ratings_map or {},
+        commission_map or {},
+        active_sponsorships or set(),
+        boost_tag,
+        experience_tag_boost_amount,
+    )
+    batch = np is not None and n >= BATCH_MIN
+    scores = _score_batch(*args) if batch else _score_scalar(*args)
+    neg = (-scores).tolist() if batch else [-s for s in scores]
+    created = [str(p.get("created_at", "")) for p in products]
 
-    # Sort by score descending, then by created_at for tie-breaker
-    scored.sort(key=lambda x: (-x[0], str(x[1].get("created_at", ""))))
+    # Sort by score descending, then by created_at for tie-breaker (stable, like sorting (score, product) pairs)
+    def key(i: int) -> Tuple[float, str]:
+        return (neg[i], created[i])
 
-    return [p for _, p in scored]
+    if top_k is None or top_k >= n:
+        order = sorted(range(n), key=key)
+    elif top_k <= 0:
+        return []
+    elif batch:
+        # Everything scoring at least the k-th best score (ties included), then an exact sort of those few
+        neg_arr = -scores
+        kth = np.partition(neg_arr, top_k - 1)[top_k - 1]
+        order = sorted(np.flatnonzero(neg_arr <= kth).tolist(), key=key)[:top_k]
+    else:
+        order = heapq.nsmallest(top_k, range(n), key=key)
+    return [products[i] for i in order]
@@ -0,0 +1,210 @@
+"""
+In-memory ranking context: partner trust scores, partner ratings and sponsorship windows.
+
+    store = RankingContextStore(fetch_partners, fetch_ratings, fetch_sponsorships, fetch_partners_by_ids)
+    await store.refresh(full=True)                          # startup
+    partners, ratings, sponsored = await store.get_context(product_ids, partner_ids)
+
+fetch_partners / fetch_ratings / fetch_sponsorships(since) are synchronous loaders (run in a worker thread):
+since=None means a full load, otherwise rows with updated_at >= since. refresh() applies only changed rows;
+every full_refresh_sec it reloads everything (drops rows deleted upstream, picks up writers that do not
+bump updated_at). Sponsorships are kept as windows (start_at, end_at), so one starting or ending between
+refreshes is honoured at lookup time without a query.
+
+Partner ids the store has not seen (new partners) are fetched on demand through fetch_partners_by_ids and
+counted as misses; ids that do not exist (UCP / Shopify products) are remembered until the next full refresh.
+"""
+
+import asyncio
+import logging
+import time
+from datetime import datetime, timedelta, timezone
+from typing import Any, Callable, Dict, Iterable, List, Optional, Set, Tuple
+
+logger = logging.getLogger(__name__)
+
+Loader = Callable[[Optional[str]], List[Dict[str, Any]]]
+
+# Re-read rows updated slightly before the last sync so clock skew between app and DB cannot hide a change
+_SYNC_OVERLAP = timedelta(seconds=5)
+
+
+def _parse_ts(value: Any) -> Optional[datetime]:
+    if isinstance(value, datetime):
+        return value if value.tzinfo else value.replace(tzinfo=timezone.utc)
+    if not value:
+        return None
+    try:
+        dt = datetime.fromisoformat(str(value).replace("Z", "+00:00"))
+    except ValueError:
+        return None
+    return dt if dt.tzinfo else dt.replace(tzinfo=timezone.utc)
+
+
+class RankingContextStore:
+    """Partners, ratings and sponsorship windows for sort_products_by_rank, served from memory."""
+
+    def __init__(
+        self,
+        fetch_partners: Loader,
+        fetch_ratings: Loader,
+        fetch_sponsorships: Loader,
+        fetch_partners_by_ids: Optional[Callable[[List[str]], List[Dict[str, Any]]]] = None,
+        full_refresh_sec: float = 600.0,
+    ):
+        self._fetch_partners = fetch_partners
+        self._fetch_ratings = fetch_ratings
+        self._fetch_sponsorships = fetch_sponsorships
+        self._fetch_partners_by_ids = fetch_partners_by_ids
+        self._full_refresh_sec = max(1.0, float(full_refresh_sec))
+        self._partners: Dict[str, Dict[str, Any]] = {}
+        self._unknown_partners: Set[str] = set()
+        self._ratings: Dict[str, float] = {}
+        self._windows: Dict[str, Tuple[str, datetime, datetime]] = {}  # sponsorship id -> (product_id, start, end)
+        self._by_product: Dict[str, Set[str]] = {}  # product_id -> sponsorship ids
+        self._ready = False
+        self._last_sync: Optional[datetime] = None
+        self._last_full: float = 0.0
+        self._lock = asyncio.Lock()
+        self._stats = {"hits": 0, "misses": 0, "refreshes": 0, "full_refreshes": 0, "refresh_errors": 0, "rows_applied": 0}
+        self._last_error: Optional[str] = None
+
+    @property
+    def ready(self) -> bool:
+        return self._ready
+
+    # --- apply rows -----------------------------------------------------------------------------------
+
+    def _apply_partners(self, rows: Iterable[Dict[str, Any]]) -> int:
+        n = 0
+        for r in rows:
+            pid = r.get("id")
+            if pid:
+                self._partners[str(pid)] = {k: r.get(k) for k in ("id", "business_name", "trust_score")}
+                self._unknown_partners.discard(str(pid))
+                n += 1
+        return n
+
+    def _apply_ratings(self, rows: Iterable[Dict[str, Any]]) -> int:
+        n = 0
+        for r in rows:
+            pid = r.get("partner_id")
+            if pid:
+                self._ratings[str(pid)] = float(r.get("avg_rating") or 0)
+                n += 1
+        return n
+
+    def _drop_window(self, sid: str) -> None:
+        entry = self._windows.pop(sid, None)
+        if entry is not None:
+            ids = self._by_product.get(entry[0])
+            if ids is not None:
+                ids.discard(sid)
+                if not ids:
+                    self._by_product.pop(entry[0], None)
+
+    def _apply_sponsorships(self, rows: Iterable[Dict[str, Any]], now: datetime) -> int:
+        n = 0
+        for r in rows:
+            sid = str(r.get("id") or "")
+            if not sid:
+                continue
+            self._drop_window(sid)
+            start, end = _parse_ts(r.get("start_at")), _parse_ts(r.get("end_at"))
+            product_id = str(r.get("product_id") or "")
+            if r.get("status") == "active" and product_id and start and end and end >= now:
+                self._windows[sid] = (product_id, start, end)
+                self._by_product.setdefault(product_id, set()).add(sid)
+            n += 1
+        return n
+
+    def _prune_expired(self, now: datetime) -> None:
+        for sid in [sid for sid, (_, _, end) in self._windows.items() if end < now]:
+            self._drop_window(sid)
+
+    # --- refresh --------------------------------------------------------------------------------------
+
+    async def refresh(self, full: bool = False) -> Dict[str, int]:
+        """Apply rows changed since the last sync (everything when full or full_refresh_sec elapsed)."""
+        async with self._lock:
+            started = datetime.now(timezone.utc)
+            full = full or not self._ready or time.monotonic() - self._last_full >= self._full_refresh_sec
+            since = None if full or self._last_sync is None else (self._last_sync - _SYNC_OVERLAP).isoformat()
+            try:
+                partners, ratings, sponsorships = await asyncio.gather(
+                    asyncio.to_thread(self._fetch_partners, since),
+                    asyncio.to_thread(self._fetch_ratings, since),
+                    asyncio.to_thread(self._fetch_sponsorships, since),
+                )
+            except Exception as e:
+                self._stats["refresh_errors"] += 1
+                self._last_error = str(e)
+                logger.warning("Ranking context refresh failed (serving previous data): %s", e)
+                return {}
+            if full:
+                self._partners, self._unknown_partners, self._ratings = {}, set(), {}
+                self._windows, self._by_product = {}, {}
+                self._last_full = time.monotonic()
+                self._stats["full_refreshes"] += 1
+            counts = {
+                "partners": self._apply_partners(partners),
+                "ratings": self._apply_ratings(ratings),
+                "sponsorships": self._apply_sponsorships(sponsorships, started),
+            }
+            self._prune_expired(started)
+            self._last_sync, self._ready, self._last_error = started, True, None
+            self._stats["refreshes"] += 1
+            self._stats["rows_applied"] += sum(counts.values())
+            return counts
+
+    # --- lookups --------------------------------------------------------------------------------------
+
+    def is_sponsored(self, product_id: str, now: Optional[datetime] = None) -> bool:
+        now = now or datetime.now(timezone.utc)
+        return any(
+            start <= now <= end
+            for start, end in (self._windows[sid][1:] for sid in self._by_product.get(str(product_id), ()))
+        )
+
+    async def get_context(
+        self,
+        product_ids: Iterable[str],
+        partner_ids: Iterable[str],
+        now: Optional[datetime] = None,
+    ) -> Optional[Tuple[Dict[str, Dict[str, Any]], Dict[str, float], Set[str]]]:
+        """(partners_map, partner_ratings_map, active_sponsorships) or None before the first load."""
+        if not self._ready:
+            return None
+        now = now or datetime.now(timezone.utc)
+        wanted = [str(p) for p in partner_ids if p]
+        missing = [p for p in wanted if p not in self._partners and p not in self._unknown_partners]
+        if missing:
+            self._stats["misses"] += 1
+            if self._fetch_partners_by_ids is not None:
+                try:
+                    rows = await asyncio.to_thread(self._fetch_partners_by_ids, missing)
+                    self._apply_partners(rows)
+                except Exception as e:
+                    logger.debug("Ranking context partner fetch failed: %s", e)
+                    rows = None
+                if rows is not None:
+                    self._unknown_partners.update(p for p in missing if p not in self._partners)
+        else:
+            self._stats["hits"] += 1
+        partners_map = {p: self._partners[p] for p in wanted if p in self._partners}
+        ratings_map = {p: self._ratings[p] for p in wanted if p in self._ratings}
+        sponsored = {str(pid) for pid in product_ids if pid and self.is_sponsored(str(pid), now)}
+        return partners_map, ratings_map, sponsored
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            **self._stats,
+            "ready": self._ready,
+            "partners": len(self._partners),
+            "unknown_partners": len(self._unknown_partners),
+            "ratings": len(self._ratings),
+            "sponsorship_windows": len(self._windows),
+            "last_sync": self._last_sync.isoformat() if self._last_sync else None,
+            "age_sec": round((datetime.now(timezone.utc) - self._last_sync).total_seconds(), 1) if self._last_sync else None,
+            "last_error": self._last_error,
+        }
@@ -12,6 +12,8 @@ import logging
 import re
 from typing import Any, Awaitable, Callable, Dict, List, Optional, Union
 
+from .http_clients import get_http_client
+
 logger = logging.getLogger(__name__)
 
 # Default timeout per Shopify MCP request (plan: 3s SLA)
@@ -236,7 +238,6 @@ class ShopifyMCPDriver:
         if not self._get_endpoints:
             return []
         try:
-            import httpx
             endpoints = await self._get_endpoints()
             if not endpoints:
                 return []
@@ -263,8 +264,7 @@ class ShopifyMCPDriver:
                 }
                 headers = {"Accept": "application/json", "Content-Type": "application/json", "User-Agent": "USO-Orchestrator/1.0 (Shopify MCP)"}
                 try:
-                    async with httpx.AsyncClient(timeout=self._timeout) as client:
-                        r = await client.post(mcp_url, json=payload, headers=headers)
+                    r = await get_http_client(mcp_url).post(mcp_url, json=payload, headers=headers, timeout=self._timeout)
                 except Exception as e:
                     logger.warning("Shopify MCP request failed %s: %s", mcp_url, e)
                     return []
@@ -0,0 +1,140 @@
+"""
+Small in-process async cache: LRU + TTL with single-flight loading.
+
+    cache = AsyncTTLCache(name="query_embeddings", max_entries=2048, ttl=3600)
+    vec = await cache.get_or_load(key, lambda: embed(text))
+
+Concurrent get_or_load calls for one key share a single loader call; the load is shielded so a caller
+that is cancelled (deadline, client disconnect) does not throw away a result other callers are waiting on.
+None results are not cached unless cache_none=True, so transient failures are retried on the next call.
+
+With stale_ttl > 0 an expired entry is kept for stale_ttl more seconds and get_or_load serves it
+(stale-while-revalidate) while one background load refreshes it. invalidate() also discards the result of
+any load that started before it, so a write cannot be overwritten by a read that raced it.
+"""
+
+import asyncio
+import time
+from collections import OrderedDict
+from typing import Any, Awaitable, Callable, Dict, Hashable, Optional, Tuple
+
+_MISSING = object()
+
+
+class AsyncTTLCache:
+    """LRU + TTL cache with single-flight async loading and hit/miss counters."""
+
+    def __init__(self, name: str = "", max_entries: int = 1024, ttl: float = 300.0, stale_ttl: float = 0.0):
+        self.name = name
+        self._max_entries = max(1, int(max_entries))
+        self._ttl = max(0.0, float(ttl))
+        self._stale_ttl = max(0.0, float(stale_ttl))
+        # key -> (value, expires_at, stale_until) in time.monotonic() seconds
+        self._entries: "OrderedDict[Hashable, Tuple[Any, float, float]]" = OrderedDict()
+        self._inflight: Dict[Hashable, asyncio.Task] = {}
+        self._generation = 0
+        self._stats = {"hits": 0, "misses": 0, "stale_hits": 0, "loads": 0, "load_errors": 0, "coalesced": 0, "evictions": 0}
+
+    def _lookup(self, key: Hashable) -> Tuple[Any, bool]:
+        """(value, fresh) for key; value is _MISSING when absent or past its stale window."""
+        entry = self._entries.get(key)
+        if entry is None:
+            return _MISSING, False
+        value, expires_at, stale_until = entry
+        now = time.monotonic()
+        if expires_at > now:
+            self._entries.move_to_end(key)
+            return value, True
+        if stale_until > now:
+            return value, False
+        self._entries.pop(key, None)
+        return _MISSING, False
+
+    def get(self, key: Hashable, default: Any = None) -> Any:
+        """Fresh cached value for key, else default. Counts a hit or miss."""
+        value, fresh = self._lookup(key)
+        if fresh:
+            self._stats["hits"] += 1
+            return value
+        self._stats["misses"] += 1
+        return default
+
+    def set(self, key: Hashable, value: Any, ttl: Optional[float] = None) -> None:
+        """Store value for ttl seconds (default: the cache TTL)."""
+        ttl = self._ttl if ttl is None else max(0.0, float(ttl))
+        if ttl <= 0:
+            self._entries.pop(key, None)
+            return
+        expires_at = time.monotonic() + ttl
+        self._entries[key] = (value, expires_at, expires_at + self._stale_ttl)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self._max_entries:
+            self._entries.popitem(last=False)
+            self._stats["evictions"] += 1
+
+    async def get_or_load(
+        self,
+        key: Hashable,
+        loader: Callable[[], Awaitable[Any]],
+        ttl: Optional[float] = None,
+        cache_none: bool = False,
+    ) -> Any:
+        """
+        Cached value for key, or await loader() once for all concurrent callers and cache its result.
+        A stale entry (within stale_ttl) is returned at once while a background load refreshes it.
+        """
+        value, fresh = self._lookup(key)
+        if fresh:
+            self._stats["hits"] += 1
+            return value
+        if value is not _MISSING:
+            self._stats["stale_hits"] += 1
+            if key not in self._inflight:
+                self._start_load(key, loader, ttl, cache_none)
+            return value
+        self._stats["misses"] += 1
+        task = self._inflight.get(key)
+        if task is None:
+            task = self._start_load(key, loader, ttl, cache_none)
+        else:
+            self._stats["coalesced"] += 1
+        return await asyncio.shield(task)
+
+    def _start_load(self, key: Hashable, loader: Callable[[], Awaitable[Any]], ttl: Optional[float], cache_none: bool) -> asyncio.Task:
+        task = asyncio.create_task(self._load(key, loader, ttl, cache_none))
+        self._inflight[key] = task
+        task.add_done_callback(lambda t, k=key: self._load_done(k, t))
+        return task
+
+    def _load_done(self, key: Hashable, task: asyncio.Task) -> None:
+        if self._inflight.get(key) is task:
+            self._inflight.pop(key, None)
+        if not task.cancelled():
+            task.exception()  # retrieved here so background (stale) refresh failures are not reported as unhandled
+
+    async def _load(self, key: Hashable, loader: Callable[[], Awaitable[Any]], ttl: Optional[float], cache_none: bool) -> Any:
+        self._stats["loads"] += 1
+        generation = self._generation
+        try:
+            value = await loader()
+        except Exception:
+            self._stats["load_errors"] += 1
+            raise
+        if (value is not None or cache_none) and generation == self._generation:
+            self.set(key, value, ttl)
+        return value
+
+    def invalidate(self, key: Optional[Hashable] = None) -> int:
+        """Drop one key (or everything when key is None). Returns number of entries removed."""
+        self._generation += 1
+        if key is None:
+            self._inflight.clear()  # loads already running finish for their callers but are not cached or joined
+            n = len(self._entries)
+            self._entries.clear()
+            return n
+        self._inflight.pop(key, None)
+        return 1 if self._entries.pop(key, None) is not None else 0
+
+    def stats(self) -> Dict[str, Any]:
+        """Counters plus current entry count (for admin/diagnostics)."""
+        return {**self._stats, "name": self.name, "entries": len(self._entries), "loading": len(self._inflight)}
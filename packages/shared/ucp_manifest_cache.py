@@ -0,0 +1,287 @@
+"""
+In-process cache for partner UCP manifests (/.well-known/ucp).
+
+Keeps the parsed shopping transport (MCP endpoint, REST catalog base, REST paths known to 404) per
+partner origin so UCPManifestDriver.search only pays for catalog calls. Honours Cache-Control
+(max-age / s-maxage, no-cache, no-store), revalidates with ETag / Last-Modified, serves stale entries
+while refreshing in the background, and negatively caches manifest failures for a short window.
+One cache per process (get_manifest_cache); driver instances created per request share it.
+"""
+
+import asyncio
+import logging
+import time
+from collections import OrderedDict
+from dataclasses import dataclass, field, replace
+from datetime import datetime, timezone
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Set
+
+from .http_clients import get_http_client
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_TTL_SEC = 300.0  # when the partner sends no Cache-Control max-age
+MAX_TTL_SEC = 3600.0  # cap partner-supplied max-age
+STALE_TTL_SEC = 86400.0  # serve stale (and refresh in background) for this long past expiry
+NEGATIVE_TTL_SEC = 60.0  # remember manifest failures so broken partners are not re-fetched every turn
+MAX_ENTRIES = 1000
+FETCH_TIMEOUT_SEC = 3.0
+
+ParseFn = Callable[[Dict[str, Any], str], Dict[str, Any]]
+
+
+@dataclass
+class ManifestEntry:
+    """Cached manifest for one partner origin. data is None for a negative (failed fetch) entry."""
+
+    origin: str
+    manifest_url: Optional[str] = None
+    data: Optional[Dict[str, Any]] = None
+    transport: Dict[str, Any] = field(default_factory=dict)
+    etag: Optional[str] = None
+    last_modified: Optional[str] = None
+    ttl: float = DEFAULT_TTL_SEC
+    must_revalidate: bool = False
+    fetched_at: float = 0.0  # time.monotonic()
+    cached_at: str = ""  # wall clock ISO timestamp (for persistence / admin)
+    rest_404_paths: Set[str] = field(default_factory=set)
+
+    @property
+    def ok(self) -> bool:
+        return self.data is not None
+
+    def age(self, now: Optional[float] = None) -> float:
+        return (now if now is not None else time.monotonic()) - self.fetched_at
+
+    def is_fresh(self, now: Optional[float] = None) -> bool:
+        return self.age(now) < self.ttl
+
+
+def parse_cache_control(value: Optional[str]) -> Dict[str, Optional[str]]:
+    """Parse a Cache-Control header into {directive: value or None}. Directives are lower-cased."""
+    out: Dict[str, Optional[str]] = {}
+    for part in (value or "").split(","):
+        part = part.strip()
+        if not part:
+            continue
+        if "=" in part:
+            k, v = part.split("=", 1)
+            out[k.strip().lower()] = v.strip().strip('"')
+        else:
+            out[part.lower()] = None
+    return out
+
+
+class UCPManifestCache:
+    """
+    LRU + TTL cache of partner manifests keyed by origin (scheme + host).
+    get() returns a fresh entry, a stale entry (scheduling a background refresh), or fetches inline
+    on a miss. Concurrent misses for one origin share a single fetch (single-flight); the fetch is
+    shielded so a caller hitting its own deadline does not throw away a manifest that is about to land.
+    """
+
+    def __init__(
+        self,
+        default_ttl: float = DEFAULT_TTL_SEC,
+        max_ttl: float = MAX_TTL_SEC,
+        stale_ttl: float = STALE_TTL_SEC,
+        negative_ttl: float = NEGATIVE_TTL_SEC,
+        max_entries: int = MAX_ENTRIES,
+        fetch_timeout: float = FETCH_TIMEOUT_SEC,
+        on_store: Optional[Callable[[ManifestEntry], Awaitable[None]]] = None,
+    ):
+        """on_store: optional async hook called after each successful fetch/revalidation (persist validators)."""
+        self._default_ttl = max(0.0, float(default_ttl))
+        self._max_ttl = max(0.0, float(max_ttl))
+        self._stale_ttl = max(0.0, float(stale_ttl))
+        self._negative_ttl = max(0.0, float(negative_ttl))
+        self._max_entries = max(1, int(max_entries))
+        self._fetch_timeout = max(0.5, float(fetch_timeout))
+        self.on_store = on_store
+        self._entries: "OrderedDict[str, ManifestEntry]" = OrderedDict()
+        self._inflight: Dict[str, asyncio.Task] = {}
+        self._stats = {"hits": 0, "stale_hits": 0, "misses": 0, "negative_hits": 0, "revalidated": 0, "fetched": 0, "fetch_errors": 0}
+
+    async def get(
+        self,
+        origin: str,
+        base_url: str,
+        headers: Dict[str, str],
+        parse: ParseFn,
+    ) -> Optional[ManifestEntry]:
+        """
+        Return the manifest entry for origin, or None when the partner has no usable manifest.
+        parse(data, origin) builds the transport dict stored with the entry.
+        """
+        now = time.monotonic()
+        entry = self._entries.get(origin)
+        if entry is not None:
+            self._entries.move_to_end(origin)
+            if entry.is_fresh(now) and not entry.must_revalidate:
+                if entry.ok:
+                    self._stats["hits"] += 1
+                    return entry
+                self._stats["negative_hits"] += 1
+                return None
+            if entry.ok and not entry.must_revalidate and entry.age(now) < entry.ttl + self._stale_ttl:
+                self._stats["stale_hits"] += 1
+                self._start_fetch(origin, base_url, headers, parse)
+                return entry
+        self._stats["misses"] += 1
+        task = self._start_fetch(origin, base_url, headers, parse)
+        entry = await asyncio.shield(task)
+        return entry if entry is not None and entry.ok else None
+
+    def mark_rest_404(self, origin: str, path: str) -> None:
+        """Remember a REST catalog path that returned 404 so later searches skip it until the manifest changes."""
+        entry = self._entries.get(origin)
+        if entry is not None:
+            entry.rest_404_paths.add(path)
+
+    def invalidate(self, origin: Optional[str] = None) -> int:
+        """Drop one origin (or everything when origin is None). Returns number of entries removed."""
+        if origin is None:
+            n = len(self._entries)
+            self._entries.clear()
+            return n
+        return 1 if self._entries.pop(origin.rstrip("/"), None) is not None else 0
+
+    def stats(self) -> Dict[str, Any]:
+        """Counters plus current entry count (for admin/diagnostics)."""
+        now = time.monotonic()
+        return {
+            **self._stats,
+            "entries": len(self._entries),
+            "fresh_entries": sum(1 for e in self._entries.values() if e.ok and e.is_fresh(now)),
+            "negative_entries": sum(1 for e in self._entries.values() if not e.ok),
+            "refreshing": len(self._inflight),
+        }
+
+    def _start_fetch(self, origin: str, base_url: str, headers: Dict[str, str], parse: ParseFn) -> asyncio.Task:
+        task = self._inflight.get(origin)
+        if task is None:
+            task = asyncio.create_task(self._fetch(origin, base_url, headers, parse))
+            self._inflight[origin] = task
+            task.add_done_callback(lambda _t, o=origin: self._inflight.pop(o, None))
+        return task
+
+    def _ttl_from_headers(self, resp_headers: Any) -> tuple:
+        """Return (ttl_seconds, must_revalidate, storable) from response Cache-Control."""
+        cc = parse_cache_control(resp_headers.get("cache-control"))
+        if "no-store" in cc:
+            return 0.0, True, False
+        if "no-cache" in cc:
+            return 0.0, True, True
+        for key in ("s-maxage", "max-age"):
+            if cc.get(key) is not None:
+                try:
+                    return min(self._max_ttl, max(0.0, float(cc[key] or 0))), False, True
+                except ValueError:
+                    break
+        return self._default_ttl, False, True
+
+    def _put(self, entry: ManifestEntry) -> None:
+        self._entries[entry.origin] = entry
+        self._entries.move_to_end(entry.origin)
+        while len(self._entries) > self._max_entries:
+            self._entries.popitem(last=False)
+
+    def _candidate_urls(self, origin: str, base_url: str, previous: Optional[ManifestEntry]) -> List[str]:
+        # Prefer /.well-known/ucp (no extension) first to avoid 404 where servers only serve that path
+        urls = [f"{origin}/.well-known/ucp", f"{origin}/.well-known/ucp.json"]
+        if base_url != origin and base_url.startswith(origin):
+            urls.append(base_url.rstrip("/"))
+        if previous is not None and previous.ok and previous.manifest_url in urls:
+            urls.remove(previous.manifest_url)
+            urls.insert(0, previous.manifest_url)
+        return urls
+
+    async def _fetch(self, origin: str, base_url: str, headers: Dict[str, str], parse: ParseFn) -> Optional[ManifestEntry]:
+        previous = self._entries.get(origin)
+        now_iso = datetime.now(timezone.utc).isoformat()
+        try:
+            for url in self._candidate_urls(origin, base_url, previous):
+                req_headers = dict(headers)
+                if previous is not None and previous.ok and url == previous.manifest_url:
+                    if previous.etag:
+                        req_headers["If-None-Match"] = previous.etag
+                    if previous.last_modified:
+                        req_headers["If-Modified-Since"] = previous.last_modified
+                r = await get_http_client(url).get(url, headers=req_headers, timeout=self._fetch_timeout)
+                logger.info("UCP manifest request: GET url=%s status=%s", url, r.status_code)
+                if r.status_code == 304 and previous is not None and previous.ok:
+                    ttl, must_revalidate, _ = self._ttl_from_headers(r.headers)
+                    entry = replace(
+                        previous,
+                        ttl=ttl,
+                        must_revalidate=must_revalidate,
+                        fetched_at=time.monotonic(),
+                        cached_at=now_iso,
+                        etag=r.headers.get("etag") or previous.etag,
+                        last_modified=r.headers.get("last-modified") or previous.last_modified,
+                    )
+                    self._stats["revalidated"] += 1
+                    self._put(entry)
+                    self._notify(entry)
+                    return entry
+                if r.status_code != 200:
+                    continue
+                data = r.json()
+                if not isinstance(data, dict):
+                    continue
+                ttl, must_revalidate, storable = self._ttl_from_headers(r.headers)
+                entry = ManifestEntry(
+                    origin=origin,
+                    manifest_url=url,
+                    data=data,
+                    transport=parse(data, origin),
+                    etag=r.headers.get("etag"),
+                    last_modified=r.headers.get("last-modified"),
+                    ttl=ttl,
+                    must_revalidate=must_revalidate,
+                    fetched_at=time.monotonic(),
+                    cached_at=now_iso,
+                )
+                logger.info("UCP manifest response: url=%s status=200 keys=%s ttl=%.0fs", url, list(data.keys())[:15], ttl)
+                self._stats["fetched"] += 1
+                if storable:
+                    self._put(entry)
+                    self._notify(entry)
+                else:
+                    self._entries.pop(origin, None)
+                return entry
+            logger.info("UCP driver: manifest failed for %s", origin)
+        except Exception as e:
+            logger.debug("UCP manifest fetch %s failed: %s", origin, e)
+        self._stats["fetch_errors"] += 1
+        if previous is not None and previous.ok:
+            # Keep serving the last good manifest; retry after the negative window
+            entry = replace(previous, fetched_at=time.monotonic(), ttl=self._negative_ttl, must_revalidate=False)
+        else:
+            entry = ManifestEntry(origin=origin, ttl=self._negative_ttl, fetched_at=time.monotonic(), cached_at=now_iso)
+        self._put(entry)
+        return entry
+
+    def _notify(self, entry: ManifestEntry) -> None:
+        hook = self.on_store
+        if hook is None:
+            return
+
+        async def _run() -> None:
+            try:
+                await hook(entry)
+            except Exception as e:
+                logger.debug("UCP manifest cache on_store hook failed for %s: %s", entry.origin, e)
+
+        asyncio.create_task(_run())
+
+
+_cache: Optional[UCPManifestCache] = None
+
+
+def get_manifest_cache() -> UCPManifestCache:
+    """Process-wide manifest cache shared by every UCPManifestDriver."""
+    global _cache
+    if _cache is None:
+        _cache = UCPManifestCache()
+    return _cache
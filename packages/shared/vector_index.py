@@ -0,0 +1,189 @@
+"""
+In-memory vector index for semantic product search.
+
+Exact cosine search over a float32 NumPy matrix (rows L2-normalized at insert, so cosine is a dot product),
+with partner and experience-tag postings used as filters before scoring: every requested tag is ANDed,
+so there is no over-fetch + post-filter. Rows can be upserted and removed incrementally; removed rows
+leave free slots that later inserts reuse.
+
+NumPy is optional. VectorIndex.available() is False without it and callers keep using pgvector.
+"""
+
+import logging
+import threading
+from typing import Any, Dict, Iterable, List, Optional, Sequence, Set, Tuple
+
+try:
+    import numpy as np
+except ImportError:  # pragma: no cover - optional dependency
+    np = None  # type: ignore[assignment]
+
+logger = logging.getLogger(__name__)
+
+
+def _norm_tag(tag: Any) -> str:
+    return str(tag or "").strip().lower()
+
+
+class VectorIndex:
+    """
+    Product embeddings + payloads keyed by id. search() returns (payload, similarity) pairs, best first.
+    Thread-safe: writes and searches take a lock, so a background refresh thread can update the index.
+    """
+
+    def __init__(self, dimension: int = 1536, initial_capacity: int = 1024):
+        if np is None:
+            raise RuntimeError("numpy is required for VectorIndex")
+        self.dimension = int(dimension)
+        self._matrix = np.zeros((max(1, initial_capacity), self.dimension), dtype=np.float32)
+        self._alive = np.zeros(max(1, initial_capacity), dtype=bool)
+        self._ids: List[Optional[str]] = [None] * max(1, initial_capacity)
+        self._payloads: List[Optional[Dict[str, Any]]] = [None] * max(1, initial_capacity)
+        self._row_of: Dict[str, int] = {}
+        self._free: List[int] = []
+        self._size = 0  # rows ever allocated (high-water mark)
+        self._by_partner: Dict[str, Set[int]] = {}
+        self._by_tag: Dict[str, Set[int]] = {}
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def available() -> bool:
+        return np is not None
+
+    def __len__(self) -> int:
+        return len(self._row_of)
+
+    def __contains__(self, product_id: str) -> bool:
+        return str(product_id) in self._row_of
+
+    def _grow(self) -> None:
+        cap = self._matrix.shape[0] * 2
+        matrix = np.zeros((cap, self.dimension), dtype=np.float32)
+        matrix[: self._matrix.shape[0]] = self._matrix
+        alive = np.zeros(cap, dtype=bool)
+        alive[: self._alive.shape[0]] = self._alive
+        extra = cap - len(self._ids)
+        self._ids.extend([None] * extra)
+        self._payloads.extend([None] * extra)
+        self._matrix, self._alive = matrix, alive
+
+    def _unlink(self, row: int) -> None:
+        payload = self._payloads[row] or {}
+        pid = payload.get("partner_id")
+        if pid is not None:
+            self._by_partner.get(str(pid), set()).discard(row)
+        for tag in payload.get("experience_tags") or []:
+            self._by_tag.get(_norm_tag(tag), set()).discard(row)
+
+    def upsert(self, product_id: str, embedding: Sequence[float], payload: Dict[str, Any]) -> bool:
+        """Insert or replace one product. Returns False (and stores nothing) for a wrong-sized or zero vector."""
+        vec = np.asarray(embedding, dtype=np.float32)
+        if vec.shape != (self.dimension,):
+            return False
+        norm = float(np.linalg.norm(vec))
+        if norm == 0.0 or not np.isfinite(norm):
+            return False
+        key = str(product_id)
+        with self._lock:
+            row = self._row_of.get(key)
+            if row is not None:
+                self._unlink(row)
+            elif self._free:
+                row = self._free.pop()
+            else:
+                if self._size >= self._matrix.shape[0]:
+                    self._grow()
+                row = self._size
+                self._size += 1
+            self._matrix[row] = vec / norm
+            self._alive[row] = True
+            self._ids[row] = key
+            self._payloads[row] = dict(payload)
+            self._row_of[key] = row
+            pid = payload.get("partner_id")
+            if pid is not None:
+                self._by_partner.setdefault(str(pid), set()).add(row)
+            for tag in payload.get("experience_tags") or []:
+                if _norm_tag(tag):
+                    self._by_tag.setdefault(_norm_tag(tag), set()).add(row)
+        return True
+
+    def remove(self, product_id: str) -> bool:
+        key = str(product_id)
+        with self._lock:
+            row = self._row_of.pop(key, None)
+            if row is None:
+                return False
+            self._unlink(row)
+            self._alive[row] = False
+            self._ids[row] = None
+            self._payloads[row] = None
+            self._free.append(row)
+        return True
+
+    def remove_many(self, product_ids: Iterable[str]) -> int:
+        return sum(1 for pid in product_ids if self.remove(pid))
+
+    def search(
+        self,
+        query: Sequence[float],
+        k: int = 20,
+        threshold: float = 0.0,
+        partner_id: Optional[str] = None,
+        exclude_partner_id: Optional[str] = None,
+        experience_tags: Optional[List[str]] = None,
+    ) -> List[Tuple[Dict[str, Any], float]]:
+        """
+        Top-k by cosine similarity above threshold. partner_id / exclude_partner_id and every tag in
+        experience_tags (AND, case-insensitive) are applied before scoring.
+        """
+        q = np.asarray(query, dtype=np.float32)
+        if q.shape != (self.dimension,) or k <= 0:
+            return []
+        qn = float(np.linalg.norm(q))
+        if qn == 0.0:
+            return []
+        q = q / qn
+        with self._lock:
+            candidates: Optional[Set[int]] = None
+            if partner_id is not None:
+                candidates = set(self._by_partner.get(str(partner_id), set()))
+            for tag in sorted({_norm_tag(t) for t in experience_tags or [] if _norm_tag(t)}, key=lambda t: len(self._by_tag.get(t, ()))):
+                rows = self._by_tag.get(tag, set())
+                candidates = set(rows) if candidates is None else candidates & rows
+                if not candidates:
+                    return []
+            if candidates is None:
+                idx = np.flatnonzero(self._alive[: self._size])
+            else:
+                idx = np.fromiter(candidates, dtype=np.int64, count=len(candidates))
+            if exclude_partner_id is not None and idx.size:
+                excluded = self._by_partner.get(str(exclude_partner_id), set())
+                if excluded:
+                    idx = idx[~np.isin(idx, np.fromiter(excluded, dtype=np.int64, count=len(excluded)))]
+            if idx.size == 0:
+                return []
+            if candidates is None:
+                # Unfiltered: score the whole matrix in place instead of gathering a copy of every row
+                scores = (self._matrix[: self._size] @ q)[idx]
+            else:
+                scores = self._matrix[idx] @ q
+            keep = scores > threshold
+            idx, scores = idx[keep], scores[keep]
+            if idx.size == 0:
+                return []
+            if idx.size > k:
+                top = np.argpartition(-scores, k - 1)[:k]
+                idx, scores = idx[top], scores[top]
+            order = np.argsort(-scores, kind="stable")
+            return [(dict(self._payloads[int(idx[i])] or {}), float(scores[i])) for i in order]
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "products": len(self._row_of),
+            "capacity": int(self._matrix.shape[0]),
+            "dimension": self.dimension,
+            "partners": sum(1 for rows in self._by_partner.values() if rows),
+            "tags": sum(1 for rows in self._by_tag.values() if rows),
+            "memory_mb": round(self._matrix.nbytes / (1024 * 1024), 1),
+        }
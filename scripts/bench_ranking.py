@@ -0,0 +1,95 @@
+#!/usr/bin/env python3
+"""
+Microbenchmark: per-product ranking (compute_product_rank_score + full sort) vs sort_products_by_rank
+(compiled policy, batch scorer, optional top-k).
+
+    python scripts/bench_ranking.py                  # 20, 50, 200, 1000 products
+    python scripts/bench_ranking.py --sizes 50 --top-k 20 --repeat 2000
+"""
+
+import argparse
+import random
+import sys
+import timeit
+from pathlib import Path
+
+_root = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(_root))
+
+from packages.shared import ranking  # noqa: E402
+from packages.shared.config_snapshot import freeze  # noqa: E402
+
+CONFIG = freeze({
+    "ranking_enabled": True,
+    "ranking_policy": {"weights": {"price": 0.3, "rating": 0.3, "commission": 0.2, "trust": 0.2}, "price_direction": "asc"},
+    "ranking_edge_cases": {"missing_rating": 0.5, "missing_commission": 0, "missing_trust": 0.5},
+    "sponsorship_pricing": {"sponsorship_enabled": True, "max_sponsored_per_query": 3},
+})
+
+
+def _data(n: int):
+    rnd = random.Random(n)
+    partners = {f"p{i}": {"id": f"p{i}", "trust_score": rnd.randint(0, 100)} for i in range(20)}
+    ratings = {f"p{i}": round(rnd.uniform(1, 5), 2) for i in range(0, 20, 2)}
+    products = [
+        {
+            "id": f"prod{i}",
+            "partner_id": f"p{rnd.randrange(20)}",
+            "price": round(rnd.uniform(1, 300), 2),
+            "created_at": f"2026-0{rnd.randint(1, 9)}-{rnd.randint(10, 28)}",
+            "experience_tags": rnd.sample(["baby", "gift", "luxury", "travel-friendly", "celebration"], 2),
+        }
+        for i in range(n)
+    ]
+    sponsored = {f"prod{i}" for i in range(0, n, 15)}
+    return products, partners, ratings, sponsored
+
+
+def _legacy(products, partners, ratings, sponsored, tag):
+    scored = []
+    for p in products:
+        partner_id = str(p.get("partner_id", "")) if p.get("partner_id") else ""
+        score = ranking.compute_product_rank_score(p, partners.get(partner_id), ratings.get(partner_id), None, dict(CONFIG))
+        if str(p.get("id", "")) in sponsored:
+            score += 0.5
+        tags = p.get("experience_tags")
+        if isinstance(tags, list) and tag in {str(t).strip().lower() for t in tags if t}:
+            score += 0.2
+        scored.append((score, p))
+    scored.sort(key=lambda x: (-x[0], str(x[1].get("created_at", ""))))
+    return [p for _, p in scored]
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sizes", type=int, nargs="+", default=[20, 50, 200, 1000])
+    parser.add_argument("--top-k", type=int, default=20)
+    parser.add_argument("--repeat", type=int, default=500)
+    args = parser.parse_args()
+
+    print(f"numpy: {'yes' if ranking.np is not None else 'no'}  batch_min: {ranking.BATCH_MIN}  top_k: {args.top_k}")
+    print(f"{'n':>6} {'legacy us':>10} {'batch us':>10} {'top-k us':>10} {'speedup':>8}")
+    for n in args.sizes:
+        products, partners, ratings, sponsored = _data(n)
+        legacy = _legacy(products, partners, ratings, sponsored, "baby")
+        batch = ranking.sort_products_by_rank(products, partners, ratings, None, sponsored, CONFIG, "baby")
+        assert [p["id"] for p in batch] == [p["id"] for p in legacy], "batch ranking differs from legacy"
+
+        def run_legacy():
+            _legacy(products, partners, ratings, sponsored, "baby")
+
+        def run_batch():
+            ranking.sort_products_by_rank(products, partners, ratings, None, sponsored, CONFIG, "baby")
+
+        def run_top_k():
+            ranking.sort_products_by_rank(products, partners, ratings, None, sponsored, CONFIG, "baby", top_k=args.top_k)
+
+        t = {
+            name: min(timeit.repeat(fn, number=args.repeat, repeat=3)) / args.repeat * 1e6
+            for name, fn in (("legacy", run_legacy), ("batch", run_batch), ("top_k", run_top_k))
+        }
+        print(f"{n:>6} {t['legacy']:>10.1f} {t['batch']:>10.1f} {t['top_k']:>10.1f} {t['legacy'] / t['top_k']:>7.1f}x")
+
+
+if __name__ == "__main__":
+    main()
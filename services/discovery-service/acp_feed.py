@@ -0,0 +1,272 @@
+"""
+Streaming ACP feed for GET /api/v1/feeds/acp.
+
+Products are read in keyset pages with partner seller fields embedded (db.iter_products_for_acp_export), turned
+into compliant ACP rows and encoded incrementally (NDJSON / CSV, through one gzip stream for the .gz formats),
+so memory stays at about one page whatever the catalog size.
+
+Snapshots: the first request for a (partner_id, format) streams the feed to the client while writing it to
+ACP_FEED_SNAPSHOT_DIR; later requests are served from that file until the catalog marker (db.get_acp_feed_marker)
+changes. The ETag is derived from the marker, so If-None-Match is answered with a 304 without reading the feed.
+"""
+
+import asyncio
+import csv
+import hashlib
+import io
+import json
+import logging
+import os
+import re
+import tempfile
+import time
+import zlib
+from pathlib import Path
+from typing import Any, AsyncIterator, Dict, Optional, Tuple
+
+from fastapi.responses import FileResponse, Response, StreamingResponse
+
+from config import settings
+from db import get_acp_feed_marker, iter_products_for_acp_export
+from protocols.acp_compliance import filter_acp_compliant_products
+
+logger = logging.getLogger(__name__)
+
+# format -> (media type, attachment filename or None, gzip)
+FORMATS: Dict[str, Tuple[str, Optional[str], bool]] = {
+    "ndjson": ("application/x-ndjson", None, False),
+    "jsonl.gz": ("application/gzip", "acp_feed.jsonl.gz", True),
+    "csv": ("text/csv; charset=utf-8", None, False),
+    "csv.gz": ("application/gzip", "acp_feed.csv.gz", True),
+}
+CHUNK_BYTES = 64 * 1024
+GZIP_LEVEL = 6
+STALE_SNAPSHOT_SEC = 300  # superseded snapshot files are removed once this old (other workers may still serve them)
+BUILD_TIMEOUT_SEC = 600  # a build whose stream was never consumed stops blocking new builds after this
+
+_building: Dict[Tuple[str, str], float] = {}  # (partner_id, format) -> build start
+_stats: Dict[str, int] = {"snapshot_hits": 0, "snapshot_builds": 0, "not_modified": 0, "streamed": 0, "errors": 0}
+
+
+def product_to_acp_row(product: Dict[str, Any]) -> Dict[str, Any]:
+    """Build one ACP feed row from product (with partner seller fields already merged)."""
+    price = float(product.get("price", 0))
+    currency = product.get("currency", "USD") or "USD"
+    availability = product.get("availability")
+    if availability is None or availability == "":
+        is_avail = product.get("is_available", True)
+        availability = "in_stock" if is_avail else "out_of_stock"
+    target_countries = product.get("target_countries")
+    if target_countries is None:
+        target_countries = []
+    if isinstance(target_countries, str):
+        target_countries = [target_countries] if target_countries else []
+    row = {
+        "item_id": str(product.get("id", "")),
+        "title": (product.get("name") or "")[:150],
+        "description": (product.get("description") or "")[:5000],
+        "url": product.get("url") or "",
+        "image_url": product.get("image_url") or "",
+        "price": f"{price:.2f} {currency}",
+        "availability": availability,
+        "brand": (product.get("brand") or "")[:70],
+        "is_eligible_search": bool(product.get("is_eligible_search", True)),
+        "is_eligible_checkout": bool(product.get("is_eligible_checkout", False)),
+        "seller_name": (product.get("seller_name") or "")[:70],
+        "seller_url": product.get("seller_url") or "",
+        "return_policy": product.get("return_policy") or "",
+        "target_countries": target_countries,
+        "store_country": product.get("store_country") or "",
+    }
+    if row.get("is_eligible_checkout"):
+        row["seller_privacy_policy"] = product.get("seller_privacy_policy") or ""
+        row["seller_tos"] = product.get("seller_tos") or ""
+    return row
+
+
+def normalize_format(format: Optional[str]) -> str:
+    """Known feed format; anything else falls back to ndjson (as before)."""
+    fmt = (format or "ndjson").strip().lower()
+    return fmt if fmt in FORMATS else "ndjson"
+
+
+async def iter_acp_rows(partner_id: Optional[str] = None) -> AsyncIterator[Dict[str, Any]]:
+    """Compliant ACP rows, one page of products in memory at a time."""
+    page_size = max(50, getattr(settings, "acp_feed_page_size", 500))
+    async for products in iter_products_for_acp_export(partner_id=partner_id, page_size=page_size):
+        rows = [product_to_acp_row(p) for p in products]
+        # Checkout fields are only checked on checkout-eligible rows, so requiring them per row matches the
+        # previous whole-feed any(is_eligible_checkout) switch without seeing the whole feed first.
+        compliant, _ = filter_acp_compliant_products(rows, require_checkout_fields=True, strict=True)
+        for row in compliant:
+            yield row
+
+
+class _CsvEncoder:
+    """CSV text per row; header from the first row's keys (list fields JSON-encoded in one cell)."""
+
+    def __init__(self) -> None:
+        self._out = io.StringIO()
+        self._writer: Optional[csv.DictWriter] = None
+
+    def encode(self, row: Dict[str, Any]) -> str:
+        if self._writer is None:
+            self._writer = csv.DictWriter(self._out, fieldnames=list(row.keys()), extrasaction="ignore")
+            self._writer.writeheader()
+        self._writer.writerow({k: json.dumps(v) if isinstance(v, list) else v for k, v in row.items()})
+        text = self._out.getvalue()
+        self._out.seek(0)
+        self._out.truncate(0)
+        return text
+
+
+async def stream_feed(partner_id: Optional[str], fmt: str) -> AsyncIterator[bytes]:
+    """Encoded feed body in ~CHUNK_BYTES chunks (gzip-compressed incrementally for the .gz formats)."""
+    _, _, gzipped = FORMATS[fmt]
+    compressor = zlib.compressobj(GZIP_LEVEL, zlib.DEFLATED, 31) if gzipped else None  # wbits 31 = gzip container
+    csv_encoder = _CsvEncoder() if fmt.startswith("csv") else None
+    buf = io.StringIO()
+    first = True
+
+    def drain() -> bytes:
+        data = buf.getvalue().encode("utf-8")
+        buf.seek(0)
+        buf.truncate(0)
+        return compressor.compress(data) if compressor else data
+
+    async for row in iter_acp_rows(partner_id):
+        if csv_encoder:
+            buf.write(csv_encoder.encode(row))
+        else:
+            buf.write(("" if first else "\n") + json.dumps(row))
+        first = False
+        if buf.tell() >= CHUNK_BYTES:
+            chunk = drain()
+            if chunk:
+                yield chunk
+    tail = drain()
+    if compressor:
+        tail += compressor.flush()
+    if tail:
+        yield tail
+
+
+def _snapshot_dir() -> Path:
+    return Path(getattr(settings, "acp_feed_snapshot_dir", "") or os.path.join(tempfile.gettempdir(), "acp_feed_snapshots"))
+
+
+def _snapshot_prefix(partner_id: Optional[str], fmt: str) -> str:
+    partner = re.sub(r"[^A-Za-z0-9-]", "", partner_id or "")[:64] or "all"
+    return f"acp_{partner}_{fmt.replace('.', '-')}_"
+
+
+def feed_etag(partner_id: Optional[str], fmt: str, marker: str) -> str:
+    digest = hashlib.sha256(f"{partner_id or ''}|{fmt}|{marker}".encode("utf-8")).hexdigest()[:32]
+    return f'"{digest}"'
+
+
+def _remove_stale_snapshots(prefix: str, keep: Path) -> None:
+    cutoff = time.time() - STALE_SNAPSHOT_SEC
+    for path in keep.parent.glob(f"{prefix}*"):
+        try:
+            if path != keep and path.stat().st_mtime < cutoff:
+                path.unlink()
+        except OSError:
+            pass
+
+
+async def _stream_and_snapshot(partner_id: Optional[str], fmt: str, path: Path) -> AsyncIterator[bytes]:
+    """Stream the feed while writing it to path; the file only appears (atomic rename) once complete."""
+    key = (partner_id or "", fmt)
+    tmp = path.with_name(f"{path.name}.{os.getpid()}.tmp")
+    complete = False
+    try:
+        path.parent.mkdir(parents=True, exist_ok=True)
+        with open(tmp, "wb") as f:
+            async for chunk in stream_feed(partner_id, fmt):
+                await asyncio.to_thread(f.write, chunk)
+                yield chunk
+        complete = True
+        os.replace(tmp, path)
+        _stats["snapshot_builds"] += 1
+        _remove_stale_snapshots(_snapshot_prefix(partner_id, fmt), path)
+    except Exception as e:
+        _stats["errors"] += 1
+        logger.warning("ACP feed build failed (partner_id=%s, format=%s): %s", partner_id, fmt, e)
+        raise
+    finally:
+        _building.pop(key, None)
+        if not complete:
+            try:
+                tmp.unlink()
+            except OSError:
+                pass
+
+
+async def _stream_only(partner_id: Optional[str], fmt: str) -> AsyncIterator[bytes]:
+    try:
+        async for chunk in stream_feed(partner_id, fmt):
+            yield chunk
+    except Exception as e:
+        _stats["errors"] += 1
+        logger.warning("ACP feed stream failed (partner_id=%s, format=%s): %s", partner_id, fmt, e)
+        raise
+
+
+def _etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    if not if_none_match:
+        return False
+    tags = {t.strip().removeprefix("W/") for t in if_none_match.split(",")}
+    return "*" in tags or etag in tags
+
+
+async def acp_feed_response(
+    partner_id: Optional[str] = None,
+    format: Optional[str] = None,
+    if_none_match: Optional[str] = None,
+) -> Response:
+    """
+    Feed response: 304 when If-None-Match matches the current marker, the snapshot file when it is current,
+    otherwise the streamed feed (also written as the new snapshot unless a build for it is already running).
+    """
+    fmt = normalize_format(format)
+    media_type, filename, _ = FORMATS[fmt]
+    headers = {"Content-Disposition": f"attachment; filename={filename}"} if filename else {}
+
+    marker = await get_acp_feed_marker(partner_id) if getattr(settings, "acp_feed_snapshot_enabled", True) else None
+    if marker is None:
+        _stats["streamed"] += 1
+        return StreamingResponse(_stream_only(partner_id, fmt), media_type=media_type, headers=headers)
+
+    etag = feed_etag(partner_id, fmt, marker)
+    headers.update({"ETag": etag, "Cache-Control": "no-cache"})
+    if _etag_matches(if_none_match, etag):
+        _stats["not_modified"] += 1
+        return Response(status_code=304, headers={"ETag": etag, "Cache-Control": "no-cache"})
+
+    prefix = _snapshot_prefix(partner_id, fmt)
+    path = _snapshot_dir() / f"{prefix}{etag.strip(chr(34))}{'.gz' if filename else ''}"
+    if path.is_file():
+        _stats["snapshot_hits"] += 1
+        return FileResponse(path, media_type=media_type, headers=headers)
+
+    key = (partner_id or "", fmt)
+    if time.monotonic() - _building.get(key, float("-inf")) < BUILD_TIMEOUT_SEC:
+        _stats["streamed"] += 1
+        return StreamingResponse(_stream_only(partner_id, fmt), media_type=media_type, headers=headers)
+    _building[key] = time.monotonic()
+    return StreamingResponse(_stream_and_snapshot(partner_id, fmt, path), media_type=media_type, headers=headers)
+
+
+def acp_feed_stats() -> Dict[str, Any]:
+    """Counters for the admin diagnostics endpoint."""
+    snapshot_dir = _snapshot_dir()
+    files = list(snapshot_dir.glob("acp_*")) if snapshot_dir.is_dir() else []
+    return {
+        **_stats,
+        "snapshot_enabled": getattr(settings, "acp_feed_snapshot_enabled", True),
+        "snapshot_dir": str(snapshot_dir),
+        "snapshot_files": len(files),
+        "snapshot_bytes": sum(f.stat().st_size for f in files if f.is_file()),
+        "building": len(_building),
+    }
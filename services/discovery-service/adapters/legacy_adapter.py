@@ -11,7 +11,7 @@ import csv
 import io
 import json
 import re
-from typing import Any, Dict, List, Optional, Union
+from typing import Any, BinaryIO, Dict, Iterable, Iterator, List, Optional, TextIO, Union
 
 # Default column mapping: legacy header -> canonical field
 # Supports common exports: Shopify, WooCommerce, generic CSV
@@ -145,30 +145,203 @@ def normalize_legacy_product(
     }
 
 
-def parse_csv_to_products(
-    content: Union[str, bytes],
-    column_map: Optional[Dict[str, str]] = None,
-) -> List[Dict[str, Any]]:
+_JSON_WRAPPER_KEYS = ("products", "items", "data")
+_JSON_READ_SIZE = 64 * 1024
+_json_decoder = json.JSONDecoder()
+
+
+class _JsonStream:
+    """Incremental JSON reader over a text stream: decodes one value at a time with a small buffer."""
+
+    def __init__(self, stream: TextIO) -> None:
+        self._f = stream
+        self._buf = ""
+        self._pos = 0
+        self._eof = False
+
+    def _fill(self) -> bool:
+        if self._eof:
+            return False
+        data = self._f.read(_JSON_READ_SIZE)
+        if not data:
+            self._eof = True
+            return False
+        self._buf = self._buf[self._pos :] + data
+        self._pos = 0
+        return True
+
+    def peek(self) -> str:
+        """Next non-whitespace character without consuming it ("" at end of input)."""
+        while True:
+            while self._pos < len(self._buf) and self._buf[self._pos] in " \t\r\n":
+                self._pos += 1
+            if self._pos < len(self._buf):
+                return self._buf[self._pos]
+            if not self._fill():
+                return ""
+
+    def expect(self, ch: str) -> None:
+        if self.peek() != ch:
+            raise ValueError(f"Invalid JSON: expected {ch!r}")
+        self._pos += 1
+
+    def value(self) -> Any:
+        self.peek()
+        while True:
+            try:
+                obj, end = _json_decoder.raw_decode(self._buf, self._pos)
+            except json.JSONDecodeError:
+                if self._fill():
+                    continue
+                raise
+            # A number at the end of the buffer may be cut short ("12" of "125", "12" of "12.5"); read on to be sure
+            cut = end == len(self._buf) or (isinstance(obj, (int, float)) and self._buf[end] in ".eE")
+            if cut and self._fill():
+                continue
+            self._pos = end
+            return obj
+
+    def array(self) -> Iterator[Any]:
+        self.expect("[")
+        if self.peek() == "]":
+            self._pos += 1
+            return
+        while True:
+            yield self.value()
+            c = self.peek()
+            self._pos += 1
+            if c == "]":
+                return
+            if c != ",":
+                raise ValueError("Invalid JSON: expected ',' or ']'")
+
+    def object_items(self) -> Iterator[Dict[str, Any]]:
+        """
+        Items of a top-level object: the first non-empty products / items / data array is streamed element by
+        element; an object without one is a single item (as parse_json_to_products).
+        """
+        self.expect("{")
+        obj: Dict[str, Any] = {}
+        while self.peek() != "}":
+            key = self.value()
+            self.expect(":")
+            if key in _JSON_WRAPPER_KEYS and self.peek() == "[":
+                streamed = False
+                for item in self.array():
+                    streamed = True
+                    yield item
+                if streamed:
+                    return
+                obj[key] = []
+            else:
+                obj[key] = self.value()
+            if self.peek() == ",":
+                self._pos += 1
+        self._pos += 1
+        yield obj
+
+
+def iter_csv_rows(stream: BinaryIO) -> Iterator[Dict[str, Any]]:
+    """Rows of a CSV file (first row = headers), read incrementally; fully empty rows are skipped."""
+    text = io.TextIOWrapper(stream, encoding="utf-8", errors="replace", newline="")
+    for row in csv.DictReader(text):
+        if any(row.values()):
+            yield dict(row)
+
+
+def iter_json_rows(stream: BinaryIO) -> Iterator[Dict[str, Any]]:
     """
-    Parse CSV content into normalized product list.
-    Uses first row as headers.
+    Objects of a JSON feed, decoded one at a time: an array of objects, an object with a "products" / "items" /
+    "data" array, a single object, or JSON Lines (one object per line).
     """
-    if isinstance(content, bytes):
-        text = content.decode("utf-8", errors="replace")
+    reader = _JsonStream(io.TextIOWrapper(stream, encoding="utf-8", errors="replace"))
+    c = reader.peek()
+    if c == "[":
+        items: Iterator[Any] = reader.array()
+    elif c == "{":
+
+        def objects() -> Iterator[Any]:
+            yield from reader.object_items()
+            while reader.peek() == "{":
+                yield reader.value()
+
+        items = objects()
+    elif c == "":
+        return
     else:
-        text = content
+        raise ValueError("Invalid JSON feed: expected an array or object")
+    for item in items:
+        if isinstance(item, dict):
+            yield item
+
+
+def iter_excel_rows(stream: BinaryIO, sheet_index: int = 0) -> Iterator[Dict[str, Any]]:
+    """Rows of an Excel (.xlsx) sheet (first row = headers), read with openpyxl in read-only mode."""
+    try:
+        import openpyxl
+    except ImportError:
+        raise ImportError("openpyxl is required for Excel support. Install with: pip install openpyxl")
+
+    wb = openpyxl.load_workbook(stream, read_only=True)
+    try:
+        rows = wb.worksheets[sheet_index].iter_rows(values_only=True)
+        first = next(rows, None)
+        if first is None:
+            return
+        headers = [str(h or "").strip() for h in first]
+        for row in rows:
+            row_dict = dict(zip(headers, (v if v is not None else "" for v in row)))
+            if any(row_dict.values()):
+                yield row_dict
+    finally:
+        wb.close()
+
 
-    reader = csv.DictReader(io.StringIO(text))
+def detect_legacy_format(filename: str, head: bytes) -> str:
+    """csv | xlsx | json from the file extension, else sniffed from the first bytes (JSON first, then CSV)."""
+    name = (filename or "").lower()
+    if name.endswith(".csv"):
+        return "csv"
+    if name.endswith(".xlsx") or name.endswith(".xls"):
+        return "xlsx"
+    if name.endswith(".json") or name.endswith(".jsonl") or name.endswith(".ndjson"):
+        return "json"
+    if head.startswith(b"PK\x03\x04"):
+        return "xlsx"
+    return "json" if head.lstrip(b"\xef\xbb\xbf \t\r\n")[:1] in (b"[", b"{") else "csv"
+
+
+def iter_legacy_rows(stream: BinaryIO, fmt: str) -> Iterator[Dict[str, Any]]:
+    """Raw rows of a legacy feed in format fmt (csv | xlsx | json); normalize each with normalize_legacy_product."""
+    if fmt == "xlsx":
+        return iter_excel_rows(stream)
+    if fmt == "json":
+        return iter_json_rows(stream)
+    return iter_csv_rows(stream)
+
+
+def _normalized(rows: Iterable[Dict[str, Any]], column_map: Optional[Dict[str, str]]) -> List[Dict[str, Any]]:
     products: List[Dict[str, Any]] = []
-    for row in reader:
-        if not any(row.values()):
-            continue
-        p = normalize_legacy_product(dict(row), column_map)
+    for row in rows:
+        p = normalize_legacy_product(row, column_map)
         if p.get("name"):
             products.append(p)
     return products
 
 
+def parse_csv_to_products(
+    content: Union[str, bytes],
+    column_map: Optional[Dict[str, str]] = None,
+) -> List[Dict[str, Any]]:
+    """
+    Parse CSV content into normalized product list.
+    Uses first row as headers.
+    """
+    if isinstance(content, str):
+        content = content.encode("utf-8")
+    return _normalized(iter_csv_rows(io.BytesIO(content)), column_map)
+
+
 def parse_json_to_products(
     content: Union[str, bytes, Dict, List],
     column_map: Optional[Dict[str, str]] = None,
@@ -190,14 +363,7 @@ def parse_json_to_products(
     elif isinstance(data, dict):
         items = data.get("products") or data.get("items") or data.get("data") or [data]
 
-    products: List[Dict[str, Any]] = []
-    for item in items:
-        if not isinstance(item, dict):
-            continue
-        p = normalize_legacy_product(item, column_map)
-        if p.get("name"):
-            products.append(p)
-    return products
+    return _normalized((item for item in items if isinstance(item, dict)), column_map)
 
 
 def parse_excel_to_products(
@@ -209,26 +375,4 @@ def parse_excel_to_products(
     Parse Excel (.xlsx) content into normalized product list.
     Uses first sheet, first row as headers.
     """
-    try:
-        import openpyxl
-    except ImportError:
-        raise ImportError("openpyxl is required for Excel support. Install with: pip install openpyxl")
-
-    wb = openpyxl.load_workbook(io.BytesIO(content), read_only=True)
-    sheet = wb.worksheets[sheet_index]
-    rows = list(sheet.iter_rows(values_only=True))
-    wb.close()
-
-    if not rows:
-        return []
-
-    headers = [str(h or "").strip() for h in rows[0]]
-    products: List[Dict[str, Any]] = []
-    for row in rows[1:]:
-        row_dict = dict(zip(headers, (v if v is not None else "" for v in row)))
-        if not any(row_dict.values()):
-            continue
-        p = normalize_legacy_product(row_dict, column_map)
-        if p.get("name"):
-            products.append(p)
-    return products
+    return _normalized(iter_excel_rows(io.BytesIO(content), sheet_index), column_map)
@@ -1,25 +1,43 @@
 """Admin endpoints for Module 1: manifest ingest, embedding backfill; Module 2: Legacy Adapter."""
 
+import os
 from typing import Any, Dict, List, Optional
 
 from fastapi import APIRouter, File, HTTPException, Query, UploadFile
 from pydantic import BaseModel
 
 from config import settings
-from db import get_supabase, upsert_products_from_legacy  # type: ignore[reportAttributeAccessIssue]
+from db import get_supabase  # type: ignore[reportAttributeAccessIssue]
+from embedding_cache import clear_embedding_cache, embedding_cache_stats
 from manifest_cache import cache_partner_manifest
+from result_cache import invalidate_result_cache, result_cache_stats
 from semantic_search import (
     backfill_product_embedding,
-    backfill_all_product_embeddings,
     backfill_kb_article_embedding,
-    backfill_all_kb_article_embeddings,
+    embedding_model_version,
+)
+from embedding_backfill import (
+    DEFAULT_BATCH_SIZE,
+    DEFAULT_CONCURRENCY,
+    cancel_job,
+    create_job,
+    get_job,
+    list_jobs,
+    run_backfill,
+    start_backfill_job,
 )
 
-from adapters.legacy_adapter import (
-    parse_csv_to_products,
-    parse_excel_to_products,
-    parse_json_to_products,
-    DEFAULT_COLUMN_MAP,
+from adapters.legacy_adapter import DEFAULT_COLUMN_MAP, detect_legacy_format
+from legacy_ingest import (
+    DEFAULT_CHUNK_SIZE as LEGACY_INGEST_CHUNK_SIZE,
+    cancel_job as cancel_ingest_job,
+    create_job as create_ingest_job,
+    get_job as get_ingest_job,
+    list_jobs as list_ingest_jobs,
+    resume_job as resume_ingest_job,
+    run_ingest,
+    spool_upload,
+    start_ingest_job,
 )
 
 router = APIRouter(prefix="/api/v1/admin", tags=["Admin"])
@@ -127,12 +145,15 @@ async def ingest_manifest(body: ManifestIngestBody):
 async def get_embeddings_status() -> Dict[str, Any]:
     """
     Return embedding status for products and KB articles: counts with/without embedding,
-    and whether the embedding API is configured. Used by admin UI to show status and trigger backfill.
+    whether the embedding provider is configured, the current model-version tag, rows embedded by another
+    model version (stale; re-embed with backfill reembed=true), and query-embedding cache counters.
+    Used by admin UI to show status and trigger backfill.
     """
     embedding_configured = getattr(settings, "embedding_configured", False)
     client = get_supabase()
-    products_total = products_with = products_without = 0
-    kb_total = kb_with = kb_without = 0
+    model = embedding_model_version()
+    products_total = products_with = products_without = products_stale = 0
+    kb_total = kb_with = kb_without = kb_stale = 0
     if client:
         try:
             r = client.table("products").select("id").is_("deleted_at", "null").limit(10000).execute()
@@ -140,6 +161,9 @@ async def get_embeddings_status() -> Dict[str, Any]:
             products_total = len(r.data or [])
             products_with = len(r_yes.data or [])
             products_without = max(0, products_total - products_with)
+            if model:
+                r_cur = client.table("products").select("id").is_("deleted_at", "null").eq("embedding_model", model).limit(10000).execute()
+                products_stale = max(0, products_with - len(r_cur.data or []))
         except Exception:
             pass
         try:
@@ -148,40 +172,82 @@ async def get_embeddings_status() -> Dict[str, Any]:
             kb_total = len(r.data or [])
             kb_with = len(r_yes.data or [])
             kb_without = max(0, kb_total - kb_with)
+            if model:
+                r_cur = client.table("partner_kb_articles").select("id").eq("is_active", True).eq("embedding_model", model).limit(10000).execute()
+                kb_stale = max(0, kb_with - len(r_cur.data or []))
         except Exception:
             pass
     return {
         "embedding_configured": embedding_configured,
-        "products": {"total": products_total, "with_embedding": products_with, "without_embedding": products_without},
-        "kb_articles": {"total": kb_total, "with_embedding": kb_with, "without_embedding": kb_without},
+        "embedding_model": model,
+        "products": {"total": products_total, "with_embedding": products_with, "without_embedding": products_without, "stale_model": products_stale},
+        "kb_articles": {"total": kb_total, "with_embedding": kb_with, "without_embedding": kb_without, "stale_model": kb_stale},
+        "query_cache": embedding_cache_stats(),
     }
 
 
+@router.delete("/embeddings/query-cache")
+async def clear_query_embedding_cache():
+    """Drop cached query embeddings in this process (e.g. after changing EMBEDDING_MODEL)."""
+    return {"invalidated": clear_embedding_cache()}
+
+
 @router.post("/embeddings/backfill")
 async def backfill_embeddings(
     product_id: Optional[str] = Query(None, description="Single product ID (products only)"),
     article_id: Optional[str] = Query(None, description="Single KB article ID (kb_articles only)"),
-    limit: int = Query(500, ge=1, le=2000, description="Max records to backfill when no single id given"),
+    limit: int = Query(500, ge=1, le=100000, description="Max records to backfill when no single id given"),
     type: str = Query("products", description="Backfill target: 'products' or 'kb_articles'"),
+    batch_size: int = Query(DEFAULT_BATCH_SIZE, ge=1, le=500, description="Texts per embeddings API request"),
+    concurrency: int = Query(DEFAULT_CONCURRENCY, ge=1, le=16, description="Embeddings API requests in flight"),
+    after_id: Optional[str] = Query(None, description="Resume after this id (checkpoint from a previous run)"),
+    background: bool = Query(False, description="Start as a background job and return immediately; poll /embeddings/backfill/jobs/{job_id}"),
+    reembed: bool = Query(False, description="Also re-embed rows whose embedding_model differs from the current provider/model"),
 ):
     """
     Backfill embeddings for products or partner KB articles.
     - type=products (default): product_id for one product, else all products missing embeddings (up to limit).
     - type=kb_articles: article_id for one article, else all KB articles missing embeddings (up to limit).
-    Requires embedding provider (OpenAI or Azure) to be configured (EMBEDDING_* / OPENAI_API_KEY).
+    Bulk runs page by id, send batch_size texts per embeddings request (concurrency in flight) and write each
+    batch in one RPC. The response (or job) carries a checkpoint; pass it as after_id to resume.
+    reembed=true also picks up rows embedded by another model version (after switching EMBEDDING_PROVIDER / EMBEDDING_MODEL).
+    Requires an embedding provider: OpenAI or Azure credentials, or EMBEDDING_PROVIDER=local | hash.
     """
-    if type == "kb_articles":
-        if article_id:
-            ok = await backfill_kb_article_embedding(article_id)
-            return {"article_id": article_id, "updated": ok}
-        result = await backfill_all_kb_article_embeddings(limit=limit)
-        return result
-    # default: products
-    if product_id:
+    if type == "kb_articles" and article_id:
+        ok = await backfill_kb_article_embedding(article_id)
+        return {"article_id": article_id, "updated": ok}
+    if type != "kb_articles" and product_id:
         ok = await backfill_product_embedding(product_id)
         return {"product_id": product_id, "updated": ok}
-    result = await backfill_all_product_embeddings(limit=limit)
-    return result
+    target = "kb_articles" if type == "kb_articles" else "products"
+    job = create_job(target, limit=limit, batch_size=batch_size, concurrency=concurrency, after_id=after_id, reembed=reembed)
+    if background:
+        return start_backfill_job(job).to_dict()
+    return (await run_backfill(job)).to_dict()
+
+
+@router.get("/embeddings/backfill/jobs")
+async def list_embedding_backfill_jobs():
+    """Recent embedding backfill jobs in this process (newest first) with progress and checkpoints."""
+    return {"jobs": [j.to_dict() for j in list_jobs()]}
+
+
+@router.get("/embeddings/backfill/jobs/{job_id}")
+async def get_embedding_backfill_job(job_id: str):
+    """Progress of one embedding backfill job."""
+    job = get_job(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail="Backfill job not found")
+    return job.to_dict()
+
+
+@router.delete("/embeddings/backfill/jobs/{job_id}")
+async def cancel_embedding_backfill_job(job_id: str):
+    """Stop a running backfill after its current page; resume later with after_id=checkpoint."""
+    job = cancel_job(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail="Backfill job not found")
+    return job.to_dict()
 
 
 # --- Module 2: Legacy Adapter Layer ---
@@ -199,19 +265,20 @@ async def legacy_ingest(
     replace_legacy: bool = Query(False, description="Replace existing legacy products before insert"),
     column_map: Optional[str] = Query(None, description="JSON object of column mapping overrides"),
     file: UploadFile = File(..., description="CSV, Excel (.xlsx), or JSON file"),
+    background: bool = Query(False, description="Start as a background job and return immediately; poll /legacy/ingest/jobs/{job_id}"),
+    chunk_size: int = Query(LEGACY_INGEST_CHUNK_SIZE, ge=1, le=5000, description="Products per insert request"),
+    embed: bool = Query(False, description="Embed each inserted chunk for semantic search right away"),
 ):
     """
     Legacy Adapter: Ingest CSV, Excel, or JSON feed into products table.
 
     Maps legacy columns to canonical schema (name, description, price, image_url, etc.).
     Normalized products are indexed for Scout Engine discovery.
+    The file is read row by row and inserted chunk_size products at a time; a failed or cancelled
+    job resumes after its checkpoint (POST /legacy/ingest/jobs/{job_id}/resume).
 
-    Supports: Shopify export, WooCommerce CSV, generic CSV/Excel/JSON.
+    Supports: Shopify export, WooCommerce CSV, generic CSV/Excel/JSON (array, {"products": [...]}, JSON Lines).
     """
-    content = await file.read()
-    if not content:
-        raise HTTPException(status_code=400, detail="Empty file")
-
     cm: Optional[Dict[str, str]] = None
     if column_map:
         try:
@@ -221,51 +288,79 @@ async def legacy_ingest(
         except Exception:
             raise HTTPException(status_code=400, detail="Invalid column_map JSON")
 
-    filename = (file.filename or "").lower()
-    products: List[Dict[str, Any]] = []
-
-    if filename.endswith(".csv"):
-        products = parse_csv_to_products(content, cm)
-    elif filename.endswith(".xlsx") or filename.endswith(".xls"):
+    path, size, head = await spool_upload(file)
+    if not size:
+        os.unlink(path)
+        raise HTTPException(status_code=400, detail="Empty file")
+    if detect_legacy_format(file.filename or "", head) == "xlsx":
         try:
-            products = parse_excel_to_products(content, cm)
+            import openpyxl  # noqa: F401
         except ImportError:
+            os.unlink(path)
             raise HTTPException(
                 status_code=503,
                 detail="Excel support requires openpyxl. Add to requirements.txt: openpyxl>=3.0.0",
             )
-    elif filename.endswith(".json"):
-        products = parse_json_to_products(content, cm)
-    else:
-        # Try JSON first, then CSV
-        try:
-            products = parse_json_to_products(content, cm)
-        except Exception:
-            products = parse_csv_to_products(content, cm)
+    job = create_ingest_job(
+        partner_id, path, file.filename or "", size, head,
+        chunk_size=chunk_size, replace_legacy=replace_legacy, embed=embed, column_map=cm,
+    )
+    if background:
+        return start_ingest_job(job).to_dict()
 
-    if not products:
+    job = await run_ingest(job)
+    if job.status == "completed" and not job.inserted:
         return {
             "products_count": 0,
             "inserted": 0,
             "message": "No valid products found in file",
             "column_map": cm or DEFAULT_COLUMN_MAP,
         }
-
-    result = await upsert_products_from_legacy(
-        partner_id=partner_id,
-        products=products,
-        replace_legacy=replace_legacy,
-    )
-
     return {
-        "products_count": len(products),
-        "inserted": result.get("inserted", 0),
-        "updated": result.get("updated", 0),
-        "error": result.get("error"),
-        "preview": products[:3] if products else [],
+        "products_count": job.inserted,
+        "inserted": job.inserted,
+        "updated": 0,
+        "error": job.error,
+        "preview": job.preview,
+        "job": job.to_dict(),
     }
 
 
+@router.get("/legacy/ingest/jobs")
+async def list_legacy_ingest_jobs():
+    """Recent legacy ingest jobs in this process (newest first) with progress and checkpoints."""
+    return {"jobs": [j.to_dict() for j in list_ingest_jobs()]}
+
+
+@router.get("/legacy/ingest/jobs/{job_id}")
+async def get_legacy_ingest_job(job_id: str):
+    """Progress of one legacy ingest job."""
+    job = get_ingest_job(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail="Ingest job not found")
+    return job.to_dict()
+
+
+@router.delete("/legacy/ingest/jobs/{job_id}")
+async def cancel_legacy_ingest_job(job_id: str):
+    """Stop a running ingest after its current chunk; resume later from the checkpoint."""
+    job = cancel_ingest_job(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail="Ingest job not found")
+    return job.to_dict()
+
+
+@router.post("/legacy/ingest/jobs/{job_id}/resume")
+async def resume_legacy_ingest_job(job_id: str):
+    """Continue a failed or cancelled ingest in the background after its checkpoint (no rows inserted twice)."""
+    job = resume_ingest_job(job_id)
+    if job is None:
+        if get_ingest_job(job_id) is None:
+            raise HTTPException(status_code=404, detail="Ingest job not found")
+        raise HTTPException(status_code=409, detail="Job is not resumable (running, completed, or file removed)")
+    return job.to_dict()
+
+
 @router.get("/legacy/column-map")
 async def legacy_column_map():
     """Return default column mapping for legacy formats."""
@@ -330,9 +425,21 @@ async def onboard_ucp_partner_endpoint(body: UCPPartnerOnboardBody):
     )
     if result.get("error"):
         raise HTTPException(status_code=500, detail=result["error"])
+    _invalidate_ucp_manifest(base_url)
     return result
 
 
+def _invalidate_ucp_manifest(base_url: str) -> None:
+    """Drop the in-process manifest for base_url's origin (and cached results) so partner changes apply on the next search."""
+    from packages.shared.discovery_aggregator import UCPManifestDriver
+    from packages.shared.ucp_manifest_cache import get_manifest_cache
+
+    origin = UCPManifestDriver._origin(base_url or "")
+    if origin:
+        get_manifest_cache().invalidate(origin)
+    invalidate_result_cache("ucp partner changed")
+
+
 @router.get("/ucp-partners")
 async def list_ucp_partners():
     """List UCP-only partners from internal_agent_registry (transport_type=UCP)."""
@@ -380,6 +487,130 @@ async def ucp_partners_status():
     return {"ucp_partner_count": len(urls), "ucp_origins_masked": masked}
 
 
+@router.get("/ucp-partners/manifest-cache")
+async def ucp_manifest_cache_stats():
+    """Diagnostic: in-process UCP manifest cache counters (hits, stale hits, misses, revalidations)."""
+    from packages.shared.ucp_manifest_cache import get_manifest_cache
+
+    return get_manifest_cache().stats()
+
+
+@router.delete("/ucp-partners/manifest-cache")
+async def clear_ucp_manifest_cache(
+    origin: Optional[str] = Query(None, description="Partner origin (e.g. https://shop.example.com); omit to clear all"),
+):
+    """Drop cached UCP manifests so the next search re-fetches them."""
+    from packages.shared.ucp_manifest_cache import get_manifest_cache
+
+    return {"invalidated": get_manifest_cache().invalidate(origin)}
+
+
+@router.get("/vector-index")
+async def vector_index_stats():
+    """Diagnostic: local vector index replica (ready, products, last sync, memory)."""
+    from local_vector_index import local_vector_index_stats
+
+    return local_vector_index_stats()
+
+
+@router.post("/vector-index/refresh")
+async def refresh_vector_index():
+    """Apply product changes to the local vector index now instead of waiting for the refresh interval."""
+    from local_vector_index import local_vector_index_stats, refresh_local_vector_index
+
+    changed = await refresh_local_vector_index()
+    return {"changed": changed, **local_vector_index_stats()}
+
+
+@router.get("/http-pools")
+async def http_pool_stats():
+    """Diagnostic: shared outbound HTTP pools per host (requests, 5xx, open/idle connections)."""
+    from packages.shared.http_clients import http_client_stats
+
+    return http_client_stats()
+
+
+@router.get("/llm-clients")
+async def llm_client_pool_stats():
+    """Diagnostic: shared LLM SDK clients per provider config (uses, builds, open/idle connections)."""
+    from packages.shared.llm_clients import llm_client_stats
+
+    return llm_client_stats()
+
+
+@router.get("/llm-gateway")
+async def llm_gateway_pool_stats():
+    """Diagnostic: async LLM gateway (per-provider limits, in-flight / waiting calls, timeouts, thread fallbacks)."""
+    from packages.shared.llm_provider import llm_gateway_stats
+
+    return llm_gateway_stats()
+
+
+@router.get("/config-snapshot")
+async def config_snapshot_stats():
+    """Diagnostic: discovery config snapshot (version, updated_at marker, loads, last error)."""
+    from config_snapshot import get_config_store
+
+    return get_config_store().stats()
+
+
+@router.post("/config-snapshot/refresh")
+async def refresh_config_snapshot():
+    """Reload platform_config / admin settings now instead of waiting for the next check."""
+    from config_snapshot import get_config_store
+
+    changed = await get_config_store().refresh(force=True)
+    return {"changed": changed, **get_config_store().stats()}
+
+
+@router.get("/discovery-stages")
+async def discovery_stage_timings(reset: bool = Query(False, description="Clear counters after reading")):
+    """Diagnostic: per-stage discovery latency (aggregator, semantic, enrichment, ranking lookups) since start or last reset."""
+    from packages.shared.monitoring.stage_timings import stage_stats
+
+    out = stage_stats.snapshot()
+    if reset:
+        stage_stats.reset()
+    return out
+
+
+@router.get("/enrichment-cache")
+async def enrichment_cache_stats():
+    """Diagnostic: experience-tag cache (hits, misses, LLM calls, tags written back, queued background work)."""
+    from middleware.metadata_enricher import enrichment_stats
+
+    return enrichment_stats()
+
+
+@router.get("/ranking-context")
+async def ranking_context_stats():
+    """Diagnostic: in-memory ranking context (hits, misses, partners, sponsorship windows, age of last sync)."""
+    from ranking_context import get_ranking_context_store
+
+    return get_ranking_context_store().stats()
+
+
+@router.post("/ranking-context/refresh")
+async def refresh_ranking_context(full: bool = Query(False, description="Reload everything instead of rows changed since the last sync")):
+    """Apply partner / rating / sponsorship changes now (e.g. right after a sponsorship purchase)."""
+    from ranking_context import get_ranking_context_store, refresh_ranking_context as refresh_store
+
+    counts = await refresh_store(full=full)
+    return {"applied": counts, **get_ranking_context_store().stats()}
+
+
+@router.get("/discovery-cache")
+async def discovery_cache_stats():
+    """Diagnostic: discovery result cache counters (hits, stale hits, misses, entries)."""
+    return result_cache_stats()
+
+
+@router.delete("/discovery-cache")
+async def clear_discovery_cache():
+    """Drop cached discovery results (call after editing sponsorships or ranking config in the portal)."""
+    return {"invalidated": invalidate_result_cache("admin")}
+
+
 class UCPPartnerPatchBody(BaseModel):
     """Update UCP partner display_name, enabled, price_premium_percent, available_to_customize, optional access_token."""
 
@@ -434,9 +665,20 @@ async def patch_ucp_partner(registry_id: str, body: UCPPartnerPatchBody):
     if len(updates) <= 1:
         return {"id": registry_id, "updated": False}
     try:
-        client.table("internal_agent_registry").update(updates).eq("id", registry_id).eq(
+        result = client.table("internal_agent_registry").update(updates).eq("id", registry_id).eq(
             "transport_type", "UCP"
         ).execute()
+        for row in result.data if isinstance(result.data, list) else []:
+            if isinstance(row, dict) and row.get("base_url"):
+                _invalidate_ucp_manifest(str(row["base_url"]))
         return {"id": registry_id, "updated": True}
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
+
+
+@router.get("/acp-feed")
+async def acp_feed_snapshot_stats():
+    """Diagnostic: ACP feed snapshots (served from file, rebuilt, 304s, streamed without a snapshot, files on disk)."""
+    from acp_feed import acp_feed_stats
+
+    return acp_feed_stats()
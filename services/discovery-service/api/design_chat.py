@@ -12,6 +12,7 @@ from db import (
     get_experience_session_legs,
     get_partner_design_chat_url,
 )
+from packages.shared.http_clients import get_http_client
 
 logger = logging.getLogger(__name__)
 
@@ -102,14 +103,13 @@ async def design_chat_proxy(body: DesignChatProxyBody) -> Dict[str, Any]:
     }
 
     try:
-        async with httpx.AsyncClient(timeout=30.0) as client:
-            r = await client.post(design_url.rstrip("/"), json=payload)
-            r.raise_for_status()
-            data = r.json() if r.headers.get("content-type", "").startswith("application/json") else {"text": r.text}
-            return {
-                "response": data.get("response") or data.get("text") or data.get("message", str(data)),
-                "partner_id": partner_id,
-            }
+        r = await get_http_client(design_url).post(design_url.rstrip("/"), json=payload, timeout=30.0)
+        r.raise_for_status()
+        data = r.json() if r.headers.get("content-type", "").startswith("application/json") else {"text": r.text}
+        return {
+            "response": data.get("response") or data.get("text") or data.get("message", str(data)),
+            "partner_id": partner_id,
+        }
     except httpx.HTTPStatusError as e:
         logger.warning("Design chat proxy HTTP error %s: %s", e.response.status_code, e.response.text[:200])
         raise HTTPException(status_code=502, detail=f"Partner design chat error: {e.response.status_code}")
@@ -1,14 +1,15 @@
 """Product discovery API - Chat-First with JSON-LD and Adaptive Cards."""
 
+import json
 import logging
 import uuid
 from datetime import datetime
 from typing import Any, Dict, List, Optional
 
-import httpx
 from pydantic import BaseModel
 
 from fastapi import APIRouter, HTTPException, Query, Request
+from fastapi.responses import StreamingResponse
 
 from config import settings
 from db import (
@@ -25,13 +26,14 @@ from db import (
     mask_products,  # type: ignore[reportAttributeAccessIssue]
     resolve_masked_id,  # type: ignore[reportAttributeAccessIssue]
 )
-from scout_engine import search
+from scout_engine import search, search_stream
 from semantic_search import semantic_search_kb_articles
 from protocols.acp_compliance import validate_product_acp
 from protocols.ucp_compliance import validate_product_ucp
 from packages.shared.adaptive_cards import generate_product_card, generate_bundle_card, generate_checkout_card
 from packages.shared.adaptive_cards.base import create_card, text_block
 from packages.shared.ucp_public_product import filter_product_for_public
+from packages.shared.http_clients import get_http_client
 
 router = APIRouter(prefix="/api/v1", tags=["Discover"])
 logger = logging.getLogger(__name__)
@@ -238,6 +240,65 @@ async def discover_products(
     return out
 
 
+@router.get("/discover/stream")
+async def discover_products_stream(
+    request: Request,
+    intent: str = Query(..., description="Search query (e.g. 'flowers', 'chocolates')"),
+    partner_id: Optional[str] = Query(None, description="Filter by partner"),
+    exclude_partner_id: Optional[str] = Query(None, description="Exclude partner (for re-sourcing)"),
+    limit: int = Query(20, ge=1, le=100),
+    budget_max: Optional[int] = Query(None, ge=0, description="Max price in cents (e.g. 5000 for $50)"),
+    experience_tag: Optional[str] = Query(None, description="Filter/boost by experience category (e.g. baby, celebration)"),
+    experience_tags: Optional[List[str]] = Query(None, description="Filter by multiple experience categories (AND semantics)"),
+):
+    """
+    Progressive discovery over SSE: one `products` event per source (local DB first, then UCP / Shopify MCP
+    partners as they answer), then a `done` event with the total count and per-source timings.
+    Sources that miss the discovery deadline are reported in `done` with error="timeout".
+    """
+    request_id = getattr(request.state, "request_id", str(uuid.uuid4()))
+
+    async def _events():
+        total = 0
+        sources: List[Dict[str, Any]] = []
+        async for batch in search_stream(
+            query=intent,
+            limit=limit,
+            partner_id=partner_id,
+            exclude_partner_id=exclude_partner_id,
+            experience_tag=experience_tag,
+            experience_tags=experience_tags,
+        ):
+            products = batch["products"]
+            if budget_max is not None:
+                products = [
+                    p for p in products
+                    if p.get("price") is None or int(round(float(p["price"]) * 100)) <= budget_max
+                ]
+            products = products[: max(0, limit - total)]
+            if settings.id_masking_enabled and products:
+                products = await mask_products(products, source="local")
+            sources.append({"source": batch["source"], "count": len(products), "elapsed_ms": batch["elapsed_ms"], "error": batch["error"]})
+            if products:
+                total += len(products)
+                payload = {
+                    "source": batch["source"],
+                    "products": [_product_for_public_response(p) for p in products],
+                    "count": len(products),
+                    "elapsed_ms": batch["elapsed_ms"],
+                }
+                yield f"event: products\ndata: {json.dumps(payload, default=str)}\n\n"
+        logger.info("UCP discover stream response: intent=%s result_count=%s", intent, total)
+        done = {"count": total, "sources": sources, "metadata": {"api_version": "v1", "request_id": request_id}}
+        yield f"event: done\ndata: {json.dumps(done, default=str)}\n\n"
+
+    return StreamingResponse(
+        _events(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "Connection": "keep-alive", "X-Accel-Buffering": "no"},
+    )
+
+
 def _product_to_acp_row_for_validation(product: dict) -> dict:
     """Build one ACP row from product (with partner seller fields) for validation."""
     price = float(product.get("price", 0))
@@ -441,10 +502,9 @@ async def proceed_to_checkout(request: Request, body: CheckoutBody):
     task_queue_url = getattr(settings, "task_queue_service_url", "") or ""
     if order_id and task_queue_url:
         try:
-            async with httpx.AsyncClient(timeout=10.0) as client:
-                await client.post(
-                    f"{task_queue_url.rstrip('/')}/api/v1/orders/{order_id}/tasks"
-                )
+            await get_http_client(task_queue_url).post(
+                f"{task_queue_url.rstrip('/')}/api/v1/orders/{order_id}/tasks", timeout=10.0
+            )
         except Exception:
             pass
 
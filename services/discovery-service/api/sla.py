@@ -1,16 +1,20 @@
 """SLA Re-Sourcing Job API - find legs where SLA exceeded, notify user, store alternatives."""
 
+import asyncio
 import logging
-from datetime import datetime, timedelta, timezone
-from typing import Any, Dict, List
+from datetime import datetime, timezone
+from typing import Any, Dict, List, Optional, Tuple
 
 from fastapi import APIRouter, HTTPException
 
+from config import settings
 from db import (
     get_supabase,
     search_products,
     create_sla_re_sourcing_pending,
-    get_partners_available_to_customize,
+    create_sla_re_sourcing_pending_bulk,
+    get_sla_overdue_legs,
+    resolve_masked_id,
 )
 
 logger = logging.getLogger(__name__)
@@ -35,116 +39,186 @@ async def get_sla_pending(thread_id: str) -> Dict[str, Any]:
     }
 
 
+def _search_query(name: Optional[str], capabilities: Any) -> str:
+    """First capability, else product name, else "product" (as the per-leg job always did)."""
+    if isinstance(capabilities, list) and capabilities:
+        return str(capabilities[0])
+    return name or "product"
+
+
+def _overdue_legs_per_leg(client) -> List[Dict[str, Any]]:
+    """Fallback before the get_sla_overdue_legs RPC is deployed: same rows, built with per-leg lookups."""
+    legs = (
+        client.table("experience_session_legs")
+        .select("id, experience_session_id, partner_id, product_id")
+        .in_("status", ["ready", "in_customization"])
+        .is_("design_started_at", "null")
+        .or_("re_sourcing_state.is.null,re_sourcing_state.neq.awaiting_user_response")
+        .execute()
+    )
+    now = datetime.now(timezone.utc)
+    out: List[Dict[str, Any]] = []
+    for leg in legs.data or []:
+        session = (
+            client.table("experience_sessions")
+            .select("thread_id, order_id")
+            .eq("id", leg.get("experience_session_id"))
+            .limit(1)
+            .execute()
+        )
+        session_row = (session.data or [None])[0]
+        if not session_row or not session_row.get("thread_id") or not session_row.get("order_id"):
+            continue
+        order = client.table("orders").select("paid_at").eq("id", session_row["order_id"]).limit(1).execute()
+        paid_at = ((order.data or [{}])[0] or {}).get("paid_at")
+        if not paid_at:
+            continue
+        partner_id = str(leg.get("partner_id", ""))
+        scp = (
+            client.table("shopify_curated_partners")
+            .select("internal_agent_registry_id")
+            .eq("partner_id", partner_id)
+            .limit(1)
+            .execute()
+        )
+        reg_id = scp.data[0].get("internal_agent_registry_id") if scp.data else None
+        if not reg_id:
+            continue
+        reg = (
+            client.table("internal_agent_registry")
+            .select("sla_response_hours, available_to_customize")
+            .eq("id", reg_id)
+            .limit(1)
+            .execute()
+        )
+        reg_row = (reg.data or [None])[0]
+        if not reg_row or not reg_row.get("available_to_customize"):
+            continue
+        hours = float(reg_row.get("sla_response_hours") or 24)
+        try:
+            paid_dt = datetime.fromisoformat(str(paid_at).replace("Z", "+00:00"))
+        except Exception:
+            continue
+        if (now - paid_dt).total_seconds() < hours * 3600:
+            continue
+        product_row: Dict[str, Any] = {}
+        if not str(leg.get("product_id") or "").startswith("uso_"):  # masked ids: _fill_masked_products
+            try:
+                product = client.table("products").select("name, capabilities").eq("id", leg.get("product_id")).limit(1).execute()
+                product_row = (product.data or [{}])[0] or {}
+            except Exception:
+                pass  # non-uuid product id: search by "product"
+        out.append({
+            "leg_id": leg["id"],
+            "thread_id": session_row["thread_id"],
+            "partner_id": partner_id,
+            "product_id": leg.get("product_id"),
+            "product_name": product_row.get("name"),
+            "product_capabilities": product_row.get("capabilities"),
+        })
+    return out
+
+
+def _fill_masked_products(client, legs: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    """
+    Product name / capabilities for legs whose product_id is a masked id the overdue query could not join:
+    token ids (uso_{slug}.{token}) are decoded here, legacy ids looked up in id_masking_map. One products query.
+    """
+    internal_ids: Dict[str, str] = {}
+    for leg in legs:
+        product_id = str(leg.get("product_id") or "")
+        if leg.get("product_name") or leg.get("product_capabilities") or not product_id.startswith("uso_"):
+            continue
+        resolved = resolve_masked_id(product_id)
+        if resolved and resolved[0]:
+            internal_ids[product_id] = str(resolved[0])
+    if not internal_ids:
+        return legs
+    try:
+        products = (
+            client.table("products")
+            .select("id, name, capabilities")
+            .in_("id", sorted(set(internal_ids.values())))
+            .execute()
+        )
+    except Exception as e:
+        logger.warning("SLA job: product lookup for masked ids failed: %s", e)
+        return legs
+    by_id = {str(p.get("id")): p for p in products.data or []}
+    for leg in legs:
+        product = by_id.get(internal_ids.get(str(leg.get("product_id") or ""), ""))
+        if product:
+            leg["product_name"] = product.get("name")
+            leg["product_capabilities"] = product.get("capabilities")
+    return legs
+
+
+async def _find_alternatives(legs: List[Dict[str, Any]]) -> Dict[str, List[Dict[str, Any]]]:
+    """
+    Alternatives snapshot (top 3) per leg id. Searches run concurrently, at most SLA_SEARCH_CONCURRENCY at a
+    time; legs sharing a (query, partner) pair share one search.
+    """
+    sem = asyncio.Semaphore(max(1, getattr(settings, "sla_search_concurrency", 8)))
+    searches: Dict[Tuple[str, str], "asyncio.Task[List[Dict[str, Any]]]"] = {}
+
+    async def search(query: str, partner_id: str) -> List[Dict[str, Any]]:
+        async with sem:
+            try:
+                return await search_products(query=query, limit=5, exclude_partner_id=partner_id or None)
+            except Exception as e:
+                logger.warning("SLA alternatives search failed (query=%s): %s", query, e)
+                return []
+
+    keys: Dict[str, Tuple[str, str]] = {}
+    for leg in legs:
+        key = (_search_query(leg.get("product_name"), leg.get("product_capabilities")), str(leg.get("partner_id") or ""))
+        keys[str(leg["leg_id"])] = key
+        if key not in searches:
+            searches[key] = asyncio.ensure_future(search(*key))
+    await asyncio.gather(*searches.values())
+
+    out: Dict[str, List[Dict[str, Any]]] = {}
+    for leg_id, key in keys.items():
+        alternatives = searches[key].result()
+        if alternatives:
+            out[leg_id] = [
+                {"id": str(a.get("id")), "name": a.get("name"), "price": float(a.get("price", 0)), "partner_id": str(a.get("partner_id", ""))}
+                for a in alternatives[:3]
+            ]
+    return out
+
+
 @router.post("/sla/run-job")
 async def run_sla_job() -> Dict[str, Any]:
     """
     SLA job: find legs where partner hasn't started design within sla_response_hours.
     For each: find similar alternatives, create sla_re_sourcing_pending, return list for notification.
-    Call from cron (e.g. every 15 min).
+    Overdue legs come from one query (get_sla_overdue_legs), alternatives are searched concurrently and the
+    pending rows are written in bulk. Call from cron (e.g. every 15 min).
     """
     client = get_supabase()
     if not client:
         raise HTTPException(status_code=503, detail="Database not configured")
 
     try:
-        cutoff = (datetime.now(timezone.utc) - timedelta(hours=24)).isoformat()
-        legs = (
-            client.table("experience_session_legs")
-            .select("id, experience_session_id, partner_id, product_id, status, re_sourcing_state, created_at")
-            .in_("status", ["ready", "in_customization"])
-            .is_("design_started_at", "null")
-            .neq("re_sourcing_state", "awaiting_user_response")
-            .execute()
-        )
-        notified = []
-        for leg in legs.data or []:
-            if leg.get("re_sourcing_state") == "awaiting_user_response":
-                continue
-            session = (
-                client.table("experience_sessions")
-                .select("thread_id, order_id")
-                .eq("id", leg.get("experience_session_id"))
-                .single()
-                .execute()
-            )
-            if not session.data or not session.data.get("thread_id"):
-                continue
-            order_id = session.data.get("order_id")
-            if not order_id:
-                continue
-            order = (
-                client.table("orders")
-                .select("paid_at")
-                .eq("id", order_id)
-                .single()
-                .execute()
-            )
-            if not order.data or not order.data.get("paid_at"):
-                continue
-            paid_at = order.data.get("paid_at")
-            partner_id = str(leg.get("partner_id", ""))
-            scp = (
-                client.table("shopify_curated_partners")
-                .select("internal_agent_registry_id")
-                .eq("partner_id", partner_id)
-                .limit(1)
-                .execute()
-            )
-            if not scp.data:
-                continue
-            reg_id = scp.data[0].get("internal_agent_registry_id")
-            if not reg_id:
-                continue
-            reg = (
-                client.table("internal_agent_registry")
-                .select("sla_response_hours, available_to_customize")
-                .eq("id", reg_id)
-                .single()
-                .execute()
-            )
-            if not reg.data or not reg.data.get("available_to_customize"):
-                continue
-            hours = float(reg.data.get("sla_response_hours") or 24)
-            from datetime import datetime as dt
-            try:
-                paid_dt = dt.fromisoformat(paid_at.replace("Z", "+00:00"))
-            except Exception:
-                continue
-            if (datetime.now(timezone.utc) - paid_dt).total_seconds() < hours * 3600:
-                continue
-
-            product = (
-                client.table("products")
-                .select("name, capabilities")
-                .eq("id", leg.get("product_id"))
-                .single()
-                .execute()
-            )
-            query = product.data.get("name", "product") if product.data else "product"
-            caps = product.data.get("capabilities") or [] if product.data else []
-            if isinstance(caps, list) and caps:
-                query = caps[0]
-
-            alternatives = await search_products(
-                query=query,
-                limit=5,
-                exclude_partner_id=partner_id,
-            )
-            if not alternatives:
-                continue
-
-            alt_snapshot = [
-                {"id": str(a.get("id")), "name": a.get("name"), "price": float(a.get("price", 0)), "partner_id": str(a.get("partner_id", ""))}
-                for a in alternatives[:3]
-            ]
-            pid = await create_sla_re_sourcing_pending(leg["id"], alt_snapshot)
-            if pid:
-                notified.append({
-                    "thread_id": session.data["thread_id"],
-                    "leg_id": leg["id"],
-                    "alternatives": alt_snapshot,
-                })
+        legs = await get_sla_overdue_legs()
+        if legs is None:
+            legs = await asyncio.to_thread(_overdue_legs_per_leg, client)
+        legs = await asyncio.to_thread(_fill_masked_products, client, legs)
+        snapshots = await _find_alternatives(legs)
+        items = [{"leg_id": leg_id, "alternatives": alts} for leg_id, alts in snapshots.items()]
+
+        claimed = await create_sla_re_sourcing_pending_bulk(items) if items else []
+        if claimed is None:
+            claimed = [item["leg_id"] for item in items if await create_sla_re_sourcing_pending(item["leg_id"], item["alternatives"])]
+        claimed_ids = set(claimed)
 
+        notified = [
+            {"thread_id": leg["thread_id"], "leg_id": str(leg["leg_id"]), "alternatives": snapshots[str(leg["leg_id"])]}
+            for leg in legs
+            if str(leg["leg_id"]) in claimed_ids
+        ]
+        logger.info("SLA job: overdue=%s with_alternatives=%s notified=%s", len(legs), len(items), len(notified))
         return {"notified": notified, "count": len(notified)}
     except Exception as e:
         logger.exception("SLA job failed: %s", e)
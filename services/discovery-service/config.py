@@ -37,26 +37,79 @@ class Settings:
     # Portal/public URL for UCP continue_url (e.g. https://your-portal.vercel.app)
     portal_public_url: str = get_env("PORTAL_PUBLIC_URL") or get_env("DISCOVERY_PUBLIC_URL") or ""
 
+    # UCP partner fan-out: partners queried concurrently, per-partner deadline, optional cap on partners per search
+    ucp_max_concurrency: int = int(get_env("UCP_MAX_CONCURRENCY") or "10")
+    ucp_partner_timeout_ms: int = int(get_env("UCP_PARTNER_TIMEOUT_MS") or "4000")
+    ucp_max_partners: int = int(get_env("UCP_MAX_PARTNERS") or "0")  # 0 = all registered partners
+
     # Metadata enrichment: assign experience_tags via LLM when missing (Phase 3)
     metadata_enrichment_enabled: bool = (get_env("METADATA_ENRICHMENT_ENABLED") or "true").strip().lower() != "false"
+    # Tag cache misses after the response (true) or before it (false); concurrent LLM batches; in-process tag cache size
+    metadata_enrichment_background: bool = (get_env("METADATA_ENRICHMENT_BACKGROUND") or "true").strip().lower() != "false"
+    metadata_enrichment_concurrency: int = int(get_env("METADATA_ENRICHMENT_CONCURRENCY") or "4")
+    metadata_tag_cache_max_entries: int = int(get_env("METADATA_TAG_CACHE_MAX_ENTRIES") or "20000")
 
     # Exclusive Gateway: mask product ids returned to clients (uso_*); mapping stored for checkout
     id_masking_enabled: bool = (get_env("ID_MASKING_ENABLED") or "false").strip().lower() == "true"
+    # "table" = uso_{slug}_{short_id} rows in id_masking_map; "token" = encrypted ids (ID_MASKING_SECRET, shared with
+    # Orchestrator), no writes when masking and no lookup when resolving. Old secrets stay valid via PREVIOUS_SECRETS.
+    id_masking_mode: str = (get_env("ID_MASKING_MODE") or "table").strip().lower()
+    id_masking_secret: str = get_env("ID_MASKING_SECRET") or ""
+    id_masking_previous_secrets: str = get_env("ID_MASKING_PREVIOUS_SECRETS") or ""
+    id_masking_ttl_hours: int = max(0, int(get_env("ID_MASKING_TTL_HOURS") or "0"))  # 0 = masked ids never expire
 
     # Exclusive Gateway: require X-Gateway-Signature on /api/* when True (shared secret with Orchestrator)
     gateway_signature_required: bool = (get_env("GATEWAY_SIGNATURE_REQUIRED") or "false").strip().lower() == "true"
     gateway_internal_secret: str = get_env("GATEWAY_INTERNAL_SECRET") or ""
 
-    # Embedding provider for semantic search (pgvector). One of "openai" | "azure".
+    # Embedding provider for semantic search (pgvector). One of "openai" | "azure" | "local" | "hash".
+    # local = CPU sentence-transformers model (LOCAL_EMBEDDING_MODEL) when installed, else hash; hash = no model / network
     embedding_provider: str = (get_env("EMBEDDING_PROVIDER") or "azure").strip().lower()
     embedding_model: str = get_env("EMBEDDING_MODEL") or get_env("EMBEDDING_DEPLOYMENT") or "text-embedding-3-small"
     openai_api_key: str = get_env("OPENAI_API_KEY") or ""
     azure_openai_endpoint: str = (get_env("AZURE_OPENAI_ENDPOINT") or "").rstrip("/")
     azure_openai_api_key: str = get_env("AZURE_OPENAI_API_KEY") or ""
+    local_embedding_model: str = get_env("LOCAL_EMBEDDING_MODEL") or "sentence-transformers/all-MiniLM-L6-v2"
+    # Model tag of vectors written before version tagging (embedding_model NULL); empty = EMBEDDING_PROVIDER:EMBEDDING_MODEL
+    # for openai / azure (the only providers back then)
+    embedding_legacy_model: str = (get_env("EMBEDDING_LEGACY_MODEL") or "").strip()
+    # Query-embedding cache (semantic search): in-process LRU + TTL; optional Postgres tier shared across workers
+    embedding_cache_max_entries: int = int(get_env("EMBEDDING_CACHE_MAX_ENTRIES") or "2048")
+    embedding_cache_ttl_sec: int = int(get_env("EMBEDDING_CACHE_TTL_SEC") or "86400")
+    embedding_cache_persistent: bool = (get_env("EMBEDDING_CACHE_PERSISTENT") or "false").strip().lower() == "true"
+    # Config snapshot (platform_config + admin_orchestration_settings): updated_at checked every CHECK_SEC, full reload every REFRESH_SEC
+    config_snapshot_check_sec: int = int(get_env("CONFIG_SNAPSHOT_CHECK_SEC") or "5")
+    config_snapshot_refresh_sec: int = int(get_env("CONFIG_SNAPSHOT_REFRESH_SEC") or "60")
+    # Ranking context: partners / ratings / sponsorship windows in memory; incremental refresh, periodic full reload
+    ranking_context_enabled: bool = (get_env("RANKING_CONTEXT_ENABLED") or "true").strip().lower() != "false"
+    ranking_context_refresh_sec: int = int(get_env("RANKING_CONTEXT_REFRESH_SEC") or "30")
+    ranking_context_full_refresh_sec: int = int(get_env("RANKING_CONTEXT_FULL_REFRESH_SEC") or "600")
+    # Discovery result cache (scout_engine.search): fresh TTL, then served stale while one refresh runs; TTL 0 = off
+    discovery_result_cache_ttl_sec: int = int(get_env("DISCOVERY_RESULT_CACHE_TTL_SEC") or "30")
+    discovery_result_cache_stale_sec: int = int(get_env("DISCOVERY_RESULT_CACHE_STALE_SEC") or "120")
+    discovery_result_cache_max_entries: int = int(get_env("DISCOVERY_RESULT_CACHE_MAX_ENTRIES") or "512")
+    # Local vector index: in-memory replica of product embeddings for semantic search (needs numpy)
+    local_vector_index_enabled: bool = (get_env("LOCAL_VECTOR_INDEX_ENABLED") or "false").strip().lower() == "true"
+    local_vector_index_refresh_sec: int = int(get_env("LOCAL_VECTOR_INDEX_REFRESH_SEC") or "60")
+    local_vector_index_max_products: int = int(get_env("LOCAL_VECTOR_INDEX_MAX_PRODUCTS") or "100000")
+    # ACP feed (/api/v1/feeds/acp): streamed in keyset pages; snapshot files reused until products / partners change
+    acp_feed_page_size: int = int(get_env("ACP_FEED_PAGE_SIZE") or "500")
+    acp_feed_snapshot_enabled: bool = (get_env("ACP_FEED_SNAPSHOT_ENABLED") or "true").strip().lower() != "false"
+    acp_feed_snapshot_dir: str = get_env("ACP_FEED_SNAPSHOT_DIR") or ""  # "" = <tmp>/acp_feed_snapshots
+    # ACP push scope=delta: pending products validated and recorded in chunks, CONCURRENCY chunks at a time
+    acp_push_chunk_size: int = int(get_env("ACP_PUSH_CHUNK_SIZE") or "200")
+    acp_push_concurrency: int = int(get_env("ACP_PUSH_CONCURRENCY") or "4")
+    # Legacy Adapter ingest: uploads spooled to LEGACY_INGEST_DIR, inserted CHUNK_SIZE products per request
+    legacy_ingest_chunk_size: int = int(get_env("LEGACY_INGEST_CHUNK_SIZE") or "500")
+    legacy_ingest_dir: str = get_env("LEGACY_INGEST_DIR") or ""  # "" = <tmp>/legacy_ingest
+    # SLA re-sourcing job (/api/v1/sla/run-job): alternatives searches run CONCURRENCY at a time
+    sla_search_concurrency: int = int(get_env("SLA_SEARCH_CONCURRENCY") or "8")
 
     @property
     def embedding_configured(self) -> bool:
-        """True if embedding API is configured (OpenAI or Azure)."""
+        """True if an embedding provider is usable (OpenAI / Azure with credentials, or a local provider)."""
+        if self.embedding_provider in ("local", "hash"):
+            return True
         if self.embedding_provider == "openai":
             return bool(self.openai_api_key and self.embedding_model)
         return bool(self.azure_openai_api_key and self.azure_openai_endpoint and self.embedding_model)
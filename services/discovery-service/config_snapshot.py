@@ -0,0 +1,131 @@
+"""
+Discovery config snapshot: platform_config (ranking, composite discovery) and admin_orchestration_settings.
+
+Loaded once into a packages.shared.config_snapshot store and refreshed in the background (marker = both
+tables' updated_at, checked every CONFIG_SNAPSHOT_CHECK_SEC; full reload every CONFIG_SNAPSHOT_REFRESH_SEC),
+so scout_engine reads config without a Supabase round trip per request. A new snapshot version drops the
+discovery result cache, since ranking and product_mix changes alter results. The two tables load independently:
+one that fails to read keeps its last good values while the other still updates.
+
+The async getters keep the return contracts of the db.py functions they replace, but values are frozen.
+"""
+
+import logging
+from typing import Any, Callable, Dict, Optional, Tuple
+
+from config import settings
+from db import _table_row, get_supabase  # type: ignore[reportAttributeAccessIssue]
+from packages.shared.config_snapshot import ConfigSnapshot, ConfigSnapshotStore
+from result_cache import invalidate_result_cache
+
+logger = logging.getLogger(__name__)
+
+_RANKING_COLUMNS = ("ranking_enabled", "ranking_policy", "ranking_edge_cases", "sponsorship_pricing")
+_ADMIN_COLUMNS = "global_tone, model_temperature, autonomy_level, discovery_timeout_ms"
+_DEFAULTS: Dict[str, Any] = {"ranking": {"ranking_enabled": True}, "composite_discovery": None, "admin_orchestration": None}
+
+
+def _load_platform_config(client: Any) -> Dict[str, Any]:
+    pc = _table_row(
+        client.table("platform_config")
+        .select(", ".join(_RANKING_COLUMNS) + ", composite_discovery_config")
+        .limit(1)
+        .execute()
+        .data
+    )
+    cdc = (pc or {}).get("composite_discovery_config")
+    return {
+        "ranking": {k: pc[k] for k in _RANKING_COLUMNS if k in pc} if pc else {"ranking_enabled": True},
+        "composite_discovery": cdc if isinstance(cdc, dict) else None,
+    }
+
+
+def _load_admin_orchestration(client: Any) -> Dict[str, Any]:
+    admin = _table_row(
+        client.table("admin_orchestration_settings").select(_ADMIN_COLUMNS).limit(1).execute().data
+    )
+    return {"admin_orchestration": dict(admin) if admin else None}
+
+
+# table loader -> snapshot sections it fills
+_SECTIONS: Tuple[Tuple[Callable[[Any], Dict[str, Any]], Tuple[str, ...]], ...] = (
+    (_load_platform_config, ("ranking", "composite_discovery")),
+    (_load_admin_orchestration, ("admin_orchestration",)),
+)
+
+
+def _load() -> Dict[str, Any]:
+    """
+    Read each table independently: a table that fails keeps its sections' last good values (defaults before the
+    first load). Raises only when every table fails, so the store keeps the previous snapshot.
+    """
+    client = get_supabase()
+    if not client:
+        return dict(_DEFAULTS)
+    previous = _store.current.values if _store.current is not None else _DEFAULTS
+    values: Dict[str, Any] = {}
+    errors = []
+    for load, sections in _SECTIONS:
+        try:
+            values.update(load(client))
+        except Exception as e:
+            errors.append(e)
+            logger.warning("Config snapshot: %s failed; keeping last good %s: %s", load.__name__, ", ".join(sections), e)
+            values.update({key: previous.get(key, _DEFAULTS[key]) for key in sections})
+    if len(errors) == len(_SECTIONS):
+        raise errors[0]
+    return values
+
+
+def _fetch_marker() -> Optional[str]:
+    client = get_supabase()
+    if not client:
+        return None
+    parts = []
+    for table in ("platform_config", "admin_orchestration_settings"):
+        try:
+            row = _table_row(client.table(table).select("updated_at").limit(1).execute().data)
+            parts.append(str((row or {}).get("updated_at")))
+        except Exception as e:  # one unreadable table must not block reloading the other
+            logger.debug("Config snapshot marker for %s failed: %s", table, e)
+            parts.append("error")
+    return "|".join(parts)
+
+
+def _on_change(snapshot: ConfigSnapshot) -> None:
+    if snapshot.version > 1:
+        invalidate_result_cache(f"config snapshot v{snapshot.version}")
+
+
+_store = ConfigSnapshotStore(
+    "discovery",
+    load=_load,
+    fetch_marker=_fetch_marker,
+    refresh_sec=getattr(settings, "config_snapshot_refresh_sec", 60),
+    check_sec=getattr(settings, "config_snapshot_check_sec", 5),
+    defaults=_DEFAULTS,
+    on_change=_on_change,
+)
+
+
+def get_config_store() -> ConfigSnapshotStore:
+    return _store
+
+
+async def get_config_snapshot() -> ConfigSnapshot:
+    return await _store.get()
+
+
+async def get_platform_config_ranking() -> Optional[Dict[str, Any]]:
+    """ranking_enabled, ranking_policy, ranking_edge_cases, sponsorship_pricing (snapshot)."""
+    return (await _store.get()).get("ranking")
+
+
+async def get_admin_orchestration_settings() -> Optional[Dict[str, Any]]:
+    """global_tone, model_temperature, autonomy_level, discovery_timeout_ms (snapshot)."""
+    return (await _store.get()).get("admin_orchestration")
+
+
+async def get_composite_discovery_config() -> Optional[Dict[str, Any]]:
+    """composite_discovery_config: products_per_category, product_mix, query_exclusion_rules (snapshot)."""
+    return (await _store.get()).get("composite_discovery")
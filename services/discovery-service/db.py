@@ -1,14 +1,21 @@
 """Supabase database client for discovery service."""
 
+import asyncio
+import logging
 import re
+import time
 import uuid as uuid_module
-from datetime import datetime, timezone
-from typing import Any, Dict, List, Optional, cast
+from datetime import datetime, timedelta, timezone
+from typing import Any, AsyncIterator, Dict, List, Optional, cast
 
 from supabase import create_client, Client
 
 from config import settings
 from packages.shared.discovery import is_browse_query
+from packages.shared.masked_ids import decode_masked_id, encode_masked_id, is_token_masked_id
+from result_cache import invalidate_result_cache
+
+logger = logging.getLogger(__name__)
 
 __all__ = [
     "get_supabase",
@@ -35,7 +42,12 @@ __all__ = [
     "get_active_sponsorships",
     "update_partner_last_acp_push",
     "update_products_last_acp_push",
+    "record_acp_push_results",
+    "get_acp_push_delta_ids",
+    "get_acp_push_status",
     "get_products_for_acp_export",
+    "iter_products_for_acp_export",
+    "get_acp_feed_marker",
     "add_product_to_bundle",
     "add_products_to_bundle_bulk",
     "get_bundle_by_id",
@@ -47,6 +59,8 @@ __all__ = [
     "replace_product_in_bundle",
     "get_agent_action_models",
     "upsert_products_from_legacy",
+    "soft_delete_legacy_products",
+    "insert_legacy_products",
     "get_platform_manifest_config",
     "create_or_get_experience_session",
     "get_experience_session_by_thread",
@@ -62,6 +76,8 @@ __all__ = [
     "update_experience_session_leg_design_started",
     "get_sla_legs_for_re_sourcing",
     "create_sla_re_sourcing_pending",
+    "get_sla_overdue_legs",
+    "create_sla_re_sourcing_pending_bulk",
     "get_sla_re_sourcing_pending_by_thread",
     "clear_sla_re_sourcing_pending",
     "update_experience_session_customization_partner",
@@ -178,6 +194,59 @@ async def _capability_fallback_for_query(
     return out[:limit]
 
 
+# search_products_v3 RPC (migration 20260406120000). After a failure (e.g. migration not applied yet) the
+# PostgREST ilike path is used and the RPC is retried after _SEARCH_RPC_RETRY_SEC.
+_SEARCH_RPC_RETRY_SEC = 300.0
+_search_rpc_retry_at = 0.0
+
+
+def _search_rpc_capabilities(query: str, tokens: List[str]) -> List[str]:
+    """Capability slugs for the fallback, as _capability_fallback_for_query would try them (first word, lower-case)."""
+    if len(tokens) > 1:
+        return [t.lower() for t in tokens]
+    cap = (tokens[0] if tokens else query.strip()).strip().lower()
+    return [cap.split()[0]] if cap else []
+
+
+async def _search_products_rpc(
+    client: Client,
+    query: str,
+    limit: int,
+    partner_id: Optional[str],
+    exclude_partner_id: Optional[str],
+    tags_to_apply: List[str],
+) -> Optional[List[Dict[str, Any]]]:
+    """
+    Token search, capability fallback, tag and partner filters in one indexed query (search_products_v3).
+    Returns None when the RPC is unavailable so the caller can use the PostgREST path.
+    """
+    global _search_rpc_retry_at
+    if time.monotonic() < _search_rpc_retry_at:
+        return None
+    browse = not query or not query.strip() or is_browse_query(query)
+    tokens = [] if browse else _product_query_tokens(query)
+    params = {
+        "p_tokens": tokens,
+        "p_capabilities": [] if browse else _search_rpc_capabilities(query, tokens),
+        "p_limit": limit,
+        "p_partner_id": partner_id,
+        "p_exclude_partner_id": exclude_partner_id,
+        "p_experience_tags": tags_to_apply,
+    }
+    try:
+        result = await asyncio.to_thread(client.rpc("search_products_v3", params).execute)
+    except Exception:
+        _search_rpc_retry_at = time.monotonic() + _SEARCH_RPC_RETRY_SEC
+        return None
+    data = _table_data(result.data)
+    for row in data:
+        row.pop("match_type", None)
+        row.pop("match_rank", None)
+        if row.get("sold_count") is None:
+            row["sold_count"] = 0
+    return data
+
+
 async def search_products(
     query: str,
     limit: int = 20,
@@ -188,9 +257,9 @@ async def search_products(
 ) -> List[Dict[str, Any]]:
     """
     Search products by name/description.
-    Uses simple text search for MVP; semantic search (pgvector) can be added later.
     When experience_tag is set, filter to products whose experience_tags JSONB contains that tag.
     When experience_tags (list) is set, filter to products that contain ALL tags (AND semantics).
+    Uses the indexed search_products_v3 RPC when deployed, else name/description ilike + capability fallback.
     """
     client = get_supabase()
     if not client:
@@ -202,6 +271,10 @@ async def search_products(
     if not tags_to_apply and experience_tag and experience_tag.strip():
         tags_to_apply = [experience_tag.strip()]
 
+    rpc_data = await _search_products_rpc(client, query, limit, partner_id, exclude_partner_id, tags_to_apply)
+    if rpc_data is not None:
+        return rpc_data
+
     select_cols = (
         "id, name, description, price, currency, capabilities, metadata, partner_id, "
         "url, brand, image_url, is_eligible_search, is_eligible_checkout, target_countries, availability, experience_tags, created_at"
@@ -219,7 +292,7 @@ async def search_products(
             q = q.neq("partner_id", exclude_partner_id)
         for tag in tags_to_apply:
             q = q.contains("experience_tags", [tag])
-        result = q.order("created_at", desc=True).limit(limit).execute()
+        result = await asyncio.to_thread(q.order("created_at", desc=True).limit(limit).execute)
         data = _table_data(result.data)
         for row in data:
             if "sold_count" not in row:
@@ -245,7 +318,7 @@ async def search_products(
                 q = q.neq("partner_id", exclude_partner_id)
             for tag in tags_to_apply:
                 q = q.contains("experience_tags", [tag])
-            result = q.order("created_at", desc=True).limit(limit).execute()
+            result = await asyncio.to_thread(q.order("created_at", desc=True).limit(limit).execute)
             data = _table_data(result.data)
             for row in data:
                 if "sold_count" not in row:
@@ -294,7 +367,7 @@ async def _search_products_by_capability(
         if experience_tags_filter:
             for tag in experience_tags_filter:
                 q = q.contains("experience_tags", [tag])
-        result = q.order("created_at", desc=True).limit(limit).execute()
+        result = await asyncio.to_thread(q.order("created_at", desc=True).limit(limit).execute)
         data = _table_data(result.data)
         for row in data:
             if "sold_count" not in row:
@@ -416,6 +489,7 @@ async def onboard_ucp_partner(
             payload["access_token_vault_ref"] = vault_ref
         if row:
             client.table("internal_agent_registry").update(payload).eq("id", row["id"]).execute()
+            invalidate_result_cache("ucp partner updated")
             return {"registry_id": str(row["id"]), "base_url": base_url}
         ins_payload: Dict[str, Any] = {
             "capability": "discovery",
@@ -431,6 +505,7 @@ async def onboard_ucp_partner(
         ins = client.table("internal_agent_registry").insert(ins_payload).execute()
         reg_data = _table_data(ins.data)
         registry_id = str(reg_data[0]["id"]) if reg_data else None
+        invalidate_result_cache("ucp partner onboarded")
         return {"registry_id": registry_id, "base_url": base_url}
     except Exception as e:
         return {"error": str(e), "registry_id": None}
@@ -481,24 +556,24 @@ async def get_ucp_partners_with_tokens(capability: Optional[str] = None) -> List
         )
         if capability and str(capability).strip():
             q = q.eq("capability", str(capability).strip())
-        result = q.execute()
+        result = await asyncio.to_thread(q.execute)
         data = _table_data(result.data)
-        out: List[Dict[str, Any]] = []
-        for r in data:
-            base_url = (r.get("base_url") or "").strip()
-            if not base_url:
-                continue
-            vault_ref = r.get("access_token_vault_ref")
-            access_token: Optional[str] = None
-            if vault_ref and str(vault_ref).strip():
-                try:
-                    rpc = client.rpc("get_shopify_token", {"vault_ref": str(vault_ref).strip()}).execute()
-                    if rpc.data is not None and isinstance(rpc.data, str) and rpc.data.strip():
-                        access_token = rpc.data.strip()
-                except Exception:
-                    pass
-            out.append({"base_url": base_url, "access_token": access_token})
-        return out
+
+        async def _resolve_token(vault_ref: Any) -> Optional[str]:
+            if not vault_ref or not str(vault_ref).strip():
+                return None
+            try:
+                rpc = await asyncio.to_thread(client.rpc("get_shopify_token", {"vault_ref": str(vault_ref).strip()}).execute)
+                if rpc.data is not None and isinstance(rpc.data, str) and rpc.data.strip():
+                    return rpc.data.strip()
+            except Exception:
+                pass
+            return None
+
+        # Vault lookups run concurrently (one RPC per partner with a token)
+        rows = [r for r in data if (r.get("base_url") or "").strip()]
+        tokens = await asyncio.gather(*[_resolve_token(r.get("access_token_vault_ref")) for r in rows])
+        return [{"base_url": (r.get("base_url") or "").strip(), "access_token": token} for r, token in zip(rows, tokens)]
     except Exception:
         return []
 
@@ -515,12 +590,14 @@ async def get_shopify_mcp_endpoints(capability: Optional[str] = None) -> List[Di
         q = client.table("shopify_curated_partners").select(
             "mcp_endpoint, shop_url, price_premium_percent, internal_agent_registry_id"
         )
-        result = q.execute()
+        result = await asyncio.to_thread(q.execute)
         data = _table_data(result.data)
         reg_ids = [r.get("internal_agent_registry_id") for r in data if r.get("internal_agent_registry_id")]
         reg_map: Dict[str, Dict[str, Any]] = {}
         if reg_ids:
-            reg_res = client.table("internal_agent_registry").select("id, display_name, capability, enabled").in_("id", reg_ids).execute()
+            reg_res = await asyncio.to_thread(
+                client.table("internal_agent_registry").select("id, display_name, capability, enabled").in_("id", reg_ids).execute
+            )
             for r in _table_data(reg_res.data):
                 reg_map[str(r.get("id", ""))] = r
         import re
@@ -647,24 +724,51 @@ async def onboard_shopify_curated_partner(
             scp_payload.pop("updated_at", None)
             client.table("shopify_curated_partners").insert(scp_payload).execute()
 
+        invalidate_result_cache("shopify partner onboarded")
         return {"partner_id": partner_id, "registry_id": registry_id, "shop_url": shop_url}
     except Exception as e:
         return {"error": str(e), "partner_id": None, "registry_id": None}
 
 
-def _mask_id_insert(
+def _masking_secrets() -> List[str]:
+    """ID_MASKING_SECRET first, then ID_MASKING_PREVIOUS_SECRETS (still accepted when resolving)."""
+    previous = [x.strip() for x in (getattr(settings, "id_masking_previous_secrets", "") or "").split(",")]
+    return [x for x in [getattr(settings, "id_masking_secret", "")] + previous if x]
+
+
+def _token_masking_enabled() -> bool:
+    """ID_MASKING_MODE=token with a secret: masked ids are encrypted tokens, no id_masking_map rows."""
+    return getattr(settings, "id_masking_mode", "table") == "token" and bool(getattr(settings, "id_masking_secret", ""))
+
+
+def _encode_masked_id(
     internal_product_id: str,
     partner_id: Optional[str],
     source: Optional[str],
-    agent_slug: Optional[str] = None,
+    agent_slug: Optional[str],
 ) -> Optional[str]:
+    """Encrypted masked id; None (logged) when encoding fails, so callers never fall back to the internal id."""
+    ttl_hours = getattr(settings, "id_masking_ttl_hours", 0)
+    try:
+        return encode_masked_id(
+            settings.id_masking_secret, internal_product_id, partner_id, agent_slug, source,
+            ttl_sec=ttl_hours * 3600 if ttl_hours else None,
+        )
+    except Exception as e:
+        logger.error("Masked id encoding failed (agent_slug=%s): %s", agent_slug, e)
+        return None
+
+
+def _mask_id_row(
+    internal_product_id: str,
+    partner_id: Optional[str],
+    source: Optional[str],
+    agent_slug: Optional[str] = None,
+) -> Dict[str, Any]:
     """
-    Insert one mapping and return masked_id.
+    id_masking_map row for a new (legacy, table-backed) masked id.
     When agent_slug provided: uso_{agent_slug}_{short_id}; else legacy uso_{24hex}.
     """
-    client = get_supabase()
-    if not client:
-        return None
     short_uid = str(uuid_module.uuid4()).replace("-", "")[:16]
     if agent_slug:
         slug_safe = "".join(c for c in str(agent_slug) if c.isalnum() or c == "_")[:64] or "discovery"
@@ -679,9 +783,28 @@ def _mask_id_insert(
     }
     if agent_slug:
         payload["agent_slug"] = str(agent_slug)[:64]
+    ttl_hours = getattr(settings, "id_masking_ttl_hours", 0)
+    if ttl_hours:
+        payload["expires_at"] = (datetime.now(timezone.utc) + timedelta(hours=ttl_hours)).isoformat()
+    return payload
+
+
+def _mask_id_insert(
+    internal_product_id: str,
+    partner_id: Optional[str],
+    source: Optional[str],
+    agent_slug: Optional[str] = None,
+) -> Optional[str]:
+    """Return a masked id: encrypted token (ID_MASKING_MODE=token), else insert one id_masking_map row."""
+    if _token_masking_enabled():
+        return _encode_masked_id(internal_product_id, partner_id, source, agent_slug)
+    client = get_supabase()
+    if not client:
+        return None
+    payload = _mask_id_row(internal_product_id, partner_id, source, agent_slug)
     try:
         client.table("id_masking_map").insert(payload).execute()
-        return masked_id
+        return payload["masked_id"]
     except Exception:
         return None
 
@@ -753,9 +876,13 @@ def resolve_masked_id(masked_id: str) -> Optional[tuple]:
     """
     Resolve masked id to (internal_product_id, partner_id).
     Returns None if not found, not a masked id, or expired (expires_at in the past).
+    Encrypted tokens (uso_{slug}.{token}) are decoded locally; legacy ids are looked up in id_masking_map.
     """
     if not masked_id or not str(masked_id).startswith("uso_"):
         return None
+    if is_token_masked_id(masked_id):
+        decoded = decode_masked_id(_masking_secrets(), masked_id)
+        return (decoded.internal_product_id, decoded.partner_id) if decoded else None
     client = get_supabase()
     if not client:
         return None
@@ -795,7 +922,9 @@ async def mask_products(
     agent_slug_map: Optional[Dict[str, str]] = None,
 ) -> List[Dict[str, Any]]:
     """
-    Replace each product's id with a masked id (uso_*); store mapping.
+    Replace each product's id with a masked id (uso_*).
+    ID_MASKING_MODE=token: encrypted ids, no writes; a product whose id cannot be encoded is dropped.
+    Else the mappings are stored in one id_masking_map insert.
     Removes partner_id from each product so internal identifiers are not exposed.
     When agent_slug_map is None, looks up slugs from partner_id via get_partner_agent_slug_map.
     Returns new list of product dicts (shallow copy with id/partner_id updated).
@@ -803,20 +932,40 @@ async def mask_products(
     if not products:
         return []
     client = get_supabase()
-    if not client:
+    token_mode = _token_masking_enabled()
+    if not client and not token_mode:
         return products
     if agent_slug_map is None:
         partner_ids = list({str(p.get("partner_id", "")) for p in products if p.get("partner_id")})
         agent_slug_map = await get_partner_agent_slug_map(partner_ids)
-    out = []
+
+    masked_ids: List[Optional[str]] = []
+    rows: List[Dict[str, Any]] = []
     for p in products:
         internal_id = str(p.get("id", ""))
+        partner_id = p.get("partner_id")
+        agent_slug = agent_slug_map.get(str(partner_id or "")) if partner_id else None
         if not internal_id:
+            masked_ids.append(None)
+        elif token_mode:
+            masked_ids.append(_encode_masked_id(internal_id, partner_id, source, agent_slug))
+        else:
+            row = _mask_id_row(internal_id, partner_id, source, agent_slug)
+            rows.append(row)
+            masked_ids.append(row["masked_id"])
+    if rows and client:
+        try:
+            await asyncio.to_thread(client.table("id_masking_map").insert(rows).execute)
+        except Exception:
+            masked_ids = [None] * len(products)
+
+    out = []
+    for p, masked in zip(products, masked_ids):
+        if not p.get("id"):
             out.append(dict(p))
             continue
-        partner_id = p.get("partner_id")
-        agent_slug = agent_slug_map.get(str(partner_id or "")) if partner_id else None
-        masked = _mask_id_insert(internal_id, partner_id, source, agent_slug)
+        if token_mode and not masked:
+            continue  # fail closed: never return an internal id in token mode
         if masked:
             new_p = {k: v for k, v in p.items() if k != "partner_id"}
             new_p["id"] = masked
@@ -879,11 +1028,11 @@ async def get_partners_by_ids(partner_ids: List[str]) -> Dict[str, Dict[str, Any
     if not client:
         return {}
     try:
-        result = (
+        result = await asyncio.to_thread(
             client.table("partners")
             .select("id, business_name, trust_score")
             .in_("id", partner_ids)
-            .execute()
+            .execute
         )
         return {str(r["id"]): r for r in _table_data(result.data)}
     except Exception:
@@ -955,11 +1104,11 @@ async def get_partner_ratings_map(partner_ids: List[str]) -> Dict[str, float]:
     if not client:
         return {}
     try:
-        result = (
+        result = await asyncio.to_thread(
             client.table("partner_ratings")
             .select("partner_id, avg_rating")
             .in_("partner_id", partner_ids)
-            .execute()
+            .execute
         )
         data = _table_data(result.data)
         return {str(r["partner_id"]): float(r.get("avg_rating") or 0) for r in data}
@@ -998,14 +1147,14 @@ async def get_active_sponsorships(product_ids: List[str]) -> set:
     try:
         from datetime import datetime, timezone
         now = datetime.now(timezone.utc).isoformat()
-        result = (
+        result = await asyncio.to_thread(
             client.table("product_sponsorships")
             .select("product_id")
             .in_("product_id", uuids)
             .eq("status", "active")
             .lte("start_at", now)
             .gte("end_at", now)
-            .execute()
+            .execute
         )
         return {str(r.get("product_id", "")) for r in _table_data(result.data) if r.get("product_id")}
     except Exception:
@@ -1028,27 +1177,127 @@ async def update_partner_last_acp_push(partner_id: str) -> bool:
         return False
 
 
-async def update_products_last_acp_push(product_ids: List[str], success: bool) -> bool:
-    """Set last_acp_push_at and last_acp_push_success for given products (for portal status)."""
-    if not product_ids:
+ACP_PUSH_ID_PAGE = 1000
+
+
+async def record_acp_push_results(succeeded: List[str], failed: Optional[List[str]] = None) -> bool:
+    """
+    Record an ACP push outcome for many products in one statement (RPC mark_products_acp_pushed). Without the
+    RPC: one bulk update per outcome. Neither touches acp_content_updated_at, so pushed rows stop being pending
+    and the feed snapshot marker is unchanged.
+    """
+    succeeded = _valid_uuids(succeeded or [])
+    failed = _valid_uuids(failed or [])
+    if not succeeded and not failed:
         return True
     client = get_supabase()
     if not client:
         return False
     try:
-        from datetime import datetime, timezone
+        rpc = client.rpc("mark_products_acp_pushed", {"p_succeeded": succeeded, "p_failed": failed})
+        await asyncio.to_thread(rpc.execute)
+        return True
+    except Exception:
+        pass
+    try:
         now = datetime.now(timezone.utc).isoformat()
-        for pid in product_ids:
-            client.table("products").update({
-                "last_acp_push_at": now,
-                "last_acp_push_success": success,
-                "updated_at": now,
-            }).eq("id", pid).execute()
+        for ids, success in ((succeeded, True), (failed, False)):
+            if ids:
+                q = client.table("products").update({"last_acp_push_at": now, "last_acp_push_success": success}).in_("id", ids)
+                await asyncio.to_thread(q.execute)
         return True
     except Exception:
         return False
 
 
+async def update_products_last_acp_push(product_ids: List[str], success: bool) -> bool:
+    """Set last_acp_push_at and last_acp_push_success for given products (for portal status)."""
+    if not product_ids:
+        return True
+    ok = True
+    for i in range(0, len(product_ids), ACP_PUSH_ID_PAGE):
+        chunk = product_ids[i : i + ACP_PUSH_ID_PAGE]
+        ok = await record_acp_push_results(chunk if success else [], [] if success else chunk) and ok
+    return ok
+
+
+async def get_acp_push_delta_ids(partner_id: str) -> Optional[List[str]]:
+    """
+    Ids of the partner's products pending an ACP push: never pushed, last push failed, or changed since
+    (RPC get_acp_push_delta, keyset pages). None when the RPC is unavailable.
+    """
+    client = get_supabase()
+    if not client or not _valid_uuids([partner_id]):
+        return None
+    ids: List[str] = []
+    after: Optional[str] = None
+    try:
+        while True:
+            rpc = client.rpc("get_acp_push_delta", {"p_partner_id": partner_id, "p_after_id": after, "p_limit": ACP_PUSH_ID_PAGE})
+            page = [str(r["id"]) for r in _table_data((await asyncio.to_thread(rpc.execute)).data) if r.get("id")]
+            ids.extend(page)
+            if len(page) < ACP_PUSH_ID_PAGE:
+                return ids
+            after = page[-1]
+    except Exception:
+        return None
+
+
+async def get_acp_push_status(partner_id: str) -> Optional[Dict[str, Any]]:
+    """Per-partner ACP push counts (total, pending, failed, never_pushed, last_pushed_at); None when unavailable."""
+    client = get_supabase()
+    if not client or not _valid_uuids([partner_id]):
+        return None
+    try:
+        result = await asyncio.to_thread(client.rpc("acp_push_status", {"p_partner_id": partner_id}).execute)
+        return _table_row(result.data)
+    except Exception:
+        return None
+
+
+_ACP_EXPORT_COLUMNS = (
+    "id, name, description, price, currency, capabilities, metadata, partner_id, "
+    "url, brand, image_url, is_eligible_search, is_eligible_checkout, target_countries, availability, experience_tags, "
+    "partners(business_name, seller_name, seller_url, return_policy_url, privacy_policy_url, terms_url, "
+    "store_country, target_countries)"
+)
+
+
+def _acp_export_query(
+    client: Any,
+    partner_id: Optional[str] = None,
+    product_id: Optional[str] = None,
+    product_ids: Optional[List[str]] = None,
+) -> Any:
+    """Products for ACP export with partner seller fields embedded (one query, no per-partner lookups)."""
+    q = client.table("products").select(_ACP_EXPORT_COLUMNS).is_("deleted_at", "null")
+    if partner_id:
+        q = q.eq("partner_id", partner_id)
+    if product_id:
+        q = q.eq("id", product_id)
+    elif product_ids:
+        q = q.in_("id", product_ids)
+    return q
+
+
+def _merge_acp_partner_fields(product: Dict[str, Any]) -> Dict[str, Any]:
+    """Product row with the embedded partner's seller_* fields merged in (embedded partners key removed)."""
+    row = dict(product)
+    partner = row.pop("partners", None)
+    if isinstance(partner, list):
+        partner = partner[0] if partner else None
+    if partner:
+        row["seller_name"] = partner.get("seller_name") or partner.get("business_name")
+        row["seller_url"] = partner.get("seller_url")
+        row["return_policy"] = partner.get("return_policy_url")
+        row["seller_privacy_policy"] = partner.get("privacy_policy_url")
+        row["seller_tos"] = partner.get("terms_url")
+        row["store_country"] = partner.get("store_country")
+        if partner.get("target_countries") is not None and "target_countries" not in row or row.get("target_countries") is None:
+            row["target_countries"] = partner.get("target_countries")
+    return row
+
+
 async def get_products_for_acp_export(
     partner_id: Optional[str] = None,
     product_id: Optional[str] = None,
@@ -1057,55 +1306,84 @@ async def get_products_for_acp_export(
     """
     Get products with partner seller fields joined for ACP feed building.
     Returns list of product dicts each with partner seller_* merged (seller_name, seller_url, etc.).
+    Full-catalog feeds should use iter_products_for_acp_export (keyset pages) instead.
     """
     client = get_supabase()
     if not client:
         return []
     try:
-        q = (
-            client.table("products")
-            .select(
-                "id, name, description, price, currency, capabilities, metadata, partner_id, "
-                "url, brand, image_url, is_eligible_search, is_eligible_checkout, target_countries, availability, experience_tags"
-            )
-            .is_("deleted_at", "null")
-        )
-        if partner_id:
-            q = q.eq("partner_id", partner_id)
-        if product_id:
-            q = q.eq("id", product_id)
-        elif product_ids:
-            q = q.in_("id", product_ids)
-        result = q.execute()
-        products = _table_data(result.data)
-        if not products:
-            return []
-        partner_ids = list({str(p["partner_id"]) for p in products if p.get("partner_id")})
-        partners_map = {}
-        for pid in partner_ids:
-            partner = await get_partner_by_id(pid)
-            if partner:
-                partners_map[pid] = partner
-        out = []
-        for p in products:
-            row = dict(p)
-            pid = str(p.get("partner_id", "")) if p.get("partner_id") else ""
-            partner = partners_map.get(pid) if pid else None
-            if partner:
-                row["seller_name"] = partner.get("seller_name") or partner.get("business_name")
-                row["seller_url"] = partner.get("seller_url")
-                row["return_policy"] = partner.get("return_policy_url")
-                row["seller_privacy_policy"] = partner.get("privacy_policy_url")
-                row["seller_tos"] = partner.get("terms_url")
-                row["store_country"] = partner.get("store_country")
-                if partner.get("target_countries") is not None and "target_countries" not in row or row.get("target_countries") is None:
-                    row["target_countries"] = partner.get("target_countries")
-            out.append(row)
-        return out
+        q = _acp_export_query(client, partner_id, product_id, product_ids)
+        result = await asyncio.to_thread(q.execute)
+        return [_merge_acp_partner_fields(p) for p in _table_data(result.data)]
     except Exception:
         return []
 
 
+async def iter_products_for_acp_export(
+    partner_id: Optional[str] = None,
+    page_size: int = 500,
+) -> AsyncIterator[List[Dict[str, Any]]]:
+    """
+    Yield pages of products (keyset pagination by id, partner seller fields merged) for streaming ACP feeds.
+    Unlike get_products_for_acp_export, query errors are raised: a feed must fail rather than end early.
+    """
+    client = get_supabase()
+    if not client:
+        return
+    after: Optional[str] = None
+    while True:
+        q = _acp_export_query(client, partner_id)
+        if after:
+            q = q.gt("id", after)
+        result = await asyncio.to_thread(q.order("id").limit(page_size).execute)
+        page = _table_data(result.data)
+        if page:
+            yield [_merge_acp_partner_fields(p) for p in page]
+        if len(page) < page_size:
+            return
+        after = str(page[-1]["id"])
+
+
+async def get_acp_feed_marker(partner_id: Optional[str] = None) -> Optional[str]:
+    """
+    Change marker for ACP feed snapshots: live product count + newest products.acp_content_updated_at (moves
+    only when a feed column changes, so embedding / tag / sold_count / push-status writes keep the snapshot)
+    + newest partners.updated_at (seller fields). Falls back to products.updated_at before that column exists.
+    None when unavailable (no client / query error).
+    """
+    client = get_supabase()
+    if not client:
+        return None
+
+    def newest_product() -> Any:
+        for column in ("acp_content_updated_at", "updated_at"):
+            q = client.table("products").select(column, count="exact").is_("deleted_at", "null")
+            if partner_id:
+                q = q.eq("partner_id", partner_id)
+            try:
+                result = q.order(column, desc=True, nullsfirst=False).limit(1).execute()
+            except Exception:
+                if column == "updated_at":
+                    raise
+                continue
+            row = _table_row(result.data) or {}
+            return result.count, row.get(column)
+
+    def newest_partner() -> Any:
+        q = client.table("partners").select("updated_at")
+        if partner_id:
+            q = q.eq("id", partner_id)
+        return q.order("updated_at", desc=True, nullsfirst=False).limit(1).execute()
+
+    try:
+        products, partners = await asyncio.gather(asyncio.to_thread(newest_product), asyncio.to_thread(newest_partner))
+    except Exception:
+        return None
+    count, newest = products
+    partner_row = _table_row(partners.data) or {}
+    return f"{count}|{newest}|{partner_row.get('updated_at')}"
+
+
 async def add_product_to_bundle(
     product_id: str,
     user_id: Optional[str] = None,
@@ -2056,6 +2334,43 @@ async def create_sla_re_sourcing_pending(leg_id: str, alternatives_snapshot: Lis
         return None
 
 
+SLA_PENDING_BULK_SIZE = 500
+
+
+async def get_sla_overdue_legs(limit: int = 5000) -> Optional[List[Dict[str, Any]]]:
+    """
+    Legs past their partner SLA in one query (RPC get_sla_overdue_legs): leg_id, thread_id, partner_id,
+    product_id, product_name, product_capabilities. None when the RPC is unavailable.
+    """
+    client = get_supabase()
+    if not client:
+        return None
+    try:
+        result = await asyncio.to_thread(client.rpc("get_sla_overdue_legs", {"p_limit": limit}).execute)
+        return [dict(r) for r in _table_data(result.data) if r.get("leg_id")]
+    except Exception:
+        return None
+
+
+async def create_sla_re_sourcing_pending_bulk(items: List[Dict[str, Any]]) -> Optional[List[str]]:
+    """
+    Store {leg_id, alternatives} snapshots and mark the legs awaiting_user_response, SLA_PENDING_BULK_SIZE
+    legs per statement (RPC create_sla_re_sourcing_pending_bulk). Returns the leg ids claimed (legs already
+    awaiting are skipped); None when the RPC is unavailable.
+    """
+    client = get_supabase()
+    if not client:
+        return None
+    claimed: List[str] = []
+    try:
+        for i in range(0, len(items), SLA_PENDING_BULK_SIZE):
+            rpc = client.rpc("create_sla_re_sourcing_pending_bulk", {"p_items": items[i : i + SLA_PENDING_BULK_SIZE]})
+            claimed.extend(str(r["leg_id"]) for r in _table_data((await asyncio.to_thread(rpc.execute)).data) if r.get("leg_id"))
+    except Exception:
+        return claimed or None
+    return claimed
+
+
 async def get_sla_re_sourcing_pending_by_thread(thread_id: str) -> Optional[Dict[str, Any]]:
     """Get pending SLA re-sourcing for thread (session -> legs -> pending)."""
     client = get_supabase()
@@ -2156,10 +2471,59 @@ async def get_agent_action_models() -> List[Dict[str, Any]]:
         return []
 
 
+def _legacy_product_row(partner_id: str, p: Dict[str, Any]) -> Dict[str, Any]:
+    """products row for one normalized Legacy Adapter product."""
+    metadata = dict(p.get("metadata") or {})
+    metadata["legacy_id"] = p.get("id") or ""
+    return {
+        "partner_id": partner_id,
+        "name": p.get("name") or "Unknown",
+        "description": p.get("description") or "",
+        "price": float(p.get("price", 0)),
+        "currency": p.get("currency", "USD"),
+        "capabilities": p.get("capabilities") or [],
+        "metadata": metadata,
+        "url": p.get("url"),
+        "brand": p.get("brand"),
+        "image_url": p.get("image_url"),
+        "availability": p.get("availability", "in_stock"),
+        "is_eligible_search": True,
+        "is_eligible_checkout": False,
+    }
+
+
+async def soft_delete_legacy_products(partner_id: str) -> None:
+    """Soft-delete the partner's live products imported by the Legacy Adapter (one UPDATE). Raises on error."""
+    client = get_supabase()
+    if not client:
+        raise RuntimeError("Database not configured")
+    now = datetime.now(timezone.utc).isoformat()
+    q = (
+        client.table("products")
+        .update({"deleted_at": now, "updated_at": now})
+        .eq("partner_id", partner_id)
+        .is_("deleted_at", "null")
+        .eq("metadata->>source", "legacy_adapter")
+    )
+    await asyncio.to_thread(q.execute)
+
+
+async def insert_legacy_products(partner_id: str, products: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    """Insert normalized Legacy Adapter products in one request; returns the inserted rows. Raises on error."""
+    if not products:
+        return []
+    client = get_supabase()
+    if not client:
+        raise RuntimeError("Database not configured")
+    q = client.table("products").insert([_legacy_product_row(partner_id, p) for p in products])
+    return _table_data((await asyncio.to_thread(q.execute)).data)
+
+
 async def upsert_products_from_legacy(
     partner_id: str,
     products: List[Dict[str, Any]],
     replace_legacy: bool = False,
+    chunk_size: int = 500,
 ) -> Dict[str, Any]:
     """
     Insert or upsert products from Legacy Adapter (Module 2).
@@ -2167,58 +2531,25 @@ async def upsert_products_from_legacy(
 
     replace_legacy: If True, soft-delete existing products with metadata.source='legacy_adapter'
     for this partner before inserting. Prevents duplicates on re-import.
+    Rows are inserted chunk_size per request; large files should go through legacy_ingest (streamed jobs).
     """
-    client = get_supabase()
-    if not client:
+    if not get_supabase():
         return {"inserted": 0, "updated": 0, "error": "Database not configured"}
 
+    inserted = 0
     try:
-        from datetime import datetime, timezone
-
-        now = datetime.now(timezone.utc).isoformat()
         if replace_legacy:
-            # Soft-delete existing legacy products for this partner
-            all_rows = (
-                client.table("products")
-                .select("id, metadata")
-                .eq("partner_id", partner_id)
-                .is_("deleted_at", "null")
-                .execute()
-            )
-            for row in _table_data(all_rows.data):
-                meta = row.get("metadata") or {}
-                if isinstance(meta, dict) and meta.get("source") == "legacy_adapter":
-                    client.table("products").update({
-                        "deleted_at": now,
-                        "updated_at": now,
-                    }).eq("id", row["id"]).execute()
-
-        inserted = 0
-        for p in products:
-            legacy_id = p.get("id") or ""
-            metadata = dict(p.get("metadata") or {})
-            metadata["legacy_id"] = legacy_id
-            row = {
-                "partner_id": partner_id,
-                "name": p.get("name") or "Unknown",
-                "description": p.get("description") or "",
-                "price": float(p.get("price", 0)),
-                "currency": p.get("currency", "USD"),
-                "capabilities": p.get("capabilities") or [],
-                "metadata": metadata,
-                "url": p.get("url"),
-                "brand": p.get("brand"),
-                "image_url": p.get("image_url"),
-                "availability": p.get("availability", "in_stock"),
-                "is_eligible_search": True,
-                "is_eligible_checkout": False,
-            }
-            client.table("products").insert(row).execute()
-            inserted += 1
-
+            await soft_delete_legacy_products(partner_id)
+        for i in range(0, len(products), max(1, chunk_size)):
+            chunk = products[i : i + max(1, chunk_size)]
+            await insert_legacy_products(partner_id, chunk)
+            inserted += len(chunk)
         return {"inserted": inserted, "updated": 0}
     except Exception as e:
-        return {"inserted": 0, "updated": 0, "error": str(e)}
+        return {"inserted": inserted, "updated": 0, "error": str(e)}
+    finally:
+        if inserted:
+            invalidate_result_cache("legacy products ingested")
 
 
 async def get_platform_manifest_config() -> Optional[Dict[str, Any]]:
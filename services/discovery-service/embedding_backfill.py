@@ -0,0 +1,295 @@
+"""
+Batched embedding backfill for products and partner KB articles (Module 1).
+
+Pages through rows missing an embedding with keyset pagination (id > checkpoint, ordered by id), embeds
+batch_size texts per API request with up to `concurrency` requests in flight, and writes each batch's
+vectors with one bulk_set_embeddings RPC. Page reads and writes are sync Supabase calls and run in worker
+threads, so a long job does not block discovery requests. After every page the job records a checkpoint (last
+id handled); pass it back as after_id to resume an interrupted run. Every vector is written with the provider's
+model-version tag (embedding_model); with reembed=True rows embedded by another model version are re-embedded
+too (untagged rows count as EMBEDDING_LEGACY_MODEL), so switching EMBEDDING_PROVIDER / EMBEDDING_MODEL is a
+resumable backfill rather than a manual reset. Jobs started in the background are tracked in-process
+and reported through /api/v1/admin/embeddings/backfill/jobs.
+"""
+
+import asyncio
+import logging
+import uuid
+from collections import OrderedDict
+from dataclasses import asdict, dataclass
+from datetime import datetime, timezone
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from db import get_supabase
+from semantic_search import (
+    _get_kb_article_embedding_input,
+    _get_product_embedding_input,
+    embed_texts,
+    embedding_model_version,
+    legacy_embedding_model_version,
+)
+from result_cache import invalidate_result_cache
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_BATCH_SIZE = 100  # texts per embeddings request
+DEFAULT_CONCURRENCY = 4  # embeddings requests in flight
+MAX_TRACKED_JOBS = 20
+
+# target -> (table, select columns, embedding input builder)
+_TARGETS: Dict[str, Tuple[str, str, Callable[[Dict[str, Any]], str]]] = {
+    "products": ("products", "id, name, description, description_kb, capabilities", _get_product_embedding_input),
+    "kb_articles": ("partner_kb_articles", "id, title, content", _get_kb_article_embedding_input),
+}
+
+
+@dataclass
+class BackfillJob:
+    """Progress of one backfill run. checkpoint is the last row id handled (resume with after_id=checkpoint)."""
+
+    id: str
+    target: str
+    limit: int
+    batch_size: int = DEFAULT_BATCH_SIZE
+    concurrency: int = DEFAULT_CONCURRENCY
+    reembed: bool = False  # also re-embed rows whose embedding_model differs from `model`
+    model: Optional[str] = None  # model-version tag written with the vectors
+    status: str = "pending"  # pending | running | completed | cancelled | failed
+    processed: int = 0
+    updated: int = 0
+    failed: int = 0
+    skipped: int = 0
+    checkpoint: Optional[str] = None
+    started_at: Optional[str] = None
+    finished_at: Optional[str] = None
+    error: Optional[str] = None
+    cancel_requested: bool = False
+
+    def to_dict(self) -> Dict[str, Any]:
+        out = asdict(self)
+        out.pop("cancel_requested", None)
+        # Keys returned by the original one-row-at-a-time backfill
+        out["updated_count"] = self.updated
+        out["failed_count"] = self.failed
+        out["skipped_count"] = self.skipped
+        out["total_processed"] = self.processed
+        return out
+
+
+_jobs: "OrderedDict[str, BackfillJob]" = OrderedDict()
+_tasks: Dict[str, asyncio.Task] = {}
+_bulk_rpc_available = True
+# PostgREST "function not found in schema cache" / Postgres undefined_function
+_MISSING_FUNCTION_CODES = ("PGRST202", "42883")
+
+
+def _now_iso() -> str:
+    return datetime.now(timezone.utc).isoformat()
+
+
+def _is_missing_function(error: Exception) -> bool:
+    code = str(getattr(error, "code", "") or "")
+    return code in _MISSING_FUNCTION_CODES or any(c in str(error) for c in _MISSING_FUNCTION_CODES)
+
+
+def _fetch_page(
+    client: Any,
+    target: str,
+    after_id: Optional[str],
+    page_size: int,
+    stale_model: Optional[str] = None,
+    legacy_model: Optional[str] = None,
+) -> List[Dict[str, Any]]:
+    """
+    Next page of rows missing an embedding (or, with stale_model, embedded by any other model version; untagged
+    rows count as legacy_model, so they are only re-embedded when that differs).
+    """
+    table, columns, _ = _TARGETS[target]
+    q = client.table(table).select(columns)
+    if stale_model:
+        untagged = "" if legacy_model == stale_model else "embedding_model.is.null,"
+        q = q.or_(f'embedding.is.null,{untagged}embedding_model.neq."{stale_model}"')
+    else:
+        q = q.is_("embedding", "null")
+    q = q.is_("deleted_at", "null") if target == "products" else q.eq("is_active", True)
+    if after_id:
+        q = q.gt("id", after_id)
+    result = q.order("id").limit(page_size).execute()
+    return [r for r in (result.data or []) if isinstance(r, dict) and r.get("id")]
+
+
+def _write_embeddings(client: Any, target: str, rows: List[Tuple[str, List[float]]], model: Optional[str] = None) -> int:
+    """
+    Bulk write via bulk_set_embeddings RPC; per-row updates when the RPC is not deployed (or this call failed).
+    Only a missing-function error disables the RPC for the process; timeouts and other errors retry it next batch.
+    """
+    global _bulk_rpc_available
+    if not rows:
+        return 0
+    table = _TARGETS[target][0]
+    items = [{"id": rid, "embedding": "[" + ",".join(str(float(x)) for x in vec) + "]"} for rid, vec in rows]
+    if _bulk_rpc_available:
+        try:
+            result = client.rpc("bulk_set_embeddings", {"p_target": table, "p_items": items, "p_model": model}).execute()
+            return int(result.data) if isinstance(result.data, int) else len(rows)
+        except Exception as e:
+            if _is_missing_function(e):
+                _bulk_rpc_available = False
+                logger.warning("bulk_set_embeddings RPC not deployed (%s); using per-row updates", e)
+            else:
+                logger.warning("bulk_set_embeddings RPC failed (%s); per-row updates for this batch", e)
+    written = 0
+    for item in items:
+        try:
+            client.table(table).update({"embedding": item["embedding"], "embedding_model": model}).eq("id", item["id"]).execute()
+            written += 1
+        except Exception as e:
+            logger.debug("Embedding update failed for %s %s: %s", table, item["id"], e)
+    return written
+
+
+async def _embed_batch(sem: asyncio.Semaphore, batch: List[Tuple[str, str]]) -> List[Tuple[str, Optional[List[float]]]]:
+    async with sem:
+        vectors = await embed_texts([text for _, text in batch])
+    return [(rid, vec) for (rid, _), vec in zip(batch, vectors)]
+
+
+async def embed_rows(
+    client: Any,
+    target: str,
+    rows: List[Dict[str, Any]],
+    model: Optional[str],
+    batch_size: int = DEFAULT_BATCH_SIZE,
+    concurrency: int = DEFAULT_CONCURRENCY,
+    sem: Optional[asyncio.Semaphore] = None,
+) -> Tuple[int, int, int]:
+    """Embed rows (id + the target's text columns) and bulk-write the vectors. Returns (updated, failed, skipped)."""
+    build_input = _TARGETS[target][2]
+    sem = sem or asyncio.Semaphore(max(1, concurrency))
+    items: List[Tuple[str, str]] = []
+    skipped = 0
+    for row in rows:
+        text = build_input(row)
+        if text:
+            items.append((str(row["id"]), text))
+        else:
+            skipped += 1
+    batch_size = max(1, batch_size)
+    batches = [items[i:i + batch_size] for i in range(0, len(items), batch_size)]
+    results = await asyncio.gather(*[_embed_batch(sem, b) for b in batches])
+    updated = failed = 0
+    for embedded in results:
+        ok_rows = [(rid, vec) for rid, vec in embedded if vec]
+        written = await asyncio.to_thread(_write_embeddings, client, target, ok_rows, model)
+        updated += written
+        failed += len(embedded) - written
+    if updated:
+        invalidate_result_cache("embeddings updated")
+    return updated, failed, skipped
+
+
+async def embed_product_rows(rows: List[Dict[str, Any]]) -> Optional[Tuple[int, int, int]]:
+    """
+    Embed freshly written product rows right away (e.g. one legacy ingest chunk) instead of waiting for a
+    backfill. Returns (updated, failed, skipped); None when no database or embedding provider is configured.
+    """
+    client = get_supabase()
+    model = embedding_model_version()
+    if not client or not model or not rows:
+        return None
+    return await embed_rows(client, "products", rows, model)
+
+
+async def run_backfill(job: BackfillJob) -> BackfillJob:
+    """Run job to completion (or until limit / cancel). Progress and checkpoint are updated after every page."""
+    client = get_supabase()
+    if not client:
+        job.status, job.error = "failed", "no_db"
+        return job
+    if job.target not in _TARGETS:
+        job.status, job.error = "failed", f"unknown target {job.target}"
+        return job
+    job.model = job.model or embedding_model_version()
+    if not job.model:
+        job.status, job.error = "failed", "embedding_not_configured"
+        return job
+    job.status, job.started_at = "running", job.started_at or _now_iso()
+    sem = asyncio.Semaphore(max(1, job.concurrency))
+    page_size = max(1, job.batch_size) * max(1, job.concurrency)
+    try:
+        while job.processed < job.limit and not job.cancel_requested:
+            page = await asyncio.to_thread(
+                _fetch_page,
+                client, job.target, job.checkpoint, min(page_size, job.limit - job.processed),
+                job.model if job.reembed else None,
+                legacy_embedding_model_version(),
+            )
+            if not page:
+                break
+            updated, failed, skipped = await embed_rows(client, job.target, page, job.model, job.batch_size, sem=sem)
+            job.updated += updated
+            job.failed += failed
+            job.skipped += skipped
+            job.processed += len(page)
+            job.checkpoint = str(page[-1]["id"])
+            logger.info(
+                "Embedding backfill %s (%s): processed=%s updated=%s failed=%s checkpoint=%s",
+                job.id, job.target, job.processed, job.updated, job.failed, job.checkpoint,
+            )
+        job.status = "cancelled" if job.cancel_requested else "completed"
+    except Exception as e:
+        logger.warning("Embedding backfill %s failed at checkpoint %s: %s", job.id, job.checkpoint, e)
+        job.status, job.error = "failed", str(e)
+    job.finished_at = _now_iso()
+    return job
+
+
+def create_job(
+    target: str,
+    limit: int,
+    batch_size: int = DEFAULT_BATCH_SIZE,
+    concurrency: int = DEFAULT_CONCURRENCY,
+    after_id: Optional[str] = None,
+    reembed: bool = False,
+) -> BackfillJob:
+    """Register a new job (oldest finished jobs are dropped beyond MAX_TRACKED_JOBS)."""
+    job = BackfillJob(
+        id=str(uuid.uuid4()),
+        target=target,
+        limit=max(1, limit),
+        batch_size=max(1, batch_size),
+        concurrency=max(1, concurrency),
+        reembed=reembed,
+        checkpoint=after_id or None,
+    )
+    _jobs[job.id] = job
+    while len(_jobs) > MAX_TRACKED_JOBS:
+        oldest = next((jid for jid, j in _jobs.items() if j.status not in ("pending", "running")), None)
+        if oldest is None:
+            break
+        _jobs.pop(oldest, None)
+    return job
+
+
+def start_backfill_job(job: BackfillJob) -> BackfillJob:
+    """Run job in the background; poll get_job(job.id) for progress."""
+    task = asyncio.create_task(run_backfill(job))
+    _tasks[job.id] = task
+    task.add_done_callback(lambda _t, jid=job.id: _tasks.pop(jid, None))
+    return job
+
+
+def get_job(job_id: str) -> Optional[BackfillJob]:
+    return _jobs.get(job_id)
+
+
+def list_jobs() -> List[BackfillJob]:
+    return list(reversed(_jobs.values()))
+
+
+def cancel_job(job_id: str) -> Optional[BackfillJob]:
+    """Stop after the current page; the checkpoint stays valid for resuming."""
+    job = _jobs.get(job_id)
+    if job is not None and job.status in ("pending", "running"):
+        job.cancel_requested = True
+    return job
@@ -0,0 +1,140 @@
+"""
+Query-embedding cache for semantic search.
+
+Two tiers keyed by provider + model + normalized query text:
+- In-process LRU + TTL (AsyncTTLCache) with single-flight, so concurrent identical queries make one API call.
+- Optional persistent tier in Postgres (query_embedding_cache table), shared across workers and restarts.
+  Enabled with EMBEDDING_CACHE_PERSISTENT=true. Its reads and writes are sync Supabase calls and run in a
+  worker thread.
+
+Normalization only shapes the key; the provider embeds the query as the user typed it (the first spelling
+seen for a key is the one cached).
+
+Only search queries go through this cache; product / KB article backfill embeds unique text and calls the
+embedding API directly.
+"""
+
+import asyncio
+import hashlib
+import json
+import logging
+import re
+from datetime import datetime, timedelta, timezone
+from typing import Any, Awaitable, Callable, List, Optional
+
+from config import settings
+from db import get_supabase
+from packages.shared.ttl_cache import AsyncTTLCache
+
+logger = logging.getLogger(__name__)
+
+_TABLE = "query_embedding_cache"
+
+_cache = AsyncTTLCache(
+    name="query_embeddings",
+    max_entries=getattr(settings, "embedding_cache_max_entries", 2048),
+    ttl=getattr(settings, "embedding_cache_ttl_sec", 86400),
+)
+
+
+def normalize_query_text(text: str) -> str:
+    """Lower-case and collapse whitespace so 'Date  Night' and 'date night' share an embedding."""
+    return re.sub(r"\s+", " ", (text or "").strip().lower())
+
+
+def embedding_cache_key(text: str, provider: str, model: str) -> str:
+    """Stable key: sha256 of provider, model and normalized text."""
+    raw = f"{provider}:{model}:{normalize_query_text(text)}"
+    return hashlib.sha256(raw.encode("utf-8")).hexdigest()
+
+
+def _parse_vector(value: Any) -> Optional[List[float]]:
+    """pgvector comes back from PostgREST as '[0.1,0.2,...]'; accept a list too."""
+    if isinstance(value, str):
+        try:
+            value = json.loads(value)
+        except ValueError:
+            return None
+    if not isinstance(value, list) or not value:
+        return None
+    try:
+        return [float(x) for x in value]
+    except (TypeError, ValueError):
+        return None
+
+
+def _load_persistent(key: str) -> Optional[List[float]]:
+    client = get_supabase()
+    if not client:
+        return None
+    cutoff = (datetime.now(timezone.utc) - timedelta(seconds=getattr(settings, "embedding_cache_ttl_sec", 86400))).isoformat()
+    try:
+        result = (
+            client.table(_TABLE)
+            .select("embedding")
+            .eq("cache_key", key)
+            .gte("created_at", cutoff)
+            .limit(1)
+            .execute()
+        )
+        rows = result.data or []
+    except Exception as e:
+        logger.debug("Embedding cache read failed: %s", e)
+        return None
+    return _parse_vector(rows[0].get("embedding")) if rows and isinstance(rows[0], dict) else None
+
+
+def _store_persistent(key: str, text: str, provider: str, model: str, embedding: List[float]) -> None:
+    client = get_supabase()
+    if not client:
+        return
+    try:
+        client.table(_TABLE).upsert(
+            {
+                "cache_key": key,
+                "provider": provider,
+                "model": model,
+                "query_text": normalize_query_text(text)[:500],
+                "embedding": "[" + ",".join(str(float(x)) for x in embedding) + "]",
+                "created_at": datetime.now(timezone.utc).isoformat(),
+            },
+            on_conflict="cache_key",
+        ).execute()
+    except Exception as e:
+        logger.debug("Embedding cache write failed: %s", e)
+
+
+async def get_cached_embedding(
+    text: str,
+    provider: str,
+    model: str,
+    embed_fn: Callable[[str], Awaitable[Optional[List[float]]]],
+) -> Optional[List[float]]:
+    """
+    Embedding for a search query: memory tier, then persistent tier (when enabled), then embed_fn(text).
+    Failures (None) are not cached.
+    """
+    key = embedding_cache_key(text, provider, model)
+    persistent = getattr(settings, "embedding_cache_persistent", False)
+
+    async def _load() -> Optional[List[float]]:
+        if persistent:
+            vec = await asyncio.to_thread(_load_persistent, key)
+            if vec is not None:
+                return vec
+        vec = await embed_fn(text)
+        if vec is not None and persistent:
+            await asyncio.to_thread(_store_persistent, key, text, provider, model, vec)
+        return vec
+
+    return await _cache.get_or_load(key, _load)
+
+
+def embedding_cache_stats() -> dict:
+    """In-process tier counters (hits, misses, coalesced, entries)."""
+    return {**_cache.stats(), "persistent": bool(getattr(settings, "embedding_cache_persistent", False))}
+
+
+def clear_embedding_cache() -> int:
+    """Drop the in-process tier (e.g. after switching embedding model). Returns entries removed."""
+    return _cache.invalidate()
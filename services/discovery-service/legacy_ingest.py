@@ -0,0 +1,255 @@
+"""
+Streaming Legacy Adapter ingest (Module 2): CSV, Excel and JSON partner feeds as resumable jobs.
+
+The upload is spooled to LEGACY_INGEST_DIR, then read row by row (adapters.legacy_adapter.iter_legacy_rows),
+normalized with normalize_legacy_product and inserted chunk_size products per request, so memory stays at one
+chunk whatever the file size. Parsing runs in a worker thread one chunk at a time. After every chunk the job
+records a checkpoint (source rows consumed); a failed or cancelled job keeps its file and resumes after the
+checkpoint. With embed=True each inserted chunk is embedded right away (embedding_backfill.embed_product_rows).
+Jobs are tracked in-process and reported through /api/v1/admin/legacy/ingest/jobs.
+"""
+
+import asyncio
+import logging
+import os
+import tempfile
+import uuid
+from collections import OrderedDict
+from dataclasses import asdict, dataclass, field
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+from fastapi import UploadFile
+
+from adapters.legacy_adapter import detect_legacy_format, iter_legacy_rows, normalize_legacy_product
+from config import settings
+from db import insert_legacy_products, soft_delete_legacy_products
+from embedding_backfill import embed_product_rows
+from result_cache import invalidate_result_cache
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_CHUNK_SIZE = max(1, getattr(settings, "legacy_ingest_chunk_size", 500))
+MAX_TRACKED_JOBS = 20
+UPLOAD_READ_SIZE = 1024 * 1024
+
+
+@dataclass
+class IngestJob:
+    """Progress of one ingest. checkpoint = source rows consumed and committed (resume restarts after it)."""
+
+    id: str
+    partner_id: str
+    filename: str
+    format: str
+    chunk_size: int = DEFAULT_CHUNK_SIZE
+    replace_legacy: bool = False
+    embed: bool = False
+    column_map: Optional[Dict[str, str]] = None
+    status: str = "pending"  # pending | running | completed | cancelled | failed
+    bytes: int = 0
+    inserted: int = 0
+    skipped: int = 0  # rows without a product name
+    chunks: int = 0
+    embedded: int = 0
+    embed_failed: int = 0
+    checkpoint: int = 0
+    replaced: bool = False  # replace_legacy soft-delete done (not repeated on resume)
+    started_at: Optional[str] = None
+    finished_at: Optional[str] = None
+    error: Optional[str] = None
+    preview: List[Dict[str, Any]] = field(default_factory=list)
+    path: Optional[str] = None
+    cancel_requested: bool = False
+
+    def to_dict(self) -> Dict[str, Any]:
+        out = asdict(self)
+        for key in ("path", "cancel_requested"):
+            out.pop(key, None)
+        out["resumable"] = self.status in ("failed", "cancelled") and bool(self.path)
+        return out
+
+
+_jobs: "OrderedDict[str, IngestJob]" = OrderedDict()
+_tasks: Dict[str, asyncio.Task] = {}
+
+
+def _now_iso() -> str:
+    return datetime.now(timezone.utc).isoformat()
+
+
+def _upload_dir() -> Path:
+    return Path(getattr(settings, "legacy_ingest_dir", "") or os.path.join(tempfile.gettempdir(), "legacy_ingest"))
+
+
+def _remove_file(job: IngestJob) -> None:
+    if job.path:
+        try:
+            os.unlink(job.path)
+        except OSError:
+            pass
+        job.path = None
+
+
+async def spool_upload(file: UploadFile) -> Tuple[str, int, bytes]:
+    """Copy the upload to LEGACY_INGEST_DIR in fixed-size reads. Returns (path, size, first bytes)."""
+    directory = _upload_dir()
+    directory.mkdir(parents=True, exist_ok=True)
+    fd, path = tempfile.mkstemp(prefix="ingest_", dir=directory)
+    size, head = 0, b""
+    with os.fdopen(fd, "wb") as f:
+        while True:
+            data = await file.read(UPLOAD_READ_SIZE)
+            if not data:
+                break
+            if not head:
+                head = data[:64]
+            await asyncio.to_thread(f.write, data)
+            size += len(data)
+    return path, size, head
+
+
+def create_job(
+    partner_id: str,
+    path: str,
+    filename: str,
+    size: int,
+    head: bytes,
+    chunk_size: int = DEFAULT_CHUNK_SIZE,
+    replace_legacy: bool = False,
+    embed: bool = False,
+    column_map: Optional[Dict[str, str]] = None,
+) -> IngestJob:
+    """Register a job for a spooled upload (oldest finished jobs and their files are dropped beyond MAX_TRACKED_JOBS)."""
+    job = IngestJob(
+        id=str(uuid.uuid4()),
+        partner_id=partner_id,
+        filename=filename,
+        format=detect_legacy_format(filename, head),
+        chunk_size=max(1, chunk_size),
+        replace_legacy=replace_legacy,
+        embed=embed,
+        column_map=column_map,
+        bytes=size,
+        path=path,
+    )
+    _jobs[job.id] = job
+    while len(_jobs) > MAX_TRACKED_JOBS:
+        oldest = next((jid for jid, j in _jobs.items() if j.status not in ("pending", "running")), None)
+        if oldest is None:
+            break
+        _remove_file(_jobs.pop(oldest))
+    return job
+
+
+def _next_chunk(rows: Iterator[Dict[str, Any]], job: IngestJob) -> Tuple[List[Dict[str, Any]], int, bool]:
+    """Read source rows until chunk_size products are collected. Returns (products, rows consumed, end of file)."""
+    products: List[Dict[str, Any]] = []
+    consumed = 0
+    for row in rows:
+        consumed += 1
+        p = normalize_legacy_product(row, job.column_map)
+        if p.get("name"):
+            products.append(p)
+            if len(products) >= job.chunk_size:
+                return products, consumed, False
+    return products, consumed, True
+
+
+def _open_rows(job: IngestJob) -> Tuple[Any, Iterator[Dict[str, Any]]]:
+    """Open the spooled file and skip the rows already committed (checkpoint)."""
+    f = open(job.path or "", "rb")
+    try:
+        rows = iter_legacy_rows(f, job.format)
+        for _ in range(job.checkpoint):
+            if next(rows, None) is None:
+                break
+    except Exception:
+        f.close()
+        raise
+    return f, rows
+
+
+async def run_ingest(job: IngestJob) -> IngestJob:
+    """Run job to completion (or until cancelled / failed). Progress and checkpoint are updated after every chunk."""
+    if not job.path or not os.path.exists(job.path):
+        job.status, job.error = "failed", "upload file no longer available"
+        return job
+    job.status, job.started_at, job.error = "running", job.started_at or _now_iso(), None
+    job.cancel_requested = False
+    f = None
+    try:
+        f, rows = await asyncio.to_thread(_open_rows, job)
+        if job.replace_legacy and not job.replaced:
+            await soft_delete_legacy_products(job.partner_id)
+            job.replaced = True
+        done = False
+        while not done and not job.cancel_requested:
+            products, consumed, done = await asyncio.to_thread(_next_chunk, rows, job)
+            inserted = await insert_legacy_products(job.partner_id, products) if products else []
+            job.inserted += len(products)
+            job.skipped += consumed - len(products)
+            job.checkpoint += consumed
+            job.chunks += 1 if products else 0
+            if len(job.preview) < 3:
+                job.preview.extend(products[: 3 - len(job.preview)])
+            logger.info(
+                "Legacy ingest %s (partner %s): rows=%s inserted=%s skipped=%s",
+                job.id, job.partner_id, job.checkpoint, job.inserted, job.skipped,
+            )
+            if job.embed and inserted:
+                try:
+                    counts = await embed_product_rows(inserted)
+                except Exception as e:  # rows are committed; a backfill can embed them later
+                    logger.warning("Legacy ingest %s: embedding chunk failed: %s", job.id, e)
+                    counts = (0, len(inserted), 0)
+                if counts:
+                    job.embedded += counts[0]
+                    job.embed_failed += counts[1]
+        job.status = "cancelled" if job.cancel_requested and not done else "completed"
+    except Exception as e:
+        logger.warning("Legacy ingest %s failed at checkpoint %s: %s", job.id, job.checkpoint, e)
+        job.status, job.error = "failed", str(e)
+    finally:
+        if f is not None:
+            f.close()
+    if job.inserted:
+        invalidate_result_cache("legacy products ingested")
+    if job.status == "completed":
+        _remove_file(job)
+    job.finished_at = _now_iso()
+    return job
+
+
+def start_ingest_job(job: IngestJob) -> IngestJob:
+    """Run job in the background; poll get_job(job.id) for progress."""
+    task = asyncio.create_task(run_ingest(job))
+    _tasks[job.id] = task
+    task.add_done_callback(lambda _t, jid=job.id: _tasks.pop(jid, None))
+    return job
+
+
+def resume_job(job_id: str) -> Optional[IngestJob]:
+    """Restart a failed or cancelled job in the background after its checkpoint; None if not resumable."""
+    job = _jobs.get(job_id)
+    if job is None or job.status not in ("failed", "cancelled") or not job.path:
+        return None
+    job.status = "pending"
+    return start_ingest_job(job)
+
+
+def get_job(job_id: str) -> Optional[IngestJob]:
+    return _jobs.get(job_id)
+
+
+def list_jobs() -> List[IngestJob]:
+    return list(reversed(_jobs.values()))
+
+
+def cancel_job(job_id: str) -> Optional[IngestJob]:
+    """Stop after the current chunk; the file and checkpoint are kept for resume."""
+    job = _jobs.get(job_id)
+    if job is not None and job.status in ("pending", "running"):
+        job.cancel_requested = True
+    return job
@@ -0,0 +1,213 @@
+"""
+Local replica of product embeddings for semantic search (LOCAL_VECTOR_INDEX_ENABLED=true).
+
+At startup a background task pages every product with an embedding into a packages.shared.vector_index
+VectorIndex. It then polls products.updated_at every LOCAL_VECTOR_INDEX_REFRESH_SEC: changed rows are
+upserted, and soft-deleted rows, rows without an embedding and rows embedded by another model than the
+configured one (embedding_model, see semantic_search.embedding_model_version; NULL counts as the legacy model)
+are dropped, so a query vector
+is only scored against comparable vectors, also mid re-embed backfill. semantic_search answers from
+the replica once it is ready and falls back to pgvector (match_products_v2) until then, or when NumPy
+is missing or the catalog exceeds LOCAL_VECTOR_INDEX_MAX_PRODUCTS.
+"""
+
+import asyncio
+import json
+import logging
+from datetime import datetime, timedelta, timezone
+from typing import Any, Dict, List, Optional, Tuple
+
+from config import settings
+from db import get_supabase
+from packages.shared.vector_index import VectorIndex
+
+logger = logging.getLogger(__name__)
+
+PAYLOAD_COLUMNS = ("id", "name", "description", "price", "currency", "capabilities", "metadata", "partner_id", "created_at", "sold_count", "experience_tags")
+_SELECT = ", ".join(PAYLOAD_COLUMNS) + ", embedding, embedding_model"
+PAGE_SIZE = 500
+# Re-read rows updated slightly before the last sync so clock skew between app and DB cannot hide a change
+_SYNC_OVERLAP = timedelta(seconds=5)
+
+_index: Optional[VectorIndex] = None
+_ready = False
+_last_sync: Optional[datetime] = None
+_last_error: Optional[str] = None
+_task: Optional[asyncio.Task] = None
+
+
+def _parse_embedding(value: Any) -> Optional[List[float]]:
+    if isinstance(value, str):
+        try:
+            value = json.loads(value)
+        except ValueError:
+            return None
+    return value if isinstance(value, list) and value else None
+
+
+def _payload(row: Dict[str, Any]) -> Dict[str, Any]:
+    return {k: row.get(k) for k in PAYLOAD_COLUMNS if k in row}
+
+
+def _fetch_page(after_id: Optional[str]) -> List[Dict[str, Any]]:
+    client = get_supabase()
+    if not client:
+        return []
+    q = client.table("products").select(_SELECT).is_("deleted_at", "null").not_.is_("embedding", "null")
+    if after_id:
+        q = q.gt("id", after_id)
+    return list(q.order("id").limit(PAGE_SIZE).execute().data or [])
+
+
+def _fetch_changed(since: datetime, after_id: Optional[str]) -> List[Dict[str, Any]]:
+    client = get_supabase()
+    if not client:
+        return []
+    q = client.table("products").select(_SELECT + ", deleted_at").gte("updated_at", since.isoformat())
+    if after_id:
+        q = q.gt("id", after_id)
+    return list(q.order("id").limit(PAGE_SIZE).execute().data or [])
+
+
+def _current_models() -> Tuple[Optional[str], Optional[str]]:
+    """(configured model tag, tag assumed for untagged vectors)."""
+    from semantic_search import embedding_model_version, legacy_embedding_model_version  # imports this module
+
+    return embedding_model_version(), legacy_embedding_model_version()
+
+
+def _apply(
+    index: VectorIndex, rows: List[Dict[str, Any]], model: Optional[str], legacy_model: Optional[str] = None
+) -> None:
+    for row in rows:
+        pid = row.get("id")
+        if not pid:
+            continue
+        emb = _parse_embedding(row.get("embedding"))
+        if (
+            row.get("deleted_at")
+            or not emb
+            or (row.get("embedding_model") or legacy_model) != model
+            or not index.upsert(str(pid), emb, _payload(row))
+        ):
+            index.remove(str(pid))
+
+
+async def build_local_vector_index() -> bool:
+    """Full load (keyset pages, fetched off the event loop). Returns True when the replica is ready."""
+    global _index, _ready, _last_sync, _last_error
+    if not VectorIndex.available():
+        _last_error = "numpy not installed"
+        logger.warning("Local vector index disabled: numpy not installed")
+        return False
+    started = datetime.now(timezone.utc)
+    index = VectorIndex()
+    model, legacy_model = _current_models()
+    max_products = getattr(settings, "local_vector_index_max_products", 100000)
+    after: Optional[str] = None
+    while True:
+        rows = await asyncio.to_thread(_fetch_page, after)
+        if not rows:
+            break
+        await asyncio.to_thread(_apply, index, rows, model, legacy_model)
+        after = str(rows[-1]["id"])
+        if len(index) > max_products:
+            _last_error = f"catalog exceeds LOCAL_VECTOR_INDEX_MAX_PRODUCTS={max_products}"
+            logger.warning("Local vector index disabled: %s", _last_error)
+            return False
+    _index, _ready, _last_sync, _last_error = index, True, started, None
+    logger.info("Local vector index ready: %s products in %.1fs", len(index), (datetime.now(timezone.utc) - started).total_seconds())
+    return True
+
+
+async def refresh_local_vector_index() -> int:
+    """Apply rows changed since the last sync. Returns number of rows read."""
+    global _last_sync
+    if _index is None or _last_sync is None:
+        return 0
+    started = datetime.now(timezone.utc)
+    since = _last_sync - _SYNC_OVERLAP
+    model, legacy_model = _current_models()
+    after: Optional[str] = None
+    seen = 0
+    while True:
+        rows = await asyncio.to_thread(_fetch_changed, since, after)
+        if not rows:
+            break
+        await asyncio.to_thread(_apply, _index, rows, model, legacy_model)
+        seen += len(rows)
+        after = str(rows[-1]["id"])
+    _last_sync = started
+    if seen:
+        logger.info("Local vector index refresh: %s changed product(s)", seen)
+    return seen
+
+
+async def _run() -> None:
+    global _last_error
+    interval = max(5, getattr(settings, "local_vector_index_refresh_sec", 60))
+    try:
+        if not await build_local_vector_index():
+            return
+    except Exception as e:
+        _last_error = str(e)
+        logger.warning("Local vector index build failed; semantic search stays on pgvector: %s", e)
+        return
+    while True:
+        await asyncio.sleep(interval)
+        try:
+            await refresh_local_vector_index()
+        except Exception as e:
+            _last_error = str(e)
+            logger.warning("Local vector index refresh failed: %s", e)
+
+
+def start_local_vector_index() -> None:
+    """Start build + refresh loop in the background when LOCAL_VECTOR_INDEX_ENABLED (no-op otherwise)."""
+    global _task
+    if not getattr(settings, "local_vector_index_enabled", False) or _task is not None:
+        return
+    _task = asyncio.create_task(_run())
+
+
+async def stop_local_vector_index() -> None:
+    global _task
+    if _task is not None:
+        _task.cancel()
+        try:
+            await _task
+        except asyncio.CancelledError:
+            pass
+        _task = None
+
+
+def search_local_index(
+    embedding: List[float],
+    limit: int,
+    threshold: float,
+    partner_id: Optional[str] = None,
+    exclude_partner_id: Optional[str] = None,
+    experience_tags: Optional[List[str]] = None,
+) -> Optional[List[Dict[str, Any]]]:
+    """Products from the replica, best first; None when the replica is not ready (caller uses pgvector)."""
+    if not _ready or _index is None:
+        return None
+    hits = _index.search(
+        embedding,
+        k=limit,
+        threshold=threshold,
+        partner_id=partner_id,
+        exclude_partner_id=exclude_partner_id,
+        experience_tags=experience_tags,
+    )
+    return [payload for payload, _ in hits]
+
+
+def local_vector_index_stats() -> Dict[str, Any]:
+    return {
+        "enabled": bool(getattr(settings, "local_vector_index_enabled", False)),
+        "ready": _ready,
+        "last_sync": _last_sync.isoformat() if _last_sync else None,
+        "last_error": _last_error,
+        **(_index.stats() if _index is not None else {}),
+    }
@@ -2,6 +2,7 @@
 
 import logging
 import sys
+from contextlib import asynccontextmanager
 from pathlib import Path
 
 # Add shared package and parent to path
@@ -42,11 +43,37 @@ from api.experience_sessions import router as experience_sessions_router
 from api.design_chat import router as design_chat_router
 from api.sla import router as sla_router
 from webhooks.inventory_webhook import router as webhooks_router
+from manifest_cache import record_ucp_manifest_fetch
+from packages.shared.ucp_manifest_cache import get_manifest_cache
+from packages.shared.http_clients import http_client_lifespan
+from local_vector_index import start_local_vector_index, stop_local_vector_index
+from config_snapshot import get_config_store
+from middleware.metadata_enricher import stop_background_enrichment
+from ranking_context import start_ranking_context, stop_ranking_context
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """Load the config snapshot, start ranking context / optional local vector index; close shared HTTP pools on shutdown."""
+    await get_config_store().refresh()
+    get_config_store().start()
+    start_ranking_context()
+    start_local_vector_index()
+    try:
+        async with http_client_lifespan(app):
+            yield
+    finally:
+        await stop_local_vector_index()
+        await stop_ranking_context()
+        await stop_background_enrichment()
+        await get_config_store().stop()
+
 
 app = FastAPI(
     title="Discovery Service",
     description="Module 1: Multi-Protocol Scout Engine",
     version="0.1.0",
+    lifespan=lifespan,
 )
 
 # Middleware
@@ -80,6 +107,9 @@ app.include_router(design_chat_router)
 app.include_router(sla_router)
 app.include_router(webhooks_router)
 
+# UCP manifests: in-process cache on the discovery hot path, validators persisted to manifest_cache
+get_manifest_cache().on_store = record_ucp_manifest_fetch
+
 # Health checks (per 07-project-operations.md)
 health_checker = HealthChecker("discovery-service", "0.1.0")
 
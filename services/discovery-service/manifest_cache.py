@@ -1,13 +1,19 @@
-"""Cache partner manifest files in Supabase (Module 1)."""
+"""Cache partner manifest files in Supabase (Module 1).
 
+The discovery hot path keeps UCP manifests in the in-process cache (packages.shared.ucp_manifest_cache);
+record_ucp_manifest_fetch records its fetches (TTL, hit count) in the same manifest_cache table used here. It does
+not store the hot path's ETag / Last-Modified: the body is not persisted, so fetch_manifest must not replay them.
+"""
+
+import asyncio
 import json
 from datetime import datetime, timedelta
 from typing import Any, Dict, List, Optional
 
-import httpx
-
 from config import settings
 from db import get_supabase
+from packages.shared.http_clients import get_http_client
+from result_cache import invalidate_result_cache
 
 
 DEFAULT_TTL_SECONDS = 3600
@@ -39,43 +45,76 @@ async def fetch_manifest(url: str) -> Optional[Dict[str, Any]]:
             headers["If-Modified-Since"] = cache_row.data["last_modified"]
 
     try:
-        async with httpx.AsyncClient(timeout=30.0) as http:
-            resp = await http.get(url, headers=headers or None)
-            if resp.status_code == 304:
-                # Use cached data from partner_manifests
-                return _get_cached_manifest_data(client, url)
-            if resp.status_code != 200:
+        resp = await get_http_client(url).get(url, headers=headers or None, timeout=30.0)
+        if resp.status_code == 304:
+            # Use cached data from partner_manifests; without a stored body, fetch it again unconditionally
+            cached = _get_cached_manifest_data(client, url)
+            if cached is not None:
+                return cached
+            resp = await get_http_client(url).get(url, timeout=30.0)
+        if resp.status_code != 200:
+            return None
+
+        data = resp.json() if resp.headers.get("content-type", "").startswith("application/json") else None
+        if data is None:
+            # Try JSONL (one JSON per line)
+            try:
+                lines = resp.text.strip().split("\n")
+                data = [json.loads(ln) for ln in lines if ln]
+            except Exception:
                 return None
 
-            data = resp.json() if resp.headers.get("content-type", "").startswith("application/json") else None
-            if data is None:
-                # Try JSONL (one JSON per line)
-                try:
-                    lines = resp.text.strip().split("\n")
-                    data = [json.loads(ln) for ln in lines if ln]
-                except Exception:
-                    return None
-
-            # Update cache metadata
-            etag = resp.headers.get("etag")
-            last_modified = resp.headers.get("last-modified")
-            client.table("manifest_cache").upsert(
-                {
-                    "manifest_url": url,
-                    "etag": etag,
-                    "last_modified": last_modified,
-                    "cached_at": datetime.utcnow().isoformat(),
-                    "hit_count": (cache_row.data.get("hit_count") or 0) + 1 if cache_row.data else 1,
-                    "last_hit_at": datetime.utcnow().isoformat(),
-                },
-                on_conflict="manifest_url",
-            ).execute()
-
-            return data
+        # Update cache metadata
+        etag = resp.headers.get("etag")
+        last_modified = resp.headers.get("last-modified")
+        client.table("manifest_cache").upsert(
+            {
+                "manifest_url": url,
+                "etag": etag,
+                "last_modified": last_modified,
+                "cached_at": datetime.utcnow().isoformat(),
+                "hit_count": (cache_row.data.get("hit_count") or 0) + 1 if cache_row.data else 1,
+                "last_hit_at": datetime.utcnow().isoformat(),
+            },
+            on_conflict="manifest_url",
+        ).execute()
+
+        return data
     except Exception:
         return None
 
 
+async def record_ucp_manifest_fetch(entry: Any) -> None:
+    """
+    on_store hook for the in-process UCP manifest cache: upsert TTL / hit count into manifest_cache for the
+    admin view. Validators are left alone (an existing row keeps fetch_manifest's own), since a 304 against them
+    needs a stored body in partner_manifests that the hot path never writes.
+    """
+    client = get_supabase()
+    if not client or not getattr(entry, "manifest_url", None):
+        return
+    existing = await asyncio.to_thread(
+        client.table("manifest_cache")
+        .select("hit_count")
+        .eq("manifest_url", entry.manifest_url)
+        .limit(1)
+        .execute
+    )
+    rows = existing.data if isinstance(existing.data, list) else []
+    hit_count = (rows[0].get("hit_count") or 0) if rows and isinstance(rows[0], dict) else 0
+    upsert = client.table("manifest_cache").upsert(
+        {
+            "manifest_url": entry.manifest_url,
+            "cache_ttl": int(entry.ttl),
+            "cached_at": entry.cached_at or datetime.utcnow().isoformat(),
+            "hit_count": hit_count + 1,
+            "last_hit_at": datetime.utcnow().isoformat(),
+        },
+        on_conflict="manifest_url",
+    )
+    await asyncio.to_thread(upsert.execute)
+
+
 def _get_cached_manifest_data(client, url: str) -> Optional[Dict[str, Any]]:
     """Get cached manifest_data from partner_manifests (expires_at in future)."""
     row = (
@@ -143,4 +182,5 @@ async def cache_partner_manifest(
     else:
         client.table("partner_manifests").insert(payload).execute()
 
+    invalidate_result_cache("partner manifest cached")
     return products
@@ -2,20 +2,52 @@
 Dynamic Metadata Enricher (Phase 3: The Vibe Moat).
 
 Intercepts products before ranking; enriches missing experience_tags via existing configured LLM.
-For Shopify/external products: in-memory only (no DB write).
 
 Single intercept path: All products (LocalDB, UCP, MCP, Shopify MCP) flow through scout_engine
 which calls enrich_products_middleware after aggregator fetch and before ranking. No bypass.
+
+Tags are cached by content hash (prompt version + normalized description), so a product is tagged once
+however often it is returned and whichever source it comes from:
+- in-process LRU (AsyncTTLCache), read on the request path with no I/O;
+- product_tag_cache table, shared across workers and restarts.
+Tags for LocalDB products are also written back to products.experience_tags (only where still empty).
+Shopify / UCP / MCP products live only in the tag cache.
+
+By default (METADATA_ENRICHMENT_BACKGROUND=true) enrich_products applies cached tags and returns at
+once; misses are tagged in a background task (batches of 5, METADATA_ENRICHMENT_CONCURRENCY LLM calls
+at a time) and show up on later searches.
 """
 
 import asyncio
+import hashlib
 import json
 import logging
 import re
-from typing import Any, Dict, List, Optional
+from typing import Any, Dict, List, Optional, Set, Tuple
+
+from config import settings
+from packages.shared.llm_provider import chat_completion, generate_content
+from packages.shared.ttl_cache import AsyncTTLCache
 
 logger = logging.getLogger(__name__)
 
+# Bump when ALLOWED_TAGS or _PROMPT change so cached tags are recomputed
+TAG_CACHE_VERSION = "tags-v1"
+_TABLE = "product_tag_cache"
+_BATCH_SIZE = 5
+_MAX_PENDING = 2000  # descriptions queued for background tagging; beyond this new misses wait for a later search
+_TAG_TTL_SEC = 7 * 86400
+_EMPTY_TTL_SEC = 3600  # LLM returned no usable tags: do not retry on every search
+
+_cache = AsyncTTLCache(
+    name="experience_tags",
+    max_entries=getattr(settings, "metadata_tag_cache_max_entries", 20000),
+    ttl=_TAG_TTL_SEC,
+)
+_pending: Set[str] = set()
+_tasks: Set[asyncio.Task] = set()
+_stats = {"applied": 0, "scheduled": 0, "dropped": 0, "table_hits": 0, "llm_calls": 0, "llm_tagged": 0, "written_back": 0}
+
 # Allowed tags for LLM to choose from (prevents hallucination)
 ALLOWED_TAGS = [
     "luxury", "romantic", "baby", "celebration", "travel", "night_out", "family",
@@ -94,29 +126,25 @@ async def _call_llm_for_tags(
 
     try:
         if provider in ("azure", "openrouter", "custom", "openai"):
-            def _call():
-                return chat_client.chat.completions.create(
-                    model=model,
-                    messages=[
-                        {"role": "system", "content": "Return only valid JSON. No markdown, no explanation."},
-                        {"role": "user", "content": user_content},
-                    ],
-                    temperature=temperature,
-                    max_tokens=max_tokens,
-                )
-
-            response = await asyncio.to_thread(_call)
+            response = await chat_completion(
+                provider,
+                chat_client,
+                model=model,
+                messages=[
+                    {"role": "system", "content": "Return only valid JSON. No markdown, no explanation."},
+                    {"role": "user", "content": user_content},
+                ],
+                temperature=temperature,
+                max_tokens=max_tokens,
+            )
             raw = (response.choices[0].message.content or "").strip()
         elif provider == "gemini":
-            gen_model = chat_client.GenerativeModel(model)
-
-            def _call():
-                return gen_model.generate_content(
-                    user_content,
-                    generation_config={"temperature": temperature, "max_output_tokens": max_tokens},
-                )
-
-            resp = await asyncio.to_thread(_call)
+            resp = await generate_content(
+                chat_client,
+                model,
+                user_content,
+                generation_config={"temperature": temperature, "max_output_tokens": max_tokens},
+            )
             raw = (getattr(resp, "text", None) or "").strip()
         else:
             return {}
@@ -126,59 +154,215 @@ async def _call_llm_for_tags(
         return {}
 
 
-async def enrich_products(
-    products: List[Dict[str, Any]],
-    *,
-    enabled: bool = True,
-) -> List[Dict[str, Any]]:
-    """
-    Enrich products missing experience_tags using configured LLM.
-    Mutates products in place. For external (SHOPIFY) source: in-memory only.
-    Batch size: 5 products per LLM call.
-    """
-    if not enabled or not products:
-        return products
+def _description(p: Dict[str, Any]) -> str:
+    return str(p.get("description") or p.get("name") or "")[:500]
+
+
+def content_hash(description: str) -> str:
+    """Tag cache key: sha256 of the prompt version and the whitespace/case-normalized description."""
+    normalized = re.sub(r"\s+", " ", (description or "").strip().lower())
+    return hashlib.sha256(f"{TAG_CACHE_VERSION}:{normalized}".encode("utf-8")).hexdigest()
 
+
+def _is_db_product(p: Dict[str, Any]) -> bool:
+    meta = p.get("metadata") or {}
+    source = str((meta.get("source") if isinstance(meta, dict) else None) or p.get("source") or "DB").upper()
+    return source == "DB" and bool(p.get("id"))
+
+
+def _load_table(hashes: List[str]) -> Dict[str, List[str]]:
+    from db import _table_data, get_supabase  # type: ignore[reportAttributeAccessIssue]
+
+    client = get_supabase()
+    if not client or not hashes:
+        return {}
+    rows = _table_data(client.table(_TABLE).select("content_hash, tags").in_("content_hash", hashes).execute().data)
+    return {str(r["content_hash"]): list(r.get("tags") or []) for r in rows if r.get("content_hash")}
+
+
+def _store_table(tags_by_hash: Dict[str, List[str]], model: str) -> None:
     from db import get_supabase
 
     client = get_supabase()
-    if not client:
-        return products
+    if not client or not tags_by_hash:
+        return
+    client.table(_TABLE).upsert(
+        [{"content_hash": h, "tags": tags, "model": model} for h, tags in tags_by_hash.items()],
+        on_conflict="content_hash",
+    ).execute()
 
+
+def _write_back(items: List[Dict[str, Any]]) -> int:
+    """Set experience_tags on LocalDB products that still have none (one RPC)."""
+    from db import _valid_uuids, get_supabase  # type: ignore[reportAttributeAccessIssue]
+
+    client = get_supabase()
+    valid = set(_valid_uuids([i["id"] for i in items]))
+    items = [i for i in items if i["id"] in valid]
+    if not client or not items:
+        return 0
+    result = client.rpc("set_missing_experience_tags", {"p_items": items}).execute()
+    return result.data if isinstance(result.data, int) else len(items)
+
+
+async def _tag_with_llm(descriptions: Dict[str, str]) -> Tuple[Dict[str, List[str]], str]:
+    """LLM tags for {hash: description}: batches of 5, run concurrently up to METADATA_ENRICHMENT_CONCURRENCY."""
+    from db import get_supabase
     from packages.shared.platform_llm import get_platform_llm_config, get_llm_chat_client
 
-    llm_config = get_platform_llm_config(client)
+    client = get_supabase()
+    if not client or not descriptions:
+        return {}, ""
+    llm_config = await asyncio.to_thread(get_platform_llm_config, client)
     if not llm_config or not llm_config.get("api_key"):
-        return products
-
+        return {}, ""
     provider, chat_client = get_llm_chat_client(llm_config)
     if not chat_client:
+        return {}, ""
+
+    hashes = list(descriptions)
+    batches = [hashes[i : i + _BATCH_SIZE] for i in range(0, len(hashes), _BATCH_SIZE)]
+    sem = asyncio.Semaphore(max(1, getattr(settings, "metadata_enrichment_concurrency", 4)))
+
+    async def _run(batch: List[str]) -> Dict[str, List[str]]:
+        async with sem:
+            _stats["llm_calls"] += 1
+            result = await _call_llm_for_tags([descriptions[h] for h in batch], llm_config, provider or "", chat_client)
+        return {h: result.get(i, []) for i, h in enumerate(batch)}
+
+    out: Dict[str, List[str]] = {}
+    for part in await asyncio.gather(*(_run(b) for b in batches)):
+        out.update(part)
+    return out, str(llm_config.get("model") or "")
+
+
+async def _enrich_missing(descriptions: Dict[str, str], db_ids: Dict[str, List[str]]) -> Dict[str, List[str]]:
+    """
+    Resolve tags for {hash: description}: product_tag_cache first, then the LLM. Fills the in-process
+    cache, stores new tags in the table and writes tags back to LocalDB products (db_ids: hash -> product ids).
+    """
+    resolved: Dict[str, List[str]] = {}
+    try:
+        found = await asyncio.to_thread(_load_table, list(descriptions))
+    except Exception as e:
+        logger.debug("Tag cache read failed: %s", e)
+        found = {}
+    _stats["table_hits"] += len(found)
+    resolved.update(found)
+
+    missing = {h: d for h, d in descriptions.items() if h not in found}
+    if missing:
+        tagged, model = await _tag_with_llm(missing)
+        new_tags = {h: tags for h, tags in tagged.items() if tags}
+        _stats["llm_tagged"] += len(new_tags)
+        for h in tagged:
+            if not tagged[h]:
+                _cache.set(h, [], ttl=_EMPTY_TTL_SEC)
+        resolved.update(new_tags)
+        if new_tags:
+            try:
+                await asyncio.to_thread(_store_table, new_tags, model)
+            except Exception as e:
+                logger.debug("Tag cache write failed: %s", e)
+
+    for h, tags in resolved.items():
+        if tags:
+            _cache.set(h, list(tags))
+    items = [{"id": pid, "tags": resolved[h]} for h, ids in db_ids.items() if resolved.get(h) for pid in ids]
+    if items:
+        try:
+            _stats["written_back"] += await asyncio.to_thread(_write_back, items)
+        except Exception as e:
+            logger.debug("Experience tag write-back failed: %s", e)
+    return resolved
+
+
+async def _enrich_in_background(descriptions: Dict[str, str], db_ids: Dict[str, List[str]]) -> None:
+    try:
+        await _enrich_missing(descriptions, db_ids)
+    except Exception as e:
+        logger.warning("Background metadata enrichment failed: %s", e)
+    finally:
+        _pending.difference_update(descriptions)
+
+
+async def enrich_products(
+    products: List[Dict[str, Any]],
+    *,
+    enabled: bool = True,
+    wait: Optional[bool] = None,
+) -> List[Dict[str, Any]]:
+    """
+    Enrich products missing experience_tags: cached tags are applied in place right away.
+    Misses are tagged in the background (wait=False, default from METADATA_ENRICHMENT_BACKGROUND) or
+    before returning (wait=True).
+    """
+    if not enabled or not products:
         return products
+    if wait is None:
+        wait = not getattr(settings, "metadata_enrichment_background", True)
 
-    # Collect indices and descriptions for products needing enrichment
-    to_enrich: List[tuple[int, Dict[str, Any]]] = []
-    for i, p in enumerate(products):
+    # hash -> products on this request needing tags (the same description may appear more than once)
+    misses: Dict[str, List[Dict[str, Any]]] = {}
+    descriptions: Dict[str, str] = {}
+    for p in products:
         meta = p.get("metadata") or {}
         source = str(meta.get("source", p.get("source", "DB"))).upper()
-        if _needs_enrichment(p, source):
-            desc = (p.get("description") or p.get("name") or "")[:500]
-            to_enrich.append((i, p))
+        if not _needs_enrichment(p, source):
+            continue
+        desc = _description(p)
+        h = content_hash(desc)
+        tags = _cache.get(h)
+        if tags is not None:
+            if tags:
+                p["experience_tags"] = list(tags)
+                _stats["applied"] += 1
+            continue
+        misses.setdefault(h, []).append(p)
+        descriptions[h] = desc
 
-    if not to_enrich:
+    if not misses:
         return products
+    db_ids = {h: [str(p["id"]) for p in ps if _is_db_product(p)] for h, ps in misses.items()}
 
-    batch_size = 5
-    for start in range(0, len(to_enrich), batch_size):
-        batch = to_enrich[start : start + batch_size]
-        indices = [idx for idx, _ in batch]
-        descriptions = [
-            (p.get("description") or p.get("name") or "")[:500]
-            for _, p in batch
-        ]
-        result = await _call_llm_for_tags(descriptions, llm_config, provider or "", chat_client)
-        for rel_idx, (orig_idx, p) in enumerate(batch):
-            tags = result.get(rel_idx, [])
-            if tags:
-                p["experience_tags"] = tags
+    if wait:
+        resolved = await _enrich_missing(descriptions, db_ids)
+        for h, ps in misses.items():
+            for p in ps:
+                if resolved.get(h):
+                    p["experience_tags"] = list(resolved[h])
+        return products
 
+    # Background: never touch the returned product dicts afterwards (they may be cached or serialized)
+    queued = {h: d for h, d in descriptions.items() if h not in _pending}
+    room = max(0, _MAX_PENDING - len(_pending))
+    if len(queued) > room:
+        _stats["dropped"] += len(queued) - room
+        queued = dict(list(queued.items())[:room])
+    if queued:
+        _pending.update(queued)
+        _stats["scheduled"] += len(queued)
+        task = asyncio.create_task(_enrich_in_background(queued, {h: db_ids[h] for h in queued if db_ids.get(h)}))
+        _tasks.add(task)
+        task.add_done_callback(_tasks.discard)
     return products
+
+
+def enrichment_stats() -> Dict[str, Any]:
+    """Tag cache counters, queued descriptions and running background tasks."""
+    return {
+        **_stats,
+        "cache": _cache.stats(),
+        "pending": len(_pending),
+        "background_tasks": len(_tasks),
+        "background": bool(getattr(settings, "metadata_enrichment_background", True)),
+    }
+
+
+async def stop_background_enrichment() -> None:
+    """Cancel background enrichment (shutdown); queued descriptions are retried on later searches."""
+    tasks = list(_tasks)
+    for task in tasks:
+        task.cancel()
+    await asyncio.gather(*tasks, return_exceptions=True)
+    _pending.clear()
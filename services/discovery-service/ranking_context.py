@@ -0,0 +1,141 @@
+"""
+Ranking context for scout_engine: partners (trust_score), partner_ratings and product_sponsorships kept in a
+packages.shared.ranking_context store, so ranking and product_mix need no queries per search.
+
+Loaded at startup, then refreshed incrementally (rows with updated_at since the last sync) every
+RANKING_CONTEXT_REFRESH_SEC with a full reload every RANKING_CONTEXT_FULL_REFRESH_SEC. Until the first
+load succeeds scout_engine falls back to the per-search db.py lookups. An incremental refresh that picks up
+sponsorship changes invalidates the discovery result cache (sponsored products are boosted in ranking).
+"""
+
+import asyncio
+import logging
+from datetime import datetime, timezone
+from typing import Any, Dict, List, Optional, Set, Tuple
+
+from config import settings
+from db import _table_data, _valid_uuids, get_supabase  # type: ignore[reportAttributeAccessIssue]
+from packages.shared.ranking_context import RankingContextStore
+from result_cache import invalidate_result_cache
+
+logger = logging.getLogger(__name__)
+
+PAGE_SIZE = 1000
+
+_task: Optional[asyncio.Task] = None
+# Set by _fetch_sponsorships (worker thread) when an incremental load returned rows; handled on the event loop
+_sponsorships_changed = False
+
+
+def _paged(table: str, columns: str, since: Optional[str], full_filter: Any = None) -> List[Dict[str, Any]]:
+    """All rows (keyset pages by id); only rows updated since `since` when given."""
+    client = get_supabase()
+    if not client:
+        return []
+    rows: List[Dict[str, Any]] = []
+    after: Optional[str] = None
+    while True:
+        q = client.table(table).select(columns)
+        if since:
+            q = q.gte("updated_at", since)
+        elif full_filter is not None:
+            q = full_filter(q)
+        if after:
+            q = q.gt("id", after)
+        page = _table_data(q.order("id").limit(PAGE_SIZE).execute().data)
+        rows.extend(page)
+        if len(page) < PAGE_SIZE:
+            return rows
+        after = str(page[-1]["id"])
+
+
+def _fetch_partners(since: Optional[str]) -> List[Dict[str, Any]]:
+    return _paged("partners", "id, business_name, trust_score", since)
+
+
+def _fetch_ratings(since: Optional[str]) -> List[Dict[str, Any]]:
+    return _paged("partner_ratings", "id, partner_id, avg_rating", since)
+
+
+def _fetch_sponsorships(since: Optional[str]) -> List[Dict[str, Any]]:
+    # Full load: only windows that are active or still to come; incremental: any change (ended / cancelled too)
+    global _sponsorships_changed
+    now = datetime.now(timezone.utc).isoformat()
+    rows = _paged(
+        "product_sponsorships",
+        "id, product_id, status, start_at, end_at",
+        since,
+        full_filter=lambda q: q.eq("status", "active").gte("end_at", now),
+    )
+    if since and rows:
+        _sponsorships_changed = True
+    return rows
+
+
+def _fetch_partners_by_ids(partner_ids: List[str]) -> List[Dict[str, Any]]:
+    client = get_supabase()
+    uuids = _valid_uuids(partner_ids)
+    if not client or not uuids:
+        return []
+    return _table_data(client.table("partners").select("id, business_name, trust_score").in_("id", uuids).execute().data)
+
+
+_store = RankingContextStore(
+    _fetch_partners,
+    _fetch_ratings,
+    _fetch_sponsorships,
+    fetch_partners_by_ids=_fetch_partners_by_ids,
+    full_refresh_sec=getattr(settings, "ranking_context_full_refresh_sec", 600),
+)
+
+
+def get_ranking_context_store() -> RankingContextStore:
+    return _store
+
+
+async def get_ranking_context(
+    product_ids: List[str], partner_ids: List[str]
+) -> Optional[Tuple[Dict[str, Dict[str, Any]], Dict[str, float], Set[str]]]:
+    """(partners_map, partner_ratings_map, active_sponsorships) from memory; None when disabled or not loaded."""
+    if not getattr(settings, "ranking_context_enabled", True):
+        return None
+    return await _store.get_context(product_ids, partner_ids)
+
+
+async def refresh_ranking_context(full: bool = False) -> Dict[str, int]:
+    """Refresh the store; drop cached discovery results when sponsorships changed since the last sync."""
+    global _sponsorships_changed
+    counts = await _store.refresh(full=full)
+    if _sponsorships_changed:
+        _sponsorships_changed = False
+        invalidate_result_cache("sponsorships changed")
+    return counts
+
+
+async def _run() -> None:
+    interval = max(5, getattr(settings, "ranking_context_refresh_sec", 30))
+    while True:
+        try:
+            await refresh_ranking_context()
+        except Exception as e:  # refresh() logs and keeps data on loader errors; this guards the loop itself
+            logger.warning("Ranking context refresh loop error: %s", e)
+        await asyncio.sleep(interval)
+
+
+def start_ranking_context() -> None:
+    """Initial load + refresh loop in the background when RANKING_CONTEXT_ENABLED (no-op otherwise)."""
+    global _task
+    if not getattr(settings, "ranking_context_enabled", True) or _task is not None or not get_supabase():
+        return
+    _task = asyncio.create_task(_run())
+
+
+async def stop_ranking_context() -> None:
+    global _task
+    if _task is not None:
+        _task.cancel()
+        try:
+            await _task
+        except asyncio.CancelledError:
+            pass
+        _task = None
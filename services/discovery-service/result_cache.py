@@ -0,0 +1,85 @@
+"""
+Discovery result cache for scout_engine.search.
+
+Results are keyed by normalized query, partner filters, experience tags, boost and limit. Entries are fresh
+for DISCOVERY_RESULT_CACHE_TTL_SEC; for DISCOVERY_RESULT_CACHE_STALE_SEC after that they are still served
+(stale-while-revalidate) while one background search refreshes them, so hot queries never wait on
+Supabase or partners. Concurrent misses for one key share a single search. Empty results are not cached
+(a partner outage should not stick).
+
+Writes made by this service that change what discovery returns call invalidate_result_cache(): product ingest
+(manifest / legacy), partner onboarding and updates, embedding writes, and a new platform_config snapshot.
+Sponsorship changes are picked up by the ranking context refresh, which invalidates when it applies any.
+Popularity (sold_count, written by order processing) and partner ratings change outside this service and are
+not hooked: after such a change, results stay stale for up to one TTL (plus the stale window while the
+refresh runs), or until DELETE /api/v1/admin/discovery-cache.
+"""
+
+import logging
+import re
+from typing import Any, Awaitable, Callable, Dict, Hashable, List, Optional
+
+from config import settings
+from packages.shared.ttl_cache import AsyncTTLCache
+
+logger = logging.getLogger(__name__)
+
+_cache = AsyncTTLCache(
+    name="discovery_results",
+    max_entries=getattr(settings, "discovery_result_cache_max_entries", 512),
+    ttl=getattr(settings, "discovery_result_cache_ttl_sec", 30),
+    stale_ttl=getattr(settings, "discovery_result_cache_stale_sec", 120),
+)
+
+
+def result_cache_enabled() -> bool:
+    return getattr(settings, "discovery_result_cache_ttl_sec", 30) > 0
+
+
+def result_cache_key(
+    query: str,
+    limit: int,
+    partner_id: Optional[str],
+    exclude_partner_id: Optional[str],
+    use_semantic: bool,
+    experience_tag: Optional[str],
+    experience_tags: Optional[List[str]],
+    experience_tag_boost_amount: float,
+) -> Hashable:
+    """Key for one search: query lower-cased with whitespace collapsed; tags order-insensitive."""
+    tags = tuple(sorted({str(t).strip().lower() for t in experience_tags or [] if t and str(t).strip()}))
+    return (
+        re.sub(r"\s+", " ", (query or "").strip().lower()),
+        int(limit),
+        str(partner_id or ""),
+        str(exclude_partner_id or ""),
+        bool(use_semantic),
+        (experience_tag or "").strip().lower(),
+        tags,
+        round(float(experience_tag_boost_amount), 4),
+    )
+
+
+async def get_or_search(
+    key: Hashable,
+    search_fn: Callable[[], Awaitable[List[Dict[str, Any]]]],
+) -> List[Dict[str, Any]]:
+    """Cached results for key, else search_fn() (shared by concurrent callers). Callers get their own product dicts."""
+
+    async def _load() -> Optional[List[Dict[str, Any]]]:
+        return (await search_fn()) or None
+
+    products = await _cache.get_or_load(key, _load)
+    return [dict(p) for p in products or []]
+
+
+def invalidate_result_cache(reason: str = "") -> int:
+    """Drop every cached result (and discard searches already in flight). Returns entries removed."""
+    n = _cache.invalidate()
+    if n:
+        logger.info("Discovery result cache invalidated (%s): %s entries", reason or "manual", n)
+    return n
+
+
+def result_cache_stats() -> Dict[str, Any]:
+    return {**_cache.stats(), "enabled": result_cache_enabled()}
@@ -1,7 +1,8 @@
 """Unified discovery interface (Module 1: Scout Engine)."""
 
+import asyncio
 import logging
-from typing import Any, Dict, List, Optional
+from typing import Any, AsyncIterator, Dict, List, Optional, Set, Tuple
 
 from config import settings
 from packages.shared.discovery import derive_search_query, is_browse_query
@@ -12,20 +13,25 @@ from packages.shared.discovery_aggregator import (
     UCPManifestDriver,
 )
 from packages.shared.shopify_mcp_driver import ShopifyMCPDriver
+from packages.shared.monitoring.stage_timings import stage_timings, timed
 from packages.shared.ranking import sort_products_by_rank
 
+from config_snapshot import (
+    get_admin_orchestration_settings,
+    get_composite_discovery_config,
+    get_platform_config_ranking,
+)
 from db import (  # type: ignore[reportAttributeAccessIssue]
     get_active_sponsorships,  # type: ignore[reportAttributeAccessIssue]
-    get_admin_orchestration_settings,  # type: ignore[reportAttributeAccessIssue]
-    get_composite_discovery_config,  # type: ignore[reportAttributeAccessIssue]
     get_ucp_partners_with_tokens,  # type: ignore[reportAttributeAccessIssue]
     get_partner_ratings_map,  # type: ignore[reportAttributeAccessIssue]
     get_partners_by_ids,  # type: ignore[reportAttributeAccessIssue]
-    get_platform_config_ranking,  # type: ignore[reportAttributeAccessIssue]
     get_shopify_mcp_endpoints,  # type: ignore[reportAttributeAccessIssue]
     search_products,  # type: ignore[reportAttributeAccessIssue]
 )
 from middleware.metadata_enricher import enrich_products as enrich_products_middleware
+from ranking_context import get_ranking_context
+from result_cache import get_or_search, result_cache_enabled, result_cache_key
 from semantic_search import semantic_search
 
 logger = logging.getLogger(__name__)
@@ -61,8 +67,9 @@ async def _apply_ranking(
     products: List[Dict[str, Any]],
     experience_tag: Optional[str] = None,
     experience_tag_boost_amount: float = 0.2,
+    top_k: Optional[int] = None,
 ) -> List[Dict[str, Any]]:
-    """Apply partner ranking to products. Returns sorted list."""
+    """Apply partner ranking to products. Returns sorted list (only the top_k best when set)."""
     if not products:
         return products
 
@@ -70,12 +77,7 @@ async def _apply_ranking(
     if not config or not config.get("ranking_enabled", True):
         return products
 
-    product_ids = [str(p.get("id", "")) for p in products if p.get("id")]
-    partner_ids = list({str(p.get("partner_id", "")) for p in products if p.get("partner_id")})
-
-    partners_map = await get_partners_by_ids(partner_ids)
-    partner_ratings_map = await get_partner_ratings_map(partner_ids)
-    active_sponsorships = await get_active_sponsorships(product_ids)
+    partners_map, partner_ratings_map, active_sponsorships = await _ranking_context(products)
 
     return sort_products_by_rank(
         products,
@@ -86,9 +88,33 @@ async def _apply_ranking(
         config=config,
         experience_tag_boost=experience_tag,
         experience_tag_boost_amount=experience_tag_boost_amount,
+        top_k=top_k,
     )
 
 
+async def _ranking_context(
+    products: List[Dict[str, Any]],
+) -> Tuple[Dict[str, Dict[str, Any]], Dict[str, float], Set[str]]:
+    """
+    Partners, partner ratings and active sponsorships for products: from the in-memory ranking context
+    when loaded, else looked up concurrently.
+    """
+    product_ids = [str(p.get("id", "")) for p in products if p.get("id")]
+    partner_ids = list({str(p.get("partner_id", "")) for p in products if p.get("partner_id")})
+    cached = await get_ranking_context(product_ids, partner_ids)
+    if cached is not None:
+        return cached
+    partners_map, partner_ratings_map, active_sponsorships = await timed(
+        "ranking_lookups",
+        asyncio.gather(
+            get_partners_by_ids(partner_ids),
+            get_partner_ratings_map(partner_ids),
+            get_active_sponsorships(product_ids),
+        ),
+    )
+    return partners_map, partner_ratings_map, active_sponsorships
+
+
 def _blend_by_source(products: List[Dict[str, Any]], limit: int) -> List[Dict[str, Any]]:
     """
     When we have products from multiple sources (DB vs UCP/MCP), build a list of up to `limit`
@@ -209,17 +235,9 @@ async def _apply_product_mix(
     return out[:limit]
 
 
-async def _fetch_via_aggregator(
-    query: str,
-    fetch_limit: int,
-    partner_id: Optional[str],
-    exclude_partner_id: Optional[str],
-    experience_tag: Optional[str] = None,
-    experience_tags: Optional[List[str]] = None,
-    exclude_experience_tags: Optional[List[str]] = None,
-) -> List[Dict[str, Any]]:
-    """Fetch via DiscoveryAggregator (LocalDB + optional UCP from private registry) with timeout."""
-    admin = await get_admin_orchestration_settings()  # type: ignore[reportGeneralTypeIssues]
+async def _build_aggregator(query: str) -> DiscoveryAggregator:
+    """DiscoveryAggregator over LocalDB + UCP partners (private registry) + Shopify MCP, timeout from admin config."""
+    admin = await get_admin_orchestration_settings()
     timeout_ms = 8000  # default 8s to reduce timeouts when UCP/MCP partners are slow
     if admin and isinstance(admin.get("discovery_timeout_ms"), (int, float)):
         v = int(admin["discovery_timeout_ms"])
@@ -227,27 +245,47 @@ async def _fetch_via_aggregator(
         timeout_ms = max(8000, v) if v == 5000 else v
     local_driver = LocalDBDriver(search_products)
     ucp_driver = None
-    internal_partners = await get_ucp_partners_with_tokens()
+    internal_partners, shopify_endpoints = await timed(
+        "partner_registry",
+        asyncio.gather(get_ucp_partners_with_tokens(), get_shopify_mcp_endpoints(capability="discovery")),
+    )
     if internal_partners:
         logger.info("DiscoveryAggregator: using %s UCP partner URL(s) for query=%s", len(internal_partners), (query or "")[:80])
         async def _get_partner_urls():
             return internal_partners
-        ucp_driver = UCPManifestDriver(get_partner_manifest_urls=_get_partner_urls)
+        ucp_driver = UCPManifestDriver(
+            get_partner_manifest_urls=_get_partner_urls,
+            max_concurrency=getattr(settings, "ucp_max_concurrency", 10),
+            partner_timeout=getattr(settings, "ucp_partner_timeout_ms", 4000) / 1000.0,
+            max_partners=getattr(settings, "ucp_max_partners", 0) or None,
+        )
     else:
         logger.info("DiscoveryAggregator: no UCP partners (get_ucp_partners_with_tokens returned empty) for query=%s", (query or "")[:80])
     shopify_mcp_driver = None
-    shopify_endpoints = await get_shopify_mcp_endpoints(capability="discovery")
     if shopify_endpoints:
         async def _get_shopify_endpoints():
             return shopify_endpoints
         shopify_mcp_driver = ShopifyMCPDriver(get_shopify_endpoints=_get_shopify_endpoints, timeout=3.0)
-    aggregator = DiscoveryAggregator(
+    return DiscoveryAggregator(
         local_db_driver=local_driver,
         ucp_driver=ucp_driver,
         mcp_driver=None,
         shopify_mcp_driver=shopify_mcp_driver,
         timeout_ms=timeout_ms,
     )
+
+
+async def _fetch_via_aggregator(
+    query: str,
+    fetch_limit: int,
+    partner_id: Optional[str],
+    exclude_partner_id: Optional[str],
+    experience_tag: Optional[str] = None,
+    experience_tags: Optional[List[str]] = None,
+    exclude_experience_tags: Optional[List[str]] = None,
+) -> List[Dict[str, Any]]:
+    """Fetch via DiscoveryAggregator (LocalDB + optional UCP from private registry) with timeout."""
+    aggregator = await _build_aggregator(query)
     ucp_products = await aggregator.search(
         query=query,
         limit=fetch_limit,
@@ -263,6 +301,10 @@ async def _fetch_via_aggregator(
     return out
 
 
+async def _no_products() -> List[Dict[str, Any]]:
+    return []
+
+
 async def _fetch_and_rank(
     query: str,
     limit: int,
@@ -276,44 +318,43 @@ async def _fetch_and_rank(
     """Fetch products (semantic or text) and apply ranking or product_mix."""
     fetch_limit = limit
     product_mix = None
-    cdc = await get_composite_discovery_config()  # type: ignore[reportGeneralTypeIssues]
+    cdc = await get_composite_discovery_config()
     if cdc and cdc.get("product_mix"):
         mix = cdc.get("product_mix")
         if isinstance(mix, list) and len(mix) > 0:
             product_mix = mix
             fetch_limit = max(limit, 50)
 
-    admin = await get_admin_orchestration_settings()  # type: ignore[reportGeneralTypeIssues]
     use_aggregator = True  # DiscoveryAggregator is default; timeout from admin or 5000ms
 
     exclude_tags = _resolve_exclude_experience_tags(query or "", cdc) if cdc else []
 
     if not query or not query.strip():
         if use_aggregator:
-            products = await _fetch_via_aggregator("", fetch_limit, partner_id, exclude_partner_id, experience_tag, experience_tags, exclude_tags)
+            products = await timed("aggregator", _fetch_via_aggregator("", fetch_limit, partner_id, exclude_partner_id, experience_tag, experience_tags, exclude_tags))
         else:
             products = await search_products(query="", limit=fetch_limit, partner_id=partner_id, exclude_partner_id=exclude_partner_id, experience_tag=experience_tag, experience_tags=experience_tags)
     elif is_browse_query(query):
         if use_aggregator:
-            products = await _fetch_via_aggregator("", fetch_limit, partner_id, exclude_partner_id, experience_tag, experience_tags, exclude_tags)
+            products = await timed("aggregator", _fetch_via_aggregator("", fetch_limit, partner_id, exclude_partner_id, experience_tag, experience_tags, exclude_tags))
         else:
             products = await search_products(query="", limit=fetch_limit, partner_id=partner_id, exclude_partner_id=exclude_partner_id, experience_tag=experience_tag, experience_tags=experience_tags)
     else:
         # Always run aggregator when enabled so UCP/Shopify MCP partners are included; merge with semantic if available.
-        products_agg: List[Dict[str, Any]] = []
-        if use_aggregator:
-            products_agg = await _fetch_via_aggregator(query, fetch_limit, partner_id, exclude_partner_id, experience_tag, experience_tags, exclude_tags)
-
-        products_semantic: List[Dict[str, Any]] = []
-        if use_semantic and getattr(settings, "embedding_configured", False):
-            products_semantic = await semantic_search(
+        # The two are independent, so they run concurrently: the stage costs the slower of the two, not the sum.
+        products_agg, products_semantic = await asyncio.gather(
+            timed("aggregator", _fetch_via_aggregator(query, fetch_limit, partner_id, exclude_partner_id, experience_tag, experience_tags, exclude_tags))
+            if use_aggregator else _no_products(),
+            timed("semantic", semantic_search(
                 query=query,
                 limit=fetch_limit,
                 partner_id=partner_id,
                 exclude_partner_id=exclude_partner_id,
                 experience_tag=experience_tag,
                 experience_tags=experience_tags,
-            )
+            ))
+            if use_semantic and getattr(settings, "embedding_configured", False) else _no_products(),
+        )
 
         # Merge: semantic first (local DB matches), then aggregator (adds UCP/MCP not already present). Dedupe by id.
         seen_ids: set = set()
@@ -343,7 +384,7 @@ async def _fetch_and_rank(
             for fallback in ("gift", "birthday", "present"):
                 if fallback != query.lower():
                     if use_aggregator:
-                        products = await _fetch_via_aggregator(fallback, fetch_limit, partner_id, exclude_partner_id, experience_tag, experience_tags, exclude_tags)
+                        products = await timed("aggregator_fallback", _fetch_via_aggregator(fallback, fetch_limit, partner_id, exclude_partner_id, experience_tag, experience_tags, exclude_tags))
                     else:
                         products = await search_products(query=fallback, limit=fetch_limit, partner_id=partner_id, exclude_partner_id=exclude_partner_id, experience_tag=experience_tag, experience_tags=experience_tags)
                     if products:
@@ -352,7 +393,7 @@ async def _fetch_and_rank(
             for fallback in ("cosmetics", "makeup", "beauty", "skincare"):
                 if fallback != query.lower():
                     if use_aggregator:
-                        products = await _fetch_via_aggregator(fallback, fetch_limit, partner_id, exclude_partner_id, experience_tag, experience_tags, exclude_tags)
+                        products = await timed("aggregator_fallback", _fetch_via_aggregator(fallback, fetch_limit, partner_id, exclude_partner_id, experience_tag, experience_tags, exclude_tags))
                     else:
                         products = await search_products(query=fallback, limit=fetch_limit, partner_id=partner_id, exclude_partner_id=exclude_partner_id, experience_tag=experience_tag, experience_tags=experience_tags)
                     if products:
@@ -363,21 +404,24 @@ async def _fetch_and_rank(
 
     # Phase 3: Dynamic metadata enrichment (experience_tags via LLM when missing)
     if getattr(settings, "metadata_enrichment_enabled", True):
-        products = await enrich_products_middleware(products, enabled=True)
+        products = await timed("enrichment", enrich_products_middleware(products, enabled=True))
 
     if product_mix:
-        product_ids = [str(p.get("id", "")) for p in products if p.get("id")]
-        partner_ids = list({str(p.get("partner_id", "")) for p in products if p.get("partner_id")})
-        partners_map = await get_partners_by_ids(partner_ids)
-        partner_ratings_map = await get_partner_ratings_map(partner_ids)
-        active_sponsorships = await get_active_sponsorships(product_ids)
+        partners_map, partner_ratings_map, active_sponsorships = await _ranking_context(products)
         return await _apply_product_mix(
             products, product_mix, limit,
             partners_map, partner_ratings_map, active_sponsorships,
         )
     # Use first tag for boost when multiple tags provided
     boost_tag = (experience_tags[0] if experience_tags else experience_tag) if (experience_tags or experience_tag) else None
-    ranked = await _apply_ranking(products, experience_tag=boost_tag, experience_tag_boost_amount=experience_tag_boost_amount)
+    # Single source: _blend_by_source just takes the first `limit`, so only those need ordering
+    single_source = len({(p.get("source") or "DB").strip().upper() for p in products}) <= 1
+    ranked = await timed("ranking", _apply_ranking(
+        products,
+        experience_tag=boost_tag,
+        experience_tag_boost_amount=experience_tag_boost_amount,
+        top_k=limit if single_source else None,
+    ))
     # Ensure UCP/MCP options are shown when available: blend by source so first page isn't only local DB
     return _blend_by_source(ranked, limit)
 
@@ -392,6 +436,7 @@ async def search(
     experience_tag: Optional[str] = None,
     experience_tags: Optional[List[str]] = None,
     experience_tag_boost_amount: float = 0.2,
+    use_cache: bool = True,
 ) -> List[Dict[str, Any]]:
     """
     Unified product discovery: semantic search when available, else text search.
@@ -404,7 +449,47 @@ async def search(
     - Applies action-word stripping when query looks like full sentence (e.g. "wanna book limo" -> "limo")
     - Applies partner ranking when ranking_enabled in platform_config
     - When composite_discovery_config.product_mix is set: composes results from slices (price, rating, sponsored, etc.)
+    - use_cache: serve from / fill the discovery result cache (see result_cache; stale-while-revalidate)
     """
+    if not use_cache or not result_cache_enabled():
+        return await _search_uncached(query, limit, partner_id, exclude_partner_id, use_semantic, experience_tag, experience_tags, experience_tag_boost_amount)
+    key = result_cache_key(
+        "" if not query or not query.strip() or is_browse_query(query) else query,
+        limit, partner_id, exclude_partner_id, use_semantic, experience_tag, experience_tags, experience_tag_boost_amount,
+    )
+    return await get_or_search(
+        key,
+        lambda: _search_uncached(query, limit, partner_id, exclude_partner_id, use_semantic, experience_tag, experience_tags, experience_tag_boost_amount),
+    )
+
+
+async def _search_uncached(
+    query: str,
+    limit: int,
+    partner_id: Optional[str],
+    exclude_partner_id: Optional[str],
+    use_semantic: bool,
+    experience_tag: Optional[str],
+    experience_tags: Optional[List[str]],
+    experience_tag_boost_amount: float,
+) -> List[Dict[str, Any]]:
+    """Run the discovery pipeline and log per-stage timings (aggregates: GET /api/v1/admin/discovery-stages)."""
+    with stage_timings() as timings:
+        results = await _search_pipeline(query, limit, partner_id, exclude_partner_id, use_semantic, experience_tag, experience_tags, experience_tag_boost_amount)
+    logger.info("scout_engine.search query=%s results=%s stages_ms=%s", (query or "")[:80], len(results), timings.as_dict())
+    return results
+
+
+async def _search_pipeline(
+    query: str,
+    limit: int,
+    partner_id: Optional[str],
+    exclude_partner_id: Optional[str],
+    use_semantic: bool,
+    experience_tag: Optional[str],
+    experience_tags: Optional[List[str]],
+    experience_tag_boost_amount: float,
+) -> List[Dict[str, Any]]:
     if not query or not query.strip():
         return await _fetch_and_rank("", limit, partner_id, exclude_partner_id, use_semantic, experience_tag, experience_tags, experience_tag_boost_amount)
 
@@ -422,3 +507,47 @@ async def search(
             return results
 
     return await _fetch_and_rank(query, limit, partner_id, exclude_partner_id, False, experience_tag, experience_tags, experience_tag_boost_amount)
+
+
+async def search_stream(
+    query: str,
+    limit: int = 20,
+    partner_id: Optional[str] = None,
+    exclude_partner_id: Optional[str] = None,
+    experience_tag: Optional[str] = None,
+    experience_tags: Optional[List[str]] = None,
+    experience_tag_boost_amount: float = 0.2,
+) -> AsyncIterator[Dict[str, Any]]:
+    """
+    Progressive discovery: yield {"source", "products", "elapsed_ms", "error"} per aggregator driver as it
+    finishes, so local products can be shown before UCP / Shopify MCP partners answer.
+
+    Each batch is ranked on its own and deduped against earlier batches. Unlike search(), batches skip
+    LLM metadata enrichment, product_mix composition and the semantic / fallback-query passes.
+    """
+    if not query or not query.strip() or is_browse_query(query):
+        query = ""
+    elif " " in query.strip():
+        query = derive_search_query(query) or query
+    cdc = await get_composite_discovery_config()
+    exclude_tags = _resolve_exclude_experience_tags(query, cdc) if cdc else []
+    boost_tag = (experience_tags[0] if experience_tags else experience_tag) if (experience_tags or experience_tag) else None
+    aggregator = await _build_aggregator(query)
+    seen_ids: set = set()
+    async for batch in aggregator.stream(
+        query=query,
+        limit=limit,
+        partner_id=partner_id,
+        exclude_partner_id=exclude_partner_id,
+        experience_tag=experience_tag,
+        experience_tags=experience_tags,
+        exclude_experience_tags=exclude_tags,
+    ):
+        products = []
+        for p in batch.products:
+            if p.id not in seen_ids:
+                seen_ids.add(p.id)
+                products.append(p.to_dict())
+        if products:
+            products = await _apply_ranking(products, experience_tag=boost_tag, experience_tag_boost_amount=experience_tag_boost_amount)
+        yield {"source": batch.source, "products": products, "elapsed_ms": batch.elapsed_ms, "error": batch.error}
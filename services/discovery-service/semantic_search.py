@@ -1,74 +1,93 @@
 """pgvector-based semantic product search (Module 1)."""
 
+import asyncio
 import logging
 from typing import Any, Dict, List, Optional
 
-import httpx
-
 from config import settings
 from db import get_supabase
+from embedding_cache import get_cached_embedding
+from local_vector_index import search_local_index
+from packages.shared.embeddings import EmbeddingProvider, create_embedding_provider
 
 logger = logging.getLogger(__name__)
 
-# pgvector schema expects 1536 dimensions (text-embedding-ada-002 / text-embedding-3-small)
+# pgvector schema expects 1536 dimensions (text-embedding-ada-002 / text-embedding-3-small); local vectors are padded
 EMBEDDING_DIMENSION = 1536
 
+_provider: Optional[EmbeddingProvider] = None
+_provider_resolved = False
+
+
+def get_embedding_provider() -> Optional[EmbeddingProvider]:
+    """Provider selected by EMBEDDING_PROVIDER (openai | azure | local | hash); None when not configured."""
+    global _provider, _provider_resolved
+    if not _provider_resolved:
+        _provider = create_embedding_provider(
+            getattr(settings, "embedding_provider", "azure") or "azure",
+            model=getattr(settings, "embedding_model", "text-embedding-3-small") or "text-embedding-3-small",
+            dimension=EMBEDDING_DIMENSION,
+            openai_api_key=getattr(settings, "openai_api_key", "") or "",
+            azure_endpoint=getattr(settings, "azure_openai_endpoint", "") or "",
+            azure_api_key=getattr(settings, "azure_openai_api_key", "") or "",
+            local_model=getattr(settings, "local_embedding_model", "") or "",
+        )
+        _provider_resolved = True
+    return _provider
+
+
+def embedding_model_version() -> Optional[str]:
+    """Version tag written to embedding_model next to every stored vector (e.g. "hash:hashing-v1")."""
+    provider = get_embedding_provider()
+    return provider.version if provider else None
+
+
+def legacy_embedding_model_version() -> Optional[str]:
+    """
+    Tag assumed for vectors with embedding_model NULL (written before version tagging): EMBEDDING_LEGACY_MODEL,
+    else EMBEDDING_PROVIDER:EMBEDDING_MODEL when that is a remote provider, which is what produced them.
+    """
+    legacy = getattr(settings, "embedding_legacy_model", "") or ""
+    if legacy:
+        return legacy
+    provider = (getattr(settings, "embedding_provider", "azure") or "azure").strip().lower()
+    if provider not in ("openai", "azure"):
+        return None
+    return f"{provider}:{getattr(settings, 'embedding_model', 'text-embedding-3-small') or 'text-embedding-3-small'}"
+
 
 async def get_query_embedding(text: str) -> Optional[List[float]]:
     """
-    Generate embedding for search query via OpenAI or Azure OpenAI.
-    Returns None when not configured or on API error.
+    Embedding for a search query, served from the query-embedding cache (memory, then optional
+    persistent tier) so repeated queries skip the provider. Returns None when not configured or on error.
     """
     if not text or not text.strip():
         return None
-    if not getattr(settings, "embedding_configured", False):
+    provider = get_embedding_provider()
+    if provider is None:
         return None
+    return await get_cached_embedding(text, provider.name, provider.model, embed_text)
 
-    provider = getattr(settings, "embedding_provider", "azure") or "azure"
-    model = getattr(settings, "embedding_model", "text-embedding-3-small") or "text-embedding-3-small"
 
-    try:
-        if provider == "openai":
-            api_key = getattr(settings, "openai_api_key", "") or ""
-            if not api_key:
-                return None
-            async with httpx.AsyncClient(timeout=30.0) as client:
-                r = await client.post(
-                    "https://api.openai.com/v1/embeddings",
-                    headers={"Authorization": f"Bearer {api_key}", "Content-Type": "application/json"},
-                    json={"model": model, "input": text.strip()[:8192]},
-                )
-                r.raise_for_status()
-                data = r.json()
-        else:
-            endpoint = getattr(settings, "azure_openai_endpoint", "") or ""
-            api_key = getattr(settings, "azure_openai_api_key", "") or ""
-            if not endpoint or not api_key:
-                return None
-            url = f"{endpoint}/openai/deployments/{model}/embeddings?api-version=2024-02-15-preview"
-            async with httpx.AsyncClient(timeout=30.0) as client:
-                r = await client.post(
-                    url,
-                    headers={"api-key": api_key, "Content-Type": "application/json"},
-                    json={"input": text.strip()[:8192]},
-                )
-                r.raise_for_status()
-                data = r.json()
-
-        items = data.get("data") if isinstance(data, dict) else None
-        if not items or not isinstance(items, list):
-            return None
-        emb = items[0].get("embedding") if isinstance(items[0], dict) else None
-        if not emb or not isinstance(emb, list):
-            return None
-        vec = [float(x) for x in emb]
-        if len(vec) < EMBEDDING_DIMENSION:
-            logger.warning("Embedding dimension %s < %s; check model", len(vec), EMBEDDING_DIMENSION)
-            return None
-        return vec[:EMBEDDING_DIMENSION]
-    except Exception as e:
-        logger.warning("Embedding API failed: %s", e)
+async def embed_text(text: str) -> Optional[List[float]]:
+    """
+    Generate embedding with the configured provider (uncached; used for single product / KB article backfill).
+    Returns None when not configured or on error.
+    """
+    if not text or not text.strip():
         return None
+    return (await embed_texts([text]))[0]
+
+
+async def embed_texts(texts: List[str]) -> List[Optional[List[float]]]:
+    """
+    Embed several texts in one provider call (one multi-input request for remote providers, one
+    encode batch for local ones). Returns one vector (or None) per input, in order.
+    """
+    provider = get_embedding_provider()
+    if not texts or provider is None:
+        return [None] * len(texts)
+    return await provider.embed(texts)
 
 
 def _get_product_embedding_input(product: Dict[str, Any]) -> str:
@@ -121,12 +140,14 @@ async def backfill_kb_article_embedding(article_id: str) -> bool:
     if not inp:
         return False
 
-    embedding = await get_query_embedding(inp)
+    embedding = await embed_text(inp)
     if not embedding:
         return False
 
     try:
-        client.table("partner_kb_articles").update({"embedding": embedding}).eq("id", article_id).execute()
+        client.table("partner_kb_articles").update(
+            {"embedding": embedding, "embedding_model": embedding_model_version()}
+        ).eq("id", article_id).execute()
         return True
     except Exception:
         return False
@@ -134,44 +155,13 @@ async def backfill_kb_article_embedding(article_id: str) -> bool:
 
 async def backfill_all_kb_article_embeddings(limit: int = 500) -> Dict[str, Any]:
     """
-    Backfill embeddings for partner KB articles that have no embedding yet.
+    Backfill embeddings for partner KB articles that have no embedding yet (batched; see embedding_backfill).
     Returns dict with updated_count, failed_count, total_processed.
     """
-    client = get_supabase()
-    if not client:
-        return {"updated_count": 0, "failed_count": 0, "total_processed": 0, "error": "no_db"}
+    from embedding_backfill import create_job, run_backfill
 
-    try:
-        result = (
-            client.table("partner_kb_articles")
-            .select("id")
-            .eq("is_active", True)
-            .is_("embedding", "null")
-            .limit(limit)
-            .execute()
-        )
-        rows = result.data or []
-    except Exception as e:
-        logger.warning("Failed to fetch KB articles for backfill: %s", e)
-        return {"updated_count": 0, "failed_count": 0, "total_processed": 0, "error": str(e)}
-
-    updated = 0
-    failed = 0
-    for row in rows:
-        aid = row.get("id") if isinstance(row, dict) else None
-        if not aid:
-            continue
-        ok = await backfill_kb_article_embedding(str(aid))
-        if ok:
-            updated += 1
-        else:
-            failed += 1
-
-    return {
-        "updated_count": updated,
-        "failed_count": failed,
-        "total_processed": len(rows),
-    }
+    job = await run_backfill(create_job("kb_articles", limit=limit))
+    return job.to_dict()
 
 
 async def semantic_search_kb_articles(
@@ -199,13 +189,15 @@ async def semantic_search_kb_articles(
             "query_embedding": embedding_str,
             "match_count": limit,
             "match_threshold": 0.0,
+            "p_embedding_model": embedding_model_version(),  # only vectors comparable with the query's
+            "p_legacy_embedding_model": legacy_embedding_model_version(),  # untagged vectors count as this model
         }
         if partner_id:
             kwargs["filter_partner_id"] = partner_id
         if exclude_partner_id:
             kwargs["exclude_partner_id"] = exclude_partner_id
 
-        result = client.rpc("match_kb_articles", kwargs).execute()
+        result = await asyncio.to_thread(client.rpc("match_kb_articles", kwargs).execute)
         rows: List[Any] = list(result.data) if isinstance(result.data, list) else []
 
         out = []
@@ -231,8 +223,6 @@ async def backfill_product_embedding(product_id: str) -> bool:
     Generate and store embedding for a product if missing.
     Returns True if embedding was stored.
     """
-    import asyncio
-
     client = get_supabase()
     if not client:
         return False
@@ -253,12 +243,14 @@ async def backfill_product_embedding(product_id: str) -> bool:
     if not inp:
         return False
 
-    embedding = await get_query_embedding(inp)
+    embedding = await embed_text(inp)
     if not embedding:
         return False
 
     try:
-        client.table("products").update({"embedding": embedding}).eq("id", product_id).execute()
+        client.table("products").update(
+            {"embedding": embedding, "embedding_model": embedding_model_version()}
+        ).eq("id", product_id).execute()
         return True
     except Exception:
         return False
@@ -266,45 +258,13 @@ async def backfill_product_embedding(product_id: str) -> bool:
 
 async def backfill_all_product_embeddings(limit: int = 500) -> Dict[str, Any]:
     """
-    Backfill embeddings for all products that have no embedding yet.
+    Backfill embeddings for all products that have no embedding yet (batched; see embedding_backfill).
     Returns dict with updated_count, failed_count, skipped_count, total_processed.
     """
-    client = get_supabase()
-    if not client:
-        return {"updated_count": 0, "failed_count": 0, "skipped_count": 0, "total_processed": 0, "error": "no_db"}
+    from embedding_backfill import create_job, run_backfill
 
-    try:
-        result = (
-            client.table("products")
-            .select("id")
-            .is_("deleted_at", "null")
-            .is_("embedding", "null")
-            .limit(limit)
-            .execute()
-        )
-        rows = result.data or []
-    except Exception as e:
-        logger.warning("Failed to fetch products for backfill: %s", e)
-        return {"updated_count": 0, "failed_count": 0, "skipped_count": 0, "total_processed": 0, "error": str(e)}
-
-    updated = 0
-    failed = 0
-    for row in rows:
-        pid = row.get("id") if isinstance(row, dict) else None
-        if not pid:
-            continue
-        ok = await backfill_product_embedding(str(pid))
-        if ok:
-            updated += 1
-        else:
-            failed += 1
-
-    return {
-        "updated_count": updated,
-        "failed_count": failed,
-        "skipped_count": 0,
-        "total_processed": len(rows),
-    }
+    job = await run_backfill(create_job("products", limit=limit))
+    return job.to_dict()
 
 
 async def semantic_search(
@@ -316,7 +276,7 @@ async def semantic_search(
     experience_tags: Optional[List[str]] = None,
 ) -> List[Dict[str, Any]]:
     """
-    Search products by semantic similarity (pgvector).
+    Search products by semantic similarity: local vector index when enabled and ready, else pgvector.
     Falls back to empty list if embeddings not configured or query embedding fails.
     When experience_tags (list) is set, only products that contain ALL tags are returned (AND semantics).
     """
@@ -334,6 +294,18 @@ async def semantic_search(
     if not tags_list and experience_tag and experience_tag.strip():
         tags_list = [experience_tag.strip().lower()]
 
+    # Local replica (LOCAL_VECTOR_INDEX_ENABLED): exact search with partner / AND-tag filters applied before scoring
+    local = search_local_index(
+        embedding,
+        limit=limit,
+        threshold=0.3,
+        partner_id=partner_id,
+        exclude_partner_id=exclude_partner_id,
+        experience_tags=tags_list,
+    )
+    if local is not None:
+        return local
+
     try:
         # pgvector expects string format for RPC: "[0.1,0.2,...]"
         embedding_str = "[" + ",".join(str(float(x)) for x in embedding) + "]"
@@ -342,6 +314,8 @@ async def semantic_search(
             "query_embedding": embedding_str,
             "match_count": limit * 3 if tags_list else limit,  # fetch extra for post-filter when multi-tag
             "match_threshold": 0.3,  # filter out low-similarity results; avoids showing unrelated products when query has no matches (e.g. "flowers" → limos)
+            "p_embedding_model": embedding_model_version(),  # only vectors comparable with the query's
+            "p_legacy_embedding_model": legacy_embedding_model_version(),  # untagged vectors count as this model
         }
         if partner_id:
             kwargs["filter_partner_id"] = partner_id
@@ -350,7 +324,7 @@ async def semantic_search(
         if tags_list:
             kwargs["filter_experience_tag"] = tags_list[0]
 
-        result = client.rpc("match_products_v2", kwargs).execute()
+        result = await asyncio.to_thread(client.rpc("match_products_v2", kwargs).execute)
         rows: List[Any] = list(result.data) if isinstance(result.data, list) else []
 
         # Normalize to dict with expected keys (created_at for ranking, sold_count for product_mix, experience_tags for discovery)
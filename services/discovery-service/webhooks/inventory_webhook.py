@@ -6,6 +6,7 @@ from fastapi import APIRouter, HTTPException, Header
 from pydantic import BaseModel
 
 from config import settings
+from packages.shared.http_clients import get_http_client
 
 router = APIRouter(prefix="/webhooks", tags=["Webhooks"])
 
@@ -78,17 +79,16 @@ async def inventory_webhook(
         )
 
     if body.thread_ids and settings.webhook_service_url:
-        import httpx
         narrative = f"Product {body.product_id}: {body.event}"
         if body.previous_value is not None and body.new_value is not None:
             narrative = f"{body.event}: {body.previous_value} → {body.new_value}"
         for tid in body.thread_ids[:5]:
             try:
-                async with httpx.AsyncClient(timeout=10.0) as c:
-                    await c.post(
-                        f"{settings.webhook_service_url}/api/v1/webhooks/chat/chatgpt/{tid}",
-                        json={"narrative": narrative, "metadata": {"product_id": body.product_id}},
-                    )
+                await get_http_client(settings.webhook_service_url).post(
+                    f"{settings.webhook_service_url}/api/v1/webhooks/chat/chatgpt/{tid}",
+                    json={"narrative": narrative, "metadata": {"product_id": body.product_id}},
+                    timeout=10.0,
+                )
             except Exception:
                 pass
 
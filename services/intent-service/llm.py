@@ -4,7 +4,6 @@ Used by intent-service API and orchestrator fallback.
 Heuristic keywords and patterns are loaded from platform_config.intent_heuristic_config (admin UI).
 """
 
-import asyncio
 import json
 import re
 from typing import Any, Dict, List, Optional, Tuple
@@ -605,6 +604,7 @@ async def _llm_resolve_intent(
     """
     if not llm_config:
         raise RuntimeError("LLM config required")
+    from packages.shared.llm_provider import chat_completion, generate_content
     from packages.shared.platform_llm import get_llm_chat_client, get_model_interaction_prompt
     from packages.shared.prompts import get_intent_system_prompt
 
@@ -642,17 +642,17 @@ async def _llm_resolve_intent(
     raw = ""
 
     if provider in ("azure", "openrouter", "custom", "openai"):
-        def _call():
-            return chat_client.chat.completions.create(
-                model=model,
-                messages=[
-                    {"role": "system", "content": system_prompt},
-                    {"role": "user", "content": user_content},
-                ],
-                temperature=temperature,
-                max_tokens=max_tokens,
-            )
-        response = await asyncio.to_thread(_call)
+        response = await chat_completion(
+            provider,
+            chat_client,
+            model=model,
+            messages=[
+                {"role": "system", "content": system_prompt},
+                {"role": "user", "content": user_content},
+            ],
+            temperature=temperature,
+            max_tokens=max_tokens,
+        )
         raw = (response.choices[0].message.content or "").strip()
         u = getattr(response, "usage", None)
         if u is not None:
@@ -666,13 +666,12 @@ async def _llm_resolve_intent(
                     "total_tokens": int(tt if tt is not None else (int(pt or 0) + int(ct or 0))),
                 }
     elif provider == "gemini":
-        gen_model = chat_client.GenerativeModel(model)
-        def _call():
-            return gen_model.generate_content(
-                f"{system_prompt}\n\n{user_content}",
-                generation_config={"temperature": temperature, "max_output_tokens": max_tokens},
-            )
-        resp = await asyncio.to_thread(_call)
+        resp = await generate_content(
+            chat_client,
+            model,
+            f"{system_prompt}\n\n{user_content}",
+            generation_config={"temperature": temperature, "max_output_tokens": max_tokens},
+        )
         raw = (getattr(resp, "text", None) or "").strip()
         try:
             um = getattr(resp, "usage_metadata", None)
@@ -3,9 +3,8 @@
 import logging
 from typing import Any, Dict, Optional
 
-import httpx
-
 from config import settings
+from packages.shared.http_clients import get_http_client
 
 logger = logging.getLogger(__name__)
 
@@ -20,15 +19,15 @@ async def trigger_recovery(
     """
     url = f"{settings.re_sourcing_service_url.rstrip('/')}/api/v1/recovery/trigger"
     try:
-        async with httpx.AsyncClient(timeout=60.0) as client:
-            r = await client.post(
-                url,
-                json={"negotiation_id": negotiation_id, "rejection": rejection_payload},
-            )
-            if r.is_success:
-                return True, r.json() if r.content else {}
-            logger.warning("Re-Sourcing trigger failed: %s %s", r.status_code, r.text[:200])
-            return False, None
+        r = await get_http_client(url).post(
+            url,
+            json={"negotiation_id": negotiation_id, "rejection": rejection_payload},
+            timeout=60.0,
+        )
+        if r.is_success:
+            return True, r.json() if r.content else {}
+        logger.warning("Re-Sourcing trigger failed: %s %s", r.status_code, r.text[:200])
+        return False, None
     except Exception as e:
         logger.exception("Re-Sourcing trigger error: %s", e)
         return False, None
@@ -10,6 +10,7 @@ sys.path.insert(0, str(_svc))
 
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
+from packages.shared.http_clients import http_client_lifespan
 
 from api.partner_webhook import router as webhook_router
 
@@ -17,6 +18,7 @@ app = FastAPI(
     title="Omnichannel Broker Service",
     description="Module 24: Partner communication - change requests via API",
     version="0.1.0",
+    lifespan=http_client_lifespan,
 )
 
 app.add_middleware(
@@ -5,6 +5,8 @@ from typing import Any, Dict, Optional
 
 import httpx
 
+from packages.shared.http_clients import get_http_client
+
 logger = logging.getLogger(__name__)
 
 
@@ -18,11 +20,10 @@ async def notify_partner(
     Returns (success, error_message).
     """
     try:
-        async with httpx.AsyncClient(timeout=timeout) as client:
-            r = await client.post(webhook_url, json=payload)
-            if r.is_success:
-                return True, None
-            return False, f"HTTP {r.status_code}: {r.text[:200]}"
+        r = await get_http_client(webhook_url).post(webhook_url, json=payload, timeout=timeout)
+        if r.is_success:
+            return True, None
+        return False, f"HTTP {r.status_code}: {r.text[:200]}"
     except httpx.TimeoutException as e:
         logger.warning("Partner webhook timeout: %s", webhook_url)
         return False, str(e)
@@ -1,14 +1,17 @@
 """Agentic decision loop: Observe → Reason → Plan → Execute → Reflect."""
 
+import asyncio
+import functools
 import json
 import logging
 import os
 import re
+from collections import Counter
+from contextvars import ContextVar
 from typing import Any, Awaitable, Callable, Dict, List, Optional, Tuple
 
-import httpx
-
 from clients import get_bundle_details, get_experience_categories, get_order_status, get_product_details
+from packages.shared.http_clients import get_http_client
 
 # #region agent log
 def _debug_log(location: str, message: str, data: dict, hypothesis_id: str = ""):
@@ -23,12 +26,18 @@ def _debug_log(location: str, message: str, data: dict, hypothesis_id: str = "")
         pass
 # #endregion
 from .planner import plan_next_action
+from .speculative import SpeculativeDiscovery
 from .turn_usage import TurnUsageAccumulator, ingest_intent_api_usage
 from .tools import execute_tool
 
 logger = logging.getLogger(__name__)
 
 HTTP_TIMEOUT = 15.0
+# Read-only lookups that only add engagement context: several in one plan run concurrently
+_PARALLEL_SAFE_TOOLS = frozenset({"get_weather", "get_upcoming_occasions", "web_search", "fetch_ucp_manifest"})
+# Cleanups for the run_agentic_loop turn in progress (prefetches, parallel lookups); run only if the turn raises
+_turn_cleanups: ContextVar[Optional[List[Callable[[], Any]]]] = ContextVar("agentic_turn_cleanups", default=None)
+_EXPLORE_MORE_PHRASES = ("more options", "show me more", "explore more", "other options", "something else", "different options", "what else", "any other", "any more", "more choices", "other choices")
 
 
 def _get_llm_config() -> Dict[str, Any]:
@@ -51,19 +60,18 @@ async def _web_search(query: str, max_results: int = 5) -> Dict[str, Any]:
     api_key = cfg.get("api_key", "")
 
     try:
-        async with httpx.AsyncClient(timeout=HTTP_TIMEOUT) as http:
-            # Tavily: POST with api_key in body or Authorization header
-            body = {"query": query, "search_depth": "basic", "max_results": min(max_results, 20)}
-            headers = {"Content-Type": "application/json"}
-            if api_key:
-                headers["Authorization"] = f"Bearer {api_key}"
-            resp = await http.post(url, json=body, headers=headers)
-            resp.raise_for_status()
-            data = resp.json()
-            results = data.get("results", data.get("answer", []))
-            if isinstance(results, str):
-                results = [{"content": results}]
-            return {"data": {"results": results[:max_results], "query": query}}
+        # Tavily: POST with api_key in body or Authorization header
+        body = {"query": query, "search_depth": "basic", "max_results": min(max_results, 20)}
+        headers = {"Content-Type": "application/json"}
+        if api_key:
+            headers["Authorization"] = f"Bearer {api_key}"
+        resp = await get_http_client(url).post(url, json=body, headers=headers, timeout=HTTP_TIMEOUT)
+        resp.raise_for_status()
+        data = resp.json()
+        results = data.get("results", data.get("answer", []))
+        if isinstance(results, str):
+            results = [{"content": results}]
+        return {"data": {"results": results[:max_results], "query": query}}
     except Exception as e:
         logger.warning("web_search failed: %s", e)
         return {"error": str(e)}
@@ -132,37 +140,36 @@ async def _get_weather(location: str) -> Dict[str, Any]:
         params = {"q": loc_in, "appid": api_key, "units": extra.get("units", "imperial")}
 
     try:
-        async with httpx.AsyncClient(timeout=HTTP_TIMEOUT) as http:
-            resp = await http.get(f"{base_url}{path}", params=params)
-            resp.raise_for_status()
-            data = resp.json()
-            if provider == "weatherapi":
-                current = data.get("current", {})
-                cond = current.get("condition", {})
-                temp_c = current.get("temp_c")
-                feels_c = current.get("feelslike_c", temp_c)
-                temp_f = round(temp_c * 9 / 5 + 32, 1) if temp_c is not None else None
-                feels_f = round(feels_c * 9 / 5 + 32, 1) if feels_c is not None else temp_f
-                return {
-                    "data": {
-                        "location": loc_in,
-                        "temp": temp_f,
-                        "feels_like": feels_f,
-                        "description": cond.get("text", ""),
-                        "humidity": current.get("humidity"),
-                    }
-                }
-            main = data.get("main", {})
-            weather = (data.get("weather") or [{}])[0]
+        resp = await get_http_client(base_url).get(f"{base_url}{path}", params=params, timeout=HTTP_TIMEOUT)
+        resp.raise_for_status()
+        data = resp.json()
+        if provider == "weatherapi":
+            current = data.get("current", {})
+            cond = current.get("condition", {})
+            temp_c = current.get("temp_c")
+            feels_c = current.get("feelslike_c", temp_c)
+            temp_f = round(temp_c * 9 / 5 + 32, 1) if temp_c is not None else None
+            feels_f = round(feels_c * 9 / 5 + 32, 1) if feels_c is not None else temp_f
             return {
                 "data": {
                     "location": loc_in,
-                    "temp": main.get("temp"),
-                    "feels_like": main.get("feels_like"),
-                    "description": weather.get("description", ""),
-                    "humidity": main.get("humidity"),
+                    "temp": temp_f,
+                    "feels_like": feels_f,
+                    "description": cond.get("text", ""),
+                    "humidity": current.get("humidity"),
                 }
             }
+        main = data.get("main", {})
+        weather = (data.get("weather") or [{}])[0]
+        return {
+            "data": {
+                "location": loc_in,
+                "temp": main.get("temp"),
+                "feels_like": main.get("feels_like"),
+                "description": weather.get("description", ""),
+                "humidity": main.get("humidity"),
+            }
+        }
     except Exception as e:
         logger.warning("get_weather failed: %s", e)
         return {"error": str(e)}
@@ -184,24 +191,215 @@ async def _get_upcoming_occasions(location: str, limit: int = 5) -> Dict[str, An
     params = {"apikey": api_key, "city": location.replace(" ", ""), "size": min(limit, 20)}
 
     try:
-        async with httpx.AsyncClient(timeout=HTTP_TIMEOUT) as http:
-            url = f"{base_url}/events.json" if not base_url.endswith(".json") else base_url
-            resp = await http.get(url, params=params)
-            resp.raise_for_status()
-            data = resp.json()
-            events = data.get("_embedded", {}).get("events", [])
-            out = []
-            for e in events[:limit]:
-                name = e.get("name", "")
-                url = e.get("url", "")
-                dates = e.get("dates", {}).get("start", {})
-                out.append({"name": name, "url": url, "date": dates.get("localDate"), "time": dates.get("localTime")})
-            return {"data": {"events": out, "location": location}}
+        url = f"{base_url}/events.json" if not base_url.endswith(".json") else base_url
+        resp = await get_http_client(url).get(url, params=params, timeout=HTTP_TIMEOUT)
+        resp.raise_for_status()
+        data = resp.json()
+        events = data.get("_embedded", {}).get("events", [])
+        out = []
+        for e in events[:limit]:
+            name = e.get("name", "")
+            url = e.get("url", "")
+            dates = e.get("dates", {}).get("start", {})
+            out.append({"name": name, "url": url, "date": dates.get("localDate"), "time": dates.get("localTime")})
+        return {"data": {"events": out, "location": location}}
     except Exception as e:
         logger.warning("get_upcoming_occasions failed: %s", e)
         return {"error": str(e)}
 
 
+def _composite_per_limit(search_queries: List[str], limit: int, explore_more: bool = False) -> int:
+    """Products per category: composite_discovery_config.products_per_category when set, else derived from limit."""
+    try:
+        from api.admin import get_composite_discovery_config  # type: ignore[reportMissingImports]
+        cdc = get_composite_discovery_config()
+        per_cat = cdc.get("products_per_category")
+        if per_cat is not None and isinstance(per_cat, (int, float)):
+            per_limit = max(1, min(20, int(per_cat)))
+        else:
+            per_limit = min(5, max(3, limit // max(1, len(search_queries)))) if search_queries else limit
+    except Exception:
+        per_limit = min(5, max(3, limit // max(1, len(search_queries)))) if search_queries else limit
+    if explore_more:
+        per_limit = min(20, max(per_limit, 8))
+    return per_limit
+
+
+def _composite_fanout(query_count: int, per_limit: int) -> Tuple[bool, int]:
+    """(fetch all categories concurrently?, limit of each first-round discovery call)."""
+    from config import settings as orchestrator_settings
+
+    if getattr(orchestrator_settings, "composite_concurrent_fanout", True) and query_count > 1:
+        return True, per_limit + max(0, getattr(orchestrator_settings, "composite_overfetch", 3))
+    return False, per_limit
+
+
+def _prefetch_composite_discovery(
+    speculative: SpeculativeDiscovery,
+    intent_data: Optional[Dict[str, Any]],
+    state: Dict[str, Any],
+    user_message: str,
+    limit: int,
+) -> None:
+    """
+    Start the discovery calls discover_composite would make for this intent (same arguments the loop injects
+    when the planner leaves them out), so they run while plan_next_action waits on the LLM.
+    """
+    intent = intent_data or {}
+    if intent.get("intent_type") not in ("discover_composite", "refine_composite"):
+        return
+    search_queries = state.get("purged_search_queries") or intent.get("search_queries")
+    if not isinstance(search_queries, list):
+        return
+    queries = [str(q).strip() for q in search_queries if q and str(q).strip()]
+    if not queries:
+        return
+    explore_more = any(p in (user_message or "").lower() for p in _EXPLORE_MORE_PHRASES)
+    per_limit = _composite_per_limit(search_queries, limit, explore_more)
+    concurrent, fetch_limit = _composite_fanout(len(queries), per_limit)
+    for q in queries if concurrent else queries[:1]:
+        speculative.prefetch(
+            query=q,
+            limit=fetch_limit,
+            location=_merged_location(intent_data, state),
+            partner_id=None,
+            exclude_partner_id=None,
+            budget_max=_extract_budget(intent_data),
+            experience_tag=intent.get("theme_experience_tag"),
+            experience_tags=intent.get("theme_experience_tags"),
+            explore_more=explore_more,
+        )
+
+
+def _split_tool_calls(plan: Dict[str, Any]) -> Tuple[List[Dict[str, Any]], Optional[Dict[str, Any]]]:
+    """
+    Split a multi-call plan into (independent lookups to run concurrently, the plan for the one remaining
+    tool call or None). Further dependent calls are dropped: they may need that call's result, so the planner
+    is asked again.
+    """
+    calls = plan.get("tool_calls") or []
+    if len(calls) <= 1:
+        return [], plan
+    lookups: List[Dict[str, Any]] = []
+    seen = set()
+    rest: List[Dict[str, Any]] = []
+    for call in calls:
+        if call.get("tool_name") in _PARALLEL_SAFE_TOOLS:
+            key = (call["tool_name"], json.dumps(call.get("tool_args") or {}, sort_keys=True, default=str))
+            if key not in seen:
+                seen.add(key)
+                lookups.append(call)
+        else:
+            rest.append(call)
+    if len(rest) > 1:
+        logger.info("Planner returned %s dependent tool calls; running %s, dropping %s", len(rest), rest[0].get("tool_name"), [c.get("tool_name") for c in rest[1:]])
+    primary = {**plan, "tool_name": rest[0]["tool_name"], "tool_args": rest[0].get("tool_args") or {}} if rest else None
+    return lookups, primary
+
+
+async def _run_parallel_lookups(
+    calls: List[Dict[str, Any]],
+    state: Dict[str, Any],
+    engagement_data: Dict[str, Any],
+    on_thinking: Optional[Callable[[str, Optional[Dict]], Awaitable[None]]],
+    thinking_messages: Dict[str, str],
+    set_last_tool_result: bool = True,
+) -> None:
+    """
+    Run independent lookups concurrently via execute_tool; results land in engagement_data like single calls.
+    set_last_tool_result=False when another tool call of the same plan owns state["last_tool_result"].
+    """
+
+    async def _one(call: Dict[str, Any]) -> Tuple[str, Dict[str, Any]]:
+        name, args = call["tool_name"], dict(call.get("tool_args") or {})
+        if name == "get_weather":
+            await _emit_thinking(on_thinking, "before_weather", {"location": args.get("location", "your area")}, thinking_messages)
+        elif name == "get_upcoming_occasions":
+            await _emit_thinking(on_thinking, "before_occasions", {"location": args.get("location", "your area")}, thinking_messages)
+        elif name == "fetch_ucp_manifest":
+            await _emit_thinking(on_thinking, "before_fetch_ucp_manifest", {"ucp_prioritized": True}, thinking_messages)
+        try:
+            return name, await execute_tool(
+                name,
+                args,
+                web_search_fn=_web_search,
+                get_weather_fn=_get_weather,
+                get_upcoming_occasions_fn=_get_upcoming_occasions,
+            )
+        except Exception as e:
+            logger.warning("Parallel tool %s failed: %s", name, e)
+            return name, {"error": str(e)}
+
+    for name, result in await asyncio.gather(*(_one(c) for c in calls)):
+        state.setdefault("completed_tools", []).append(name)
+        if set_last_tool_result:
+            state["last_tool_result"] = result
+        if "error" in result:
+            state["agent_reasoning"].append(f"Tool error ({name}): {result['error']}")
+            continue
+        if name == "fetch_ucp_manifest":
+            engagement_data["ucp_manifests_fetched"] = True
+        elif name == "web_search":
+            engagement_data["web_search"] = result.get("data", result)
+        elif name == "get_weather":
+            engagement_data["weather"] = result.get("data", result)
+            wd = result.get("data", result) or {}
+            await _emit_thinking(on_thinking, "after_weather", {"weather_desc": wd.get("description", ""), "location": wd.get("location", "")}, thinking_messages)
+        elif name == "get_upcoming_occasions":
+            engagement_data["occasions"] = result.get("data", result)
+
+
+def _on_turn_error(cleanup: Callable[[], Any]) -> None:
+    """Register cleanup to run if the current run_agentic_loop turn raises (no-op outside a turn)."""
+    cleanups = _turn_cleanups.get()
+    if cleanups is not None:
+        cleanups.append(cleanup)
+
+
+def _cleanup_turn_on_error(fn: Callable[..., Awaitable[Any]]) -> Callable[..., Awaitable[Any]]:
+    """A planner or tool exception must not leave the turn's prefetches or parallel lookups running."""
+
+    @functools.wraps(fn)
+    async def wrapper(*args: Any, **kwargs: Any) -> Any:
+        cleanups: List[Callable[[], Any]] = []
+        token = _turn_cleanups.set(cleanups)
+        try:
+            return await fn(*args, **kwargs)
+        except BaseException:
+            for cleanup in cleanups:
+                cleanup()
+            raise
+        finally:
+            _turn_cleanups.reset(token)
+
+    return wrapper
+
+
+async def _start_parallel_lookups(
+    plan: Dict[str, Any],
+    state: Dict[str, Any],
+    engagement_data: Dict[str, Any],
+    on_thinking: Optional[Callable[[str, Optional[Dict]], Awaitable[None]]],
+    thinking_messages: Dict[str, str],
+) -> Tuple[Optional["asyncio.Future[None]"], Optional[Dict[str, Any]]]:
+    """
+    Start a multi-call plan's independent lookups. Returns (lookups still running or None, plan for the primary
+    call or None). They run alongside the primary call, except that discover_composite uses weather / occasions
+    (rain pivot) and a plan without a primary call has nothing to overlap, so those wait for them.
+    """
+    lookups, primary = _split_tool_calls(plan)
+    if not lookups:
+        return None, primary
+    pending = asyncio.ensure_future(
+        _run_parallel_lookups(lookups, state, engagement_data, on_thinking, thinking_messages, primary is None)
+    )
+    if primary is None or primary.get("tool_name") == "discover_composite":
+        await pending
+        return None, primary
+    _on_turn_error(pending.cancel)
+    return pending, primary
+
+
 async def _discover_composite(
     search_queries: List[str],
     experience_name: str,
@@ -216,7 +414,7 @@ async def _discover_composite(
     theme_experience_tags: Optional[List[str]] = None,
     explore_more: bool = False,
 ) -> Dict[str, Any]:
-    """Call discover_products per query, compose experience bundle. When bundle_options provided, build multiple bundles with prices. theme_experience_tag or theme_experience_tags filter/boost discovery (multi-tag = AND semantics). When explore_more=True, request more options per category (e.g. from UCP/MCP)."""
+    """Call discover_products per query (concurrently unless COMPOSITE_CONCURRENT_FANOUT=false), compose experience bundle. When bundle_options provided, build multiple bundles with prices. theme_experience_tag or theme_experience_tags filter/boost discovery (multi-tag = AND semantics). When explore_more=True, request more options per category (e.g. from UCP/MCP)."""
     from packages.shared.adaptive_cards.experience_card import generate_experience_card
 
     categories: List[Dict[str, Any]] = []
@@ -224,31 +422,13 @@ async def _discover_composite(
     item_list_elements: List[Dict[str, Any]] = []
     suggested_bundle_options: List[Dict[str, Any]] = []
 
-    # Use composite_discovery_config.products_per_category when available (default 3 for curated bundle)
-    try:
-        from api.admin import get_composite_discovery_config  # type: ignore[reportMissingImports]
-        cdc = get_composite_discovery_config()
-        per_cat = cdc.get("products_per_category")
-        if per_cat is not None and isinstance(per_cat, (int, float)):
-            per_limit = max(1, min(20, int(per_cat)))
-        else:
-            per_limit = min(5, max(3, limit // max(1, len(search_queries)))) if search_queries else limit
-    except Exception:
-        per_limit = min(5, max(3, limit // max(1, len(search_queries)))) if search_queries else limit
-    if explore_more:
-        per_limit = min(20, max(per_limit, 8))
-
-    excluded_partners: List[str] = []
-    category_products: Dict[str, List[Dict[str, Any]]] = {}  # query -> products
+    per_limit = _composite_per_limit(search_queries, limit, explore_more)
 
-    for q in search_queries:
-        if not q or not str(q).strip():
-            continue
-        exclude_partner_id: Optional[str] = excluded_partners[-1] if excluded_partners else None
+    async def _fetch(q: str, fetch_limit: int, exclude_partner_id: Optional[str]) -> List[Dict[str, Any]]:
         try:
             resp = await discover_products_fn(
-                query=str(q).strip(),
-                limit=per_limit,
+                query=q,
+                limit=fetch_limit,
                 location=location,
                 partner_id=partner_id,
                 exclude_partner_id=exclude_partner_id,
@@ -260,18 +440,43 @@ async def _discover_composite(
         except Exception as e:
             logger.warning("Discover composite query %s failed: %s", q, e)
             resp = {"data": {"products": [], "count": 0}}
-        products = resp.get("data", resp).get("products", [])
+        return resp.get("data", resp).get("products", [])
+
+    def _top_partner(products: List[Dict[str, Any]]) -> Optional[str]:
+        partner_counts = Counter(str(p.get("partner_id", "")) for p in products if p.get("partner_id"))
+        return partner_counts.most_common(1)[0][0] if partner_counts else None
+
+    queries = [q for q in search_queries if q and str(q).strip()]
+    excluded_partners: List[str] = []
+    fetched: List[Tuple[str, List[Dict[str, Any]]]] = []
+    concurrent, fetch_limit = _composite_fanout(len(queries), per_limit)
+    if concurrent:
+        # All categories at once, over-fetched; each category then drops the previous category's dominant
+        # partner here (same exclusion as the sequential path, decided on the selected products).
+        results = await asyncio.gather(*(_fetch(str(q).strip(), fetch_limit, None) for q in queries))
+        for q, raw in zip(queries, results):
+            exclude_partner_id = excluded_partners[-1] if excluded_partners else None
+            diverse = [p for p in raw if str(p.get("partner_id", "")) != exclude_partner_id] if exclude_partner_id else raw
+            products = (diverse or raw)[:per_limit]
+            fetched.append((q, products))
+            top_partner = _top_partner(products)
+            if top_partner and top_partner not in excluded_partners:
+                excluded_partners.append(top_partner)
+    else:
+        for q in queries:
+            exclude_partner_id = excluded_partners[-1] if excluded_partners else None
+            products = await _fetch(str(q).strip(), per_limit, exclude_partner_id)
+            fetched.append((q, products))
+            # Exclude dominant partner from next category to ensure bundle diversity
+            top_partner = _top_partner(products)
+            if top_partner and top_partner not in excluded_partners:
+                excluded_partners.append(top_partner)
+
+    category_products: Dict[str, List[Dict[str, Any]]] = {}  # query -> products
+    for q, products in fetched:
         categories.append({"query": q, "products": products})
         category_products[q] = products
         all_products.extend(products)
-        # Exclude dominant partner from next category to ensure bundle diversity
-        if products:
-            from collections import Counter
-            partner_counts = Counter(str(p.get("partner_id", "")) for p in products if p.get("partner_id"))
-            if partner_counts:
-                top_partner = partner_counts.most_common(1)[0][0]
-                if top_partner and top_partner not in excluded_partners:
-                    excluded_partners.append(top_partner)
         for p in products:
             item_list_elements.append({
                 "@type": "Product",
@@ -509,6 +714,7 @@ async def _refine_bundle_category(
     }
 
 
+@_cleanup_turn_on_error
 async def run_agentic_loop(
     user_message: str,
     *,
@@ -579,6 +785,14 @@ async def run_agentic_loop(
             turn_usage=turn_usage,
         )
 
+    # Speculative discovery: likely discover_composite calls start while the planner LLM runs (exact-argument reuse)
+    from config import settings as orchestrator_settings
+    speculative: Optional[SpeculativeDiscovery] = None
+    if discover_products_fn and getattr(orchestrator_settings, "speculative_discovery", True):
+        speculative = SpeculativeDiscovery(discover_products_fn)
+        discover_products_fn = speculative
+        _on_turn_error(speculative.discard)
+
     # Derive last_suggestion and probe_count from conversation history
     last_suggestion = None
     probe_count = 0
@@ -695,8 +909,12 @@ async def run_agentic_loop(
         except Exception:
             thinking_messages = {}
 
+    pending_lookups: Optional["asyncio.Future[None]"] = None
     for iteration in range(max_iterations):
         state["iteration"] = iteration
+        if pending_lookups is not None:
+            await pending_lookups  # planner sees every result of the previous multi-call plan
+            pending_lookups = None
 
         # Intent-first: call intent on iteration 0 before planner
         if iteration == 0 and intent_data is None and resolve_intent_fn:
@@ -892,6 +1110,12 @@ async def run_agentic_loop(
                 await _emit_thinking(on_thinking, "before_complete_probing", ctx, thinking_messages or {})
             elif rec == "handle_unrelated":
                 await _emit_thinking(on_thinking, "before_handle_unrelated", ctx, thinking_messages or {})
+            # Probing turns ask a question instead of searching, so a prefetch would be wasted work
+            probing = rec == "complete_with_probing" or (
+                state.get("orchestrator_state") == ORCHESTRATOR_STATE_AWAITING_PROBE
+            )
+            if speculative is not None and iteration == 0 and not probing:
+                _prefetch_composite_discovery(speculative, intent_data, state, user_message, limit)
             plan = await plan_next_action(
                 user_message,
                 state,
@@ -960,6 +1184,15 @@ async def run_agentic_loop(
                 state["planner_complete_message"] = msg or "Processed your request."
                 break
 
+        if plan.get("action") == "tool" and plan.get("tool_calls"):
+            pending_lookups, primary = await _start_parallel_lookups(
+                plan, state, engagement_data, on_thinking, thinking_messages or {}
+            )
+            if primary is None:
+                state["agent_reasoning"].append(plan.get("reasoning", ""))
+                continue
+            plan = primary
+
         if plan.get("action") == "tool":
             tool_name = plan["tool_name"]
             tool_args = plan.get("tool_args", {})
@@ -1035,8 +1268,7 @@ async def run_agentic_loop(
                 if not tool_args.get("bundle_options") and intent_data.get("bundle_options"):
                     tool_args["bundle_options"] = intent_data.get("bundle_options")
                 _msg_lower_c = (user_message or "").lower()
-                _explore_more_phrases_c = ("more options", "show me more", "explore more", "other options", "something else", "different options", "what else", "any other", "any more", "more choices", "other choices")
-                if any(p in _msg_lower_c for p in _explore_more_phrases_c):
+                if any(p in _msg_lower_c for p in _EXPLORE_MORE_PHRASES):
                     tool_args["explore_more"] = True
                 # Always prefer purged list when user previously removed categories (e.g. "no limo")
                 purged_sq = state.get("purged_search_queries")
@@ -1130,6 +1362,7 @@ async def run_agentic_loop(
                     discover_products_fn=discover_products_fn,
                 )
 
+            state.setdefault("completed_tools", []).append(tool_name)
             result = await execute_tool(
                 tool_name,
                 tool_args,
@@ -1376,6 +1609,11 @@ async def run_agentic_loop(
                     state["planner_complete_message"] = summary
                 break
 
+    if pending_lookups is not None:
+        await pending_lookups
+    if speculative is not None:
+        speculative.discard()
+
     await _emit_thinking(on_thinking, "before_response", intent_data or {}, thinking_messages or {})
 
     # Resolve required fulfillment fields from admin, bundle (Discovery), and products/KB; update state for this response
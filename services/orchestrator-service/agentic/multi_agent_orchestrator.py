@@ -7,8 +7,6 @@ import logging
 import time
 from typing import Any, Awaitable, Callable, Dict, List, Optional
 
-import httpx
-
 from config import settings
 
 from .agent_registry import (
@@ -28,6 +26,7 @@ from .agents import (
     trace_append,
 )
 from .turn_usage import TurnUsageAccumulator, heuristic_credit_usage
+from packages.shared.http_clients import get_http_client
 
 logger = logging.getLogger(__name__)
 
@@ -139,10 +138,9 @@ async def _invoke_ucp(
 
         path = "/api/v1/ucp/items"
         headers = _gateway_headers_for_discovery("GET", path)
-        async with httpx.AsyncClient(timeout=HTTP_TIMEOUT) as http:
-            r = await http.get(url, params={"query": q, "limit": min(inv.limit, 30)}, headers=headers)
-            r.raise_for_status()
-            body = r.json()
+        r = await get_http_client(url).get(url, params={"query": q, "limit": min(inv.limit, 30)}, headers=headers, timeout=HTTP_TIMEOUT)
+        r.raise_for_status()
+        body = r.json()
         inner = body.get("data", body)
         items = inner.get("items") if isinstance(inner, dict) else None
         if items is None and isinstance(inner, list):
@@ -1,10 +1,11 @@
 """LLM-based planner for Agentic AI - decides next action from state."""
 
-import asyncio
 import json
 import logging
 from typing import TYPE_CHECKING, Any, Dict, List, Optional
 
+from packages.shared.llm_provider import chat_completion, generate_content
+
 if TYPE_CHECKING:
     from .turn_usage import TurnUsageAccumulator
 
@@ -14,6 +15,8 @@ logger = logging.getLogger(__name__)
 
 PLANNER_SYSTEM = """You are the Agentic Orchestrator. Decide the next tool.
 
+Independent lookups (get_weather, get_upcoming_occasions, web_search, fetch_ucp_manifest) may be requested together in one turn, alongside at most one other tool; they run in parallel. state.completed_tools lists tools already run this turn—do not call them again.
+
 Rule 1: Read Admin Config. If ucp_prioritized is true in state, call fetch_ucp_manifest first before discover_products or discover_composite.
 
 Rule 2: For outdoor/location-based experiences in intent or proposed_plan, ALWAYS call get_weather and get_upcoming_occasions for the location BEFORE calling discover_composite. Use this data to pivot the plan if necessary (e.g., adverse conditions -> suggest an indoor-aligned category from the same intent). Update the proposed_plan in your reasoning so the frontend Draft Itinerary reflects the pivot.
@@ -58,8 +61,8 @@ def _get_planner_client_for_config(llm_config: Dict[str, Any]):
     except Exception as e:
         logger.warning("New LLM provider not used: %s", e)
 
-    # Legacy: platform config (llm_providers)
-    from openai import OpenAI
+    # Legacy: platform config (llm_providers); clients shared process-wide per provider config
+    from packages.shared.llm_clients import get_gemini_client, get_openai_client
 
     cfg = llm_config or {}
     preferred = cfg.get("provider", "azure")
@@ -69,28 +72,25 @@ def _get_planner_client_for_config(llm_config: Dict[str, Any]):
     endpoint = cfg.get("endpoint")
 
     if preferred == "openrouter" and api_key:
-        return ("openrouter", OpenAI(base_url="https://openrouter.ai/api/v1", api_key=api_key))
+        return ("openrouter", get_openai_client(api_key, base_url="https://openrouter.ai/api/v1"))
 
     if preferred == "custom" and endpoint and api_key:
         base = endpoint.rstrip("/")
         if not base.endswith("/v1"):
             base = f"{base}/v1"
-        return ("custom", OpenAI(base_url=base, api_key=api_key))
+        return ("custom", get_openai_client(api_key, base_url=base))
 
     if preferred == "gemini" and api_key:
         try:
-            import google.generativeai as genai  # type: ignore[reportPrivateImportUsage]
-            genai.configure(api_key=api_key)  # type: ignore[reportAttributeAccessIssue]
-            return ("gemini", genai)
+            return ("gemini", get_gemini_client(api_key))
         except ImportError:
             logger.warning("google-generativeai not installed for Gemini support.")
 
     if preferred in ("azure", "openai") and endpoint and api_key:
-        from openai import AzureOpenAI
-        return ("azure", AzureOpenAI(
-            api_key=api_key,
-            api_version="2024-02-01",
+        return ("azure", get_openai_client(
+            api_key,
             azure_endpoint=endpoint.rstrip("/"),
+            api_version="2024-02-01",
         ))
 
     return (None, None)
@@ -161,6 +161,8 @@ async def plan_next_action(
         if isinstance(opt, dict) and opt.get("label"):
             bundle_labels.append(opt.get("label"))
     state_summary = {
+        # Kept first: the summary is cut to 2200 chars, and the prompt tells the model not to repeat these
+        "completed_tools": state.get("completed_tools") or None,
         "iteration": state.get("iteration", 0),
         "probe_count": state.get("probe_count", 0),
         "last_suggestion": state.get("last_suggestion"),
@@ -228,15 +230,15 @@ async def plan_next_action(
             ]
             tools = [{"type": "function", "function": t} for t in TOOL_DEFS]
 
-            response = await asyncio.to_thread(
-                lambda: client.chat.completions.create(  # type: ignore[reportAttributeAccessIssue,reportOptionalMemberAccess]
-                    model=model,
-                    messages=messages,
-                    tools=tools,  # type: ignore[reportArgumentType]
-                    tool_choice="auto",
-                    temperature=temperature,
-                    max_tokens=500,
-                )
+            response = await chat_completion(
+                provider,
+                client,
+                model=model,
+                messages=messages,
+                tools=tools,
+                tool_choice="auto",
+                temperature=temperature,
+                max_tokens=500,
             )
             if turn_usage is not None and getattr(response, "usage", None):
                 turn_usage.add_openai_usage("planner", response.usage)
@@ -244,18 +246,14 @@ async def plan_next_action(
             msg = choice.message
 
             if msg.tool_calls:
-                tool_call = msg.tool_calls[0]
-                name = tool_call.function.name  # type: ignore[reportAttributeAccessIssue]
-                try:
-                    args = json.loads(tool_call.function.arguments or "{}")  # type: ignore[reportAttributeAccessIssue]
-                except json.JSONDecodeError:
-                    args = {}
-                return {
-                    "action": "tool",
-                    "tool_name": name,
-                    "tool_args": args,
-                    "reasoning": msg.content or "",
-                }
+                tool_calls = []
+                for tool_call in msg.tool_calls:
+                    try:
+                        args = json.loads(tool_call.function.arguments or "{}")  # type: ignore[reportAttributeAccessIssue]
+                    except json.JSONDecodeError:
+                        args = {}
+                    tool_calls.append({"tool_name": tool_call.function.name, "tool_args": args})  # type: ignore[reportAttributeAccessIssue]
+                return _tool_plan(tool_calls, msg.content or "")
 
             return {
                 "action": "complete",
@@ -279,6 +277,19 @@ async def plan_next_action(
     return _fallback_plan(user_message, state)
 
 
+def _tool_plan(tool_calls: List[Dict[str, Any]], reasoning: str) -> Dict[str, Any]:
+    """Tool plan: tool_name / tool_args = first call; tool_calls = every call the model made (run together by the loop)."""
+    plan = {
+        "action": "tool",
+        "tool_name": tool_calls[0]["tool_name"],
+        "tool_args": tool_calls[0]["tool_args"],
+        "reasoning": reasoning,
+    }
+    if len(tool_calls) > 1:
+        plan["tool_calls"] = tool_calls
+    return plan
+
+
 async def _plan_with_gemini(
     genai_module,
     user_content: str,
@@ -299,22 +310,16 @@ async def _plan_with_gemini(
             "parameters": t.get("parameters", {"type": "object", "properties": {}}),
         })
 
-    gen_model = genai_module.GenerativeModel(
+    prompt = f"{system_prompt or PLANNER_SYSTEM}\n\n{user_content}"
+
+    response = await generate_content(
+        genai_module,
         model,
+        prompt,
+        generation_config={"temperature": temperature, "max_output_tokens": 500},
         tools=[{"function_declarations": declarations}],
     )
 
-    prompt = f"{system_prompt or PLANNER_SYSTEM}\n\n{user_content}"
-
-    def _call():
-        resp = gen_model.generate_content(
-            prompt,
-            generation_config={"temperature": temperature, "max_output_tokens": 500},
-        )
-        return resp
-
-    response = await asyncio.to_thread(_call)
-
     if turn_usage is not None:
         try:
             um = getattr(response, "usage_metadata", None)
@@ -337,17 +342,17 @@ async def _plan_with_gemini(
         return {"action": "complete", "message": "Done.", "reasoning": ""}
 
     parts = response.candidates[0].content.parts if response.candidates[0].content else []
+    tool_calls = []
+    reasoning = ""
     for part in parts:
         if hasattr(part, "function_call") and part.function_call:
             fc = part.function_call
             name = getattr(fc, "name", "")
             args = dict(getattr(fc, "args", {})) if hasattr(fc, "args") else {}
-            return {
-                "action": "tool",
-                "tool_name": name,
-                "tool_args": args,
-                "reasoning": getattr(part, "text", "") or "",
-            }
+            tool_calls.append({"tool_name": name, "tool_args": args})
+            reasoning = reasoning or getattr(part, "text", "") or ""
+    if tool_calls:
+        return _tool_plan(tool_calls, reasoning)
 
     text = response.text if hasattr(response, "text") else "Done."
     return {"action": "complete", "message": text, "reasoning": text}
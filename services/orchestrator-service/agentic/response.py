@@ -1,12 +1,11 @@
 """LLM-generated engagement response - natural user-facing message instead of templated summary."""
 
-import asyncio
 import json
 import logging
-import queue
-import threading
 from typing import Any, AsyncIterator, Dict, List, Optional, Tuple
 
+from packages.shared.llm_provider import chat_completion, generate_content, stream_chat_completion
+
 from .turn_usage import TurnUsageAccumulator
 
 logger = logging.getLogger(__name__)
@@ -603,17 +602,17 @@ async def generate_engagement_response(
 
     try:
         if provider in ("azure", "openrouter", "custom", "openai"):
-            def _call_openai_engagement():
-                return client.chat.completions.create(  # type: ignore[reportAttributeAccessIssue,reportOptionalMemberAccess]
-                    model=model,
-                    messages=[
-                        {"role": "system", "content": system_prompt},
-                        {"role": "user", "content": user_content},
-                    ],
-                    temperature=temperature,
-                    max_tokens=max_tokens,
-                )
-            response = await asyncio.to_thread(_call_openai_engagement)
+            response = await chat_completion(
+                provider,
+                client,
+                model=model,
+                messages=[
+                    {"role": "system", "content": system_prompt},
+                    {"role": "user", "content": user_content},
+                ],
+                temperature=temperature,
+                max_tokens=max_tokens,
+            )
             text = (response.choices[0].message.content or "").strip()
             if turn_usage is not None and getattr(response, "usage", None):
                 turn_usage.add_openai_usage("engagement", response.usage)
@@ -622,13 +621,12 @@ async def generate_engagement_response(
             return text if text else None
 
         if provider == "gemini":
-            gen_model = client.GenerativeModel(model)  # type: ignore[reportAttributeAccessIssue,reportOptionalMemberAccess]
-            def _call_gemini_engagement():
-                return gen_model.generate_content(
-                    f"{system_prompt}\n\n{user_content}",
-                    generation_config={"temperature": temperature, "max_output_tokens": max_tokens},
-                )
-            resp = await asyncio.to_thread(_call_gemini_engagement)
+            resp = await generate_content(
+                client,
+                model,
+                f"{system_prompt}\n\n{user_content}",
+                generation_config={"temperature": temperature, "max_output_tokens": max_tokens},
+            )
             if resp and resp.candidates:
                 text = (getattr(resp, "text", None) or "").strip()
                 if turn_usage is not None:
@@ -766,56 +764,51 @@ async def stream_engagement_response(
 
     try:
         if provider in ("azure", "openrouter", "custom", "openai"):
-            thread_safe_q: queue.Queue = queue.Queue()
-
+            stream_kw: Dict[str, Any] = dict(
+                model=model,
+                messages=[
+                    {"role": "system", "content": system_prompt},
+                    {"role": "user", "content": user_content},
+                ],
+                temperature=temperature,
+                max_tokens=max_tokens,
+            )
             stream_usage: List[Any] = []
+            chunks: List[str] = []
+
+            def _delta(chunk: Any) -> Optional[str]:
+                u = getattr(chunk, "usage", None)
+                if u is not None:
+                    stream_usage[:] = [u]
+                if chunk.choices and len(chunk.choices) > 0:
+                    return getattr(chunk.choices[0].delta, "content", None)
+                return None
 
-            def _openai_stream() -> None:
+            stream: Any = None
+            try:
                 try:
-                    base_kw = dict(
-                        model=model,
-                        messages=[
-                            {"role": "system", "content": system_prompt},
-                            {"role": "user", "content": user_content},
-                        ],
-                        temperature=temperature,
-                        max_tokens=max_tokens,
-                        stream=True,
-                    )
-                    try:
-                        stream = client.chat.completions.create(  # type: ignore[reportAttributeAccessIssue,reportOptionalMemberAccess]
-                            **base_kw,
-                            stream_options={"include_usage": True},
-                        )
-                    except TypeError:
-                        stream = client.chat.completions.create(**base_kw)  # type: ignore[reportAttributeAccessIssue,reportOptionalMemberAccess]
-                    for chunk in stream:
-                        u = getattr(chunk, "usage", None)
-                        if u is not None:
-                            stream_usage.clear()
-                            stream_usage.append(u)
-                        if chunk.choices and len(chunk.choices) > 0:
-                            delta = getattr(chunk.choices[0].delta, "content", None)
-                            if delta:
-                                thread_safe_q.put(delta)
-                except Exception as e:
-                    thread_safe_q.put(e)
-                finally:
-                    thread_safe_q.put(None)
-
-            thread = threading.Thread(target=_openai_stream)
-            thread.start()
-            loop = asyncio.get_event_loop()
-            chunks: List[str] = []
-            while True:
-                item = await loop.run_in_executor(None, thread_safe_q.get)
-                if item is None:
-                    break
-                if isinstance(item, Exception):
-                    logger.warning("Engagement stream LLM failed: %s", item)
-                    return
-                chunks.append(item)
-                yield item
+                    stream = stream_chat_completion(provider, client, stream_options={"include_usage": True}, **stream_kw)
+                    first = await stream.__anext__()
+                except TypeError:  # SDK without stream_options
+                    stream = stream_chat_completion(provider, client, **stream_kw)
+                    first = await stream.__anext__()
+                delta = _delta(first)
+                if delta:
+                    chunks.append(delta)
+                    yield delta
+                async for chunk in stream:
+                    delta = _delta(chunk)
+                    if delta:
+                        chunks.append(delta)
+                        yield delta
+            except StopAsyncIteration:
+                pass
+            except Exception as e:
+                logger.warning("Engagement stream LLM failed: %s", e)
+                return
+            finally:
+                if stream is not None:
+                    await stream.aclose()  # frees the provider slot when the caller stops early
             full_text = "".join(chunks)
             if turn_usage is not None:
                 if stream_usage:
@@ -826,21 +819,18 @@ async def stream_engagement_response(
             return
 
         if provider == "gemini":
-            gen_model = client.GenerativeModel(model)  # type: ignore[reportAttributeAccessIssue,reportOptionalMemberAccess]
-
-            def _gemini_generate() -> Optional[str]:
-                try:
-                    resp = gen_model.generate_content(
-                        f"{system_prompt}\n\n{user_content}",
-                        generation_config={"temperature": temperature, "max_output_tokens": max_tokens},
-                    )
-                    if resp and resp.candidates:
-                        return (getattr(resp, "text", None) or "").strip()
-                except Exception as e:
-                    logger.warning("Gemini engagement failed: %s", e)
-                return None
-
-            text = await asyncio.to_thread(_gemini_generate)
+            text = None
+            try:
+                resp = await generate_content(
+                    client,
+                    model,
+                    f"{system_prompt}\n\n{user_content}",
+                    generation_config={"temperature": temperature, "max_output_tokens": max_tokens},
+                )
+                if resp and resp.candidates:
+                    text = (getattr(resp, "text", None) or "").strip()
+            except Exception as e:
+                logger.warning("Gemini engagement failed: %s", e)
             if text:
                 if turn_usage is not None:
                     turn_usage.add_engagement_text_fallback(text)
@@ -1062,26 +1052,25 @@ Return JSON: {{"product_ids": ["id1", "id2", ...]}} one per category, best fit f
 
     try:
         if provider in ("azure", "openrouter", "custom"):
-            def _call_openai_suggest():
-                return client.chat.completions.create(  # type: ignore[reportAttributeAccessIssue,reportOptionalMemberAccess]
-                    model=model,
-                    messages=[
-                        {"role": "system", "content": SUGGEST_BUNDLE_SYSTEM},
-                        {"role": "user", "content": user_content},
-                    ],
-                    temperature=temperature,
-                    max_tokens=300,
-                )
-            response = await asyncio.to_thread(_call_openai_suggest)
+            response = await chat_completion(
+                provider,
+                client,
+                model=model,
+                messages=[
+                    {"role": "system", "content": SUGGEST_BUNDLE_SYSTEM},
+                    {"role": "user", "content": user_content},
+                ],
+                temperature=temperature,
+                max_tokens=300,
+            )
             text = (response.choices[0].message.content or "").strip()
         elif provider == "gemini":
-            gen_model = client.GenerativeModel(model)  # type: ignore[reportAttributeAccessIssue,reportOptionalMemberAccess]
-            def _call_gemini_suggest():
-                return gen_model.generate_content(
-                    f"{SUGGEST_BUNDLE_SYSTEM}\n\n{user_content}",
-                    generation_config={"temperature": temperature, "max_output_tokens": 300},
-                )
-            resp = await asyncio.to_thread(_call_gemini_suggest)
+            resp = await generate_content(
+                client,
+                model,
+                f"{SUGGEST_BUNDLE_SYSTEM}\n\n{user_content}",
+                generation_config={"temperature": temperature, "max_output_tokens": 300},
+            )
             text = (getattr(resp, "text", None) or "").strip() if resp and resp.candidates else ""
         else:
             return []
@@ -1212,26 +1201,25 @@ Return JSON: {{ "options": [ {{ "label": "...", "description": "Fancy 1-2 senten
 
     try:
         if provider in ("azure", "openrouter", "custom"):
-            def _call_openai_suggest_options():
-                return client.chat.completions.create(  # type: ignore[reportAttributeAccessIssue,reportOptionalMemberAccess]
-                    model=model,
-                    messages=[
-                        {"role": "system", "content": system_prompt},
-                        {"role": "user", "content": user_content},
-                    ],
-                    temperature=temperature,
-                    max_tokens=max_tokens,
-                )
-            response = await asyncio.to_thread(_call_openai_suggest_options)
+            response = await chat_completion(
+                provider,
+                client,
+                model=model,
+                messages=[
+                    {"role": "system", "content": system_prompt},
+                    {"role": "user", "content": user_content},
+                ],
+                temperature=temperature,
+                max_tokens=max_tokens,
+            )
             text = (response.choices[0].message.content or "").strip()
         elif provider == "gemini":
-            gen_model = client.GenerativeModel(model)  # type: ignore[reportAttributeAccessIssue,reportOptionalMemberAccess]
-            def _call_gemini_suggest_options():
-                return gen_model.generate_content(
-                    f"{system_prompt}\n\n{user_content}",
-                    generation_config={"temperature": temperature, "max_output_tokens": max_tokens},
-                )
-            resp = await asyncio.to_thread(_call_gemini_suggest_options)
+            resp = await generate_content(
+                client,
+                model,
+                f"{system_prompt}\n\n{user_content}",
+                generation_config={"temperature": temperature, "max_output_tokens": max_tokens},
+            )
             text = (getattr(resp, "text", None) or "").strip() if resp and resp.candidates else ""
         else:
             return []
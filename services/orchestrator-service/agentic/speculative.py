@@ -0,0 +1,72 @@
+"""Speculative discovery: start likely discover_products calls while the planner LLM is still deciding."""
+
+import asyncio
+import json
+import logging
+from typing import Any, Awaitable, Callable, Dict
+
+logger = logging.getLogger(__name__)
+
+
+def _call_key(kwargs: Dict[str, Any]) -> str:
+    """Arguments that change the discovery result; None / False equal the discover function's defaults."""
+    return json.dumps(
+        {k: v for k, v in kwargs.items() if v is not None and v is not False},
+        sort_keys=True,
+        default=str,
+    )
+
+
+def _consume_result(task: "asyncio.Task[Any]") -> None:
+    if not task.cancelled():
+        task.exception()  # mark retrieved; an unused prefetch failing is not an error
+
+
+class SpeculativeDiscovery:
+    """
+    Drop-in wrapper for discover_products_fn. prefetch(**kwargs) starts a discovery call in the background;
+    a later call with the same arguments awaits that task instead of calling discovery again. Calls with
+    other arguments go straight through, so results never differ from the unwrapped function.
+    discard() cancels prefetches nobody used.
+    """
+
+    def __init__(self, discover_products_fn: Callable[..., Awaitable[Dict[str, Any]]]):
+        self._fn = discover_products_fn
+        self._tasks: Dict[str, "asyncio.Task[Dict[str, Any]]"] = {}
+        self.prefetched = 0
+        self.hits = 0
+
+    def prefetch(self, **kwargs: Any) -> None:
+        key = _call_key(kwargs)
+        if key in self._tasks:
+            return
+        task = asyncio.create_task(self._fn(**kwargs))
+        task.add_done_callback(_consume_result)
+        self._tasks[key] = task
+        self.prefetched += 1
+
+    async def __call__(self, *args: Any, **kwargs: Any) -> Dict[str, Any]:
+        task = self._tasks.pop(_call_key(kwargs), None) if not args else None
+        if task is not None:
+            try:
+                result = await task
+                self.hits += 1
+                return result
+            except asyncio.CancelledError:
+                if not task.cancelled():
+                    raise  # the caller itself was cancelled
+            except Exception as e:
+                logger.debug("Speculative discovery failed, calling again: %s", e)
+        return await self._fn(*args, **kwargs)
+
+    def discard(self) -> int:
+        """Cancel unused prefetches; returns how many were still pending."""
+        pending = 0
+        for task in self._tasks.values():
+            if not task.done():
+                task.cancel()
+                pending += 1
+        self._tasks.clear()
+        if self.prefetched:
+            logger.info("Speculative discovery: prefetched=%s hits=%s cancelled=%s", self.prefetched, self.hits, pending)
+        return pending
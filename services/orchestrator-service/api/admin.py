@@ -1,6 +1,5 @@
 """Platform admin: kill switch, SLA config, test interaction."""
 
-import asyncio
 import time
 from datetime import datetime, timezone
 from typing import Any, Dict, List, Optional, Tuple
@@ -10,6 +9,7 @@ from pydantic import BaseModel, Field
 
 from config import settings
 from db import get_supabase
+from packages.shared.http_clients import get_http_client
 
 router = APIRouter(prefix="/api/v1/admin", tags=["Admin"])
 
@@ -221,6 +221,22 @@ async def get_kill_switch_status() -> Dict[str, Any]:
     }
 
 
+@router.get("/llm-clients")
+async def get_llm_client_stats() -> Dict[str, Any]:
+    """Diagnostic: shared LLM SDK clients per provider config (uses, builds, open/idle connections)."""
+    from packages.shared.llm_clients import llm_client_stats
+
+    return llm_client_stats()
+
+
+@router.get("/llm-gateway")
+async def get_llm_gateway_stats() -> Dict[str, Any]:
+    """Diagnostic: async LLM gateway (per-provider limits, in-flight / waiting calls, timeouts, thread fallbacks)."""
+    from packages.shared.llm_provider import llm_gateway_stats
+
+    return llm_gateway_stats()
+
+
 @router.post("/test-interaction")
 async def test_interaction(body: TestInteractionBody) -> Dict[str, Any]:
     """
@@ -239,17 +255,16 @@ async def test_interaction(body: TestInteractionBody) -> Dict[str, Any]:
         import json as _json
 
         async def _call_intent_service() -> Dict[str, Any]:
-            import httpx
             url = f"{settings.intent_service_url}/api/v1/resolve"
-            async with httpx.AsyncClient(timeout=30.0) as client:
-                r = await client.post(
-                    url,
-                    json={"text": user_message, "persist": False},
-                )
-                if r.status_code != 200:
-                    raise RuntimeError(f"Intent service error: {r.status_code} - {r.text[:200] if r.text else ''}")
-                data = r.json()
-                return data.get("data", data)
+            r = await get_http_client(url).post(
+                url,
+                json={"text": user_message, "persist": False},
+                timeout=30.0,
+            )
+            if r.status_code != 200:
+                raise RuntimeError(f"Intent service error: {r.status_code} - {r.text[:200] if r.text else ''}")
+            data = r.json()
+            return data.get("data", data)
 
         async def _local_resolve() -> Dict[str, Any]:
             """Fallback when Intent service unreachable: use in-process heuristics."""
@@ -298,6 +313,7 @@ async def test_interaction(body: TestInteractionBody) -> Dict[str, Any]:
     if not llm_config or not llm_config.get("api_key"):
         raise HTTPException(status_code=503, detail="No LLM configured or API key missing.")
 
+    from packages.shared.llm_provider import chat_completion, generate_content
     from packages.shared.platform_llm import get_llm_chat_client, get_model_interaction_prompt
 
     client = get_supabase()
@@ -316,28 +332,27 @@ async def test_interaction(body: TestInteractionBody) -> Dict[str, Any]:
 
     try:
         if provider in ("azure", "openrouter", "custom", "openai"):
-            def _call():
-                return chat_client.chat.completions.create(
-                    model=model,
-                    messages=[
-                        {"role": "system", "content": system_prompt or "You are a helpful assistant."},
-                        {"role": "user", "content": user_message},
-                    ],
-                    temperature=temperature,
-                    max_tokens=max_tokens,
-                )
-            response = await asyncio.to_thread(_call)
+            response = await chat_completion(
+                provider,
+                chat_client,
+                model=model,
+                messages=[
+                    {"role": "system", "content": system_prompt or "You are a helpful assistant."},
+                    {"role": "user", "content": user_message},
+                ],
+                temperature=temperature,
+                max_tokens=max_tokens,
+            )
             text = (response.choices[0].message.content or "").strip()
             return {"response": text, "model": model, "interaction_type": body.interaction_type}
 
         if provider == "gemini":
-            gen_model = chat_client.GenerativeModel(model)
-            def _call():
-                return gen_model.generate_content(
-                    f"{system_prompt or 'You are a helpful assistant.'}\n\nUser: {user_message}",
-                    generation_config={"temperature": temperature, "max_output_tokens": max_tokens},
-                )
-            resp = await asyncio.to_thread(_call)
+            resp = await generate_content(
+                chat_client,
+                model,
+                f"{system_prompt or 'You are a helpful assistant.'}\n\nUser: {user_message}",
+                generation_config={"temperature": temperature, "max_output_tokens": max_tokens},
+            )
             if resp and resp.candidates:
                 text = (getattr(resp, "text", None) or "").strip()
                 return {"response": text, "model": model, "interaction_type": body.interaction_type}
@@ -5,11 +5,11 @@ Proxies: manifest, order status, classify-support, returns.
 
 from typing import Any, Dict, List, Optional
 
-import httpx
 from fastapi import APIRouter, HTTPException
 from pydantic import BaseModel
 
 from config import settings
+from packages.shared.http_clients import get_http_client
 
 router = APIRouter(prefix="/api/v1", tags=["Auxiliary"])
 
@@ -17,25 +17,23 @@ router = APIRouter(prefix="/api/v1", tags=["Auxiliary"])
 @router.get("/manifest")
 async def get_manifest() -> Dict[str, Any]:
     """Proxy to discovery service manifest. AI agents discover capabilities."""
-    async with httpx.AsyncClient(timeout=10.0) as client:
-        r = await client.get(f"{settings.discovery_service_url}/api/v1/manifest")
-        if r.status_code != 200:
-            raise HTTPException(status_code=r.status_code, detail="Manifest unavailable")
-        return r.json()
+    r = await get_http_client(settings.discovery_service_url).get(f"{settings.discovery_service_url}/api/v1/manifest", timeout=10.0)
+    if r.status_code != 200:
+        raise HTTPException(status_code=r.status_code, detail="Manifest unavailable")
+    return r.json()
 
 
 @router.get("/orders/{order_id}/status")
 async def get_order_status(order_id: str) -> Dict[str, Any]:
     """Proxy to discovery service order status. Track order."""
-    async with httpx.AsyncClient(timeout=10.0) as client:
-        r = await client.get(
-            f"{settings.discovery_service_url}/api/v1/orders/{order_id}/status"
-        )
-        if r.status_code == 404:
-            raise HTTPException(status_code=404, detail="Order not found")
-        if r.status_code != 200:
-            raise HTTPException(status_code=r.status_code, detail="Order status unavailable")
-        return r.json()
+    r = await get_http_client(settings.discovery_service_url).get(
+        f"{settings.discovery_service_url}/api/v1/orders/{order_id}/status", timeout=10.0
+    )
+    if r.status_code == 404:
+        raise HTTPException(status_code=404, detail="Order not found")
+    if r.status_code != 200:
+        raise HTTPException(status_code=r.status_code, detail="Order status unavailable")
+    return r.json()
 
 
 class ClassifySupportBody(BaseModel):
@@ -48,20 +46,20 @@ async def classify_support(body: ClassifySupportBody) -> Dict[str, Any]:
     """Proxy to hybrid-response classify-and-route. Route support (AI vs human)."""
     if not body.conversation_ref:
         raise HTTPException(status_code=400, detail="conversation_ref required")
-    async with httpx.AsyncClient(timeout=10.0) as client:
-        r = await client.post(
-            f"{settings.hybrid_response_service_url}/api/v1/classify-and-route",
-            json={
-                "conversation_ref": body.conversation_ref,
-                "message_content": body.message_content,
-            },
+    r = await get_http_client(settings.hybrid_response_service_url).post(
+        f"{settings.hybrid_response_service_url}/api/v1/classify-and-route",
+        json={
+            "conversation_ref": body.conversation_ref,
+            "message_content": body.message_content,
+        },
+        timeout=10.0,
+    )
+    if r.status_code != 200:
+        raise HTTPException(
+            status_code=r.status_code,
+            detail=r.json().get("detail", "Classify failed") if r.content else "Classify failed",
         )
-        if r.status_code != 200:
-            raise HTTPException(
-                status_code=r.status_code,
-                detail=r.json().get("detail", "Classify failed") if r.content else "Classify failed",
-            )
-        return r.json()
+    return r.json()
 
 
 class CreateReturnBody(BaseModel):
@@ -79,16 +77,16 @@ class CreateReturnBody(BaseModel):
 @router.post("/returns")
 async def create_return(body: CreateReturnBody) -> Dict[str, Any]:
     """Proxy to reverse-logistics create return. Create return request."""
-    async with httpx.AsyncClient(timeout=10.0) as client:
-        r = await client.post(
-            f"{settings.reverse_logistics_service_url}/api/v1/returns",
-            json=body.model_dump(exclude_none=True),
+    r = await get_http_client(settings.reverse_logistics_service_url).post(
+        f"{settings.reverse_logistics_service_url}/api/v1/returns",
+        json=body.model_dump(exclude_none=True),
+        timeout=10.0,
+    )
+    if r.status_code == 500:
+        raise HTTPException(status_code=500, detail="Failed to create return request")
+    if r.status_code != 200:
+        raise HTTPException(
+            status_code=r.status_code,
+            detail=r.json().get("detail", "Create return failed") if r.content else "Create return failed",
         )
-        if r.status_code == 500:
-            raise HTTPException(status_code=500, detail="Failed to create return request")
-        if r.status_code != 200:
-            raise HTTPException(
-                status_code=r.status_code,
-                detail=r.json().get("detail", "Create return failed") if r.content else "Create return failed",
-            )
-        return r.json()
+    return r.json()
@@ -1,11 +1,11 @@
 """Gateway UCP: single /.well-known/ucp for USO and proxy routes to Discovery."""
 
-import httpx
 from fastapi import APIRouter, Request
 from fastapi.responses import JSONResponse, Response
 
 from config import settings
 from registry import get_capabilities
+from packages.shared.http_clients import get_http_client
 
 router = APIRouter(tags=["Gateway UCP"])
 
@@ -76,8 +76,7 @@ async def gateway_ucp_items(request: Request):
     """Proxy to Discovery UCP catalog (searchGifts)."""
     url = _discovery_url("/api/v1/ucp/items")
     params = dict(request.query_params)
-    async with httpx.AsyncClient(timeout=30.0) as client:
-        r = await client.get(url, params=params)
+    r = await get_http_client(url).get(url, params=params, timeout=30.0)
     return Response(
         content=r.content,
         status_code=r.status_code,
@@ -91,8 +90,7 @@ async def gateway_ucp_checkout(request: Request):
     """Proxy to Discovery UCP checkout."""
     url = _discovery_url("/api/v1/ucp/checkout")
     body = await request.body()
-    async with httpx.AsyncClient(timeout=30.0) as client:
-        r = await client.post(url, content=body, headers={"Content-Type": request.headers.get("content-type", "application/json")})
+    r = await get_http_client(url).post(url, content=body, headers={"Content-Type": request.headers.get("content-type", "application/json")}, timeout=30.0)
     return Response(
         content=r.content,
         status_code=r.status_code,
@@ -106,8 +104,7 @@ async def gateway_ucp_rest_openapi(request: Request):
     """Proxy to Discovery UCP OpenAPI schema."""
     url = _discovery_url("/api/v1/gateway/ucp/rest.openapi.json")
     headers = _gateway_headers("GET", "/api/v1/ucp/rest.openapi.json")
-    async with httpx.AsyncClient(timeout=10.0) as client:
-        r = await client.get(url, headers=headers)
+    r = await get_http_client(url).get(url, headers=headers, timeout=10.0)
     return Response(
         content=r.content,
         status_code=r.status_code,
@@ -10,12 +10,13 @@ from urllib.parse import urlparse
 import httpx
 
 from config import settings
-from db import store_masked_id
+from db import store_masked_ids
 from packages.shared.adaptive_cards import generate_product_card
 from packages.shared.discovery import fallback_search_query
 from packages.shared.gateway_signature import sign_request
 from packages.shared.json_ld import product_list_ld
 from registry import AgentEntry, get_agents
+from packages.shared.http_clients import get_http_client
 
 logger = logging.getLogger(__name__)
 
@@ -75,10 +76,9 @@ async def discover_products_via_rpc(
     headers = _gateway_headers_for_discovery("POST", path, body_bytes)
     headers["Content-Type"] = "application/json"
 
-    async with httpx.AsyncClient(timeout=HTTP_TIMEOUT) as client:
-        r = await client.post(url, content=body_bytes, headers=headers)
-        r.raise_for_status()
-        data = r.json()
+    r = await get_http_client(url).post(url, content=body_bytes, headers=headers, timeout=HTTP_TIMEOUT)
+    r.raise_for_status()
+    data = r.json()
     if "error" in data:
         raise RuntimeError(data["error"].get("message", "JSON-RPC error"))
     result = data.get("result") or {}
@@ -105,10 +105,9 @@ async def get_catalog_planning_context() -> Dict[str, List[str]]:
     headers = _gateway_headers_for_discovery("GET", path)
     out: Dict[str, List[str]] = {"experience_categories": [], "capability_tags": []}
     try:
-        async with httpx.AsyncClient(timeout=15.0) as client:
-            r = await client.get(url, headers=headers)
-            r.raise_for_status()
-            data = r.json()
+        r = await get_http_client(url).get(url, headers=headers, timeout=15.0)
+        r.raise_for_status()
+        data = r.json()
         inner = data.get("data") or data
         cats = inner.get("experience_categories")
         caps = inner.get("capability_tags")
@@ -150,7 +149,9 @@ async def discover_products_broadcast(
     """
     Broadcast discovery: fan out to all agents with discovery capability via JSON-RPC,
     merge results (dedupe by id), return same shape as discover_products.
-    When ID_MASKING_ENABLED=true, product ids are masked as uso_{agent_slug}_{short_id} and stored in id_masking_map with TTL; resolve at checkout.
+    When ID_MASKING_ENABLED=true, product ids are masked (uso_{agent_slug}_{short_id} stored in id_masking_map with TTL,
+    or encrypted uso_{agent_slug}.{token} ids with ID_MASKING_MODE=token); resolve at checkout. A product whose id
+    could not be masked is dropped.
     """
     agents = get_agents(capability="discovery")
     if not agents:
@@ -188,25 +189,32 @@ async def discover_products_broadcast(
     merged: List[Dict[str, Any]] = []
     seen_ids: set = set()
     id_masking_enabled = getattr(settings, "id_masking_enabled", False)
+    agent_products: List[tuple] = []  # (slug, product copy)
     for raw in results:
         if isinstance(raw, Exception):
             continue
         slug, product_list = raw if isinstance(raw, tuple) and len(raw) == 2 else ("agent", [])
-        for p in product_list:
-            if not isinstance(p, dict):
-                continue
-            p = dict(p)
-            pid = p.get("id")
-            if id_masking_enabled and pid and slug:
-                masked = store_masked_id(slug, str(pid), p.get("partner_id"), "rpc")
-                if masked:
-                    p["id"] = masked
-                p.pop("partner_id", None)
-            if pid is not None and str(p.get("id")) not in seen_ids:
-                seen_ids.add(str(p.get("id")))
-                merged.append(p)
-            elif pid is None:
-                merged.append(p)
+        agent_products.extend((slug, dict(p)) for p in product_list if isinstance(p, dict))
+    masked_by_index: Dict[int, Optional[str]] = {}
+    if id_masking_enabled:
+        # All masks in one call: a single id_masking_map insert (table mode) or no I/O at all (token mode)
+        to_mask = [i for i, (slug, p) in enumerate(agent_products) if p.get("id") and slug]
+        if to_mask:
+            items = [(agent_products[i][0], str(agent_products[i][1]["id"]), agent_products[i][1].get("partner_id")) for i in to_mask]
+            masked_by_index = dict(zip(to_mask, await asyncio.to_thread(store_masked_ids, items, "rpc")))
+    for i, (slug, p) in enumerate(agent_products):
+        pid = p.get("id")
+        if id_masking_enabled and pid and slug:
+            masked = masked_by_index.get(i)
+            if not masked:
+                continue  # fail closed: never return an internal id while masking is enabled
+            p["id"] = masked
+            p.pop("partner_id", None)
+        if pid is not None and str(p.get("id")) not in seen_ids:
+            seen_ids.add(str(p.get("id")))
+            merged.append(p)
+        elif pid is None:
+            merged.append(p)
     merged = merged[:limit]
     if budget_max is not None:
         filtered = [p for p in merged if p.get("price") is None or int(round(float(p["price"]) * 100)) <= budget_max]
@@ -328,10 +336,9 @@ async def resolve_intent(
         payload["catalog_capability_tags"] = catalog_capability_tags
     if force_model:
         payload["force_model"] = True
-    async with httpx.AsyncClient(timeout=HTTP_TIMEOUT) as client:
-        r = await client.post(url, json=payload)
-        r.raise_for_status()
-        return r.json()
+    r = await get_http_client(url).post(url, json=payload, timeout=HTTP_TIMEOUT)
+    r.raise_for_status()
+    return r.json()
 
 
 # Retry 429 from Discovery (e.g. Render free-tier rate limits): max attempts, base delay seconds
@@ -388,61 +395,60 @@ async def discover_products(
     path = "/api/v1/discover"
     headers = _gateway_headers_for_discovery("GET", path)
     for attempt in range(DISCOVERY_RETRY_ATTEMPTS):
-        async with httpx.AsyncClient(timeout=HTTP_TIMEOUT) as client:
-            try:
-                r = await client.get(url, params=params, headers=headers)
-            except httpx.RequestError as e:
-                if attempt < DISCOVERY_RETRY_ATTEMPTS - 1:
-                    delay = min(20, 2 * (2**attempt))
-                    logger.warning(
-                        "Discovery request error (%s), retry %s/%s in %ss",
-                        e,
-                        attempt + 1,
-                        DISCOVERY_RETRY_ATTEMPTS,
-                        delay,
-                    )
-                    await asyncio.sleep(delay)
-                    continue
-                logger.warning("Discovery unreachable after retries: %s", e)
-                return _empty_discovery_fallback(query)
-            if r.status_code == 429 and attempt < DISCOVERY_RETRY_ATTEMPTS - 1:
-                delay = DISCOVERY_RETRY_BASE_DELAY
-                retry_after = r.headers.get("Retry-After")
-                if retry_after and retry_after.isdigit():
-                    delay = min(60, max(5, int(retry_after)))
-                logger.warning(
-                    "Discovery rate limited (429), retry %s/%s in %ss",
-                    attempt + 1,
-                    DISCOVERY_RETRY_ATTEMPTS,
-                    delay,
-                )
-                await asyncio.sleep(delay)
-                continue
-            if r.status_code == 429:
-                logger.warning("Discovery rate limited (429) after %s retries, returning empty", DISCOVERY_RETRY_ATTEMPTS)
-                return _empty_discovery_fallback(query)
-            # Render cold starts / transient proxy 502: short backoff then empty fallback
-            if r.status_code in (502, 503, 504) and attempt < DISCOVERY_RETRY_ATTEMPTS - 1:
-                delay = min(20, 3 * (2**attempt))
+        try:
+            r = await get_http_client(url).get(url, params=params, headers=headers, timeout=HTTP_TIMEOUT)
+        except httpx.RequestError as e:
+            if attempt < DISCOVERY_RETRY_ATTEMPTS - 1:
+                delay = min(20, 2 * (2**attempt))
                 logger.warning(
-                    "Discovery unavailable (%s), retry %s/%s in %ss",
-                    r.status_code,
+                    "Discovery request error (%s), retry %s/%s in %ss",
+                    e,
                     attempt + 1,
                     DISCOVERY_RETRY_ATTEMPTS,
                     delay,
                 )
                 await asyncio.sleep(delay)
                 continue
-            if r.status_code in (502, 503, 504):
-                logger.warning(
-                    "Discovery returned %s after %s retries, returning empty catalog",
-                    r.status_code,
-                    DISCOVERY_RETRY_ATTEMPTS,
-                )
-                return _empty_discovery_fallback(query)
-            r.raise_for_status()
-            out = r.json()
-            return out
+            logger.warning("Discovery unreachable after retries: %s", e)
+            return _empty_discovery_fallback(query)
+        if r.status_code == 429 and attempt < DISCOVERY_RETRY_ATTEMPTS - 1:
+            delay = DISCOVERY_RETRY_BASE_DELAY
+            retry_after = r.headers.get("Retry-After")
+            if retry_after and retry_after.isdigit():
+                delay = min(60, max(5, int(retry_after)))
+            logger.warning(
+                "Discovery rate limited (429), retry %s/%s in %ss",
+                attempt + 1,
+                DISCOVERY_RETRY_ATTEMPTS,
+                delay,
+            )
+            await asyncio.sleep(delay)
+            continue
+        if r.status_code == 429:
+            logger.warning("Discovery rate limited (429) after %s retries, returning empty", DISCOVERY_RETRY_ATTEMPTS)
+            return _empty_discovery_fallback(query)
+        # Render cold starts / transient proxy 502: short backoff then empty fallback
+        if r.status_code in (502, 503, 504) and attempt < DISCOVERY_RETRY_ATTEMPTS - 1:
+            delay = min(20, 3 * (2**attempt))
+            logger.warning(
+                "Discovery unavailable (%s), retry %s/%s in %ss",
+                r.status_code,
+                attempt + 1,
+                DISCOVERY_RETRY_ATTEMPTS,
+                delay,
+            )
+            await asyncio.sleep(delay)
+            continue
+        if r.status_code in (502, 503, 504):
+            logger.warning(
+                "Discovery returned %s after %s retries, returning empty catalog",
+                r.status_code,
+                DISCOVERY_RETRY_ATTEMPTS,
+            )
+            return _empty_discovery_fallback(query)
+        r.raise_for_status()
+        out = r.json()
+        return out
 
     return _empty_discovery_fallback(query)
 
@@ -452,10 +458,9 @@ async def get_product_details(product_id: str) -> Dict[str, Any]:
     url = f"{settings.discovery_service_url}/api/v1/products/{product_id}"
     path = f"/api/v1/products/{product_id}"
     headers = _gateway_headers_for_discovery("GET", path)
-    async with httpx.AsyncClient(timeout=HTTP_TIMEOUT) as client:
-        r = await client.get(url, headers=headers)
-        r.raise_for_status()
-        return r.json()
+    r = await get_http_client(url).get(url, headers=headers, timeout=HTTP_TIMEOUT)
+    r.raise_for_status()
+    return r.json()
 
 
 async def get_bundle_details(bundle_id: str) -> Dict[str, Any]:
@@ -463,10 +468,9 @@ async def get_bundle_details(bundle_id: str) -> Dict[str, Any]:
     url = f"{settings.discovery_service_url}/api/v1/bundles/{bundle_id}"
     path = f"/api/v1/bundles/{bundle_id}"
     headers = _gateway_headers_for_discovery("GET", path)
-    async with httpx.AsyncClient(timeout=HTTP_TIMEOUT) as client:
-        r = await client.get(url, headers=headers)
-        r.raise_for_status()
-        return r.json()
+    r = await get_http_client(url).get(url, headers=headers, timeout=HTTP_TIMEOUT)
+    r.raise_for_status()
+    return r.json()
 
 
 async def add_to_bundle(
@@ -477,18 +481,18 @@ async def add_to_bundle(
     """Call Discovery service to add product to bundle."""
     url = f"{settings.discovery_service_url}/api/v1/bundle/add"
     headers = _gateway_headers_for_discovery("POST", "/api/v1/bundle/add")
-    async with httpx.AsyncClient(timeout=HTTP_TIMEOUT) as client:
-        r = await client.post(
-            url,
-            json={
-                "product_id": product_id,
-                "user_id": user_id,
-                "bundle_id": bundle_id,
-            },
-            headers=headers,
-        )
-        r.raise_for_status()
-        return r.json()
+    r = await get_http_client(url).post(
+        url,
+        json={
+            "product_id": product_id,
+            "user_id": user_id,
+            "bundle_id": bundle_id,
+        },
+        headers=headers,
+        timeout=HTTP_TIMEOUT,
+    )
+    r.raise_for_status()
+    return r.json()
 
 
 async def add_to_bundle_bulk(
@@ -516,10 +520,9 @@ async def add_to_bundle_bulk(
     if fulfillment_fields is not None:
         payload["fulfillment_fields"] = fulfillment_fields
     headers = _gateway_headers_for_discovery("POST", "/api/v1/bundle/add-bulk")
-    async with httpx.AsyncClient(timeout=HTTP_TIMEOUT) as client:
-        r = await client.post(url, json=payload, headers=headers)
-        r.raise_for_status()
-        return r.json()
+    r = await get_http_client(url).post(url, json=payload, headers=headers, timeout=HTTP_TIMEOUT)
+    r.raise_for_status()
+    return r.json()
 
 
 async def replace_in_bundle(
@@ -530,28 +533,27 @@ async def replace_in_bundle(
     """Replace a product in bundle (category refinement)."""
     url = f"{settings.discovery_service_url}/api/v1/bundle/replace"
     headers = _gateway_headers_for_discovery("POST", "/api/v1/bundle/replace")
-    async with httpx.AsyncClient(timeout=HTTP_TIMEOUT) as client:
-        r = await client.post(
-            url,
-            json={
-                "bundle_id": bundle_id,
-                "leg_id": leg_id,
-                "new_product_id": new_product_id,
-            },
-            headers=headers,
-        )
-        r.raise_for_status()
-        return r.json()
+    r = await get_http_client(url).post(
+        url,
+        json={
+            "bundle_id": bundle_id,
+            "leg_id": leg_id,
+            "new_product_id": new_product_id,
+        },
+        headers=headers,
+        timeout=HTTP_TIMEOUT,
+    )
+    r.raise_for_status()
+    return r.json()
 
 
 async def remove_from_bundle(item_id: str) -> Dict[str, Any]:
     """Call Discovery service to remove item from bundle."""
     url = f"{settings.discovery_service_url}/api/v1/bundle/remove"
     headers = _gateway_headers_for_discovery("POST", "/api/v1/bundle/remove")
-    async with httpx.AsyncClient(timeout=HTTP_TIMEOUT) as client:
-        r = await client.post(url, json={"item_id": item_id}, headers=headers)
-        r.raise_for_status()
-        return r.json()
+    r = await get_http_client(url).post(url, json={"item_id": item_id}, headers=headers, timeout=HTTP_TIMEOUT)
+    r.raise_for_status()
+    return r.json()
 
 
 async def get_order_status(order_id: str) -> Dict[str, Any]:
@@ -559,22 +561,20 @@ async def get_order_status(order_id: str) -> Dict[str, Any]:
     url = f"{settings.discovery_service_url}/api/v1/orders/{order_id}/status"
     path = f"/api/v1/orders/{order_id}/status"
     headers = _gateway_headers_for_discovery("GET", path)
-    async with httpx.AsyncClient(timeout=10.0) as client:
-        r = await client.get(url, headers=headers)
-        if r.status_code == 404:
-            return {"error": "Order not found"}
-        r.raise_for_status()
-        return r.json()
+    r = await get_http_client(url).get(url, headers=headers, timeout=10.0)
+    if r.status_code == 404:
+        return {"error": "Order not found"}
+    r.raise_for_status()
+    return r.json()
 
 
 async def proceed_to_checkout(bundle_id: str) -> Dict[str, Any]:
     """Call Discovery service to proceed to checkout with bundle. Creates order, returns order_id."""
     url = f"{settings.discovery_service_url}/api/v1/checkout"
     headers = _gateway_headers_for_discovery("POST", "/api/v1/checkout")
-    async with httpx.AsyncClient(timeout=HTTP_TIMEOUT) as client:
-        r = await client.post(url, json={"bundle_id": bundle_id}, headers=headers)
-        r.raise_for_status()
-        return r.json()
+    r = await get_http_client(url).post(url, json={"bundle_id": bundle_id}, headers=headers, timeout=HTTP_TIMEOUT)
+    r.raise_for_status()
+    return r.json()
 
 
 async def commitment_precheck(
@@ -590,10 +590,9 @@ async def commitment_precheck(
         payload["thread_id"] = thread_id
     if user_id:
         payload["user_id"] = user_id
-    async with httpx.AsyncClient(timeout=HTTP_TIMEOUT) as client:
-        r = await client.post(url, json=payload)
-        r.raise_for_status()
-        return r.json()
+    r = await get_http_client(url).post(url, json=payload, timeout=HTTP_TIMEOUT)
+    r.raise_for_status()
+    return r.json()
 
 
 async def create_payment_intent(
@@ -610,19 +609,17 @@ async def create_payment_intent(
         payload["thread_id"] = thread_id
     if total_amount is not None:
         payload["total_amount"] = total_amount
-    async with httpx.AsyncClient(timeout=HTTP_TIMEOUT) as client:
-        r = await client.post(url, json=payload)
-        r.raise_for_status()
-        return r.json()
+    r = await get_http_client(url).post(url, json=payload, timeout=HTTP_TIMEOUT)
+    r.raise_for_status()
+    return r.json()
 
 
 async def confirm_payment(order_id: str) -> Dict[str, Any]:
     """Call Payment service to confirm payment (demo mode). Marks order as paid."""
     url = f"{settings.payment_service_url}/api/v1/payment/confirm"
-    async with httpx.AsyncClient(timeout=HTTP_TIMEOUT) as client:
-        r = await client.post(url, json={"order_id": order_id})
-        r.raise_for_status()
-        return r.json()
+    r = await get_http_client(url).post(url, json={"order_id": order_id}, timeout=HTTP_TIMEOUT)
+    r.raise_for_status()
+    return r.json()
 
 
 async def create_checkout_session(
@@ -630,23 +627,22 @@ async def create_checkout_session(
 ) -> Dict[str, Any]:
     """Call Payment service to create Stripe Checkout Session. Returns url for redirect."""
     url = f"{settings.payment_service_url}/api/v1/payment/checkout-session"
-    async with httpx.AsyncClient(timeout=HTTP_TIMEOUT) as client:
-        r = await client.post(
-            url,
-            json={"order_id": order_id, "success_url": success_url, "cancel_url": cancel_url},
-        )
-        r.raise_for_status()
-        return r.json()
+    r = await get_http_client(url).post(
+        url,
+        json={"order_id": order_id, "success_url": success_url, "cancel_url": cancel_url},
+        timeout=HTTP_TIMEOUT,
+    )
+    r.raise_for_status()
+    return r.json()
 
 
 async def set_customization_partner(thread_id: str, partner_id: Optional[str] = None) -> bool:
     """Set customization_partner_id for session (hybrid customization)."""
     url = f"{settings.discovery_service_url}/api/v1/experience-sessions/by-thread/{thread_id}/customization-partner"
     try:
-        async with httpx.AsyncClient(timeout=10.0) as client:
-            r = await client.put(url, params={"partner_id": partner_id} if partner_id else {})
-            r.raise_for_status()
-            return True
+        r = await get_http_client(url).put(url, params={"partner_id": partner_id} if partner_id else {}, timeout=10.0)
+        r.raise_for_status()
+        return True
     except Exception:
         return False
 
@@ -655,10 +651,9 @@ async def design_chat_active(thread_id: str) -> Dict[str, Any]:
     """Check if thread has design chat active (legs in in_customization)."""
     url = f"{settings.discovery_service_url}/api/v1/design-chat/active"
     try:
-        async with httpx.AsyncClient(timeout=10.0) as client:
-            r = await client.get(url, params={"thread_id": thread_id})
-            r.raise_for_status()
-            return r.json()
+        r = await get_http_client(url).get(url, params={"thread_id": thread_id}, timeout=10.0)
+        r.raise_for_status()
+        return r.json()
     except Exception:
         return {"active": False}
 
@@ -667,15 +662,14 @@ async def get_sla_re_sourcing_pending(thread_id: str) -> Optional[Dict[str, Any]
     """Get pending SLA re-sourcing for thread (awaiting user response)."""
     url = f"{settings.discovery_service_url}/api/v1/sla/pending"
     try:
-        async with httpx.AsyncClient(timeout=10.0) as client:
-            r = await client.get(url, params={"thread_id": thread_id})
-            if r.status_code == 404:
-                return None
-            r.raise_for_status()
-            data = r.json()
-            if isinstance(data, dict) and data.get("experience_session_leg_id"):
-                return data
+        r = await get_http_client(url).get(url, params={"thread_id": thread_id}, timeout=10.0)
+        if r.status_code == 404:
             return None
+        r.raise_for_status()
+        data = r.json()
+        if isinstance(data, dict) and data.get("experience_session_leg_id"):
+            return data
+        return None
     except httpx.HTTPStatusError:
         return None
     except Exception:
@@ -691,15 +685,14 @@ async def execute_sla_re_sourcing(
     """Execute SLA re-sourcing (user confirmed switch)."""
     resourcing_url = settings.resourcing_service_url
     url = f"{resourcing_url.rstrip('/')}/api/v1/recovery/sla-execute"
-    async with httpx.AsyncClient(timeout=30.0) as client:
-        r = await client.post(url, json={
-            "experience_session_leg_id": leg_id,
-            "alternative_partner_id": alternative_partner_id,
-            "alternative_product_id": alternative_product_id,
-            "alternative_price": alternative_price,
-        })
-        r.raise_for_status()
-        return r.json()
+    r = await get_http_client(url).post(url, json={
+        "experience_session_leg_id": leg_id,
+        "alternative_partner_id": alternative_partner_id,
+        "alternative_product_id": alternative_product_id,
+        "alternative_price": alternative_price,
+    }, timeout=30.0)
+    r.raise_for_status()
+    return r.json()
 
 
 async def design_chat_proxy(
@@ -709,17 +702,17 @@ async def design_chat_proxy(
 ) -> Dict[str, Any]:
     """Forward message to partner design chat endpoint."""
     url = f"{settings.discovery_service_url}/api/v1/design-chat/proxy"
-    async with httpx.AsyncClient(timeout=30.0) as client:
-        r = await client.post(
-            url,
-            json={
-                "thread_id": thread_id,
-                "user_message": user_message,
-                "order_id": order_id,
-            },
-        )
-        r.raise_for_status()
-        return r.json()
+    r = await get_http_client(url).post(
+        url,
+        json={
+            "thread_id": thread_id,
+            "user_message": user_message,
+            "order_id": order_id,
+        },
+        timeout=30.0,
+    )
+    r.raise_for_status()
+    return r.json()
 
 
 async def create_checkout_session_from_order(
@@ -727,18 +720,18 @@ async def create_checkout_session_from_order(
 ) -> Dict[str, Any]:
     """Call Payment service with order data (fallback when order not in Payment DB)."""
     url = f"{settings.payment_service_url}/api/v1/payment/checkout-session-from-order"
-    async with httpx.AsyncClient(timeout=HTTP_TIMEOUT) as client:
-        r = await client.post(
-            url,
-            json={
-                "order_id": order_id,
-                "success_url": success_url,
-                "cancel_url": cancel_url,
-                "order": order,
-            },
-        )
-        r.raise_for_status()
-        return r.json()
+    r = await get_http_client(url).post(
+        url,
+        json={
+            "order_id": order_id,
+            "success_url": success_url,
+            "cancel_url": cancel_url,
+            "order": order,
+        },
+        timeout=HTTP_TIMEOUT,
+    )
+    r.raise_for_status()
+    return r.json()
 
 
 async def create_change_request(
@@ -751,20 +744,20 @@ async def create_change_request(
 ) -> Dict[str, Any]:
     """Call Omnichannel Broker to create change request and notify partner."""
     url = f"{settings.omnichannel_broker_url}/api/v1/change-request"
-    async with httpx.AsyncClient(timeout=HTTP_TIMEOUT) as client:
-        r = await client.post(
-            url,
-            json={
-                "order_id": order_id,
-                "order_leg_id": order_leg_id,
-                "partner_id": partner_id,
-                "original_item": original_item,
-                "requested_change": requested_change,
-                "respond_by": respond_by,
-            },
-        )
-        r.raise_for_status()
-        return r.json()
+    r = await get_http_client(url).post(
+        url,
+        json={
+            "order_id": order_id,
+            "order_leg_id": order_leg_id,
+            "partner_id": partner_id,
+            "original_item": original_item,
+            "requested_change": requested_change,
+            "respond_by": respond_by,
+        },
+        timeout=HTTP_TIMEOUT,
+    )
+    r.raise_for_status()
+    return r.json()
 
 
 async def start_orchestration(
@@ -774,13 +767,13 @@ async def start_orchestration(
     """Start a Durable Functions orchestration instance. Returns error dict if Durable is unavailable."""
     url = f"{settings.durable_orchestrator_url}/api/orchestrators/base_orchestrator"
     try:
-        async with httpx.AsyncClient(timeout=HTTP_TIMEOUT) as client:
-            r = await client.post(
-                url,
-                json={"message": message, "wait_event_name": wait_event_name},
-            )
-            r.raise_for_status()
-            return r.json()
+        r = await get_http_client(url).post(
+            url,
+            json={"message": message, "wait_event_name": wait_event_name},
+            timeout=HTTP_TIMEOUT,
+        )
+        r.raise_for_status()
+        return r.json()
     except Exception as e:
         return {
             "error": f"Durable Orchestrator unavailable: {e}",
@@ -798,20 +791,20 @@ async def start_standing_intent_orchestration(
     """Start standing intent orchestrator. Returns instance ID or error."""
     url = f"{settings.durable_orchestrator_url}/api/orchestrators/standing_intent_orchestrator"
     try:
-        async with httpx.AsyncClient(timeout=HTTP_TIMEOUT) as client:
-            r = await client.post(
-                url,
-                json={
-                    "message": message,
-                    "approval_timeout_hours": approval_timeout_hours,
-                    "platform": platform,
-                    "thread_id": thread_id,
-                },
-            )
-            r.raise_for_status()
-            data = r.json()
-            instance_id = data.get("id") or data.get("instanceId") or data.get("instance_id")
-            return {"id": instance_id, "statusQueryGetUri": data.get("statusQueryGetUri")}
+        r = await get_http_client(url).post(
+            url,
+            json={
+                "message": message,
+                "approval_timeout_hours": approval_timeout_hours,
+                "platform": platform,
+                "thread_id": thread_id,
+            },
+            timeout=HTTP_TIMEOUT,
+        )
+        r.raise_for_status()
+        data = r.json()
+        instance_id = data.get("id") or data.get("instanceId") or data.get("instance_id")
+        return {"id": instance_id, "statusQueryGetUri": data.get("statusQueryGetUri")}
     except Exception as e:
         return {"error": str(e)}
 
@@ -819,19 +812,17 @@ async def start_standing_intent_orchestration(
 async def raise_orchestrator_event(instance_id: str, event_name: str, event_data: Optional[Dict[str, Any]] = None) -> None:
     """Raise external event to wake a waiting orchestrator."""
     url = f"{settings.durable_orchestrator_url}/api/orchestrators/{instance_id}/raise/{event_name}"
-    async with httpx.AsyncClient(timeout=HTTP_TIMEOUT) as client:
-        r = await client.post(url, json=event_data or {})
-        r.raise_for_status()
+    r = await get_http_client(url).post(url, json=event_data or {}, timeout=HTTP_TIMEOUT)
+    r.raise_for_status()
 
 
 async def get_orchestrator_status(instance_id: str) -> Optional[Dict[str, Any]]:
     """Get orchestration instance status."""
     url = f"{settings.durable_orchestrator_url}/api/orchestrators/{instance_id}/status"
     try:
-        async with httpx.AsyncClient(timeout=10.0) as client:
-            r = await client.get(url)
-            r.raise_for_status()
-            return r.json()
+        r = await get_http_client(url).get(url, timeout=10.0)
+        r.raise_for_status()
+        return r.json()
     except Exception:
         return None
 
@@ -846,19 +837,19 @@ async def create_standing_intent_via_api(
     """Create standing intent via orchestrator API (for agentic flow)."""
     url = f"{settings.orchestrator_base_url}/api/v1/standing-intents"
     try:
-        async with httpx.AsyncClient(timeout=HTTP_TIMEOUT) as client:
-            r = await client.post(
-                url,
-                json={
-                    "intent_description": intent_description,
-                    "approval_timeout_hours": approval_timeout_hours,
-                    "platform": platform,
-                    "thread_id": thread_id,
-                    "user_id": user_id,
-                },
-            )
-            r.raise_for_status()
-            return r.json()
+        r = await get_http_client(url).post(
+            url,
+            json={
+                "intent_description": intent_description,
+                "approval_timeout_hours": approval_timeout_hours,
+                "platform": platform,
+                "thread_id": thread_id,
+                "user_id": user_id,
+            },
+            timeout=HTTP_TIMEOUT,
+        )
+        r.raise_for_status()
+        return r.json()
     except Exception as e:
         return {"error": str(e)}
 
@@ -872,16 +863,16 @@ async def register_thread_mapping(
     """Register chat thread mapping for webhook push. Returns True if successful."""
     url = f"{settings.webhook_service_url}/api/v1/webhooks/mappings"
     try:
-        async with httpx.AsyncClient(timeout=HTTP_TIMEOUT) as client:
-            r = await client.post(
-                url,
-                json={
-                    "platform": platform,
-                    "thread_id": thread_id,
-                    "user_id": user_id,
-                    "platform_user_id": platform_user_id,
-                },
-            )
-            return r.status_code == 200
+        r = await get_http_client(url).post(
+            url,
+            json={
+                "platform": platform,
+                "thread_id": thread_id,
+                "user_id": user_id,
+                "platform_user_id": platform_user_id,
+            },
+            timeout=HTTP_TIMEOUT,
+        )
+        return r.status_code == 200
     except Exception:
         return False
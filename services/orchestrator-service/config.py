@@ -79,6 +79,9 @@ class Settings:
     # ID masking at Gateway: when True, broadcast discovery returns uso_{agent_slug}_{short_id}; mapping stored in id_masking_map with TTL
     id_masking_enabled: bool = (get_env("ID_MASKING_ENABLED") or "false").strip().lower() == "true"
     id_masking_ttl_hours: int = max(1, min(168, int(get_env("ID_MASKING_TTL_HOURS") or "24")))
+    # "table" = rows in id_masking_map; "token" = encrypted, self-contained ids (same ID_MASKING_SECRET as Discovery)
+    id_masking_mode: str = (get_env("ID_MASKING_MODE") or "table").strip().lower()
+    id_masking_secret: str = get_env("ID_MASKING_SECRET") or ""
 
     # Agentic handoff (Clerk SSO 2.0 - optional)
     clerk_publishable_key: str = get_env("CLERK_PUBLISHABLE_KEY") or ""
@@ -94,6 +97,14 @@ class Settings:
     # When False (default), intent's recommended_next_action can directly set the next step (current behavior).
     planner_always_decides: bool = (get_env("PLANNER_ALWAYS_DECIDES") or "false").strip().lower() == "true"
 
+    # discover_composite: fetch every category at once (COMPOSITE_OVERFETCH extra products each) and apply partner
+    # diversity afterwards, so a bundle costs ~one discovery round trip. false = one category after another.
+    composite_concurrent_fanout: bool = (get_env("COMPOSITE_CONCURRENT_FANOUT") or "true").strip().lower() != "false"
+    composite_overfetch: int = int(get_env("COMPOSITE_OVERFETCH") or "3")
+    # Start the discovery calls discover_composite would make while the planner LLM decides; reused only on an
+    # exact argument match, cancelled otherwise
+    speculative_discovery: bool = (get_env("SPECULATIVE_DISCOVERY") or "true").strip().lower() != "false"
+
     @property
     def agentic_handoff_configured(self) -> bool:
         return bool(self.clerk_publishable_key and self.clerk_secret_key)
@@ -1,12 +1,16 @@
 """Supabase client for orchestrator (account_links, users, id_masking_map)."""
 
+import logging
 import uuid as uuid_module
 from datetime import datetime, timedelta, timezone
-from typing import Any, Dict, List, Optional, cast
+from typing import Any, Dict, List, Optional, Tuple, cast
 
 from supabase import create_client, Client
 
 from config import settings
+from packages.shared.masked_ids import encode_masked_id
+
+logger = logging.getLogger(__name__)
 
 _client: Optional[Client] = None
 
@@ -26,36 +30,77 @@ def _supabase_configured() -> bool:
     return bool(getattr(settings, "supabase_url", None) and getattr(settings, "supabase_key", None))
 
 
-def store_masked_id(
-    agent_slug: str,
-    internal_product_id: str,
-    partner_id: Optional[str] = None,
+def _token_masking_enabled() -> bool:
+    return getattr(settings, "id_masking_mode", "table") == "token" and bool(getattr(settings, "id_masking_secret", ""))
+
+
+def check_id_masking_config() -> None:
+    """Warn (once, at startup) when ID_MASKING_MODE=token has no ID_MASKING_SECRET and table mode is used instead."""
+    if getattr(settings, "id_masking_mode", "table") == "token" and not getattr(settings, "id_masking_secret", ""):
+        logger.warning(
+            "ID_MASKING_MODE=token but ID_MASKING_SECRET is not set; masked ids fall back to id_masking_map rows"
+        )
+
+
+def store_masked_ids(
+    items: List[Tuple[str, str, Optional[str]]],
     source: str = "rpc",
-) -> Optional[str]:
+) -> List[Optional[str]]:
     """
-    Store a masked id mapping for Gateway ID masking (uso_{agent_slug}_{short_id}).
-    Used when merging broadcast discovery results so clients only see USO-owned ids.
-    Returns masked_id or None if DB unavailable. TTL from settings.id_masking_ttl_hours.
+    Masked ids for (agent_slug, internal_product_id, partner_id) items, in order (None where masking failed).
+    ID_MASKING_MODE=token: encrypted ids (uso_{agent_slug}.{token}), no DB writes.
+    Else uso_{agent_slug}_{short_id} mappings stored in one id_masking_map insert.
+    TTL from settings.id_masking_ttl_hours.
     """
+    if not items:
+        return []
+    ttl_hours = getattr(settings, "id_masking_ttl_hours", 24)
+    if _token_masking_enabled():
+        out: List[Optional[str]] = []
+        for agent_slug, internal_id, partner_id in items:
+            try:
+                out.append(encode_masked_id(
+                    settings.id_masking_secret, internal_id, partner_id, agent_slug, source, ttl_sec=ttl_hours * 3600,
+                ))
+            except Exception as e:
+                logger.error("Masked id encoding failed (agent_slug=%s): %s", agent_slug, e)
+                out.append(None)
+        return out
     client = get_supabase()
     if not client:
-        return None
-    short_uid = str(uuid_module.uuid4()).replace("-", "")[:16]
-    masked_id = f"uso_{agent_slug}_{short_uid}"
-    ttl_hours = getattr(settings, "id_masking_ttl_hours", 24)
+        return [None] * len(items)
     expires_at = (datetime.now(timezone.utc) + timedelta(hours=ttl_hours)).isoformat()
-    try:
-        client.table("id_masking_map").insert({
-            "masked_id": masked_id,
-            "internal_product_id": str(internal_product_id),
+    rows = [
+        {
+            "masked_id": f"uso_{agent_slug}_{str(uuid_module.uuid4()).replace('-', '')[:16]}",
+            "internal_product_id": str(internal_id),
             "partner_id": str(partner_id) if partner_id else None,
             "source": source,
             "agent_slug": agent_slug,
             "expires_at": expires_at,
-        }).execute()
-        return masked_id
-    except Exception:
-        return None
+        }
+        for agent_slug, internal_id, partner_id in items
+    ]
+    try:
+        client.table("id_masking_map").insert(rows).execute()
+        return [r["masked_id"] for r in rows]
+    except Exception as e:
+        logger.error("id_masking_map insert failed (%s ids): %s", len(rows), e)
+        return [None] * len(items)
+
+
+def store_masked_id(
+    agent_slug: str,
+    internal_product_id: str,
+    partner_id: Optional[str] = None,
+    source: str = "rpc",
+) -> Optional[str]:
+    """
+    Masked id for Gateway ID masking (see store_masked_ids).
+    Used when merging broadcast discovery results so clients only see USO-owned ids.
+    Returns masked_id or None if DB unavailable.
+    """
+    return store_masked_ids([(agent_slug, internal_product_id, partner_id)], source)[0]
 
 
 def get_user_by_id(user_id: str) -> Optional[Dict[str, Any]]:
@@ -41,11 +41,16 @@ from api.standing_intents import router as standing_intents_router
 from api.admin import router as admin_router
 from api.gateway_ucp import router as gateway_ucp_router
 from api.multi_agent import router as multi_agent_router
+from packages.shared.http_clients import get_http_client, http_client_lifespan
+from db import check_id_masking_config
+
+check_id_masking_config()
 
 app = FastAPI(
     title="Orchestrator Service",
     description="Intent → Discovery orchestration. Chat-First single endpoint.",
     version="0.1.0",
+    lifespan=http_client_lifespan,
 )
 
 app.middleware("http")(request_id_middleware)
@@ -74,11 +79,9 @@ health_checker = HealthChecker("orchestrator-service", "0.1.0")
 
 async def check_intent_service() -> DependencyCheck:
     """Check Intent service reachability."""
-    import httpx
     try:
-        async with httpx.AsyncClient(timeout=5.0) as client:
-            r = await client.get(f"{settings.intent_service_url}/health")
-            ok = r.status_code == 200
+        r = await get_http_client(settings.intent_service_url).get(f"{settings.intent_service_url}/health", timeout=5.0)
+        ok = r.status_code == 200
     except Exception as e:
         return DependencyCheck(
             name="intent_service",
@@ -94,11 +97,9 @@ async def check_intent_service() -> DependencyCheck:
 
 async def check_discovery_service() -> DependencyCheck:
     """Check Discovery service reachability."""
-    import httpx
     try:
-        async with httpx.AsyncClient(timeout=5.0) as client:
-            r = await client.get(f"{settings.discovery_service_url}/health")
-            ok = r.status_code == 200
+        r = await get_http_client(settings.discovery_service_url).get(f"{settings.discovery_service_url}/health", timeout=5.0)
+        ok = r.status_code == 200
     except Exception as e:
         return DependencyCheck(
             name="discovery_service",
@@ -10,6 +10,7 @@ sys.path.insert(0, str(_svc))
 
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
+from packages.shared.http_clients import http_client_lifespan
 
 from api.checkout import router as checkout_router
 from api.commitment import router as commitment_router
@@ -24,6 +25,7 @@ app = FastAPI(
     title="Payment Service",
     description="Module 15: Atomic Multi-Checkout with Stripe",
     version="0.1.0",
+    lifespan=http_client_lifespan,
 )
 
 app.add_middleware(
@@ -7,7 +7,7 @@ Shopify Draft Order integration for Gateway-to-Shopify payment flow (Phase 5).
 
 from typing import Any, Dict, List, Optional
 
-import httpx
+from packages.shared.http_clients import get_http_client
 
 SHOPIFY_API_VERSION = "2024-10"
 
@@ -62,8 +62,7 @@ async def create_draft_order_precheck(
         "Content-Type": "application/json",
         "X-Shopify-Access-Token": access_token,
     }
-    async with httpx.AsyncClient(timeout=15.0) as client:
-        resp = await client.post(url, json=payload, headers=headers)
+    resp = await get_http_client(url).post(url, json=payload, headers=headers, timeout=15.0)
     resp.raise_for_status()
     data = resp.json()
     draft = data.get("draft_order", {})
@@ -92,8 +91,7 @@ async def complete_draft_order(
         "X-Shopify-Access-Token": access_token,
     }
     payload = {"payment_pending": payment_pending}
-    async with httpx.AsyncClient(timeout=15.0) as client:
-        resp = await client.put(url, json=payload, headers=headers)
+    resp = await get_http_client(url).put(url, json=payload, headers=headers, timeout=15.0)
     if resp.status_code >= 400:
         return {
             "error": resp.text or "Complete failed",
@@ -124,8 +122,7 @@ async def cancel_shopify_order(
         "X-Shopify-Access-Token": access_token,
     }
     try:
-        async with httpx.AsyncClient(timeout=15.0) as client:
-            resp = await client.post(url, json={}, headers=headers)
+        resp = await get_http_client(url).post(url, json={}, headers=headers, timeout=15.0)
         return resp.status_code < 400
     except Exception:
         return False
@@ -74,11 +74,12 @@ def get_proof(proof_id: str) -> Dict[str, Any]:
 
 
 def _create_image_client(cfg: Dict[str, Any]):
-    """Create OpenAI-compatible client for image generation from platform config."""
+    """OpenAI-compatible client for image generation from platform config (shared per config, see llm_clients)."""
     try:
-        from openai import OpenAI, AzureOpenAI
+        import openai  # noqa: F401
     except ImportError:
         raise HTTPException(status_code=503, detail="openai package required for image generation; pip install openai")
+    from packages.shared.llm_clients import get_openai_client
 
     provider = (cfg.get("provider") or "openai").lower()
     api_key = cfg.get("api_key")
@@ -89,18 +90,18 @@ def _create_image_client(cfg: Dict[str, Any]):
         return None, None
 
     if provider == "azure" and endpoint:
-        client = AzureOpenAI(
+        client = get_openai_client(
+            api_key,
             azure_endpoint=endpoint.rstrip("/") if endpoint else None,
-            api_key=api_key,
             api_version="2024-02-15-preview",
         )
         return client, model
     if provider in ("openrouter", "custom") and endpoint:
         base = endpoint.rstrip("/")
-        client = OpenAI(api_key=api_key, base_url=base)
+        client = get_openai_client(api_key, base_url=base)
         return client, model
     # openai (direct) or fallback
-    client = OpenAI(api_key=api_key)
+    client = get_openai_client(api_key)
     return client, model
 
 
@@ -55,8 +55,8 @@ def _vision_configured() -> bool:
 def _compare_images(proof_url: str, source_url: Optional[str]) -> float:
     """Use Platform Config LLM or OpenAI Vision to compare images. Returns 0-1 similarity score."""
     try:
-        from openai import OpenAI
         from db import get_supabase
+        from packages.shared.llm_clients import get_openai_client
         from packages.shared.platform_llm import get_platform_llm_config
 
         client = None
@@ -68,24 +68,23 @@ def _compare_images(proof_url: str, source_url: Optional[str]) -> float:
             model = cfg.get("model") or "gpt-4o"
             provider = cfg.get("provider", "azure")
             if provider == "openrouter":
-                client = OpenAI(base_url="https://openrouter.ai/api/v1", api_key=cfg["api_key"])
+                client = get_openai_client(cfg["api_key"], base_url="https://openrouter.ai/api/v1")
             elif provider == "custom" and cfg.get("endpoint"):
                 base = cfg["endpoint"].rstrip("/")
                 if not base.endswith("/v1"):
                     base = f"{base}/v1"
-                client = OpenAI(base_url=base, api_key=cfg["api_key"])
+                client = get_openai_client(cfg["api_key"], base_url=base)
             elif provider in ("azure", "openai") and cfg.get("endpoint"):
-                from openai import AzureOpenAI
-                client = AzureOpenAI(
-                    api_key=cfg["api_key"],
-                    api_version="2024-02-15-preview",
+                client = get_openai_client(
+                    cfg["api_key"],
                     azure_endpoint=cfg["endpoint"].rstrip("/"),
+                    api_version="2024-02-15-preview",
                 )
             else:
-                client = OpenAI(api_key=cfg["api_key"])
+                client = get_openai_client(cfg["api_key"])
 
         if not client and settings.openai_api_key:
-            client = OpenAI(api_key=settings.openai_api_key)
+            client = get_openai_client(settings.openai_api_key)
 
         if not client:
             return 0.0
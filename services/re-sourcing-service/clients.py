@@ -3,9 +3,8 @@
 import logging
 from typing import Any, Dict, List, Optional
 
-import httpx
-
 from config import settings
+from packages.shared.http_clients import get_http_client
 
 logger = logging.getLogger(__name__)
 
@@ -15,14 +14,13 @@ async def commitment_cancel(partner_id: str, external_order_id: str, vendor_type
     from config import settings
     url = f"{settings.payment_service_url.rstrip('/')}/api/v1/commitment/cancel"
     try:
-        async with httpx.AsyncClient(timeout=15.0) as client:
-            r = await client.post(url, json={
-                "partner_id": partner_id,
-                "external_order_id": external_order_id,
-                "vendor_type": vendor_type,
-            })
-            r.raise_for_status()
-            return r.json().get("ok", False)
+        r = await get_http_client(url).post(url, json={
+            "partner_id": partner_id,
+            "external_order_id": external_order_id,
+            "vendor_type": vendor_type,
+        }, timeout=15.0)
+        r.raise_for_status()
+        return r.json().get("ok", False)
     except Exception as e:
         logger.exception("Commitment cancel failed: %s", e)
         return False
@@ -39,11 +37,10 @@ async def discover_products(
     if exclude_partner_id:
         params["exclude_partner_id"] = exclude_partner_id
     try:
-        async with httpx.AsyncClient(timeout=30.0) as client:
-            r = await client.get(url, params=params)
-            r.raise_for_status()
-            data = r.json()
-            return data.get("data", {}).get("products", [])
+        r = await get_http_client(url).get(url, params=params, timeout=30.0)
+        r.raise_for_status()
+        data = r.json()
+        return data.get("data", {}).get("products", [])
     except Exception as e:
         logger.exception("Discovery search failed: %s", e)
         return []
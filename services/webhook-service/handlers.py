@@ -3,10 +3,10 @@
 import logging
 from typing import Any, Dict
 
-import httpx
 from fastapi import HTTPException
 
 from config import settings
+from packages.shared.http_clients import get_http_client
 
 logger = logging.getLogger(__name__)
 
@@ -39,9 +39,8 @@ async def send_chatgpt_webhook(thread_id: str, update_data: Dict[str, Any]) -> b
     """Push update to ChatGPT thread. Raises 503 if CHATGPT_WEBHOOK_URL not set."""
     _require_chatgpt_configured()
     url = settings.chatgpt_webhook_url.rstrip("/") + f"/{thread_id}"
-    async with httpx.AsyncClient(timeout=10.0) as client:
-        r = await client.post(url, json=update_data)
-        r.raise_for_status()
+    r = await get_http_client(url).post(url, json=update_data, timeout=10.0)
+    r.raise_for_status()
     return True
 
 
@@ -49,9 +48,8 @@ async def send_gemini_webhook(thread_id: str, update_data: Dict[str, Any]) -> bo
     """Push update to Gemini thread. Raises 503 if GEMINI_WEBHOOK_URL not set."""
     _require_gemini_configured()
     url = settings.gemini_webhook_url.rstrip("/") + f"/{thread_id}"
-    async with httpx.AsyncClient(timeout=10.0) as client:
-        r = await client.post(url, json=update_data)
-        r.raise_for_status()
+    r = await get_http_client(url).post(url, json=update_data, timeout=10.0)
+    r.raise_for_status()
     return True
 
 
@@ -17,6 +17,7 @@ from packages.shared.errors.middleware import (
 )
 from packages.shared.monitoring import HealthChecker, DependencyStatus, health_router
 from packages.shared.monitoring.health import DependencyCheck
+from packages.shared.http_clients import http_client_lifespan
 
 from config import settings
 from db import check_connection
@@ -26,6 +27,7 @@ app = FastAPI(
     title="Webhook Push Notification Bridge",
     description="Push updates to ChatGPT, Gemini, WhatsApp chat threads",
     version="0.1.0",
+    lifespan=http_client_lifespan,
 )
 
 app.middleware("http")(request_id_middleware)
@@ -0,0 +1,22 @@
+-- Persistent tier for the discovery query-embedding cache (EMBEDDING_CACHE_PERSISTENT=true).
+-- Keyed by sha256(provider:model:normalized query); shared across discovery workers and restarts.
+
+BEGIN;
+
+CREATE TABLE IF NOT EXISTS query_embedding_cache (
+  cache_key TEXT PRIMARY KEY,
+  provider TEXT NOT NULL,
+  model TEXT NOT NULL,
+  query_text TEXT NOT NULL,
+  embedding vector(1536) NOT NULL,
+  created_at TIMESTAMPTZ NOT NULL DEFAULT NOW()
+);
+
+CREATE INDEX IF NOT EXISTS idx_query_embedding_cache_created_at
+  ON query_embedding_cache(created_at);
+
+ALTER TABLE query_embedding_cache ENABLE ROW LEVEL SECURITY;
+
+COMMENT ON TABLE query_embedding_cache IS 'Discovery semantic search: cached query embeddings (rows older than EMBEDDING_CACHE_TTL_SEC are ignored and may be deleted).';
+
+COMMIT;
@@ -0,0 +1,33 @@
+-- Bulk embedding writes for the discovery backfill: one RPC per batch instead of one UPDATE per row.
+-- p_items: [{"id": "<uuid>", "embedding": "[0.1,0.2,...]"}, ...]
+
+BEGIN;
+
+CREATE OR REPLACE FUNCTION bulk_set_embeddings(p_target text, p_items jsonb)
+RETURNS integer
+LANGUAGE plpgsql
+AS $$
+DECLARE
+  n integer := 0;
+BEGIN
+  IF p_target = 'products' THEN
+    UPDATE products p
+    SET embedding = (i->>'embedding')::vector(1536)
+    FROM jsonb_array_elements(p_items) AS i
+    WHERE p.id = (i->>'id')::uuid;
+  ELSIF p_target = 'partner_kb_articles' THEN
+    UPDATE partner_kb_articles a
+    SET embedding = (i->>'embedding')::vector(1536)
+    FROM jsonb_array_elements(p_items) AS i
+    WHERE a.id = (i->>'id')::uuid;
+  ELSE
+    RAISE EXCEPTION 'bulk_set_embeddings: unsupported target %', p_target;
+  END IF;
+  GET DIAGNOSTICS n = ROW_COUNT;
+  RETURN n;
+END;
+$$;
+
+COMMENT ON FUNCTION bulk_set_embeddings IS 'Module 1: set embeddings for a batch of products or partner_kb_articles rows (embedding backfill)';
+
+COMMIT;
@@ -0,0 +1,26 @@
+-- Keep products.updated_at current on every UPDATE so discovery's local vector index can sync deltas
+-- (changed rows, soft deletes, new embeddings) by polling updated_at.
+
+BEGIN;
+
+CREATE OR REPLACE FUNCTION products_touch_updated_at()
+RETURNS trigger
+LANGUAGE plpgsql
+AS $$
+BEGIN
+  NEW.updated_at := NOW();
+  RETURN NEW;
+END;
+$$;
+
+DROP TRIGGER IF EXISTS trg_products_touch_updated_at ON products;
+CREATE TRIGGER trg_products_touch_updated_at
+  BEFORE UPDATE ON products
+  FOR EACH ROW
+  EXECUTE FUNCTION products_touch_updated_at();
+
+CREATE INDEX IF NOT EXISTS idx_products_updated_at ON products(updated_at);
+
+COMMENT ON FUNCTION products_touch_updated_at IS 'Sets products.updated_at on UPDATE (delta sync for the discovery local vector index)';
+
+COMMIT;
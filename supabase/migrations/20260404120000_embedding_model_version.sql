@@ -0,0 +1,43 @@
+-- Model-version tag stored with every embedding (e.g. "azure:text-embedding-3-small", "hash:hashing-v1").
+-- Vectors from different providers / models are not comparable; the backfill uses this column to find and
+-- re-embed rows left behind after switching EMBEDDING_PROVIDER or EMBEDDING_MODEL.
+
+BEGIN;
+
+ALTER TABLE products ADD COLUMN IF NOT EXISTS embedding_model TEXT;
+ALTER TABLE partner_kb_articles ADD COLUMN IF NOT EXISTS embedding_model TEXT;
+
+COMMENT ON COLUMN products.embedding_model IS 'Provider:model that produced embedding (NULL = written before version tagging)';
+COMMENT ON COLUMN partner_kb_articles.embedding_model IS 'Provider:model that produced embedding (NULL = written before version tagging)';
+
+-- Replace the two-argument version with one that also records the model-version tag
+DROP FUNCTION IF EXISTS bulk_set_embeddings(text, jsonb);
+
+CREATE OR REPLACE FUNCTION bulk_set_embeddings(p_target text, p_items jsonb, p_model text DEFAULT NULL)
+RETURNS integer
+LANGUAGE plpgsql
+AS $$
+DECLARE
+  n integer := 0;
+BEGIN
+  IF p_target = 'products' THEN
+    UPDATE products p
+    SET embedding = (i->>'embedding')::vector(1536), embedding_model = p_model
+    FROM jsonb_array_elements(p_items) AS i
+    WHERE p.id = (i->>'id')::uuid;
+  ELSIF p_target = 'partner_kb_articles' THEN
+    UPDATE partner_kb_articles a
+    SET embedding = (i->>'embedding')::vector(1536), embedding_model = p_model
+    FROM jsonb_array_elements(p_items) AS i
+    WHERE a.id = (i->>'id')::uuid;
+  ELSE
+    RAISE EXCEPTION 'bulk_set_embeddings: unsupported target %', p_target;
+  END IF;
+  GET DIAGNOSTICS n = ROW_COUNT;
+  RETURN n;
+END;
+$$;
+
+COMMENT ON FUNCTION bulk_set_embeddings IS 'Module 1: set embeddings (and model-version tag) for a batch of products or partner_kb_articles rows (embedding backfill)';
+
+COMMIT;
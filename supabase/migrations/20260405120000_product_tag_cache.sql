@@ -0,0 +1,40 @@
+-- Experience-tag enrichment cache (discovery metadata_enricher).
+-- Keyed by sha256(prompt version + normalized description), so Shopify / UCP / MCP products (never stored in
+-- products) are tagged once, and identical descriptions share tags across partners, workers and restarts.
+
+BEGIN;
+
+CREATE TABLE IF NOT EXISTS product_tag_cache (
+  content_hash TEXT PRIMARY KEY,
+  tags JSONB NOT NULL DEFAULT '[]'::jsonb,
+  model TEXT,
+  created_at TIMESTAMPTZ NOT NULL DEFAULT NOW()
+);
+
+ALTER TABLE product_tag_cache ENABLE ROW LEVEL SECURITY;
+
+COMMENT ON TABLE product_tag_cache IS 'Discovery metadata enricher: LLM-assigned experience_tags by description content hash.';
+
+-- Write enriched tags back to LocalDB products in one call; rows tagged meanwhile (e.g. in the partner portal) are kept.
+-- p_items: [{"id": "<uuid>", "tags": ["luxury", "romantic"]}, ...]
+CREATE OR REPLACE FUNCTION set_missing_experience_tags(p_items jsonb)
+RETURNS integer
+LANGUAGE plpgsql
+AS $$
+DECLARE
+  n integer := 0;
+BEGIN
+  UPDATE products p
+  SET experience_tags = i->'tags'
+  FROM jsonb_array_elements(p_items) AS i
+  WHERE p.id = (i->>'id')::uuid
+    AND jsonb_typeof(i->'tags') = 'array'
+    AND (p.experience_tags IS NULL OR p.experience_tags = '[]'::jsonb);
+  GET DIAGNOSTICS n = ROW_COUNT;
+  RETURN n;
+END;
+$$;
+
+COMMENT ON FUNCTION set_missing_experience_tags IS 'Module 1: set experience_tags on products that have none (metadata enricher write-back)';
+
+COMMIT;
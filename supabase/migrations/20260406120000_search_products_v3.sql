@@ -0,0 +1,163 @@
+-- Module 1: indexed text search for discovery (replaces name/description ilike OR chains and the
+-- per-token capability fallback in db.search_products).
+--
+-- products_search_text(name, description): lower-cased name + description, trigram GIN index, so
+--   substring matches (ILIKE '%tok%') use the index instead of scanning products.
+-- products_search_tsv(name, description, capabilities): 'simple' tsvector GIN index, used to match
+--   word prefixes (including capability slugs) and to rank hits.
+-- search_products_v3: token match, capability fallback, experience-tag containment and partner filters
+--   in one ranked query.
+
+BEGIN;
+
+CREATE EXTENSION IF NOT EXISTS pg_trgm;
+
+CREATE OR REPLACE FUNCTION products_search_text(p_name text, p_description text)
+RETURNS text
+LANGUAGE sql
+IMMUTABLE
+PARALLEL SAFE
+AS $$
+  SELECT lower(coalesce(p_name, '') || ' ' || coalesce(p_description, ''));
+$$;
+
+CREATE OR REPLACE FUNCTION products_search_tsv(p_name text, p_description text, p_capabilities jsonb)
+RETURNS tsvector
+LANGUAGE sql
+IMMUTABLE
+PARALLEL SAFE
+AS $$
+  SELECT setweight(to_tsvector('simple'::regconfig, coalesce(p_name, '')), 'A')
+      || setweight(to_tsvector('simple'::regconfig, coalesce(p_description, '')), 'B')
+      || setweight(
+           to_tsvector(
+             'simple'::regconfig,
+             CASE WHEN jsonb_typeof(p_capabilities) = 'array'
+               THEN array_to_string(ARRAY(SELECT jsonb_array_elements_text(p_capabilities)), ' ')
+               ELSE ''
+             END
+           ),
+           'C'
+         );
+$$;
+
+CREATE INDEX IF NOT EXISTS idx_products_search_trgm
+  ON products USING GIN (products_search_text(name, description) gin_trgm_ops)
+  WHERE deleted_at IS NULL;
+
+CREATE INDEX IF NOT EXISTS idx_products_search_tsv
+  ON products USING GIN (products_search_tsv(name, description, capabilities))
+  WHERE deleted_at IS NULL;
+
+-- p_tokens: query tokens (db._product_query_tokens); empty = browse (newest first).
+-- p_capabilities: capability slugs tried only when no product matches the tokens.
+-- p_experience_tags: products must contain ALL tags.
+CREATE OR REPLACE FUNCTION search_products_v3(
+  p_tokens text[] DEFAULT '{}',
+  p_capabilities text[] DEFAULT '{}',
+  p_limit int DEFAULT 20,
+  p_partner_id uuid DEFAULT NULL,
+  p_exclude_partner_id uuid DEFAULT NULL,
+  p_experience_tags text[] DEFAULT '{}'
+)
+RETURNS TABLE (
+  id uuid,
+  name text,
+  description text,
+  price numeric,
+  currency varchar,
+  capabilities jsonb,
+  metadata jsonb,
+  partner_id uuid,
+  url text,
+  brand varchar,
+  image_url text,
+  is_eligible_search boolean,
+  is_eligible_checkout boolean,
+  target_countries jsonb,
+  availability varchar,
+  experience_tags jsonb,
+  created_at timestamptz,
+  sold_count integer,
+  match_type text,
+  match_rank real
+)
+LANGUAGE plpgsql
+STABLE
+AS $$
+#variable_conflict use_column
+DECLARE
+  patterns text[];
+  tsq tsquery;
+  tags jsonb := to_jsonb(coalesce(p_experience_tags, '{}'::text[]));
+  caps text[];
+BEGIN
+  -- '%tok%' with LIKE wildcards escaped; prefix tsquery 'tok1:* | tok2:*' from the alphanumeric part of each token
+  SELECT
+    array_agg('%' || replace(replace(replace(lower(t), '\', '\\'), '%', '\%'), '_', '\_') || '%'),
+    to_tsquery('simple', string_agg(nullif(regexp_replace(lower(t), '[^[:alnum:]]+', '', 'g'), '') || ':*', ' | '))
+  INTO patterns, tsq
+  FROM unnest(coalesce(p_tokens, '{}'::text[])) AS t
+  WHERE length(t) > 1;
+
+  IF patterns IS NULL THEN
+    RETURN QUERY
+    SELECT p.id, p.name, p.description, p.price, p.currency, p.capabilities, p.metadata, p.partner_id,
+           p.url, p.brand, p.image_url, p.is_eligible_search, p.is_eligible_checkout, p.target_countries,
+           p.availability, p.experience_tags, p.created_at, p.sold_count, 'browse'::text, 0::real
+    FROM products p
+    WHERE p.deleted_at IS NULL
+      AND (p_partner_id IS NULL OR p.partner_id = p_partner_id)
+      AND (p_exclude_partner_id IS NULL OR p.partner_id <> p_exclude_partner_id)
+      AND p.experience_tags @> tags
+    ORDER BY p.created_at DESC
+    LIMIT p_limit;
+    RETURN;
+  END IF;
+
+  RETURN QUERY
+  SELECT p.id, p.name, p.description, p.price, p.currency, p.capabilities, p.metadata, p.partner_id,
+         p.url, p.brand, p.image_url, p.is_eligible_search, p.is_eligible_checkout, p.target_countries,
+         p.availability, p.experience_tags, p.created_at, p.sold_count, 'text'::text,
+         coalesce(ts_rank_cd(products_search_tsv(p.name, p.description, p.capabilities), tsq), 0)::real AS rank_score
+  FROM products p
+  WHERE p.deleted_at IS NULL
+    AND (p_partner_id IS NULL OR p.partner_id = p_partner_id)
+    AND (p_exclude_partner_id IS NULL OR p.partner_id <> p_exclude_partner_id)
+    AND p.experience_tags @> tags
+    AND (
+      products_search_text(p.name, p.description) ILIKE ANY (patterns)
+      OR (tsq IS NOT NULL AND products_search_tsv(p.name, p.description, p.capabilities) @@ tsq)
+    )
+  ORDER BY rank_score DESC, p.created_at DESC
+  LIMIT p_limit;
+
+  IF FOUND THEN
+    RETURN;
+  END IF;
+
+  -- Capability fallback: products listing any of the slugs, earlier slugs first
+  SELECT array_agg(lower(c)) INTO caps FROM unnest(coalesce(p_capabilities, '{}'::text[])) AS c WHERE c <> '';
+  IF caps IS NULL THEN
+    RETURN;
+  END IF;
+
+  RETURN QUERY
+  SELECT p.id, p.name, p.description, p.price, p.currency, p.capabilities, p.metadata, p.partner_id,
+         p.url, p.brand, p.image_url, p.is_eligible_search, p.is_eligible_checkout, p.target_countries,
+         p.availability, p.experience_tags, p.created_at, p.sold_count, 'capability'::text, 0::real
+  FROM products p
+  WHERE p.deleted_at IS NULL
+    AND (p_partner_id IS NULL OR p.partner_id = p_partner_id)
+    AND (p_exclude_partner_id IS NULL OR p.partner_id <> p_exclude_partner_id)
+    AND p.experience_tags @> tags
+    AND p.capabilities ?| caps
+  ORDER BY (SELECT min(c.pos) FROM unnest(caps) WITH ORDINALITY AS c(cap, pos) WHERE p.capabilities ? c.cap),
+           p.created_at DESC
+  LIMIT p_limit;
+END;
+$$;
+
+COMMENT ON FUNCTION search_products_v3(text[], text[], int, uuid, uuid, text[]) IS 'Module 1: ranked text search (trigram + tsvector indexes) with capability fallback, experience-tag and partner filters';
+
+COMMIT;
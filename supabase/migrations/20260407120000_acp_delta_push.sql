@@ -0,0 +1,76 @@
+-- Module 1: delta ACP push (POST /api/v1/feeds/push scope=delta) and push-status counts.
+--
+-- A product is pending when it was never pushed, its last push failed, or it changed after the last push
+-- (updated_at > last_acp_push_at). mark_products_acp_pushed stamps last_acp_push_at with NOW(), the same
+-- value the products updated_at trigger writes in that transaction, so a pushed product stops being pending
+-- until its next real change.
+
+BEGIN;
+
+CREATE INDEX IF NOT EXISTS idx_products_acp_push_pending ON products(partner_id, id)
+  WHERE deleted_at IS NULL
+    AND (last_acp_push_at IS NULL OR last_acp_push_success IS NOT TRUE OR updated_at > last_acp_push_at);
+
+CREATE OR REPLACE FUNCTION get_acp_push_delta(
+  p_partner_id uuid,
+  p_after_id uuid DEFAULT NULL,
+  p_limit int DEFAULT 1000
+)
+RETURNS TABLE (id uuid)
+LANGUAGE sql
+STABLE
+AS $$
+  SELECT p.id
+  FROM products p
+  WHERE p.partner_id = p_partner_id
+    AND p.deleted_at IS NULL
+    AND (p.last_acp_push_at IS NULL OR p.last_acp_push_success IS NOT TRUE OR p.updated_at > p.last_acp_push_at)
+    AND (p_after_id IS NULL OR p.id > p_after_id)
+  ORDER BY p.id
+  LIMIT GREATEST(1, LEAST(COALESCE(p_limit, 1000), 5000));
+$$;
+
+CREATE OR REPLACE FUNCTION mark_products_acp_pushed(
+  p_succeeded uuid[] DEFAULT '{}',
+  p_failed uuid[] DEFAULT '{}'
+)
+RETURNS integer
+LANGUAGE sql
+AS $$
+  WITH ok AS (
+    UPDATE products
+    SET last_acp_push_at = NOW(), last_acp_push_success = TRUE
+    WHERE id = ANY(COALESCE(p_succeeded, '{}'))
+    RETURNING 1
+  ),
+  failed AS (
+    UPDATE products
+    SET last_acp_push_at = NOW(), last_acp_push_success = FALSE
+    WHERE id = ANY(COALESCE(p_failed, '{}'))
+    RETURNING 1
+  )
+  SELECT ((SELECT COUNT(*) FROM ok) + (SELECT COUNT(*) FROM failed))::int;
+$$;
+
+CREATE OR REPLACE FUNCTION acp_push_status(p_partner_id uuid)
+RETURNS TABLE (total bigint, pending bigint, failed bigint, never_pushed bigint, last_pushed_at timestamptz)
+LANGUAGE sql
+STABLE
+AS $$
+  SELECT
+    COUNT(*),
+    COUNT(*) FILTER (WHERE last_acp_push_at IS NULL OR last_acp_push_success IS NOT TRUE OR updated_at > last_acp_push_at),
+    COUNT(*) FILTER (WHERE last_acp_push_success IS FALSE),
+    COUNT(*) FILTER (WHERE last_acp_push_at IS NULL),
+    MAX(last_acp_push_at)
+  FROM products
+  WHERE partner_id = p_partner_id
+    AND deleted_at IS NULL;
+$$;
+
+COMMENT ON INDEX idx_products_acp_push_pending IS 'Products awaiting an ACP push (never pushed, failed, or changed since); keeps delta pushes proportional to churn';
+COMMENT ON FUNCTION get_acp_push_delta IS 'Keyset page of a partner''s product ids pending an ACP push (discovery /feeds/push scope=delta)';
+COMMENT ON FUNCTION mark_products_acp_pushed IS 'Record an ACP push outcome for many products in one statement (last_acp_push_at = NOW() = trigger updated_at)';
+COMMENT ON FUNCTION acp_push_status IS 'Per-partner ACP push counts: total, pending, failed, never pushed, last push time';
+
+COMMIT;
@@ -0,0 +1,95 @@
+-- SLA re-sourcing job (POST /api/v1/sla/run-job) as two set-based statements.
+--
+-- get_sla_overdue_legs joins legs -> sessions -> orders -> curated partner -> registry in one query and returns
+-- only legs whose SLA window (registry sla_response_hours, default 24) has passed since the order was paid,
+-- with the product name / capabilities used to search for alternatives. create_sla_re_sourcing_pending_bulk
+-- stores every snapshot and flips the legs to awaiting_user_response in one statement; a leg already awaiting
+-- (e.g. a concurrent run) is skipped, so users are notified once.
+
+BEGIN;
+
+CREATE INDEX IF NOT EXISTS idx_experience_session_legs_sla_candidates ON experience_session_legs(id)
+  WHERE status IN ('ready', 'in_customization')
+    AND design_started_at IS NULL
+    AND re_sourcing_state IS DISTINCT FROM 'awaiting_user_response';
+
+CREATE OR REPLACE FUNCTION get_sla_overdue_legs(p_limit int DEFAULT 5000)
+RETURNS TABLE (
+  leg_id uuid,
+  thread_id text,
+  partner_id uuid,
+  product_id text,
+  product_name text,
+  product_capabilities jsonb,
+  paid_at timestamptz,
+  sla_response_hours numeric
+)
+LANGUAGE sql
+STABLE
+AS $$
+  SELECT
+    l.id,
+    s.thread_id,
+    l.partner_id,
+    l.product_id,
+    p.name,
+    p.capabilities,
+    o.paid_at,
+    COALESCE(NULLIF(r.sla_response_hours, 0), 24)
+  FROM experience_session_legs l
+  JOIN experience_sessions s ON s.id = l.experience_session_id AND s.thread_id IS NOT NULL AND s.thread_id <> ''
+  JOIN orders o ON o.id = s.order_id AND o.paid_at IS NOT NULL
+  JOIN LATERAL (
+    SELECT scp.internal_agent_registry_id
+    FROM shopify_curated_partners scp
+    WHERE scp.partner_id = l.partner_id
+    LIMIT 1
+  ) cp ON cp.internal_agent_registry_id IS NOT NULL
+  JOIN internal_agent_registry r ON r.id = cp.internal_agent_registry_id AND r.available_to_customize IS TRUE
+  LEFT JOIN id_masking_map m ON m.masked_id = l.product_id
+  LEFT JOIN products p ON p.id = CASE
+    WHEN l.product_id ~* '^[0-9a-f]{8}-[0-9a-f]{4}-[0-9a-f]{4}-[0-9a-f]{4}-[0-9a-f]{12}$' THEN l.product_id::uuid
+    WHEN m.internal_product_id ~* '^[0-9a-f]{8}-[0-9a-f]{4}-[0-9a-f]{4}-[0-9a-f]{4}-[0-9a-f]{12}$' THEN m.internal_product_id::uuid
+  END
+  WHERE l.status IN ('ready', 'in_customization')
+    AND l.design_started_at IS NULL
+    AND l.re_sourcing_state IS DISTINCT FROM 'awaiting_user_response'
+    AND o.paid_at + make_interval(secs => COALESCE(NULLIF(r.sla_response_hours, 0), 24) * 3600) <= NOW()
+  ORDER BY o.paid_at
+  LIMIT GREATEST(1, LEAST(COALESCE(p_limit, 5000), 20000));
+$$;
+
+CREATE OR REPLACE FUNCTION create_sla_re_sourcing_pending_bulk(p_items jsonb)
+RETURNS TABLE (leg_id uuid)
+LANGUAGE sql
+AS $$
+  WITH items AS (
+    SELECT DISTINCT ON ((e->>'leg_id')::uuid)
+      (e->>'leg_id')::uuid AS leg_id,
+      COALESCE(e->'alternatives', '[]'::jsonb) AS alternatives
+    FROM jsonb_array_elements(COALESCE(p_items, '[]'::jsonb)) e
+    WHERE e->>'leg_id' IS NOT NULL
+  ),
+  claimed AS (
+    UPDATE experience_session_legs l
+    SET re_sourcing_state = 'awaiting_user_response', updated_at = NOW()
+    FROM items i
+    WHERE l.id = i.leg_id
+      AND l.re_sourcing_state IS DISTINCT FROM 'awaiting_user_response'
+    RETURNING l.id
+  ),
+  inserted AS (
+    INSERT INTO sla_re_sourcing_pending (experience_session_leg_id, alternatives_snapshot)
+    SELECT i.leg_id, i.alternatives
+    FROM items i
+    JOIN claimed c ON c.id = i.leg_id
+    RETURNING experience_session_leg_id
+  )
+  SELECT experience_session_leg_id FROM inserted;
+$$;
+
+COMMENT ON INDEX idx_experience_session_legs_sla_candidates IS 'Legs the SLA re-sourcing job may still notify (ready / in_customization, design not started, not awaiting)';
+COMMENT ON FUNCTION get_sla_overdue_legs IS 'Legs past their partner SLA (registry sla_response_hours since orders.paid_at) with thread and product search fields, in one query';
+COMMENT ON FUNCTION create_sla_re_sourcing_pending_bulk IS 'Store SLA alternatives for many legs and mark them awaiting_user_response in one statement; returns the legs claimed';
+
+COMMIT;
@@ -0,0 +1,82 @@
+-- Semantic search only scores vectors from the query's embedding model.
+--
+-- match_products_v2 / match_kb_articles gain p_embedding_model (the provider:model tag discovery writes to
+-- embedding_model, e.g. "azure:text-embedding-3-small"). When set, rows embedded by another model are skipped:
+-- after switching EMBEDDING_PROVIDER or EMBEDDING_MODEL, and during the re-embed backfill
+-- (POST /api/v1/admin/embeddings/backfill?reembed=true), a query vector is never compared with vectors it is
+-- not comparable to. Rows written before version tagging (embedding_model IS NULL) count as
+-- p_legacy_embedding_model (the provider:model that produced them), so existing vectors keep matching without a
+-- re-embed. NULL p_embedding_model keeps the old unfiltered behaviour.
+
+BEGIN;
+
+CREATE INDEX IF NOT EXISTS idx_products_embedding_model ON products(embedding_model)
+  WHERE deleted_at IS NULL AND embedding IS NOT NULL;
+
+DROP FUNCTION IF EXISTS match_products_v2(vector(1536), int, float, uuid, uuid, text);
+DROP FUNCTION IF EXISTS match_products_v2(vector(1536), int, float, uuid, uuid, text, text);
+
+CREATE OR REPLACE FUNCTION match_products_v2(
+  query_embedding vector(1536),
+  match_count int DEFAULT 20,
+  match_threshold float DEFAULT 0.5,
+  filter_partner_id uuid DEFAULT NULL,
+  exclude_partner_id uuid DEFAULT NULL,
+  filter_experience_tag text DEFAULT NULL,
+  p_embedding_model text DEFAULT NULL,
+  p_legacy_embedding_model text DEFAULT NULL
+)
+RETURNS SETOF products
+LANGUAGE plpgsql
+AS $$
+BEGIN
+  RETURN QUERY
+  SELECT p.*
+  FROM products p
+  WHERE p.deleted_at IS NULL
+    AND p.embedding IS NOT NULL
+    AND (p_embedding_model IS NULL OR COALESCE(p.embedding_model, p_legacy_embedding_model) = p_embedding_model)
+    AND (1 - (p.embedding <=> query_embedding)) > match_threshold
+    AND (filter_partner_id IS NULL OR p.partner_id = filter_partner_id)
+    AND (exclude_partner_id IS NULL OR p.partner_id != exclude_partner_id)
+    AND (filter_experience_tag IS NULL OR p.experience_tags ? filter_experience_tag)
+  ORDER BY p.embedding <=> query_embedding
+  LIMIT match_count;
+END;
+$$;
+
+DROP FUNCTION IF EXISTS match_kb_articles(vector(1536), int, float, uuid, uuid);
+DROP FUNCTION IF EXISTS match_kb_articles(vector(1536), int, float, uuid, uuid, text);
+
+CREATE OR REPLACE FUNCTION match_kb_articles(
+  query_embedding vector(1536),
+  match_count int DEFAULT 20,
+  match_threshold float DEFAULT 0.0,
+  filter_partner_id uuid DEFAULT NULL,
+  exclude_partner_id uuid DEFAULT NULL,
+  p_embedding_model text DEFAULT NULL,
+  p_legacy_embedding_model text DEFAULT NULL
+)
+RETURNS SETOF partner_kb_articles
+LANGUAGE plpgsql
+AS $$
+BEGIN
+  RETURN QUERY
+  SELECT a.*
+  FROM partner_kb_articles a
+  WHERE a.is_active = TRUE
+    AND a.embedding IS NOT NULL
+    AND (p_embedding_model IS NULL OR COALESCE(a.embedding_model, p_legacy_embedding_model) = p_embedding_model)
+    AND (1 - (a.embedding <=> query_embedding)) > match_threshold
+    AND (filter_partner_id IS NULL OR a.partner_id = filter_partner_id)
+    AND (exclude_partner_id IS NULL OR a.partner_id != exclude_partner_id)
+  ORDER BY a.embedding <=> query_embedding
+  LIMIT match_count;
+END;
+$$;
+
+COMMENT ON INDEX idx_products_embedding_model IS 'Semantic search filter on the embedding model-version tag';
+COMMENT ON FUNCTION match_products_v2(vector(1536), int, float, uuid, uuid, text, text, text) IS 'KB/semantic product search via pgvector; p_embedding_model limits matches to vectors from the query''s model (untagged rows count as p_legacy_embedding_model)';
+COMMENT ON FUNCTION match_kb_articles(vector(1536), int, float, uuid, uuid, text, text) IS 'Module 1: Semantic search over partner KB articles via pgvector cosine similarity; p_embedding_model limits matches to vectors from the query''s model (untagged rows count as p_legacy_embedding_model)';
+
+COMMIT;
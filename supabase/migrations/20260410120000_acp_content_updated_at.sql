@@ -0,0 +1,104 @@
+-- ACP delta push and feed snapshots keyed on feed content, not on every row write.
+--
+-- products.updated_at is bumped by trg_products_touch_updated_at on every UPDATE, including bookkeeping
+-- writes that never change a feed row (embeddings, experience-tag write-back, sold_count, push outcomes).
+-- acp_content_updated_at only moves when a column the ACP feed is built from changes (IS DISTINCT FROM), so
+-- "pending" (acp_content_updated_at > last_acp_push_at) and the feed snapshot marker follow catalog edits.
+
+BEGIN;
+
+ALTER TABLE products ADD COLUMN IF NOT EXISTS acp_content_updated_at TIMESTAMPTZ;
+
+-- Backfill without firing the updated_at trigger (would touch every row for the vector-index delta sync)
+ALTER TABLE products DISABLE TRIGGER trg_products_touch_updated_at;
+UPDATE products SET acp_content_updated_at = COALESCE(updated_at, created_at, NOW()) WHERE acp_content_updated_at IS NULL;
+ALTER TABLE products ENABLE TRIGGER trg_products_touch_updated_at;
+
+CREATE OR REPLACE FUNCTION products_touch_acp_content_updated_at()
+RETURNS trigger
+LANGUAGE plpgsql
+AS $$
+BEGIN
+  IF TG_OP = 'INSERT' THEN
+    NEW.acp_content_updated_at := NOW();
+  ELSIF NEW.name IS DISTINCT FROM OLD.name
+    OR NEW.description IS DISTINCT FROM OLD.description
+    OR NEW.price IS DISTINCT FROM OLD.price
+    OR NEW.currency IS DISTINCT FROM OLD.currency
+    OR NEW.url IS DISTINCT FROM OLD.url
+    OR NEW.image_url IS DISTINCT FROM OLD.image_url
+    OR NEW.brand IS DISTINCT FROM OLD.brand
+    OR NEW.availability IS DISTINCT FROM OLD.availability
+    OR NEW.is_available IS DISTINCT FROM OLD.is_available
+    OR NEW.is_eligible_search IS DISTINCT FROM OLD.is_eligible_search
+    OR NEW.is_eligible_checkout IS DISTINCT FROM OLD.is_eligible_checkout
+    OR NEW.target_countries IS DISTINCT FROM OLD.target_countries
+    OR NEW.partner_id IS DISTINCT FROM OLD.partner_id
+    OR NEW.deleted_at IS DISTINCT FROM OLD.deleted_at
+  THEN
+    NEW.acp_content_updated_at := NOW();
+  ELSE
+    NEW.acp_content_updated_at := OLD.acp_content_updated_at;
+  END IF;
+  RETURN NEW;
+END;
+$$;
+
+DROP TRIGGER IF EXISTS trg_products_touch_acp_content_updated_at ON products;
+CREATE TRIGGER trg_products_touch_acp_content_updated_at
+  BEFORE INSERT OR UPDATE ON products
+  FOR EACH ROW
+  EXECUTE FUNCTION products_touch_acp_content_updated_at();
+
+DROP INDEX IF EXISTS idx_products_acp_push_pending;
+CREATE INDEX idx_products_acp_push_pending ON products(partner_id, id)
+  WHERE deleted_at IS NULL
+    AND (last_acp_push_at IS NULL OR last_acp_push_success IS NOT TRUE OR acp_content_updated_at > last_acp_push_at);
+
+CREATE INDEX IF NOT EXISTS idx_products_acp_content_updated_at ON products(acp_content_updated_at)
+  WHERE deleted_at IS NULL;
+
+CREATE OR REPLACE FUNCTION get_acp_push_delta(
+  p_partner_id uuid,
+  p_after_id uuid DEFAULT NULL,
+  p_limit int DEFAULT 1000
+)
+RETURNS TABLE (id uuid)
+LANGUAGE sql
+STABLE
+AS $$
+  SELECT p.id
+  FROM products p
+  WHERE p.partner_id = p_partner_id
+    AND p.deleted_at IS NULL
+    AND (p.last_acp_push_at IS NULL OR p.last_acp_push_success IS NOT TRUE OR p.acp_content_updated_at > p.last_acp_push_at)
+    AND (p_after_id IS NULL OR p.id > p_after_id)
+  ORDER BY p.id
+  LIMIT GREATEST(1, LEAST(COALESCE(p_limit, 1000), 5000));
+$$;
+
+CREATE OR REPLACE FUNCTION acp_push_status(p_partner_id uuid)
+RETURNS TABLE (total bigint, pending bigint, failed bigint, never_pushed bigint, last_pushed_at timestamptz)
+LANGUAGE sql
+STABLE
+AS $$
+  SELECT
+    COUNT(*),
+    COUNT(*) FILTER (WHERE last_acp_push_at IS NULL OR last_acp_push_success IS NOT TRUE OR acp_content_updated_at > last_acp_push_at),
+    COUNT(*) FILTER (WHERE last_acp_push_success IS FALSE),
+    COUNT(*) FILTER (WHERE last_acp_push_at IS NULL),
+    MAX(last_acp_push_at)
+  FROM products
+  WHERE partner_id = p_partner_id
+    AND deleted_at IS NULL;
+$$;
+
+COMMENT ON COLUMN products.acp_content_updated_at IS 'Last change to a column the ACP feed is built from (trigger; ignores embedding / tag / sold_count / push bookkeeping writes)';
+COMMENT ON FUNCTION products_touch_acp_content_updated_at IS 'Sets products.acp_content_updated_at on INSERT and when an ACP feed column changes';
+COMMENT ON INDEX idx_products_acp_push_pending IS 'Products awaiting an ACP push (never pushed, failed, or feed content changed since); keeps delta pushes proportional to catalog edits';
+COMMENT ON INDEX idx_products_acp_content_updated_at IS 'Newest feed-content change (ACP feed snapshot marker)';
+COMMENT ON FUNCTION get_acp_push_delta IS 'Keyset page of a partner''s product ids pending an ACP push (discovery /feeds/push scope=delta)';
+COMMENT ON FUNCTION acp_push_status IS 'Per-partner ACP push counts: total, pending, failed, never pushed, last push time';
+COMMENT ON FUNCTION mark_products_acp_pushed IS 'Record an ACP push outcome for many products in one statement (does not touch acp_content_updated_at)';
+
+COMMIT;
@@ -1,9 +1,13 @@
 """Pytest configuration for server-based tests."""
 
 import os
+import sys
+from pathlib import Path
 
 import pytest
 
+_SERVICES = Path(__file__).resolve().parents[1] / "services"
+
 
 def _get_base_url() -> str:
     """Resolve discovery service base URL from environment."""
@@ -26,3 +30,31 @@ def base_url() -> str:
 def discovery_base_url(base_url: str) -> str:
     """Alias for discovery service base URL."""
     return base_url
+
+
+def use_service(name: str) -> Path:
+    """
+    Put services/<name> first on sys.path and forget top-level modules (db, config, clients, api, ...) imported
+    from another service, so service-local imports resolve to this service even after other tests ran.
+    """
+    service_dir = _SERVICES / name
+    for mod_name, mod in list(sys.modules.items()):
+        path = getattr(mod, "__file__", None) or ""
+        if path.startswith(str(_SERVICES)) and not path.startswith(str(service_dir) + os.sep):
+            del sys.modules[mod_name]
+    if str(service_dir) in sys.path:
+        sys.path.remove(str(service_dir))
+    sys.path.insert(0, str(service_dir))
+    return service_dir
+
+
+@pytest.fixture
+def orchestrator_service() -> Path:
+    """orchestrator-service on sys.path (import agentic.* inside the test)."""
+    return use_service("orchestrator-service")
+
+
+@pytest.fixture
+def discovery_service() -> Path:
+    """discovery-service on sys.path (import its modules inside the test)."""
+    return use_service("discovery-service")
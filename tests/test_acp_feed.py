@@ -0,0 +1,228 @@
+"""Tests for the streamed ACP feed (discovery-service acp_feed) and the chunked ACP push (api/feeds, db)."""
+
+import asyncio
+import csv
+import gzip
+import io
+import json
+import sys
+import types
+from pathlib import Path
+
+import pytest
+
+_root = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(_root))
+
+
+def _product(i, checkout=False, **overrides):
+    product = {
+        "id": f"p{i}",
+        "name": f"Bouquet {i}",
+        "description": "Seasonal flowers, hand tied" + ", fresh" * (i % 7),
+        "url": f"https://shop.example/p{i}",
+        "image_url": f"https://shop.example/p{i}.jpg",
+        "price": 10 + i * 1.25,
+        "currency": "USD",
+        "brand": "Bloom & Co",
+        "is_eligible_search": True,
+        "is_eligible_checkout": checkout,
+        "seller_name": "Bloom, \"the\" shop",
+        "seller_url": "https://shop.example",
+        "return_policy": "https://shop.example/returns",
+        "target_countries": ["US", "CA"],
+        "store_country": "US",
+    }
+    if checkout:
+        product.update(seller_privacy_policy="https://shop.example/privacy", seller_tos="https://shop.example/tos")
+    product.update(overrides)
+    return product
+
+
+PRODUCTS = [_product(i, checkout=i % 3 == 1) for i in range(120)] + [
+    _product(200, seller_url=""),  # missing a required field
+    _product(201, name="Wine gift box"),  # prohibited content
+]
+
+
+def _old_bodies():
+    """Whole-feed bodies as GET /feeds/acp built them before streaming."""
+    from acp_feed import product_to_acp_row
+    from protocols.acp_compliance import filter_acp_compliant_products
+
+    rows = [product_to_acp_row(p) for p in PRODUCTS]
+    require_checkout = any(r.get("is_eligible_checkout") for r in rows)
+    rows, _ = filter_acp_compliant_products(rows, require_checkout_fields=require_checkout, strict=True)
+    out = io.StringIO()
+    writer = csv.DictWriter(out, fieldnames=list(rows[0].keys()), extrasaction="ignore")
+    writer.writeheader()
+    for r in rows:
+        writer.writerow({k: json.dumps(v) if isinstance(v, list) else v for k, v in r.items()})
+    return {"ndjson": "\n".join(json.dumps(r) for r in rows).encode("utf-8"), "csv": out.getvalue().encode("utf-8")}
+
+
+@pytest.fixture
+def acp_feed(discovery_service, monkeypatch):
+    import acp_feed
+
+    async def iter_products(partner_id=None, page_size=50):
+        for i in range(0, len(PRODUCTS), page_size):
+            yield PRODUCTS[i : i + page_size]
+
+    monkeypatch.setattr(acp_feed, "iter_products_for_acp_export", iter_products)
+    monkeypatch.setattr(acp_feed, "CHUNK_BYTES", 1024)
+    return acp_feed
+
+
+async def _body(acp_feed, fmt):
+    chunks = [chunk async for chunk in acp_feed.stream_feed(None, fmt)]
+    assert len(chunks) > 1
+    return b"".join(chunks)
+
+
+@pytest.mark.parametrize("fmt", ["ndjson", "csv"])
+def test_stream_matches_old_whole_body(acp_feed, fmt):
+    old = _old_bodies()[fmt]
+    assert asyncio.run(_body(acp_feed, fmt)) == old
+    assert gzip.decompress(asyncio.run(_body(acp_feed, "jsonl.gz" if fmt == "ndjson" else "csv.gz"))) == old
+
+
+def test_matching_if_none_match_returns_304(acp_feed, monkeypatch, tmp_path):
+    async def marker(partner_id):
+        return "120|2026-10-01T00:00:00+00:00"
+
+    monkeypatch.setattr(acp_feed, "get_acp_feed_marker", marker)
+    monkeypatch.setattr(acp_feed, "_building", {})
+    monkeypatch.setattr(acp_feed, "settings", type("S", (), {"acp_feed_snapshot_dir": str(tmp_path)})())
+    etag = acp_feed.feed_etag("partner-1", "csv", "120|2026-10-01T00:00:00+00:00")
+
+    response = asyncio.run(acp_feed.acp_feed_response("partner-1", "csv", if_none_match=f'W/{etag}, "other"'))
+    assert response.status_code == 304 and response.headers["etag"] == etag
+
+    response = asyncio.run(acp_feed.acp_feed_response("partner-1", "csv", if_none_match='"stale"'))
+    assert response.status_code == 200 and response.headers["etag"] == etag
+
+
+IDS = [f"00000000-0000-4000-8000-{i:012d}" for i in range(8)]
+
+
+class _Execute:
+    def __init__(self, fn):
+        self.fn = fn
+
+    def execute(self):
+        return types.SimpleNamespace(data=self.fn())
+
+
+def _missing_function(name):
+    def fail():
+        raise RuntimeError(f"function {name} does not exist")
+
+    return fail
+
+
+class _PushClient:
+    """rpc() / table().update().in_() stand-in recording calls; missing RPCs raise on execute()."""
+
+    def __init__(self, rpcs):
+        self.rpcs, self.calls, self.updates = rpcs, [], []
+
+    def rpc(self, name, params):
+        self.calls.append((name, dict(params)))
+        if name not in self.rpcs:
+            return _Execute(_missing_function(name))
+        return _Execute(lambda: self.rpcs[name](params))
+
+    def table(self, name):
+        client = self
+
+        class _Update:
+            def update(self, values):
+                self.values = values
+                return self
+
+            def in_(self, column, ids):
+                client.updates.append((name, self.values["last_acp_push_success"], list(ids)))
+                return _Execute(lambda: [])
+
+        return _Update()
+
+
+@pytest.mark.asyncio
+async def test_run_chunked_bounds_chunk_size_and_concurrency(discovery_service, monkeypatch):
+    from api import feeds
+
+    monkeypatch.setattr(feeds, "settings", types.SimpleNamespace(acp_push_chunk_size=3, acp_push_concurrency=2))
+    active = {"now": 0, "peak": 0}
+
+    async def fn(chunk):
+        active["now"] += 1
+        active["peak"] = max(active["peak"], active["now"])
+        await asyncio.sleep(0.01)
+        active["now"] -= 1
+        return chunk
+
+    assert await feeds._run_chunked(IDS, fn) == [IDS[0:3], IDS[3:6], IDS[6:8]]  # results in chunk order
+    assert active["peak"] == 2
+    assert await feeds._run_chunked([], fn) == []
+
+
+@pytest.mark.asyncio
+async def test_push_chunk_splits_pushed_and_failed_ids(discovery_service, monkeypatch):
+    from api import feeds
+
+    recorded = []
+
+    async def build_rows(partner_id=None, product_id=None, product_ids=None):
+        return [{"item_id": pid} for pid in product_ids if pid != IDS[1]]  # IDS[1] is not compliant
+
+    async def record(succeeded, failed):
+        recorded.append((succeeded, failed))
+        return len(recorded) == 1
+
+    monkeypatch.setattr(feeds, "_build_acp_rows", build_rows)
+    monkeypatch.setattr(feeds, "record_acp_push_results", record)
+    assert await feeds._push_acp_chunk("partner-1", IDS[:3]) == {"pushed": 2, "failed": 1, "unrecorded": 0}
+    assert recorded == [([IDS[0], IDS[2]], [IDS[1]])]
+    assert await feeds._push_acp_chunk("partner-1", IDS[:3]) == {"pushed": 2, "failed": 1, "unrecorded": 3}
+
+
+@pytest.mark.asyncio
+async def test_record_push_results_falls_back_to_bulk_updates_without_rpc(discovery_service, monkeypatch):
+    import db
+
+    client = _PushClient({})
+    monkeypatch.setattr(db, "get_supabase", lambda: client)
+    assert await db.record_acp_push_results([IDS[0], "gid://shopify/Product/1", IDS[1]], [IDS[2]])
+    assert client.calls == [("mark_products_acp_pushed", {"p_succeeded": IDS[:2], "p_failed": [IDS[2]]})]
+    assert client.updates == [("products", True, IDS[:2]), ("products", False, [IDS[2]])]
+
+    client = _PushClient({"mark_products_acp_pushed": lambda params: None})
+    monkeypatch.setattr(db, "get_supabase", lambda: client)
+    assert await db.record_acp_push_results(IDS[:2], [])
+    assert client.updates == []
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("total", [5, 4, 0])
+async def test_delta_ids_page_until_a_short_page(discovery_service, monkeypatch, total):
+    import db
+
+    def delta(params):
+        start = IDS.index(params["p_after_id"]) + 1 if params["p_after_id"] else 0
+        return [{"id": pid} for pid in IDS[:total][start : start + params["p_limit"]]]
+
+    client = _PushClient({"get_acp_push_delta": delta})
+    monkeypatch.setattr(db, "get_supabase", lambda: client)
+    monkeypatch.setattr(db, "ACP_PUSH_ID_PAGE", 2)
+    assert await db.get_acp_push_delta_ids(IDS[7]) == IDS[:total]
+    assert len(client.calls) == total // 2 + 1  # a full last page needs one more (empty) read
+    assert [c[1]["p_after_id"] for c in client.calls] == [None] + IDS[1 : total : 2][: total // 2]
+
+
+@pytest.mark.asyncio
+async def test_delta_ids_none_without_rpc(discovery_service, monkeypatch):
+    import db
+
+    monkeypatch.setattr(db, "get_supabase", lambda: _PushClient({}))
+    assert await db.get_acp_push_delta_ids(IDS[7]) is None
@@ -0,0 +1,114 @@
+"""Tests for running several planner tool calls from one plan (agentic.loop parallel lookups)."""
+
+import asyncio
+
+import pytest
+
+
+def _plan(*calls):
+    tool_calls = [{"tool_name": name, "tool_args": args} for name, args in calls]
+    return {
+        "action": "tool",
+        "tool_name": tool_calls[0]["tool_name"],
+        "tool_args": tool_calls[0]["tool_args"],
+        "tool_calls": tool_calls,
+        "reasoning": "r",
+    }
+
+
+def _fake_execute_tool(calls, delay=0.0):
+    async def execute_tool(name, args, **kwargs):
+        calls.append(name)
+        await asyncio.sleep(delay)
+        return {"data": {"tool": name, "description": "sunny", "location": args.get("location", "")}}
+
+    return execute_tool
+
+
+def test_split_single_call_plan_unchanged(orchestrator_service):
+    from agentic.loop import _split_tool_calls
+
+    plan = {"action": "tool", "tool_name": "discover_products", "tool_args": {"query": "cake"}}
+    assert _split_tool_calls(plan) == ([], plan)
+
+
+def test_split_dedupes_lookups(orchestrator_service):
+    from agentic.loop import _split_tool_calls
+
+    lookups, primary = _split_tool_calls(_plan(
+        ("get_weather", {"location": "Austin"}),
+        ("get_weather", {"location": "Austin"}),
+        ("get_weather", {"location": "Dallas"}),
+        ("web_search", {"query": "events"}),
+    ))
+    assert [(c["tool_name"], c["tool_args"]) for c in lookups] == [
+        ("get_weather", {"location": "Austin"}),
+        ("get_weather", {"location": "Dallas"}),
+        ("web_search", {"query": "events"}),
+    ]
+    assert primary is None
+
+
+def test_split_keeps_one_primary_and_drops_the_rest(orchestrator_service):
+    from agentic.loop import _split_tool_calls
+
+    lookups, primary = _split_tool_calls(_plan(
+        ("get_weather", {"location": "Austin"}),
+        ("discover_products", {"query": "flowers"}),
+        ("add_to_bundle", {"product_id": "p1"}),
+    ))
+    assert [c["tool_name"] for c in lookups] == ["get_weather"]
+    assert primary["tool_name"] == "discover_products"
+    assert primary["tool_args"] == {"query": "flowers"}
+    assert primary["reasoning"] == "r"
+
+
+@pytest.mark.asyncio
+async def test_discover_composite_waits_for_lookups(orchestrator_service, monkeypatch):
+    from agentic import loop
+
+    calls = []
+    monkeypatch.setattr(loop, "execute_tool", _fake_execute_tool(calls, delay=0.05))
+    state, engagement = {"agent_reasoning": []}, {}
+    pending, primary = await loop._start_parallel_lookups(
+        _plan(("get_weather", {"location": "Austin"}), ("discover_composite", {"search_queries": ["dinner"]})),
+        state, engagement, None, {},
+    )
+    assert pending is None and primary["tool_name"] == "discover_composite"
+    assert engagement["weather"]["tool"] == "get_weather"
+
+
+@pytest.mark.asyncio
+async def test_other_primary_overlaps_lookups_and_owns_last_tool_result(orchestrator_service, monkeypatch):
+    from agentic import loop
+
+    calls = []
+    monkeypatch.setattr(loop, "execute_tool", _fake_execute_tool(calls, delay=0.05))
+    state, engagement = {"agent_reasoning": [], "last_tool_result": "primary"}, {}
+    pending, primary = await loop._start_parallel_lookups(
+        _plan(("web_search", {"query": "events"}), ("discover_products", {"query": "cake"})),
+        state, engagement, None, {},
+    )
+    assert primary["tool_name"] == "discover_products"
+    assert pending is not None and not pending.done()
+    await pending
+    assert engagement["web_search"]["tool"] == "web_search"
+    assert state["completed_tools"] == ["web_search"]
+    assert state["last_tool_result"] == "primary"  # the primary call's result is not overwritten
+
+
+@pytest.mark.asyncio
+async def test_lookups_only_plan_sets_last_tool_result(orchestrator_service, monkeypatch):
+    from agentic import loop
+
+    calls = []
+    monkeypatch.setattr(loop, "execute_tool", _fake_execute_tool(calls))
+    state, engagement = {"agent_reasoning": []}, {}
+    pending, primary = await loop._start_parallel_lookups(
+        _plan(("get_weather", {"location": "Austin"}), ("get_upcoming_occasions", {"location": "Austin"})),
+        state, engagement, None, {},
+    )
+    assert pending is None and primary is None
+    assert sorted(calls) == ["get_upcoming_occasions", "get_weather"]
+    assert state["last_tool_result"]["data"]["tool"] in ("get_weather", "get_upcoming_occasions")
+    assert "weather" in engagement and "occasions" in engagement
@@ -0,0 +1,111 @@
+"""Tests for versioned config snapshots (packages/shared/config_snapshot)."""
+
+import copy
+import sys
+import types
+from pathlib import Path
+
+import pytest
+
+_root = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(_root))
+
+from packages.shared.config_snapshot import ConfigSnapshotStore, freeze
+
+
+def test_frozen_values_are_read_only_but_keep_types():
+    cfg = freeze({"product_mix": [{"sort": "price_asc", "pct": 50}], "ranking_enabled": True})
+    assert isinstance(cfg, dict) and isinstance(cfg["product_mix"], list)
+    assert isinstance(cfg["product_mix"][0], dict)
+    with pytest.raises(TypeError):
+        cfg["ranking_enabled"] = False
+    with pytest.raises(TypeError):
+        cfg["product_mix"].append({})
+    thawed = copy.deepcopy(cfg)
+    thawed["product_mix"][0]["pct"] = 100
+    assert cfg["product_mix"][0]["pct"] == 50
+
+
+@pytest.mark.asyncio
+async def test_reloads_only_when_marker_moves_and_versions_on_change():
+    state = {"marker": "t1", "value": 1, "loads": 0}
+    changes = []
+
+    def _load():
+        state["loads"] += 1
+        return {"ranking": {"value": state["value"]}}
+
+    store = ConfigSnapshotStore("test", load=_load, fetch_marker=lambda: state["marker"], refresh_sec=3600, on_change=changes.append)
+    snap = await store.get()
+    assert snap.version == 1 and snap.get("ranking") == {"value": 1}
+
+    assert await store.refresh() is False  # marker unchanged: no reload
+    assert state["loads"] == 1
+
+    state["marker"] = "t2"  # touched but same values: reloaded, version kept
+    assert await store.refresh() is False
+    assert state["loads"] == 2 and store.current.version == 1
+
+    state["marker"], state["value"] = "t3", 2
+    assert await store.refresh() is True
+    assert store.current.version == 2 and store.current.get("ranking") == {"value": 2}
+    assert [s.version for s in changes] == [1, 2]
+
+
+@pytest.mark.asyncio
+async def test_failed_reload_keeps_previous_snapshot_and_defaults_before_first_load():
+    def _fail():
+        raise RuntimeError("db down")
+
+    store = ConfigSnapshotStore("test", load=_fail, defaults={"ranking": {"ranking_enabled": True}})
+    snap = await store.get()
+    assert snap.version == 0 and snap.get("ranking") == {"ranking_enabled": True}
+    assert store.stats()["load_errors"] == 1
+
+
+@pytest.mark.asyncio
+async def test_discovery_tables_load_independently(discovery_service, monkeypatch):
+    import config_snapshot
+
+    failing = set()
+    rows = {
+        "platform_config": [{"ranking_enabled": False, "composite_discovery_config": {"products_per_category": 4}}],
+        "admin_orchestration_settings": [{"global_tone": "warm"}],
+    }
+
+    class _Query:
+        def __init__(self, table):
+            self.table = table
+
+        def __getattr__(self, name):
+            return lambda *args, **kwargs: self
+
+        def execute(self):
+            if self.table in failing:
+                raise RuntimeError(f"{self.table} unavailable")
+            return types.SimpleNamespace(data=rows[self.table])
+
+    client = types.SimpleNamespace(table=_Query)
+    monkeypatch.setattr(config_snapshot, "get_supabase", lambda: client)
+    store = ConfigSnapshotStore("test", load=config_snapshot._load, defaults=config_snapshot._DEFAULTS)
+    monkeypatch.setattr(config_snapshot, "_store", store)
+
+    failing.add("admin_orchestration_settings")  # first load: admin falls back to its default, ranking still loads
+    snap = await store.get()
+    assert snap.get("ranking") == {"ranking_enabled": False}
+    assert snap.get("composite_discovery") == {"products_per_category": 4}
+    assert snap.get("admin_orchestration") is None
+
+    failing.clear()
+    await store.refresh(force=True)
+    assert store.current.get("admin_orchestration") == {"global_tone": "warm"}
+
+    failing.add("platform_config")  # ranking keeps its last good value while admin updates
+    rows["admin_orchestration_settings"] = [{"global_tone": "formal"}]
+    await store.refresh(force=True)
+    assert store.current.get("ranking") == {"ranking_enabled": False}
+    assert store.current.get("admin_orchestration") == {"global_tone": "formal"}
+
+    failing.add("admin_orchestration_settings")  # both down: previous snapshot kept
+    assert await store.refresh(force=True) is False
+    assert store.stats()["load_errors"] == 1
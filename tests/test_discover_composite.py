@@ -0,0 +1,73 @@
+"""Tests for the concurrent discover_composite fan-out and its partner-diversity pass (agentic.loop)."""
+
+import sys
+from pathlib import Path
+
+import pytest
+
+_root = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(_root))
+
+
+def _products(prefix, partners):
+    return [{"id": f"{prefix}{i}", "name": f"{prefix}{i}", "price": 10, "partner_id": p} for i, p in enumerate(partners)]
+
+
+def _fake_discover(catalog, calls):
+    async def discover_products(query, limit, **kwargs):
+        calls.append((query, limit, kwargs.get("exclude_partner_id")))
+        return {"data": {"products": catalog[query][:limit]}}
+
+    return discover_products
+
+
+async def _run(loop, monkeypatch, catalog, per_limit=2, overfetch=3):
+    from config import settings
+
+    monkeypatch.setattr(loop, "_composite_per_limit", lambda *args, **kwargs: per_limit)
+    monkeypatch.setattr(settings, "composite_concurrent_fanout", True, raising=False)
+    monkeypatch.setattr(settings, "composite_overfetch", overfetch, raising=False)
+    calls = []
+    result = await loop._discover_composite(list(catalog), "date night", _fake_discover(catalog, calls))
+    return {c["query"]: [p["id"] for p in c["products"]] for c in result["data"]["categories"]}, calls
+
+
+@pytest.mark.asyncio
+async def test_concurrent_fetch_excludes_previous_top_partner(orchestrator_service, monkeypatch):
+    from agentic import loop
+
+    catalog = {
+        "flowers": _products("f", ["A", "A", "B"]),
+        "dinner": _products("d", ["A", "A", "C", "D", "C"]),
+        "movies": _products("m", ["C", "E", "C"]),
+    }
+    categories, calls = await _run(loop, monkeypatch, catalog)
+    assert sorted(calls) == [("dinner", 5, None), ("flowers", 5, None), ("movies", 5, None)]  # one over-fetched round
+    assert categories["flowers"] == ["f0", "f1"]
+    assert categories["dinner"] == ["d2", "d3"]  # flowers' top partner A dropped
+    assert categories["movies"] == ["m1"]  # dinner's top partner C dropped
+
+
+@pytest.mark.asyncio
+async def test_exclusion_that_empties_a_category_keeps_unfiltered_results(orchestrator_service, monkeypatch):
+    from agentic import loop
+
+    catalog = {
+        "flowers": _products("f", ["A", "B"]),
+        "cake": _products("c", ["A", "A", "A"]),
+    }
+    categories, _ = await _run(loop, monkeypatch, catalog)
+    assert categories["cake"] == ["c0", "c1"]
+
+
+@pytest.mark.asyncio
+async def test_categories_trimmed_to_per_limit(orchestrator_service, monkeypatch):
+    from agentic import loop
+
+    catalog = {
+        "flowers": _products("f", ["A", "B", "C", "D", "E", "F"]),
+        "dinner": _products("d", ["B", "C", "D", "E", "F", "G"]),
+    }
+    categories, calls = await _run(loop, monkeypatch, catalog, per_limit=3, overfetch=2)
+    assert {limit for _, limit, _ in calls} == {5}
+    assert categories == {"flowers": ["f0", "f1", "f2"], "dinner": ["d0", "d1", "d2"]}
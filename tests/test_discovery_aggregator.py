@@ -0,0 +1,230 @@
+"""Tests for the protocol-aware discovery aggregator (UCP partner fan-out)."""
+
+import asyncio
+import sys
+import time
+from pathlib import Path
+
+import pytest
+
+_root = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(_root))
+
+from packages.shared.discovery_aggregator import DiscoveryAggregator, LocalDBDriver, UCPManifestDriver, UCPProduct
+from packages.shared.ucp_manifest_cache import UCPManifestCache, parse_cache_control
+
+
+def _fake_partner_driver(delays, **kwargs):
+    """UCPManifestDriver whose per-partner lookup sleeps delays[base_url] then returns 2 products."""
+
+    async def _urls():
+        return list(delays.keys())
+
+    driver = UCPManifestDriver(get_partner_manifest_urls=_urls, **kwargs)
+
+    async def _search_partner(base_url, access_token, query, limit, headers):
+        await asyncio.sleep(delays[base_url])
+        slug = base_url.split("//")[-1]
+        return [UCPProduct(id=f"{slug}-{i}", name=f"{slug} {i}", source="UCP") for i in range(2)]
+
+    driver._search_partner = _search_partner  # type: ignore[method-assign]
+    return driver
+
+
+@pytest.mark.asyncio
+async def test_ucp_partners_fetched_concurrently():
+    """Latency tracks the slowest partner, not the sum; partners past the old cap of 5 are queried."""
+    delays = {f"https://p{i}.example": 0.2 for i in range(8)}
+    driver = _fake_partner_driver(delays, max_concurrency=8)
+    start = time.monotonic()
+    out = await driver.search("flowers", limit=100)
+    elapsed = time.monotonic() - start
+    assert elapsed < 0.6
+    assert len(out) == 16
+    # Round-robin merge: first product of each partner before any second product
+    assert [p.id for p in out[:8]] == [f"p{i}.example-0" for i in range(8)]
+
+
+@pytest.mark.asyncio
+async def test_ucp_slow_partner_hits_per_partner_deadline():
+    """A slow partner is dropped at its own deadline; the others still answer."""
+    delays = {"https://fast.example": 0.05, "https://slow.example": 5.0}
+    driver = _fake_partner_driver(delays, partner_timeout=0.5)
+    start = time.monotonic()
+    out = await driver.search("flowers", limit=10)
+    assert time.monotonic() - start < 1.5
+    assert {p.id for p in out} == {"fast.example-0", "fast.example-1"}
+
+
+@pytest.mark.asyncio
+async def test_ucp_overall_deadline_returns_partial_results():
+    """Overall timeout returns partners that already answered instead of nothing."""
+    delays = {"https://fast.example": 0.05, "https://slow.example": 3.0}
+    driver = _fake_partner_driver(delays, partner_timeout=10.0)
+    out = await driver.search("flowers", limit=10, timeout=0.5)
+    assert {p.id for p in out} == {"fast.example-0", "fast.example-1"}
+
+
+@pytest.mark.asyncio
+async def test_ucp_max_partners_caps_fan_out():
+    delays = {f"https://p{i}.example": 0.0 for i in range(6)}
+    driver = _fake_partner_driver(delays, max_partners=2)
+    out = await driver.search("", limit=50)
+    assert {p.id.split("-")[0] for p in out} == {"p0.example", "p1.example"}
+
+
+# --- UCP manifest cache ---
+
+
+def _mock_http(monkeypatch, handler):
+    """Route every httpx.AsyncClient through a MockTransport calling handler(request)."""
+    import httpx
+    from packages.shared import http_clients
+
+    monkeypatch.setattr(http_clients, "_registry", None)
+    real_client = httpx.AsyncClient
+    monkeypatch.setattr(httpx, "AsyncClient", lambda **kw: real_client(transport=httpx.MockTransport(handler), **kw))
+
+
+_MANIFEST = {"ucp": {"services": {"dev.ucp.shopping": [{"transport": "mcp", "endpoint": "/api/mcp"}]}}}
+
+
+def _parse(data, origin):
+    return {"mcp_endpoint": f"{origin}/api/mcp"}
+
+
+def test_parse_cache_control():
+    cc = parse_cache_control('public, max-age=600, no-cache="set-cookie"')
+    assert cc == {"public": None, "max-age": "600", "no-cache": "set-cookie"}
+
+
+@pytest.mark.asyncio
+async def test_manifest_cache_hit_skips_network(monkeypatch):
+    import httpx
+
+    calls = []
+
+    def handler(request):
+        calls.append(str(request.url))
+        return httpx.Response(200, json=_MANIFEST, headers={"Cache-Control": "max-age=600", "ETag": '"v1"'})
+
+    _mock_http(monkeypatch, handler)
+    cache = UCPManifestCache()
+    e1 = await cache.get("https://shop.example", "https://shop.example", {}, _parse)
+    e2 = await cache.get("https://shop.example", "https://shop.example", {}, _parse)
+    assert e1 is e2
+    assert e1.ttl == 600 and e1.etag == '"v1"'
+    assert e1.transport["mcp_endpoint"] == "https://shop.example/api/mcp"
+    assert calls == ["https://shop.example/.well-known/ucp"]
+    assert cache.stats()["hits"] == 1
+
+
+@pytest.mark.asyncio
+async def test_manifest_cache_stale_entry_revalidates_in_background(monkeypatch):
+    import httpx
+
+    seen_headers = []
+
+    def handler(request):
+        seen_headers.append(request.headers.get("if-none-match"))
+        if request.headers.get("if-none-match") == '"v1"':
+            return httpx.Response(304, headers={"Cache-Control": "max-age=60"})
+        return httpx.Response(200, json=_MANIFEST, headers={"Cache-Control": "max-age=0", "ETag": '"v1"'})
+
+    _mock_http(monkeypatch, handler)
+    cache = UCPManifestCache()
+    first = await cache.get("https://shop.example", "https://shop.example", {}, _parse)
+    stale = await cache.get("https://shop.example", "https://shop.example", {}, _parse)
+    assert stale is first  # served immediately while refresh runs
+    await asyncio.sleep(0.05)
+    refreshed = await cache.get("https://shop.example", "https://shop.example", {}, _parse)
+    assert refreshed.ttl == 60 and refreshed.data == _MANIFEST
+    assert seen_headers == [None, '"v1"']
+    assert cache.stats()["revalidated"] == 1
+
+
+@pytest.mark.asyncio
+async def test_manifest_cache_negative_entry_and_single_flight(monkeypatch):
+    import httpx
+
+    calls = []
+
+    def handler(request):
+        calls.append(str(request.url))
+        return httpx.Response(404)
+
+    _mock_http(monkeypatch, handler)
+    cache = UCPManifestCache()
+    results = await asyncio.gather(*[cache.get("https://gone.example", "https://gone.example", {}, _parse) for _ in range(5)])
+    assert results == [None] * 5
+    assert await cache.get("https://gone.example", "https://gone.example", {}, _parse) is None
+    # One fetch (two candidate URLs) for 6 lookups
+    assert calls == ["https://gone.example/.well-known/ucp", "https://gone.example/.well-known/ucp.json"]
+
+
+# --- DiscoveryAggregator partial results / streaming ---
+
+
+class _SlowDriver:
+    """Stand-in for ShopifyMCPDriver / MCPDriver: sleeps, then returns one product."""
+
+    def __init__(self, delay, product_id):
+        self.delay = delay
+        self.product_id = product_id
+        self.cancelled = False
+
+    async def search(self, query, limit=20, partner_id=None, exclude_partner_id=None):
+        try:
+            await asyncio.sleep(self.delay)
+        except asyncio.CancelledError:
+            self.cancelled = True
+            raise
+        return [UCPProduct(id=self.product_id, name=self.product_id, source="MCP")]
+
+
+def _local_driver(ids):
+    async def _search_fn(**kwargs):
+        return [{"id": i, "name": i} for i in ids]
+
+    return LocalDBDriver(_search_fn)
+
+
+@pytest.mark.asyncio
+async def test_aggregator_deadline_keeps_local_results():
+    """A driver overrunning timeout_ms no longer discards LocalDB results that already arrived."""
+    slow = _SlowDriver(5.0, "shopify-1")
+    agg = DiscoveryAggregator(local_db_driver=_local_driver(["a", "b"]), shopify_mcp_driver=slow, timeout_ms=500)
+    start = time.monotonic()
+    out = await agg.search("flowers", limit=10)
+    assert time.monotonic() - start < 1.5
+    assert [p.id for p in out] == ["a", "b"]
+    await asyncio.sleep(0)
+    assert slow.cancelled
+
+
+@pytest.mark.asyncio
+async def test_aggregator_stream_yields_fastest_first_and_reports_timeouts():
+    agg = DiscoveryAggregator(
+        local_db_driver=_local_driver(["a"]),
+        mcp_driver=_SlowDriver(0.1, "mcp-1"),
+        shopify_mcp_driver=_SlowDriver(5.0, "shopify-1"),
+        timeout_ms=600,
+    )
+    batches = [b async for b in agg.stream("flowers", limit=10)]
+    assert [b.source for b in batches] == ["local", "mcp", "shopify_mcp"]
+    assert [p.id for p in batches[1].products] == ["mcp-1"]
+    assert batches[2].products == [] and batches[2].error == "timeout"
+
+
+@pytest.mark.asyncio
+async def test_aggregator_search_merges_in_driver_order_and_excludes_tags():
+    async def _search_fn(**kwargs):
+        return [{"id": "a", "name": "a", "experience_tags": ["baby"]}, {"id": "b", "name": "b"}]
+
+    agg = DiscoveryAggregator(
+        local_db_driver=LocalDBDriver(_search_fn),
+        mcp_driver=_SlowDriver(0.0, "mcp-1"),
+        timeout_ms=1000,
+    )
+    out = await agg.search("gifts", limit=10, exclude_experience_tags=["Baby"])
+    assert [p.id for p in out] == ["b", "mcp-1"]
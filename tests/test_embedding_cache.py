@@ -0,0 +1,42 @@
+"""Tests for the query-embedding cache (discovery-service embedding_cache)."""
+
+import sys
+import threading
+from pathlib import Path
+
+import pytest
+
+_root = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(_root))
+
+
+@pytest.mark.asyncio
+async def test_original_text_is_embedded_and_persistent_tier_runs_off_the_loop(discovery_service, monkeypatch):
+    import embedding_cache
+    from packages.shared.ttl_cache import AsyncTTLCache
+
+    loop_thread = threading.get_ident()
+    threads, stored, embedded = [], [], []
+
+    def load(key):
+        threads.append(threading.get_ident())
+        return None
+
+    def store(key, text, provider, model, vec):
+        threads.append(threading.get_ident())
+        stored.append((key, text))
+
+    async def embed_fn(text):
+        embedded.append(text)
+        return [0.6, 0.8]
+
+    monkeypatch.setattr(embedding_cache, "_cache", AsyncTTLCache(name="test", max_entries=8, ttl=60))
+    monkeypatch.setattr(embedding_cache, "settings", type("S", (), {"embedding_cache_persistent": True})())
+    monkeypatch.setattr(embedding_cache, "_load_persistent", load)
+    monkeypatch.setattr(embedding_cache, "_store_persistent", store)
+
+    assert await embedding_cache.get_cached_embedding("Date  Night", "hash", "v1", embed_fn) == [0.6, 0.8]
+    assert await embedding_cache.get_cached_embedding(" date night", "hash", "v1", embed_fn) == [0.6, 0.8]
+    assert embedded == ["Date  Night"]  # second spelling shares the cached vector
+    assert stored == [(embedding_cache.embedding_cache_key("date night", "hash", "v1"), "Date  Night")]
+    assert len(threads) == 2 and loop_thread not in threads
@@ -0,0 +1,45 @@
+"""Tests for the pluggable embedding providers (packages/shared/embeddings)."""
+
+import math
+import sys
+from pathlib import Path
+
+import pytest
+
+_root = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(_root))
+
+from packages.shared.embeddings import (
+    AzureOpenAIEmbeddingProvider,
+    HashingEmbeddingProvider,
+    OpenAIEmbeddingProvider,
+    create_embedding_provider,
+)
+
+
+def _cosine(a, b):
+    return sum(x * y for x, y in zip(a, b))
+
+
+@pytest.mark.asyncio
+async def test_hashing_provider_is_deterministic_normalized_and_batched():
+    provider = HashingEmbeddingProvider()
+    vectors = await provider.embed(["Red roses for date night", "red  ROSES for date night", "", "limo rental"])
+    assert len(vectors) == 4
+    a, b, empty, c = vectors
+    assert a == b  # case / whitespace insensitive
+    assert empty is None
+    assert len(a) == 1536 and math.isclose(math.sqrt(sum(x * x for x in a)), 1.0, rel_tol=1e-9)
+    assert _cosine(a, (await provider.embed(["roses date night"]))[0]) > _cosine(a, c)
+    assert provider.version == "hash:hashing-v1"
+
+
+def test_create_embedding_provider_selection():
+    assert create_embedding_provider("openai", "text-embedding-3-small") is None  # no key
+    assert isinstance(create_embedding_provider("openai", "text-embedding-3-small", openai_api_key="sk"), OpenAIEmbeddingProvider)
+    assert create_embedding_provider("azure", "text-embedding-3-small") is None
+    azure = create_embedding_provider("azure", "emb", azure_endpoint="https://x/", azure_api_key="k")
+    assert isinstance(azure, AzureOpenAIEmbeddingProvider) and azure.version == "azure:emb"
+    assert isinstance(create_embedding_provider("hash"), HashingEmbeddingProvider)
+    assert create_embedding_provider("local") is not None
+    assert create_embedding_provider("unknown") is None
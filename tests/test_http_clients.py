@@ -0,0 +1,79 @@
+"""Tests for shared pooled HTTP clients (packages/shared/http_clients)."""
+
+import asyncio
+import sys
+from pathlib import Path
+
+import httpx
+import pytest
+
+_root = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(_root))
+
+from packages.shared.http_clients import HTTPClientRegistry, host_key
+
+
+def test_host_key():
+    assert host_key("https://API.Example.com/v1/x?y=1") == "https://api.example.com"
+    assert host_key("http://localhost:8000/health") == "http://localhost:8000"
+    assert host_key("") == "default"
+    assert host_key("/relative/path") == "default"
+
+
+@pytest.mark.asyncio
+async def test_client_reused_per_host():
+    reg = HTTPClientRegistry()
+    a1 = reg.get("https://a.example/x")
+    a2 = reg.get("https://a.example/y")
+    b = reg.get("https://b.example/x")
+    assert a1 is a2
+    assert a1 is not b
+    await reg.aclose()
+    assert a1.is_closed and b.is_closed
+
+
+@pytest.mark.asyncio
+async def test_lru_evicts_and_closes_oldest_host():
+    reg = HTTPClientRegistry(max_hosts=2)
+    a = reg.get("https://a.example")
+    reg.get("https://b.example")
+    reg.get("https://a.example")  # a is now most recently used
+    reg.get("https://c.example")
+    assert reg.stats()["active_hosts"] == 2
+    assert reg.get("https://a.example") is a
+    assert "https://b.example" not in reg._clients
+    await reg.aclose()
+
+
+@pytest.mark.asyncio
+async def test_evicted_client_closed_only_after_grace_when_idle():
+    reg = HTTPClientRegistry(max_hosts=1, timeout=0.5)
+    a = reg.get("https://a.example")
+    reg.get("https://b.example")
+    assert not a.is_closed  # a coroutine may still be using it
+    assert reg.stats()["retired_clients"] == 1
+    await asyncio.sleep(0.6)
+    reg.get("https://b.example")
+    await asyncio.sleep(0)
+    await asyncio.sleep(0)
+    assert a.is_closed
+    assert reg.stats()["retired_clients"] == 0
+    await reg.aclose()
+
+
+@pytest.mark.asyncio
+async def test_stats_count_requests_and_5xx(monkeypatch):
+    def handler(request):
+        return httpx.Response(503 if request.url.path == "/down" else 200, json={})
+
+    real_client = httpx.AsyncClient
+    monkeypatch.setattr(httpx, "AsyncClient", lambda **kw: real_client(transport=httpx.MockTransport(handler), **kw))
+    reg = HTTPClientRegistry()
+    client = reg.get("https://svc.example")
+    await client.get("https://svc.example/ok", timeout=1.0)
+    await client.get("https://svc.example/down", timeout=1.0)
+    host = reg.stats()["hosts"]["https://svc.example"]
+    assert host["requests"] == 2 and host["responses"] == 2
+    assert host["errors_5xx"] == 1
+    assert host["clients_created"] == 1
+    await reg.aclose()
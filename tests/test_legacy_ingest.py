@@ -0,0 +1,95 @@
+"""Tests for streaming legacy catalog ingest (discovery-service adapters/legacy_adapter and legacy_ingest)."""
+
+import io
+import json
+import sys
+from pathlib import Path
+
+import pytest
+
+_root = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(_root))
+
+READ_SIZES = [1, 2, 3, 7, 16, 64 * 1024]
+
+PRODUCTS = [
+    {"name": "Roses", "price": 125, "tags": "flowers red"},
+    {"name": "Tulips", "price": 12.5, "nested": {"a": [1, 2, {"b": None}]}},
+    {"name": "Cake é", "price": -3e2, "ok": True},
+]
+
+
+def _rows(text, read_size, monkeypatch):
+    from adapters import legacy_adapter
+
+    monkeypatch.setattr(legacy_adapter, "_JSON_READ_SIZE", read_size)
+    return list(legacy_adapter.iter_json_rows(io.BytesIO(text.encode("utf-8"))))
+
+
+@pytest.mark.parametrize("read_size", READ_SIZES)
+def test_json_array_across_small_reads(discovery_service, monkeypatch, read_size):
+    assert _rows(json.dumps(PRODUCTS), read_size, monkeypatch) == PRODUCTS
+    assert _rows(" [ ] ", read_size, monkeypatch) == []
+
+
+@pytest.mark.parametrize("read_size", READ_SIZES)
+@pytest.mark.parametrize("key", ["products", "items", "data"])
+def test_json_wrapper_object_across_small_reads(discovery_service, monkeypatch, read_size, key):
+    text = json.dumps({"total": 12345.5e1, key: PRODUCTS, "next": None})
+    assert _rows(text, read_size, monkeypatch) == PRODUCTS
+
+
+@pytest.mark.parametrize("read_size", READ_SIZES)
+def test_json_lines_across_small_reads(discovery_service, monkeypatch, read_size):
+    text = "\n".join(json.dumps(p) for p in PRODUCTS) + "\n"
+    assert _rows(text, read_size, monkeypatch) == PRODUCTS
+
+
+@pytest.mark.parametrize("read_size", READ_SIZES)
+def test_numbers_cut_at_a_buffer_edge(discovery_service, monkeypatch, read_size):
+    # A single object is read key by key, so top-level numbers can end exactly at a buffer edge
+    item = {"name": "A", "price": 125.75, "qty": 1000, "weight": 1.5e-3}
+    for pad in range(read_size if read_size < 64 else 1):
+        text = " " * pad + json.dumps(item)
+        assert _rows(text, read_size, monkeypatch) == [item]
+
+
+def test_csv_blank_rows_are_skipped(discovery_service):
+    from adapters.legacy_adapter import iter_csv_rows, parse_csv_to_products
+
+    content = b"name,price\nRoses,10\n,\n\nTulips,5\n\n"
+    assert [r["name"] for r in iter_csv_rows(io.BytesIO(content))] == ["Roses", "Tulips"]
+    assert [p["price"] for p in parse_csv_to_products(content)] == [10.0, 5.0]
+
+
+@pytest.mark.asyncio
+async def test_failed_chunk_resumes_without_duplicate_inserts(discovery_service, monkeypatch, tmp_path):
+    import legacy_ingest
+
+    path = tmp_path / "feed.csv"
+    # Row 3 has no name (skipped, but counted in the checkpoint); blank lines are not rows at all
+    path.write_text("name,price\n" + "".join(f"P{i},{i}\n" if i != 3 else ",7\n\n" for i in range(10)))
+    inserted, calls = [], {"n": 0}
+
+    async def insert_legacy_products(partner_id, products):
+        calls["n"] += 1
+        if calls["n"] == 2:
+            raise RuntimeError("insert failed")
+        inserted.extend(p["name"] for p in products)
+        return [{"id": p["name"]} for p in products]
+
+    monkeypatch.setattr(legacy_ingest, "insert_legacy_products", insert_legacy_products)
+    monkeypatch.setattr(legacy_ingest, "invalidate_result_cache", lambda reason: None)
+    job = legacy_ingest.create_job("partner-1", str(path), "feed.csv", path.stat().st_size, b"name", chunk_size=3)
+
+    await legacy_ingest.run_ingest(job)
+    assert job.status == "failed" and job.error == "insert failed"
+    assert job.checkpoint == 3 and inserted == ["P0", "P1", "P2"]
+    assert job.to_dict()["resumable"]
+
+    assert legacy_ingest.resume_job(job.id) is job
+    await legacy_ingest._tasks[job.id]
+    assert job.status == "completed"
+    assert inserted == [f"P{i}" for i in range(10) if i != 3]
+    assert job.inserted == 9 and job.skipped == 1 and job.checkpoint == 10
+    assert not path.exists()
@@ -0,0 +1,66 @@
+"""Tests for the process-wide LLM client cache (packages/shared/llm_clients)."""
+
+import sys
+import types
+from pathlib import Path
+
+import pytest
+
+_root = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(_root))
+
+from packages.shared.llm_clients import LLMClientRegistry, config_key  # noqa: E402
+
+
+def test_config_key_stable_and_sensitive():
+    assert config_key(kind="openai", api_key="k", base_url=None) == config_key(api_key="k", kind="openai")
+    assert config_key(kind="openai", api_key="k") != config_key(kind="openai", api_key="k2")
+    assert "k" not in config_key(kind="openai", api_key="k" * 40)
+
+
+def test_openai_client_reused_per_config():
+    pytest.importorskip("openai")
+    reg = LLMClientRegistry()
+    a1 = reg.openai("sk-a", base_url="https://openrouter.ai/api/v1")
+    a2 = reg.openai("sk-a", base_url="https://openrouter.ai/api/v1")
+    b = reg.openai("sk-b", base_url="https://openrouter.ai/api/v1")
+    az = reg.openai("sk-a", azure_endpoint="https://x.openai.azure.com", api_version="2024-02-01")
+    assert a1 is a2
+    assert a1 is not b and a1 is not az
+    assert type(az).__name__ == "AzureOpenAI"
+    stats = reg.stats()
+    assert stats["builds"] == 3 and stats["hits"] == 1 and stats["cached_clients"] == 3
+    assert "sk-a" not in str(stats)
+    reg.clear()
+    assert reg.stats()["cached_clients"] == 0
+
+
+def test_lru_drops_oldest_config():
+    pytest.importorskip("openai")
+    reg = LLMClientRegistry(max_clients=2)
+    a = reg.openai("sk-a")
+    reg.openai("sk-b")
+    assert reg.openai("sk-a") is a  # a is now most recently used
+    reg.openai("sk-c")
+    assert reg.stats()["evictions"] == 1
+    assert reg.openai("sk-a") is a
+    assert reg.stats()["builds"] == 3  # sk-b was dropped, sk-a kept
+    reg.clear()
+
+
+def test_gemini_configured_once_per_key(monkeypatch):
+    configured = []
+    genai = types.ModuleType("google.generativeai")
+    genai.configure = lambda api_key: configured.append(api_key)  # type: ignore[attr-defined]
+    google = types.ModuleType("google")
+    google.generativeai = genai  # type: ignore[attr-defined]
+    monkeypatch.setitem(sys.modules, "google", google)
+    monkeypatch.setitem(sys.modules, "google.generativeai", genai)
+
+    reg = LLMClientRegistry()
+    assert reg.gemini("g1") is genai
+    reg.gemini("g1")
+    reg.gemini("g2")
+    reg.gemini("g2")
+    assert configured == ["g1", "g2"]
+    assert reg.stats()["gemini_configures"] == 2
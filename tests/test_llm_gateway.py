@@ -0,0 +1,112 @@
+"""Tests for the async LLM gateway (packages/shared/llm_provider/gateway)."""
+
+import asyncio
+import sys
+import types
+from pathlib import Path
+
+import pytest
+
+_root = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(_root))
+
+from packages.shared.llm_clients import LLMClientRegistry  # noqa: E402
+from packages.shared.llm_provider.gateway import LLMGateway, LLMTimeoutError  # noqa: E402
+
+
+class _AsyncCompletions:
+    def __init__(self, delay=0.05, chunks=3):
+        self.delay = delay
+        self.chunks = chunks
+        self.active = 0
+        self.peak = 0
+
+    async def create(self, **kwargs):
+        self.active += 1
+        self.peak = max(self.peak, self.active)
+        try:
+            await asyncio.sleep(self.delay)
+        finally:
+            self.active -= 1
+        if kwargs.get("stream"):
+            return self._stream()
+        return {"model": kwargs["model"]}
+
+    async def _stream(self):
+        for i in range(self.chunks):
+            await asyncio.sleep(0)
+            yield i
+
+
+def _client(**kwargs):
+    completions = _AsyncCompletions(**kwargs)
+    return types.SimpleNamespace(chat=types.SimpleNamespace(completions=completions)), completions
+
+
+def test_concurrency_limited_per_provider():
+    client, completions = _client()
+    gateway = LLMGateway(limits={"azure": 2})
+
+    async def run():
+        return await asyncio.gather(*(gateway.chat_completion("azure", client, model="m") for _ in range(6)))
+
+    results = asyncio.run(run())
+    assert results == [{"model": "m"}] * 6
+    assert completions.peak == 2
+    stats = gateway.stats()["providers"]["azure"]
+    assert stats["calls"] == 6 and stats["in_flight"] == 0 and stats["limit"] == 2
+
+
+def test_timeout_raises_and_frees_slot():
+    client, _ = _client(delay=1.0)
+    gateway = LLMGateway(limits={"gemini": 1})
+
+    async def run():
+        with pytest.raises(LLMTimeoutError):
+            await gateway.chat_completion("gemini", client, model="m", timeout=0.05)
+        client.chat.completions.delay = 0
+        return await gateway.chat_completion("gemini", client, model="m", timeout=0.5)
+
+    assert asyncio.run(run()) == {"model": "m"}
+    stats = gateway.stats()["providers"]["gemini"]
+    assert stats["timeouts"] == 1 and stats["in_flight"] == 0
+
+
+def test_stream_releases_slot_when_closed_early():
+    client, _ = _client(delay=0, chunks=5)
+    gateway = LLMGateway(limits={"openrouter": 1})
+
+    async def run():
+        stream = gateway.stream_chat_completion("openrouter", client, model="m")
+        first = await stream.__anext__()
+        await stream.aclose()
+        rest = [c async for c in gateway.stream_chat_completion("openrouter", client, model="m")]
+        return first, rest
+
+    first, rest = asyncio.run(run())
+    assert first == 0 and rest == [0, 1, 2, 3, 4]
+    assert gateway.stats()["providers"]["openrouter"]["in_flight"] == 0
+
+
+def test_unknown_sync_client_runs_in_thread():
+    calls = []
+    create = lambda **kw: calls.append(kw) or "ok"  # noqa: E731
+    client = types.SimpleNamespace(chat=types.SimpleNamespace(completions=types.SimpleNamespace(create=create)))
+    gateway = LLMGateway()
+    assert asyncio.run(gateway.chat_completion("custom", client, model="m")) == "ok"
+    assert calls == [{"model": "m"}] and gateway.stats()["thread_fallbacks"] == 1
+
+
+def test_registry_client_has_async_twin_per_loop():
+    pytest.importorskip("openai")
+    reg = LLMClientRegistry()
+    sync_client = reg.openai("sk-a", base_url="https://openrouter.ai/api/v1")
+
+    async def twins():
+        return reg.async_twin(sync_client), reg.async_twin(sync_client), reg.async_twin(object())
+
+    a1, a2, unknown = asyncio.run(twins())
+    assert a1 is a2 and unknown is None
+    assert type(a1).__name__ == "AsyncOpenAI" and str(a1.base_url).startswith("https://openrouter.ai/api/v1")
+    (b1, _, _) = asyncio.run(twins())
+    assert b1 is not a1  # a new event loop gets its own async client
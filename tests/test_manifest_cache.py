@@ -0,0 +1,71 @@
+"""Tests for the Supabase-backed partner manifest cache (discovery-service manifest_cache)."""
+
+import asyncio
+import sys
+import types
+from pathlib import Path
+
+import httpx
+
+_root = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(_root))
+
+
+class _Query:
+    """Chainable stand-in for a supabase table query; execute() returns rows[table]."""
+
+    def __init__(self, client, table):
+        self.client, self.table = client, table
+
+    def __getattr__(self, name):
+        return lambda *args, **kwargs: self
+
+    def upsert(self, row, **kwargs):
+        self.client.upserts.append((self.table, row))
+        return self
+
+    def execute(self):
+        return types.SimpleNamespace(data=self.client.rows.get(self.table))
+
+
+class _Client:
+    def __init__(self, rows):
+        self.rows, self.upserts = rows, []
+
+    def table(self, name):
+        return _Query(self, name)
+
+
+def test_hot_path_fetch_does_not_store_validators(discovery_service, monkeypatch):
+    import manifest_cache
+
+    client = _Client({"manifest_cache": [{"hit_count": 4}]})
+    monkeypatch.setattr(manifest_cache, "get_supabase", lambda: client)
+    entry = types.SimpleNamespace(
+        manifest_url="https://shop.example/.well-known/ucp", etag='"v1"', last_modified="Tue, 01 Sep 2026 00:00:00 GMT",
+        ttl=300, cached_at=None,
+    )
+    asyncio.run(manifest_cache.record_ucp_manifest_fetch(entry))
+    (table, row), = client.upserts
+    assert table == "manifest_cache" and row["hit_count"] == 5 and row["cache_ttl"] == 300
+    assert "etag" not in row and "last_modified" not in row
+
+
+def test_304_without_stored_body_fetches_again(discovery_service, monkeypatch):
+    import manifest_cache
+
+    client = _Client({"manifest_cache": {"etag": '"v1"'}, "partner_manifests": None})
+    requests = []
+
+    def handler(request):
+        requests.append(request.headers.get("if-none-match"))
+        if request.headers.get("if-none-match"):
+            return httpx.Response(304)
+        return httpx.Response(200, json={"products": [{"id": "p1"}]}, headers={"etag": '"v2"'})
+
+    http = httpx.AsyncClient(transport=httpx.MockTransport(handler))
+    monkeypatch.setattr(manifest_cache, "get_supabase", lambda: client)
+    monkeypatch.setattr(manifest_cache, "get_http_client", lambda url: http)
+    assert asyncio.run(manifest_cache.fetch_manifest("https://shop.example/feed.json")) == {"products": [{"id": "p1"}]}
+    assert requests == ['"v1"', None]
+    assert client.upserts[-1][1]["etag"] == '"v2"'
@@ -0,0 +1,92 @@
+"""Tests for stateless masked product ids (packages/shared/masked_ids)."""
+
+import asyncio
+import sys
+import time
+import types
+from pathlib import Path
+
+_root = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(_root))
+
+from packages.shared.masked_ids import decode_masked_id, encode_masked_id, is_token_masked_id
+
+PRODUCT = "3f2b8c1e-7d4a-4e8b-9a51-0c6d2e9f1a77"
+PARTNER = "a1b2c3d4-e5f6-4a7b-8c9d-0e1f2a3b4c5d"
+
+
+def test_round_trip_keeps_ids_hidden_and_compact():
+    masked = encode_masked_id("s3cret", PRODUCT, PARTNER, agent_slug="flowers_co", source="local", ttl_sec=3600)
+    assert masked.startswith("uso_flowers_co.") and is_token_masked_id(masked)
+    assert PRODUCT not in masked and PRODUCT.replace("-", "") not in masked
+    assert len(masked) < 120
+    decoded = decode_masked_id("s3cret", masked)
+    assert decoded is not None
+    assert (decoded.internal_product_id, decoded.partner_id, decoded.source) == (PRODUCT, PARTNER, "local")
+    assert decoded.agent_slug == "flowers_co"
+    assert encode_masked_id("s3cret", PRODUCT) != encode_masked_id("s3cret", PRODUCT)  # random nonce
+
+
+def test_non_uuid_ids_and_missing_partner():
+    masked = encode_masked_id("k", "gid://shopify/Product/123", None, agent_slug="shop")
+    decoded = decode_masked_id("k", masked)
+    assert decoded.internal_product_id == "gid://shopify/Product/123"
+    assert decoded.partner_id is None and decoded.expires_at is None
+
+
+def test_rejects_tampering_wrong_key_and_expiry():
+    masked = encode_masked_id("k", PRODUCT, PARTNER, agent_slug="a", ttl_sec=60)
+    assert decode_masked_id("other", masked) is None
+    assert decode_masked_id("k", masked.replace("uso_a.", "uso_b.")) is None  # slug is authenticated
+    flipped = masked[:-2] + ("A" if masked[-2] != "A" else "B") + masked[-1]
+    assert decode_masked_id("k", flipped) is None
+    assert decode_masked_id("k", masked, now=time.time() + 120) is None
+    assert decode_masked_id("k", "uso_a_0123456789abcdef") is None  # legacy table id
+    assert not is_token_masked_id("uso_a_0123456789abcdef")
+
+
+def test_previous_secret_still_resolves():
+    masked = encode_masked_id("old", PRODUCT, agent_slug="a")
+    assert decode_masked_id(["new", "old"], masked).internal_product_id == PRODUCT
+
+
+def test_token_mode_drops_products_that_cannot_be_masked(discovery_service, monkeypatch):
+    import db
+
+    def encode(secret, internal_id, *args, **kwargs):
+        if internal_id == "broken":
+            raise ValueError("bad key")
+        return encode_masked_id(secret, internal_id, *args, **kwargs)
+
+    monkeypatch.setattr(db, "settings", types.SimpleNamespace(id_masking_mode="token", id_masking_secret="k"))
+    monkeypatch.setattr(db, "get_supabase", lambda: None)
+    monkeypatch.setattr(db, "encode_masked_id", encode)
+    products = [{"id": PRODUCT, "partner_id": PARTNER, "name": "ok"}, {"id": "broken", "partner_id": PARTNER}]
+    out = asyncio.run(db.mask_products(products, agent_slug_map={PARTNER: "shop"}))
+    assert [p["name"] for p in out] == ["ok"]
+    assert out[0]["id"].startswith("uso_shop.") and "partner_id" not in out[0]
+
+
+def test_broadcast_drops_products_whose_id_was_not_masked(orchestrator_service, monkeypatch, caplog):
+    import clients
+    import db
+    from registry import AgentEntry
+
+    async def via_rpc(base_url, **kwargs):
+        return {"products": [{"id": PRODUCT, "partner_id": PARTNER, "name": "ok"}, {"id": "broken", "name": "lost"}]}
+
+    def encode(secret, internal_id, *args, **kwargs):
+        if internal_id == "broken":
+            raise ValueError("bad key")
+        return encode_masked_id(secret, internal_id, *args, **kwargs)
+
+    monkeypatch.setattr(db, "settings", types.SimpleNamespace(id_masking_mode="token", id_masking_secret="k"))
+    monkeypatch.setattr(db, "encode_masked_id", encode)
+    monkeypatch.setattr(clients, "settings", types.SimpleNamespace(id_masking_enabled=True, discovery_service_url=""))
+    monkeypatch.setattr(clients, "get_agents", lambda capability=None: [AgentEntry("http://shop", "Shop", "shop")])
+    monkeypatch.setattr(clients, "discover_products_via_rpc", via_rpc)
+    with caplog.at_level("ERROR", logger=db.logger.name):
+        out = asyncio.run(clients.discover_products_broadcast("roses"))
+    assert [p["name"] for p in out["data"]["products"]] == ["ok"]
+    assert out["data"]["products"][0]["id"].startswith("uso_shop.") and "partner_id" not in out["data"]["products"][0]
+    assert "Masked id encoding failed" in caplog.text
@@ -0,0 +1,101 @@
+"""Tests for experience-tag enrichment (discovery-service middleware/metadata_enricher) with a stubbed LLM."""
+
+import asyncio
+import sys
+from pathlib import Path
+
+import pytest
+
+_root = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(_root))
+
+UUIDS = [f"00000000-0000-4000-8000-{i:012d}" for i in range(10)]
+
+
+@pytest.fixture
+def enricher(discovery_service, monkeypatch):
+    import db
+    from middleware import metadata_enricher
+    from packages.shared import platform_llm
+    from packages.shared.ttl_cache import AsyncTTLCache
+
+    state = {"llm_batches": [], "table": {}, "stored": [], "written": []}
+
+    async def call_llm(descriptions, llm_config, provider, chat_client):
+        state["llm_batches"].append(list(descriptions))
+        return {i: ["romantic"] for i, d in enumerate(descriptions) if "untaggable" not in d}
+
+    def write_back(items):
+        state["written"].append(items)
+        return len(items)
+
+    monkeypatch.setattr(metadata_enricher, "_cache", AsyncTTLCache(name="test_tags", max_entries=100, ttl=60))
+    monkeypatch.setattr(metadata_enricher, "_pending", set())
+    monkeypatch.setattr(metadata_enricher, "_tasks", set())
+    monkeypatch.setattr(metadata_enricher, "_stats", dict.fromkeys(metadata_enricher._stats, 0))
+    monkeypatch.setattr(metadata_enricher, "_call_llm_for_tags", call_llm)
+    monkeypatch.setattr(metadata_enricher, "_load_table", lambda hashes: {h: state["table"][h] for h in hashes if h in state["table"]})
+    monkeypatch.setattr(metadata_enricher, "_store_table", lambda tags, model: state["stored"].append((tags, model)))
+    monkeypatch.setattr(metadata_enricher, "_write_back", write_back)
+    monkeypatch.setattr(db, "get_supabase", lambda: object())
+    monkeypatch.setattr(platform_llm, "get_platform_llm_config", lambda client: {"api_key": "k", "model": "tagger"})
+    monkeypatch.setattr(platform_llm, "get_llm_chat_client", lambda config: ("openai", object()))
+    monkeypatch.setattr(metadata_enricher, "state", state, raising=False)  # recorded calls, for the assertions
+    return metadata_enricher
+
+
+def _products():
+    products = [{"id": UUIDS[i], "description": f"Bouquet number {i}"} for i in range(6)]
+    products.append({"id": "gid://shopify/Product/1", "description": "Bouquet number 0", "metadata": {"source": "SHOPIFY"}})
+    products.append({"id": UUIDS[8], "description": "Tagged", "experience_tags": ["luxury"]})
+    products.append({"id": UUIDS[9], "description": "untaggable widget"})
+    return products
+
+
+@pytest.mark.asyncio
+async def test_misses_are_batched_and_written_back_once(enricher):
+    enricher._cache.set(enricher.content_hash("Bouquet number 1"), ["birthday"])
+    enricher.state["table"][enricher.content_hash("Bouquet number 2")] = ["wedding"]
+    products = _products()
+
+    await enricher.enrich_products(products, wait=True)
+    state = enricher.state
+    assert [len(b) for b in state["llm_batches"]] == [5]  # 0, 3, 4, 5 and the untaggable one (0 is shared by two products)
+    assert products[1]["experience_tags"] == ["birthday"] and products[2]["experience_tags"] == ["wedding"]
+    assert products[0]["experience_tags"] == products[6]["experience_tags"] == ["romantic"]
+    assert products[7]["experience_tags"] == ["luxury"] and "experience_tags" not in products[8]
+    (stored, model), = state["stored"]
+    assert len(stored) == 4 and model == "tagger"  # the untaggable description is not stored
+    written, = state["written"]
+    assert sorted(i["id"] for i in written) == sorted(UUIDS[i] for i in (0, 2, 3, 4, 5))  # LocalDB products only
+
+    again = _products()
+    await enricher.enrich_products(again, wait=True)
+    assert len(state["llm_batches"]) == 1 and len(state["written"]) == 1  # every description cached, empty tags too
+    assert [p.get("experience_tags") for p in again[:7]] == [["romantic"], ["birthday"], ["wedding"]] + [["romantic"]] * 4
+
+
+@pytest.mark.asyncio
+async def test_batches_of_five(enricher):
+    products = [{"id": UUIDS[0], "description": f"Gift {i}"} for i in range(12)]
+    await enricher.enrich_products(products, wait=True)
+    assert [len(b) for b in enricher.state["llm_batches"]] == [5, 5, 2]
+    assert len(enricher.state["stored"]) == 1
+
+
+@pytest.mark.asyncio
+async def test_background_mode_returns_at_once_and_tags_later(enricher):
+    products = _products()
+    assert await enricher.enrich_products(products, wait=False) is products
+    assert "experience_tags" not in products[0]  # returned dicts are never touched afterwards
+    assert len(enricher._pending) == 7
+
+    await enricher.enrich_products(_products(), wait=False)  # already queued: not scheduled again
+    assert len(enricher._tasks) == 1
+    await asyncio.gather(*list(enricher._tasks))
+    assert "experience_tags" not in products[0] and not enricher._pending
+    assert len(enricher.state["llm_batches"]) == 2  # seven descriptions: batches of 5 + 2
+
+    later = _products()
+    await enricher.enrich_products(later, wait=False)
+    assert later[0]["experience_tags"] == ["romantic"] and not enricher._tasks
@@ -0,0 +1,96 @@
+"""Tests for partner ranking (packages/shared/ranking): batch scorer and top-k match the per-product scorer."""
+
+import random
+import sys
+from pathlib import Path
+
+import pytest
+
+_root = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(_root))
+
+from packages.shared import ranking
+from packages.shared.config_snapshot import freeze
+from packages.shared.ranking import compile_ranking_policy, compute_product_rank_score, sort_products_by_rank
+
+CONFIGS = [
+    {},
+    {"ranking_policy": {"weights": {"price": 0.5, "rating": 0.1, "commission": 0.1, "trust": 0.3}, "price_direction": "desc"}},
+    {"ranking_edge_cases": {"missing_rating": 3, "missing_commission": 5, "missing_trust": 0.9}},
+    {"sponsorship_pricing": {"sponsorship_enabled": False}},
+]
+
+
+def _catalog(seed: int, n: int):
+    rnd = random.Random(seed)
+    prices = [None, "abc", -5, 0, "12.50", 3.99, 49, 250, float("nan"), float("inf")]
+    partners = {f"p{i}": {"id": f"p{i}", "trust_score": rnd.choice([None, "x", -10, 0, 55, 100, 140])} for i in range(6)}
+    partners["p6"] = {}
+    ratings = {f"p{i}": rnd.choice([0, 2.5, 4.9, 7]) for i in range(0, 6, 2)}
+    commissions = {"p1": 12.0, "p3": 40.0}
+    products = [
+        {
+            "id": f"prod{i}",
+            "partner_id": rnd.choice([None, "", "p0", "p1", "p2", "p3", "p4", "p5", "p6", "missing"]),
+            "price": rnd.choice(prices),
+            "created_at": rnd.choice([None, "2026-01-01", "2026-02-01", "2026-03-01"]),
+            "experience_tags": rnd.choice([None, "baby", ["Baby", "gift"], ["luxury"], [" ", None]]),
+        }
+        for i in range(n)
+    ]
+    sponsored = {f"prod{i}" for i in range(0, n, 7)}
+    return products, partners, ratings, commissions, sponsored
+
+
+def _reference(products, partners, ratings, commissions, sponsored, config, tag):
+    """Score every product with compute_product_rank_score and fully sort (the original algorithm)."""
+    sp = config.get("sponsorship_pricing") or {}
+    boost_sponsored = bool(sp.get("sponsorship_enabled", True))
+    scored = []
+    for p in products:
+        partner_id = str(p.get("partner_id", "")) if p.get("partner_id") else ""
+        partner = partners.get(partner_id) if partner_id else None
+        score = compute_product_rank_score(p, partner, ratings.get(partner_id), commissions.get(partner_id), config)
+        if str(p.get("id", "")) in sponsored and boost_sponsored:
+            score += 0.5
+        tags = p.get("experience_tags")
+        if tag and isinstance(tags, list) and tag.strip().lower() in {str(t).strip().lower() for t in tags if t}:
+            score += 0.2
+        scored.append((score, p))
+    scored.sort(key=lambda x: (-x[0], str(x[1].get("created_at", ""))))
+    return [p["id"] for _, p in scored]
+
+
+@pytest.mark.parametrize("config", CONFIGS)
+@pytest.mark.parametrize("n", [5, 60, 300])
+def test_batch_and_scalar_paths_match_reference(config, n):
+    products, partners, ratings, commissions, sponsored = _catalog(n, n)
+    for tag in (None, "baby"):
+        expected = _reference(products, partners, ratings, commissions, sponsored, config, tag)
+        got = sort_products_by_rank(products, partners, ratings, commissions, sponsored, config, experience_tag_boost=tag)
+        assert [p["id"] for p in got] == expected
+
+
+@pytest.mark.parametrize("k", [1, 3, 10, 59, 60, 100])
+def test_top_k_matches_full_sort_prefix(k, monkeypatch):
+    products, partners, ratings, commissions, sponsored = _catalog(7, 60)
+    full = sort_products_by_rank(products, partners, ratings, commissions, sponsored, {})
+    assert sort_products_by_rank(products, partners, ratings, commissions, sponsored, {}, top_k=k) == full[:k]
+    monkeypatch.setattr(ranking, "BATCH_MIN", 10_000)  # heap path
+    assert sort_products_by_rank(products, partners, ratings, commissions, sponsored, {}, top_k=k) == full[:k]
+
+
+def test_ranking_disabled_keeps_input_order():
+    products, partners, *_ = _catalog(1, 30)
+    assert sort_products_by_rank(products, partners, config={"ranking_enabled": False}) == products
+    assert sort_products_by_rank(products, partners, config={"ranking_enabled": False}, top_k=4) == products[:4]
+
+
+def test_compiled_policy_is_reused_for_snapshot_config():
+    cfg = freeze({"ranking_policy": {"weights": {"price": 1}}})
+    assert compile_ranking_policy(cfg) is compile_ranking_policy(cfg)
+    assert compile_ranking_policy(cfg).w_price == 1.0
+    mutable = {"ranking_policy": {"weights": {"price": 1}}}
+    first = compile_ranking_policy(mutable)
+    mutable["ranking_policy"]["weights"]["price"] = 2
+    assert compile_ranking_policy(mutable).w_price == 2.0 != first.w_price
@@ -0,0 +1,109 @@
+"""Tests for the in-memory ranking context (packages/shared/ranking_context)."""
+
+import sys
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+
+import pytest
+
+_root = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(_root))
+
+from packages.shared.ranking_context import RankingContextStore
+
+NOW = datetime.now(timezone.utc)
+
+
+def _iso(delta_sec: float) -> str:
+    return (NOW + timedelta(seconds=delta_sec)).isoformat()
+
+
+class _Tables:
+    def __init__(self):
+        self.partners = [{"id": "p1", "business_name": "Bloom", "trust_score": 80}]
+        self.ratings = [{"partner_id": "p1", "avg_rating": 4.5}]
+        self.sponsorships = [
+            {"id": "s1", "product_id": "a", "status": "active", "start_at": _iso(-3600), "end_at": _iso(3600)},
+            {"id": "s2", "product_id": "b", "status": "active", "start_at": _iso(1800), "end_at": _iso(7200)},
+        ]
+        self.since = []
+        self.by_ids = []
+
+    def store(self, **kwargs):
+        def partners(since):
+            self.since.append(since)
+            return list(self.partners)
+
+        def by_ids(ids):
+            self.by_ids.append(list(ids))
+            return [r for r in self.partners if r["id"] in ids]
+
+        return RankingContextStore(
+            partners, lambda since: list(self.ratings), lambda since: list(self.sponsorships), by_ids, **kwargs
+        )
+
+
+@pytest.mark.asyncio
+async def test_not_ready_until_first_refresh():
+    store = _Tables().store()
+    assert await store.get_context(["a"], ["p1"]) is None
+    await store.refresh()
+    partners, ratings, sponsored = await store.get_context(["a", "b"], ["p1"], now=NOW)
+    assert partners["p1"]["trust_score"] == 80
+    assert ratings == {"p1": 4.5}
+    assert sponsored == {"a"}
+    assert store.stats()["hits"] == 1
+
+
+@pytest.mark.asyncio
+async def test_sponsorship_windows_open_and_close_without_refresh():
+    store = _Tables().store()
+    await store.refresh()
+    assert not store.is_sponsored("b", NOW)
+    assert store.is_sponsored("b", NOW + timedelta(seconds=3600))
+    assert not store.is_sponsored("a", NOW + timedelta(seconds=3601 + 5))
+
+
+@pytest.mark.asyncio
+async def test_incremental_refresh_applies_changes_since_last_sync():
+    t = _Tables()
+    store = t.store(full_refresh_sec=3600)
+    await store.refresh()
+    t.partners = [{"id": "p1", "business_name": "Bloom", "trust_score": 20}]
+    t.sponsorships = [{"id": "s1", "product_id": "a", "status": "cancelled", "start_at": _iso(-3600), "end_at": _iso(3600)}]
+    await store.refresh()
+    assert t.since[0] is None and t.since[1] is not None
+    partners, _, sponsored = await store.get_context(["a", "b"], ["p1"], now=NOW + timedelta(seconds=2000))
+    assert partners["p1"]["trust_score"] == 20
+    assert sponsored == {"b"}  # s1 cancelled; s2 kept from the first load
+
+
+@pytest.mark.asyncio
+async def test_unseen_partner_is_fetched_once_and_unknown_ids_remembered():
+    t = _Tables()
+    store = t.store()
+    await store.refresh()
+    t.partners.append({"id": "p2", "business_name": "New", "trust_score": 50})
+    partners, _, _ = await store.get_context([], ["p1", "p2", "ucp-x"])
+    assert set(partners) == {"p1", "p2"}
+    assert t.by_ids == [["p2", "ucp-x"]]
+    await store.get_context([], ["p2", "ucp-x"])
+    assert t.by_ids == [["p2", "ucp-x"]]
+    stats = store.stats()
+    assert stats["misses"] == 1 and stats["hits"] == 1 and stats["unknown_partners"] == 1
+
+
+@pytest.mark.asyncio
+async def test_refresh_error_keeps_previous_data():
+    t = _Tables()
+    store = t.store()
+    await store.refresh()
+
+    def boom(since):
+        raise RuntimeError("db down")
+
+    store._fetch_ratings = boom
+    assert await store.refresh() == {}
+    _, ratings, _ = await store.get_context([], ["p1"])
+    assert ratings == {"p1": 4.5}
+    assert store.stats()["refresh_errors"] == 1
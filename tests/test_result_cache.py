@@ -0,0 +1,57 @@
+"""Tests for discovery result cache invalidation hooks (discovery-service ranking_context, embedding_backfill)."""
+
+import asyncio
+import sys
+from pathlib import Path
+
+import pytest
+
+_root = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(_root))
+
+
+@pytest.mark.asyncio
+async def test_incremental_sponsorship_changes_invalidate(discovery_service, monkeypatch):
+    import ranking_context
+
+    pages = {"product_sponsorships": []}
+    reasons = []
+    monkeypatch.setattr(ranking_context, "_paged", lambda table, *args, **kwargs: list(pages.get(table, [])))
+    monkeypatch.setattr(ranking_context, "invalidate_result_cache", reasons.append)
+    monkeypatch.setattr(ranking_context, "_sponsorships_changed", False)
+    store = ranking_context.RankingContextStore(
+        ranking_context._fetch_partners, ranking_context._fetch_ratings, ranking_context._fetch_sponsorships
+    )
+    monkeypatch.setattr(ranking_context, "_store", store)
+
+    pages["product_sponsorships"] = [
+        {"id": "s1", "product_id": "a", "status": "active", "start_at": None, "end_at": "2999-01-01T00:00:00+00:00"}
+    ]
+    await ranking_context.refresh_ranking_context(full=True)  # initial load is not a change
+    assert reasons == []
+
+    await ranking_context.refresh_ranking_context()
+    assert reasons == ["sponsorships changed"]
+
+    pages["product_sponsorships"] = []
+    await ranking_context.refresh_ranking_context()
+    assert reasons == ["sponsorships changed"]
+
+
+def test_embedding_writes_invalidate(discovery_service, monkeypatch):
+    import embedding_backfill
+
+    async def embed_texts(texts):
+        return [[1.0, 0.0] if "Roses" in t else None for t in texts]
+
+    reasons = []
+    monkeypatch.setattr(embedding_backfill, "embed_texts", embed_texts)
+    monkeypatch.setattr(embedding_backfill, "_write_embeddings", lambda client, target, rows, model=None: len(rows))
+    monkeypatch.setattr(embedding_backfill, "invalidate_result_cache", reasons.append)
+
+    rows = [{"id": "1", "name": "Roses"}, {"id": "2", "name": "Tulips"}]
+    assert asyncio.run(embedding_backfill.embed_rows(None, "products", rows, "hash:v1")) == (1, 1, 0)
+    assert reasons == ["embeddings updated"]
+
+    asyncio.run(embedding_backfill.embed_rows(None, "products", rows[1:], "hash:v1"))
+    assert reasons == ["embeddings updated"]  # nothing written
@@ -0,0 +1,159 @@
+"""Tests for the SLA re-sourcing job (discovery-service api/sla.py)."""
+
+import asyncio
+import sys
+import types
+from pathlib import Path
+
+import pytest
+
+_root = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(_root))
+
+
+def _leg(leg_id, partner_id="partner-a", name="Roses", capabilities=None, product_id="p1"):
+    return {
+        "leg_id": leg_id,
+        "thread_id": f"thread-{leg_id}",
+        "partner_id": partner_id,
+        "product_id": product_id,
+        "product_name": name,
+        "product_capabilities": capabilities,
+    }
+
+
+def _fake_search(calls, delay=0.02):
+    active = {"now": 0, "peak": 0}
+
+    async def search_products(query, limit, exclude_partner_id=None):
+        calls.append((query, exclude_partner_id))
+        active["now"] += 1
+        active["peak"] = max(active["peak"], active["now"])
+        await asyncio.sleep(delay)
+        active["now"] -= 1
+        return [{"id": f"{query}-{i}", "name": query, "price": "10", "partner_id": "other"} for i in range(5)]
+
+    return search_products, active
+
+
+class _ProductsTable:
+    def __init__(self, rows):
+        self.rows = rows
+        self.ids = None
+
+    def select(self, *_):
+        return self
+
+    def in_(self, _column, ids):
+        self.ids = ids
+        return self
+
+    def execute(self):
+        return types.SimpleNamespace(data=[r for r in self.rows if r["id"] in self.ids])
+
+
+@pytest.mark.asyncio
+async def test_find_alternatives_shares_searches_per_query_and_partner(discovery_service, monkeypatch):
+    from api import sla
+
+    calls = []
+    search_products, _ = _fake_search(calls)
+    monkeypatch.setattr(sla, "search_products", search_products)
+    legs = [
+        _leg("l1"),
+        _leg("l2"),  # same query and partner as l1: one search
+        _leg("l3", partner_id="partner-b"),
+        _leg("l4", capabilities=["bouquet", "vase"]),
+    ]
+    out = await sla._find_alternatives(legs)
+    assert sorted(calls) == [("Roses", "partner-a"), ("Roses", "partner-b"), ("bouquet", "partner-a")]
+    assert set(out) == {"l1", "l2", "l3", "l4"}
+    assert out["l1"] == out["l2"] and len(out["l1"]) == 3
+    assert out["l4"][0] == {"id": "bouquet-0", "name": "bouquet", "price": 10.0, "partner_id": "other"}
+
+
+@pytest.mark.asyncio
+async def test_find_alternatives_bounds_concurrency(discovery_service, monkeypatch):
+    from api import sla
+
+    calls = []
+    search_products, active = _fake_search(calls)
+    monkeypatch.setattr(sla, "search_products", search_products)
+    monkeypatch.setattr(sla, "settings", types.SimpleNamespace(sla_search_concurrency=2))
+    await sla._find_alternatives([_leg(f"l{i}", name=f"query {i}") for i in range(7)])
+    assert len(calls) == 7 and active["peak"] == 2
+
+
+@pytest.mark.asyncio
+async def test_run_job_notifies_only_bulk_claimed_legs(discovery_service, monkeypatch):
+    from api import sla
+
+    async def overdue():
+        return [_leg("l1"), _leg("l2"), _leg("l3", name="Nothing")]
+
+    async def search_products(query, limit, exclude_partner_id=None):
+        return [] if query == "Nothing" else [{"id": "alt", "name": "Tulips", "price": 5, "partner_id": "p2"}]
+
+    written = []
+
+    async def bulk(items):
+        written.append(items)
+        return ["l2"]  # l1 was claimed by an overlapping run
+
+    monkeypatch.setattr(sla, "get_supabase", lambda: object())
+    monkeypatch.setattr(sla, "get_sla_overdue_legs", overdue)
+    monkeypatch.setattr(sla, "search_products", search_products)
+    monkeypatch.setattr(sla, "create_sla_re_sourcing_pending_bulk", bulk)
+    result = await sla.run_sla_job()
+    assert [item["leg_id"] for item in written[0]] == ["l1", "l2"]  # l3 has no alternatives
+    assert result["count"] == 1
+    assert result["notified"] == [{"thread_id": "thread-l2", "leg_id": "l2", "alternatives": written[0][1]["alternatives"]}]
+
+
+@pytest.mark.asyncio
+async def test_run_job_falls_back_to_single_inserts(discovery_service, monkeypatch):
+    from api import sla
+
+    async def overdue():
+        return [_leg("l1"), _leg("l2")]
+
+    async def search_products(query, limit, exclude_partner_id=None):
+        return [{"id": "alt", "name": "Tulips", "price": 5, "partner_id": "p2"}]
+
+    async def bulk(items):
+        return None  # RPC not deployed
+
+    inserted = []
+
+    async def single(leg_id, alternatives):
+        inserted.append(leg_id)
+        return leg_id == "l1"
+
+    monkeypatch.setattr(sla, "get_supabase", lambda: object())
+    monkeypatch.setattr(sla, "get_sla_overdue_legs", overdue)
+    monkeypatch.setattr(sla, "search_products", search_products)
+    monkeypatch.setattr(sla, "create_sla_re_sourcing_pending_bulk", bulk)
+    monkeypatch.setattr(sla, "create_sla_re_sourcing_pending", single)
+    result = await sla.run_sla_job()
+    assert inserted == ["l1", "l2"]
+    assert [n["leg_id"] for n in result["notified"]] == ["l1"]
+
+
+def test_token_masked_product_ids_are_decoded_for_the_search_query(discovery_service, monkeypatch):
+    from api import sla
+
+    resolved = {"uso_shop.tok": ("internal-1", "partner-a")}
+    monkeypatch.setattr(sla, "resolve_masked_id", resolved.get)
+    table = _ProductsTable([{"id": "internal-1", "name": "Peonies", "capabilities": ["peony bouquet"]}])
+    client = types.SimpleNamespace(table=lambda name: table)
+    legs = [
+        _leg("l1", name=None, product_id="uso_shop.tok"),
+        _leg("l2", name="Roses", product_id="uso_shop.other"),  # already joined by the query
+        _leg("l3", name=None, product_id="uso_shop.unknown"),
+    ]
+    sla._fill_masked_products(client, legs)
+    assert table.ids == ["internal-1"]
+    assert legs[0]["product_capabilities"] == ["peony bouquet"]
+    assert sla._search_query(legs[0]["product_name"], legs[0]["product_capabilities"]) == "peony bouquet"
+    assert legs[1]["product_name"] == "Roses"
+    assert legs[2]["product_name"] is None
@@ -0,0 +1,97 @@
+"""Tests for speculative discovery prefetches (agentic.speculative.SpeculativeDiscovery)."""
+
+import asyncio
+
+import pytest
+
+
+def _fake_discover(calls, delay=0.0, fail_first=False):
+    async def discover_products(**kwargs):
+        calls.append(kwargs)
+        await asyncio.sleep(delay)
+        if fail_first and len(calls) == 1:
+            raise RuntimeError("discovery down")
+        return {"data": {"products": [kwargs.get("query")]}}
+
+    return discover_products
+
+
+@pytest.mark.asyncio
+async def test_exact_argument_call_reuses_prefetch(orchestrator_service):
+    from agentic.speculative import SpeculativeDiscovery
+
+    calls = []
+    speculative = SpeculativeDiscovery(_fake_discover(calls, delay=0.01))
+    speculative.prefetch(query="cake", limit=5, location=None)
+    result = await speculative(query="cake", limit=5)
+    assert result == {"data": {"products": ["cake"]}}
+    assert len(calls) == 1
+    assert speculative.prefetched == 1 and speculative.hits == 1
+
+
+@pytest.mark.asyncio
+async def test_other_arguments_pass_through(orchestrator_service):
+    from agentic.speculative import SpeculativeDiscovery
+
+    calls = []
+    speculative = SpeculativeDiscovery(_fake_discover(calls))
+    speculative.prefetch(query="cake", limit=5)
+    result = await speculative(query="flowers", limit=5)
+    assert result == {"data": {"products": ["flowers"]}}
+    assert sorted(c["query"] for c in calls) == ["cake", "flowers"]
+    assert speculative.hits == 0
+    speculative.discard()
+
+
+@pytest.mark.asyncio
+async def test_failed_prefetch_is_called_again(orchestrator_service):
+    from agentic.speculative import SpeculativeDiscovery
+
+    calls = []
+    speculative = SpeculativeDiscovery(_fake_discover(calls, fail_first=True))
+    speculative.prefetch(query="cake")
+    result = await speculative(query="cake")
+    assert result == {"data": {"products": ["cake"]}}
+    assert len(calls) == 2 and speculative.hits == 0
+
+
+@pytest.mark.asyncio
+async def test_discard_cancels_pending_prefetches(orchestrator_service):
+    from agentic.speculative import SpeculativeDiscovery
+
+    calls = []
+    speculative = SpeculativeDiscovery(_fake_discover(calls, delay=1.0))
+    speculative.prefetch(query="cake")
+    speculative.prefetch(query="cake")  # same arguments: one task
+    speculative.prefetch(query="flowers")
+    await asyncio.sleep(0)
+    tasks = list(speculative._tasks.values())
+    assert speculative.discard() == 2
+    await asyncio.gather(*tasks, return_exceptions=True)
+    assert all(t.cancelled() for t in tasks)
+    assert speculative._tasks == {}
+
+
+@pytest.mark.asyncio
+async def test_turn_error_cancels_prefetches(orchestrator_service):
+    from agentic.loop import _cleanup_turn_on_error, _on_turn_error
+    from agentic.speculative import SpeculativeDiscovery
+
+    speculative = SpeculativeDiscovery(_fake_discover([], delay=1.0))
+
+    @_cleanup_turn_on_error
+    async def turn(fail):
+        speculative.prefetch(query="cake")
+        _on_turn_error(speculative.discard)
+        if fail:
+            raise RuntimeError("planner failed")
+        return "done"
+
+    assert await turn(False) == "done"
+    assert len(speculative._tasks) == 1  # normal turns discard explicitly after the loop
+    speculative.discard()
+
+    with pytest.raises(RuntimeError):
+        await turn(True)
+    assert speculative._tasks == {}
+    _on_turn_error(speculative.discard)  # outside a turn: ignored
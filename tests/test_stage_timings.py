@@ -0,0 +1,36 @@
+"""Tests for per-request stage timings (packages/shared/monitoring/stage_timings)."""
+
+import asyncio
+import sys
+from pathlib import Path
+
+import pytest
+
+_root = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(_root))
+
+from packages.shared.monitoring.stage_timings import stage_stats, stage_timings, timed
+
+
+@pytest.mark.asyncio
+async def test_concurrent_stages_are_recorded_and_bounded_by_slowest():
+    stage_stats.reset()
+
+    async def _work(seconds, value):
+        await asyncio.sleep(seconds)
+        return value
+
+    with stage_timings() as t:
+        a, b = await asyncio.gather(timed("aggregator", _work(0.05, "a")), timed("semantic", _work(0.02, "b")))
+        with pytest.raises(ValueError):
+            await timed("ranking", _raise())
+    assert (a, b) == ("a", "b")
+    stages = t.as_dict()
+    assert set(stages) == {"aggregator", "semantic", "ranking", "total"}
+    assert stages["aggregator"] >= 45
+    assert stages["total"] < stages["aggregator"] + stages["semantic"]
+    assert stage_stats.snapshot()["aggregator"]["count"] == 1
+
+
+async def _raise():
+    raise ValueError("boom")
@@ -0,0 +1,93 @@
+"""Tests for the shared LRU + TTL async cache (packages/shared/ttl_cache)."""
+
+import asyncio
+import sys
+from pathlib import Path
+
+import pytest
+
+_root = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(_root))
+
+from packages.shared.ttl_cache import AsyncTTLCache
+
+
+@pytest.mark.asyncio
+async def test_get_or_load_caches_and_single_flights():
+    calls = []
+
+    async def _loader():
+        calls.append(1)
+        await asyncio.sleep(0.05)
+        return [0.1, 0.2]
+
+    cache = AsyncTTLCache(ttl=60)
+    results = await asyncio.gather(*[cache.get_or_load("flowers", _loader) for _ in range(5)])
+    assert all(r == [0.1, 0.2] for r in results)
+    assert len(calls) == 1
+    assert await cache.get_or_load("flowers", _loader) == [0.1, 0.2]
+    assert len(calls) == 1
+    stats = cache.stats()
+    assert stats["coalesced"] == 4 and stats["loads"] == 1 and stats["hits"] == 1
+
+
+@pytest.mark.asyncio
+async def test_none_is_not_cached_by_default():
+    calls = []
+
+    async def _loader():
+        calls.append(1)
+        return None
+
+    cache = AsyncTTLCache(ttl=60)
+    assert await cache.get_or_load("k", _loader) is None
+    assert await cache.get_or_load("k", _loader) is None
+    assert len(calls) == 2
+
+
+def test_lru_eviction_and_ttl_expiry():
+    cache = AsyncTTLCache(max_entries=2, ttl=60)
+    cache.set("a", 1)
+    cache.set("b", 2)
+    assert cache.get("a") == 1  # a becomes most recently used
+    cache.set("c", 3)
+    assert cache.get("b") is None
+    assert cache.get("a") == 1 and cache.get("c") == 3
+    cache.set("d", 4, ttl=0)
+    assert cache.get("d") is None
+    assert cache.invalidate() == 2
+
+
+@pytest.mark.asyncio
+async def test_stale_while_revalidate_serves_stale_and_refreshes_once():
+    calls = []
+
+    async def _loader():
+        calls.append(1)
+        await asyncio.sleep(0.02)
+        return len(calls)
+
+    cache = AsyncTTLCache(ttl=60, stale_ttl=60)
+    cache.set("q", 0, ttl=0.01)
+    await asyncio.sleep(0.02)
+    assert cache.get("q") is None  # get() only returns fresh values
+    results = await asyncio.gather(*[cache.get_or_load("q", _loader) for _ in range(3)])
+    assert results == [0, 0, 0]
+    await asyncio.sleep(0.05)
+    assert len(calls) == 1
+    assert await cache.get_or_load("q", _loader) == 1
+    assert cache.stats()["stale_hits"] == 3
+
+
+@pytest.mark.asyncio
+async def test_invalidate_discards_load_in_flight():
+    async def _loader():
+        await asyncio.sleep(0.02)
+        return "before-write"
+
+    cache = AsyncTTLCache(ttl=60)
+    pending = asyncio.ensure_future(cache.get_or_load("k", _loader))
+    await asyncio.sleep(0.005)  # loader is running
+    cache.invalidate()
+    assert await pending == "before-write"
+    assert cache.get("k") is None
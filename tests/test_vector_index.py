@@ -0,0 +1,77 @@
+"""Tests for the in-memory vector index (packages/shared/vector_index)."""
+
+import sys
+from pathlib import Path
+
+import pytest
+
+_root = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(_root))
+
+np = pytest.importorskip("numpy")
+
+from packages.shared.vector_index import VectorIndex
+
+
+def _vec(*head, dim=8):
+    v = [0.0] * dim
+    v[: len(head)] = head
+    return v
+
+
+def _index():
+    idx = VectorIndex(dimension=8, initial_capacity=2)
+    idx.upsert("a", _vec(1, 0), {"id": "a", "partner_id": "p1", "experience_tags": ["Luxury", "travel-friendly"]})
+    idx.upsert("b", _vec(1, 1), {"id": "b", "partner_id": "p2", "experience_tags": ["luxury"]})
+    idx.upsert("c", _vec(0, 1), {"id": "c", "partner_id": "p1", "experience_tags": []})
+    return idx
+
+
+def test_search_orders_by_cosine_and_applies_threshold():
+    idx = _index()
+    hits = idx.search(_vec(1, 0), k=10, threshold=0.3)
+    assert [p["id"] for p, _ in hits] == ["a", "b"]
+    assert hits[0][1] == pytest.approx(1.0)
+
+
+def test_filters_are_pushed_down():
+    idx = _index()
+    assert [p["id"] for p, _ in idx.search(_vec(1, 1), k=10, partner_id="p1")] == ["a", "c"]
+    assert [p["id"] for p, _ in idx.search(_vec(1, 1), k=10, exclude_partner_id="p1")] == ["b"]
+    # AND semantics across tags, case-insensitive
+    assert [p["id"] for p, _ in idx.search(_vec(1, 1), k=10, experience_tags=["luxury", "Travel-Friendly"])] == ["a"]
+    assert idx.search(_vec(1, 1), k=10, experience_tags=["luxury", "missing"]) == []
+
+
+def test_upsert_replaces_and_remove_frees_slot():
+    idx = _index()
+    idx.upsert("a", _vec(0, 1), {"id": "a", "partner_id": "p3", "experience_tags": []})
+    assert idx.search(_vec(1, 1), k=10, partner_id="p1")[0][0]["id"] == "c"
+    assert idx.search(_vec(1, 1), k=10, experience_tags=["luxury"])[0][0]["id"] == "b"
+    assert idx.remove("b") and "b" not in idx
+    idx.upsert("d", _vec(1, 0), {"id": "d"})
+    assert len(idx) == 3
+    assert [p["id"] for p, _ in idx.search(_vec(1, 0), k=1)] == ["d"]
+    assert not idx.upsert("bad", [1.0, 2.0], {"id": "bad"})
+
+
+def test_local_replica_treats_untagged_vectors_as_legacy_model(discovery_service, monkeypatch):
+    import local_vector_index
+    import semantic_search
+
+    monkeypatch.setattr(
+        semantic_search, "settings",
+        type("S", (), {"embedding_legacy_model": "", "embedding_provider": "azure", "embedding_model": "te-3"})(),
+    )
+    legacy = semantic_search.legacy_embedding_model_version()
+    assert legacy == "azure:te-3"
+    rows = [
+        {"id": "tagged", "embedding": _vec(1, 0), "embedding_model": "azure:te-3"},
+        {"id": "untagged", "embedding": _vec(0, 1), "embedding_model": None},
+        {"id": "other", "embedding": _vec(1, 1), "embedding_model": "hash:hashing-v1"},
+    ]
+    idx = VectorIndex(dimension=8)
+    local_vector_index._apply(idx, rows, "azure:te-3", legacy)
+    assert len(idx) == 2 and {r[0]["id"] for r in idx.search(_vec(1, 1), k=5, threshold=-1.0)} == {"tagged", "untagged"}
+    local_vector_index._apply(idx, rows, "hash:hashing-v1", legacy)  # after switching models
+    assert {r[0]["id"] for r in idx.search(_vec(1, 1), k=5, threshold=-1.0)} == {"other"}